@@ -0,0 +1,452 @@
+"""Shared agent runtime: one state snapshot per tick, agents evaluated concurrently.
+
+Every Redis input a registered agent reads is fetched with a single MGET into
+an immutable :class:`AgentSnapshot`, reused for ``AGENT_TICK_MS``.  Each tick
+runs the agents on a thread pool with a per-agent time budget.  Results are
+cached per agent against the snapshot digest they were computed from: an agent
+only re-runs when the inputs change, a slow agent that overruns its budget
+keeps running and its result is picked up by a later tick, and until then the
+tick carries its previous result flagged ``stale``.  While the inputs are
+unchanged and no new result has arrived the previous tick is served as is.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timezone
+from types import MappingProxyType
+from typing import Any, Callable, Mapping
+
+from backend.config import AGENT_BUDGET_MS, AGENT_RUNTIME_WORKERS, AGENT_TICK_MS
+from backend.compute.geopolitical_risk import compute_geopolitical_index
+from backend.compute.portfolio_protection import protection_protocol
+from backend.compute.quantile_sketch import DDSketch
+from backend.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEYS = (
+    "index:latest",
+    "regime:latest",
+    "risk:status",
+    "stablecoin:health",
+    "stablecoin:health:latest",
+    "microstructure:latest",
+    "price:integrity",
+    "price:pyth:SOL_USD",
+    "price:sol:pyth",
+    "prediction:latest",
+    "carry:latest",
+    "geopolitical:index:latest",
+    "gdelt:latest",
+    "wits:tariff:USA:ALL:ALL",
+    "wits:latest",
+    "cross_asset:contagion:latest",
+)
+
+
+def _loads(raw: Any) -> dict[str, Any] | None:
+    if raw is None:
+        return None
+    try:
+        value = json.loads(raw)
+        return value if isinstance(value, dict) else None
+    except (TypeError, ValueError):
+        return None
+
+
+def build_agent_state(snaps: Mapping[str, dict[str, Any] | None]) -> dict[str, Any]:
+    """Flatten the raw snapshots into the state dict the desk agents evaluate."""
+    state: dict[str, Any] = {}
+    now = datetime.now(timezone.utc).isoformat()
+
+    idx = snaps.get("index:latest")
+    if idx:
+        state["tariff_index"] = idx.get("tariff_index", 0)
+        state["tariff_momentum"] = idx.get("rate_of_change", 0)
+        state["shock_score"] = idx.get("shock_score", 0)
+        state["data_ts"] = idx.get("ts", now)
+    else:
+        state["data_ts"] = now
+
+    regime = snaps.get("regime:latest")
+    if regime:
+        state["vol_regime"] = regime.get("vol_regime", "normal")
+        state["funding_regime"] = regime.get("funding_regime", "neutral")
+
+    risk = snaps.get("risk:status")
+    if risk:
+        state["margin_usage"] = risk.get("margin_usage", 0)
+
+    stable = snaps.get("stablecoin:health")
+    if stable:
+        state["stablecoin_health"] = stable
+
+    micro = snaps.get("microstructure:latest")
+    if micro:
+        state["orderbook_imbalance"] = micro.get("imbalance", 0)
+        state["spread_bps"] = micro.get("spread_bps", 0) if "spread_bps" in micro else 0
+
+    integrity = snaps.get("price:integrity")
+    if integrity:
+        state["price_integrity"] = integrity.get("status", "OK")
+
+    state["positions"] = []
+    state["current_price"] = 0
+    price_snap = snaps.get("price:pyth:SOL_USD") or snaps.get("price:sol:pyth")
+    if price_snap:
+        state["current_price"] = price_snap.get("price", 0)
+
+    predict = snaps.get("prediction:latest")
+    if predict:
+        state["predictor_prob"] = predict.get("probability_up", 0.5)
+
+    carry = snaps.get("carry:latest")
+    if carry:
+        scores = carry.get("scores", [])
+        if scores:
+            state["carry_score"] = scores[0].get("annualized_carry", 0)
+
+    geo = snaps.get("geopolitical:index:latest")
+    if geo:
+        state.update(geo)
+
+    return state
+
+
+def geo_inputs(snaps: Mapping[str, dict[str, Any] | None]) -> dict[str, Any]:
+    return {
+        "gdelt": snaps.get("gdelt:latest"),
+        "wits": snaps.get("wits:tariff:USA:ALL:ALL") or snaps.get("wits:latest"),
+        "stablecoin": snaps.get("stablecoin:health:latest") or snaps.get("stablecoin:health"),
+        "cross_asset": snaps.get("cross_asset:contagion:latest"),
+    }
+
+
+class AgentSnapshot:
+    """Immutable view of one tick's inputs and the values derived from them.
+
+    The top-level mappings are read-only proxies; routes that return them
+    should copy with ``dict(...)``.
+    """
+
+    __slots__ = ("snapshots", "digest", "ts", "state", "geo_inputs", "geo_index", "protection")
+
+    def __init__(self, snapshots: dict[str, dict[str, Any] | None], digest: str):
+        self.snapshots = MappingProxyType(snapshots)
+        self.digest = digest
+        self.ts = datetime.now(timezone.utc).isoformat()
+        self.state = MappingProxyType(build_agent_state(snapshots))
+        self.geo_inputs = MappingProxyType(geo_inputs(snapshots))
+        try:
+            geo_index = compute_geopolitical_index(dict(self.geo_inputs))
+            protection = protection_protocol({"geopolitical_index": geo_index, "data_quality": geo_index.get("data_quality", "degraded")})
+        except Exception:
+            logger.warning("Agent snapshot geopolitical derivation failed", exc_info=True)
+            geo_index, protection = {"data_quality": "degraded"}, {}
+        self.geo_index = MappingProxyType(geo_index)
+        self.protection = MappingProxyType(protection)
+
+    def snapshot(self, key: str) -> dict[str, Any] | None:
+        return self.snapshots.get(key)
+
+
+class _AgentResult:
+    __slots__ = ("digest", "status", "signals", "elapsed_ms", "at", "result_id")
+
+    def __init__(self, digest: str, status: str, signals: tuple[dict[str, Any], ...], elapsed_ms: float, result_id: int):
+        self.digest = digest
+        self.status = status
+        self.signals = signals
+        self.elapsed_ms = elapsed_ms
+        self.at = time.monotonic()
+        self.result_id = result_id
+
+
+class _AgentSpec:
+    __slots__ = ("name", "evaluate", "budget_s", "latency", "runs", "timeouts", "errors", "last_status", "last_ms", "inflight", "result")
+
+    def __init__(self, name: str, evaluate: Callable[[AgentSnapshot], list[dict[str, Any]]], budget_s: float):
+        self.name = name
+        self.evaluate = evaluate
+        self.budget_s = budget_s
+        self.latency = DDSketch()
+        self.runs = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_status = "idle"
+        self.last_ms = 0.0
+        self.inflight: Future | None = None
+        self.result: _AgentResult | None = None
+
+
+class AgentTick:
+    """One evaluation of every agent.  ``new_signals`` holds only the signals
+    from agent results that no earlier tick carried."""
+
+    __slots__ = ("tick_id", "digest", "signals", "new_signals", "agents", "ts", "elapsed_ms", "complete", "result_version")
+
+    def __init__(
+        self,
+        tick_id: int,
+        digest: str,
+        signals: list[dict[str, Any]],
+        new_signals: list[dict[str, Any]],
+        agents: dict[str, dict[str, Any]],
+        elapsed_ms: float,
+        result_version: int,
+    ):
+        self.tick_id = tick_id
+        self.digest = digest
+        self.signals = tuple(signals)
+        self.new_signals = tuple(new_signals)
+        self.agents = agents
+        self.ts = datetime.now(timezone.utc).isoformat()
+        self.elapsed_ms = elapsed_ms
+        self.complete = all(a["status"] == "ok" for a in agents.values())
+        self.result_version = result_version
+
+
+class AgentRuntime:
+
+    def __init__(
+        self,
+        state_store: StateStore | None = None,
+        tick_ms: float = AGENT_TICK_MS,
+        budget_ms: float = AGENT_BUDGET_MS,
+        max_workers: int = AGENT_RUNTIME_WORKERS,
+    ):
+        self._store = state_store or StateStore()
+        self.tick_seconds = max(tick_ms, 0.0) / 1000.0
+        self.budget_seconds = max(budget_ms, 0.0) / 1000.0
+        self._max_workers = max(1, max_workers)
+        self._pool: ThreadPoolExecutor | None = None
+        self._agents: dict[str, _AgentSpec] = {}
+        self._listeners: list[Callable[[AgentTick], None]] = []
+        self._snapshot: AgentSnapshot | None = None
+        self._snapshot_at = 0.0
+        self._last: AgentTick | None = None
+        self._snapshot_lock = threading.Lock()
+        self._tick_lock = threading.Lock()
+        self._result_lock = threading.Lock()
+        self._result_version = 0
+        self._tick_ids = 0
+
+    @property
+    def agents(self) -> list[str]:
+        return list(self._agents)
+
+    def register(self, name: str, evaluate: Callable[[AgentSnapshot], list[dict[str, Any]]], budget_ms: float | None = None) -> None:
+        budget_s = self.budget_seconds if budget_ms is None else max(budget_ms, 0.0) / 1000.0
+        self._agents[name] = _AgentSpec(name, evaluate, budget_s)
+        self._last = None
+
+    def add_tick_listener(self, callback: Callable[[AgentTick], None]) -> None:
+        self._listeners.append(callback)
+
+    def _read(self) -> list[Any]:
+        r = self._store.get_redis()
+        if r is not None:
+            try:
+                return r.mget(list(SNAPSHOT_KEYS))
+            except Exception:
+                logger.warning("Agent snapshot read failed", exc_info=True)
+        return [None] * len(SNAPSHOT_KEYS)
+
+    def snapshot(self) -> AgentSnapshot:
+        with self._snapshot_lock:
+            now = time.monotonic()
+            snap = self._snapshot
+            if snap is not None and now - self._snapshot_at < self.tick_seconds:
+                return snap
+            raw = self._read()
+            digest = hashlib.blake2b("\x00".join(v or "" for v in raw).encode(), digest_size=16).hexdigest()
+            if snap is None or snap.digest != digest:
+                snap = self._snapshot = AgentSnapshot(dict(zip(SNAPSHOT_KEYS, (_loads(v) for v in raw))), digest)
+            self._snapshot_at = now
+            return snap
+
+    def invalidate(self) -> None:
+        with self._snapshot_lock:
+            self._snapshot = None
+
+    def _call(self, spec: _AgentSpec, snapshot: AgentSnapshot) -> None:
+        """Evaluate one agent and cache its result against the snapshot digest;
+        runs to completion even after the tick that started it has moved on."""
+        start = time.perf_counter()
+        status, signals = "ok", ()
+        try:
+            signals = tuple(spec.evaluate(snapshot) or [])
+        except Exception:
+            status = "error"
+            logger.debug("Agent %s error", spec.name, exc_info=True)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        spec.latency.add(elapsed_ms)
+        with self._result_lock:
+            spec.runs += 1
+            if status == "error":
+                spec.errors += 1
+            self._result_version += 1
+            spec.result = _AgentResult(snapshot.digest, status, signals, round(elapsed_ms, 3), self._result_version)
+
+    def _run(self, snapshot: AgentSnapshot, last: AgentTick | None) -> AgentTick:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="agent")
+        started = time.perf_counter()
+        submitted: dict[str, Future] = {}
+        for spec in self._agents.values():
+            result = spec.result
+            if result is not None and result.digest == snapshot.digest:
+                continue
+            if spec.inflight is not None and not spec.inflight.done():
+                continue
+            spec.inflight = submitted[spec.name] = self._pool.submit(self._call, spec, snapshot)
+
+        timed_out: set[str] = set()
+        for name, future in submitted.items():
+            spec = self._agents[name]
+            try:
+                future.result(timeout=max(spec.budget_s - (time.perf_counter() - started), 0.0))
+            except FutureTimeout:
+                spec.timeouts += 1
+                timed_out.add(name)
+                logger.warning("Agent %s exceeded its %.0f ms budget", spec.name, spec.budget_s * 1000)
+
+        with self._result_lock:
+            version = self._result_version
+            results = {spec.name: spec.result for spec in self._agents.values()}
+        watermark = last.result_version if last is not None else 0
+        now = time.monotonic()
+
+        signals: list[dict[str, Any]] = []
+        new_signals: list[dict[str, Any]] = []
+        agents: dict[str, dict[str, Any]] = {}
+        for spec in self._agents.values():
+            result = results[spec.name]
+            fresh = result is not None and result.digest == snapshot.digest
+            if fresh:
+                status = result.status
+            else:
+                status = "timeout" if spec.name in timed_out else "busy"
+            if result is not None and result.status == "ok":
+                signals.extend(result.signals)
+                if result.result_id > watermark:
+                    new_signals.extend(result.signals)
+            spec.last_status = status
+            spec.last_ms = result.elapsed_ms if fresh else round((time.perf_counter() - started) * 1000.0, 3)
+            agents[spec.name] = {
+                "status": status,
+                "elapsed_ms": spec.last_ms,
+                "signal_count": len(result.signals) if result is not None and result.status == "ok" else 0,
+                "stale": not fresh,
+                "age_ms": round((now - result.at) * 1000.0, 3) if result is not None else None,
+            }
+        with self._result_lock:
+            self._tick_ids += 1
+            tick_id = self._tick_ids
+        return AgentTick(tick_id, snapshot.digest, signals, new_signals, agents, round((time.perf_counter() - started) * 1000.0, 3), version)
+
+    def tick(self) -> AgentTick:
+        """Evaluate the agents whose cached result predates the current
+        snapshot; the previous tick is reused while the inputs are unchanged
+        and no agent has produced a result since."""
+        snapshot = self.snapshot()
+        with self._tick_lock:
+            last = self._last
+            if last is not None and last.digest == snapshot.digest and last.result_version == self._result_version:
+                return last
+            tick = self._last = self._run(snapshot, last)
+        for callback in self._listeners:
+            try:
+                callback(tick)
+            except Exception:
+                logger.warning("Agent tick listener failed", exc_info=True)
+        return tick
+
+    def latest(self) -> AgentTick | None:
+        return self._last
+
+    def signals(self, agents: set[str] | None = None) -> list[dict[str, Any]]:
+        tick = self.tick()
+        return [s for s in tick.signals if agents is None or s.get("agent") in agents]
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "agents": {
+                spec.name: {
+                    "last_status": spec.last_status,
+                    "last_ms": spec.last_ms,
+                    "runs": spec.runs,
+                    "timeouts": spec.timeouts,
+                    "errors": spec.errors,
+                    "budget_ms": round(spec.budget_s * 1000.0, 3),
+                    "p50_ms": round(spec.latency.quantile(0.50), 3),
+                    "p99_ms": round(spec.latency.quantile(0.99), 3),
+                }
+                for spec in self._agents.values()
+            },
+            "snapshot_digest": self._snapshot.digest if self._snapshot else None,
+            "last_tick_ms": self._last.elapsed_ms if self._last else None,
+        }
+
+    def shutdown(self) -> None:
+        with self._tick_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def register_default_agents(runtime: AgentRuntime) -> AgentRuntime:
+    from backend.agents.conflict_agent import ConflictAgent
+    from backend.agents.energy_shock_agent import EnergyShockAgent
+    from backend.agents.execution_agent import ExecutionAgent
+    from backend.agents.geopolitical_agent import GeopoliticalAgent
+    from backend.agents.hedging_agent import HedgingAgent
+    from backend.agents.hyperliquid_agent import HyperliquidAgent
+    from backend.agents.jupiter_agent import JupiterAgent
+    from backend.agents.liquidity_agent import LiquidityAgent
+    from backend.agents.macro_agent import MacroAgent
+    from backend.agents.protection_agent import ProtectionAgent
+    from backend.agents.risk_agent import RiskAgent
+    from backend.agents.sanctions_agent import SanctionsAgent
+
+    for name, agent in (
+        ("risk_agent", RiskAgent()),
+        ("macro_agent", MacroAgent()),
+        ("execution_agent", ExecutionAgent()),
+        ("liquidity_agent", LiquidityAgent()),
+        ("hyperliquid_agent", HyperliquidAgent()),
+        ("jupiter_agent", JupiterAgent()),
+        ("hedging_agent", HedgingAgent()),
+    ):
+        runtime.register(name, lambda snap, agent=agent: agent.evaluate(snap.state))
+    for agent in (GeopoliticalAgent(), SanctionsAgent(), ConflictAgent(), EnergyShockAgent()):
+        runtime.register(agent.name, lambda snap, agent=agent: agent.evaluate(snap.geo_index))
+    protection_agent = ProtectionAgent()
+    runtime.register(protection_agent.name, lambda snap: protection_agent.evaluate({**snap.geo_index, **snap.protection}))
+    return runtime
+
+
+GEO_AGENTS = frozenset({"geopolitical_agent", "sanctions_agent", "conflict_agent", "energy_shock_agent", "protection_agent"})
+
+_runtime: AgentRuntime | None = None
+_default_listeners: list[Callable[[AgentTick], None]] = []
+
+
+def add_default_tick_listener(callback: Callable[[AgentTick], None]) -> None:
+    """Attach ``callback`` to the shared runtime without building it; used by routers at import."""
+    _default_listeners.append(callback)
+    if _runtime is not None:
+        _runtime.add_tick_listener(callback)
+
+
+def get_agent_runtime() -> AgentRuntime:
+    global _runtime
+    if _runtime is None:
+        runtime = register_default_agents(AgentRuntime())
+        for callback in _default_listeners:
+            runtime.add_tick_listener(callback)
+        _runtime = runtime
+    return _runtime
@@ -7,12 +7,13 @@ from fastapi import APIRouter
 from backend.compute.backtester import run_backtest
 from backend.core.state_store import StateStore
 from backend.core.event_bus import EventBus, EventType
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/backtest", tags=["backtest"])
 
-_store = StateStore()
-_bus = EventBus()
+_store = Lazy(StateStore)
+_bus = Lazy(EventBus)
 
 _LATEST_KEY = "desk:backtest:latest"
 _LATEST_TTL = 1800
@@ -24,7 +25,7 @@ _MAX_HISTORY = 20
 def run_backtest_endpoint(body: dict[str, Any] | None = None):
     config = body or {}
 
-    _bus.emit(
+    _bus().emit(
         EventType.BACKTEST_STARTED,
         source="backtest_routes",
         payload={
@@ -45,7 +46,7 @@ def run_backtest_endpoint(body: dict[str, Any] | None = None):
         }
 
     result["success"] = True
-    _store.set_snapshot(_LATEST_KEY, result, ttl=_LATEST_TTL)
+    _store().set_snapshot(_LATEST_KEY, result, ttl=_LATEST_TTL)
 
     summary = {
         "total_return_pct": result.get("total_return_pct"),
@@ -59,7 +60,7 @@ def run_backtest_endpoint(body: dict[str, Any] | None = None):
     if len(_HISTORY) > _MAX_HISTORY:
         _HISTORY.pop(0)
 
-    _bus.emit(
+    _bus().emit(
         EventType.BACKTEST_COMPLETED,
         source="backtest_routes",
         payload={
@@ -75,7 +76,7 @@ def run_backtest_endpoint(body: dict[str, Any] | None = None):
 
 @router.get("/latest")
 def get_latest_backtest():
-    cached = _store.get_snapshot(_LATEST_KEY)
+    cached = _store().get_snapshot(_LATEST_KEY)
     if cached:
         return cached
     return {
@@ -5,31 +5,32 @@ from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
 from backend.compute.basis_engine import compute_basis, assess_feasibility, get_history as get_basis_history_data
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/basis", tags=["basis"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 @router.get("/latest")
 def get_latest():
     try:
-        hl_snap = _store.get_snapshot("price:hyperliquid:SOL_PERP") or {}
-        drift_snap = _store.get_snapshot("price:drift:SOL_PERP") or {}
-        spot_snap = _store.get_snapshot("price:pyth:SOL_USD") or _store.get_snapshot("price:sol:pyth") or _store.get_snapshot("price:sol:kraken") or {}
+        hl_snap = _store().get_snapshot("price:hyperliquid:SOL_PERP") or {}
+        drift_snap = _store().get_snapshot("price:drift:SOL_PERP") or {}
+        spot_snap = _store().get_snapshot("price:pyth:SOL_USD") or _store().get_snapshot("price:sol:pyth") or _store().get_snapshot("price:sol:kraken") or {}
 
         hl_perp = hl_snap.get("price", 0)
         drift_perp = drift_snap.get("price", 0)
         spot = spot_snap.get("price", 0)
 
-        hl_funding_snap = _store.get_snapshot("funding:hyperliquid") or {}
-        drift_funding_snap = _store.get_snapshot("funding:drift") or {}
+        hl_funding_snap = _store().get_snapshot("funding:hyperliquid") or {}
+        drift_funding_snap = _store().get_snapshot("funding:drift") or {}
         hl_funding = hl_funding_snap.get("funding_rate", 0)
         drift_funding = drift_funding_snap.get("funding_rate", 0)
 
         result = compute_basis(hl_perp, drift_perp, spot, hl_funding, drift_funding)
-        _store.set_snapshot("basis:latest", result, ttl=30)
+        _store().set_snapshot("basis:latest", result, ttl=30)
         return result
     except Exception as exc:
         logger.error("Error computing basis: %s", exc, exc_info=True)
@@ -44,8 +45,8 @@ def get_latest():
 @router.get("/feasibility")
 def get_feasibility():
     try:
-        micro = _store.get_snapshot("microstructure:latest") or {}
-        integrity = _store.get_snapshot("price:integrity") or {}
+        micro = _store().get_snapshot("microstructure:latest") or {}
+        integrity = _store().get_snapshot("price:integrity") or {}
 
         spread_bps = micro.get("spread_bps", 0)
         liquidity_depth = micro.get("liquidity_depth", 100000)
@@ -6,19 +6,20 @@ from fastapi import APIRouter, HTTPException
 from backend.core.schemas import DivergenceResponse, AlertResponse
 from backend.data.repositories.market_repo import MarketRepository
 from backend.data.repositories.events_repo import EventsRepository
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/divergence", tags=["divergence"])
 
-_market_repo = MarketRepository()
-_events_repo = EventsRepository()
+_market_repo = Lazy(MarketRepository)
+_events_repo = Lazy(EventsRepository)
 
 
 @router.get("/spreads", response_model=list[DivergenceResponse])
 def get_spreads():
     try:
-        all_ticks = _market_repo.get_all_latest()
+        all_ticks = _market_repo().get_all_latest()
         by_symbol: dict[str, list[dict]] = {}
         for tick in all_ticks:
             sym = tick["symbol"]
@@ -51,7 +52,7 @@ def get_spreads():
 @router.get("/alerts", response_model=list[AlertResponse])
 def get_alerts():
     try:
-        events = _events_repo.get_by_type("DIVERGENCE_ALERT", limit=20)
+        events = _events_repo().get_by_type("DIVERGENCE_ALERT", limit=20)
         alerts = []
         for ev in events:
             payload = ev.get("payload", {})
@@ -7,49 +7,51 @@ from typing import Any
 from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
-from backend.ingest.yfinance_ingest import EQUITY_INDEX_ETFS, SECTOR_ETFS, TARIFF_SENSITIVE, EQUITY_UNIVERSE, SECTORS, fetch_history, fetch_quote
+from backend.agents.runtime import get_agent_runtime
+from backend.ingest.yfinance_ingest import EQUITY_INDEX_ETFS, SECTOR_ETFS, TARIFF_SENSITIVE, EQUITY_UNIVERSE, SECTORS, fetch_quote
+from backend.ingest.equity_universe import get_equity_loader
 from backend.ingest.stooq_ingest import fetch_history as fetch_stooq_history
-from backend.compute.equity_analytics import analyze_history
+from backend.compute.equity_analytics import analyze_universe
 from backend.compute.equity_tariff_exposure import score_universe
 from backend.agents.equity_risk_agent import EquityRiskAgent
 from backend.agents.tariff_exposure_agent import TariffExposureAgent
 from backend.agents.sector_rotation_agent import SectorRotationAgent
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/equities", tags=["equities"])
-_store = StateStore()
-_risk_agent = EquityRiskAgent()
-_tariff_agent = TariffExposureAgent()
-_sector_agent = SectorRotationAgent()
+_store = Lazy(StateStore)
+_risk_agent = Lazy(EquityRiskAgent)
+_tariff_agent = Lazy(TariffExposureAgent)
+_sector_agent = Lazy(SectorRotationAgent)
+
+
 
 
 def _history(ticker: str, provider: str = "yfinance") -> dict[str, Any]:
-    try:
-        if provider == "stooq":
-            return fetch_stooq_history(ticker)
-        return fetch_history(ticker)
-    except Exception as exc:
-        logger.warning("Equity history failed for %s", ticker, exc_info=True)
-        return fetch_history(ticker) | {"degraded": True, "error": str(exc)}
+    if provider == "stooq":
+        return fetch_stooq_history(ticker)
+    return get_equity_loader().get(ticker)
 
 
-def _analytics_for(ticker: str, spy_hist: list[dict[str, Any]] | None = None) -> dict[str, Any]:
-    h = _history(ticker)
-    if h.get("degraded"):
-        alt = fetch_stooq_history(ticker)
-        if not alt.get("degraded"):
-            h = alt
-    spy = spy_hist if spy_hist is not None else (_history("SPY").get("history") or [])
-    row = analyze_history(ticker, h.get("history") or [], spy, SECTORS.get(ticker.upper(), "Unknown"))
-    row["provider_status"] = h.get("provider_status", {})
-    row["degraded"] = h.get("degraded", False)
-    return row
+def _analytics_rows(tickers: list[str]) -> list[dict[str, Any]]:
+    histories = get_equity_loader().load(["SPY", *tickers])
+    rows = analyze_universe(
+        {t.upper(): histories[t.upper()].get("history") or [] for t in tickers},
+        histories["SPY"].get("history") or [],
+        SECTORS,
+    )
+    for row in rows:
+        h = histories[row["ticker"]]
+        row["provider_status"] = h.get("provider_status", {})
+        row["degraded"] = h.get("degraded", False)
+    return rows
 
 
 def _wits_gdelt() -> tuple[dict[str, Any] | None, dict[str, Any] | None, list[str]]:
     warnings = []
-    wits = _store.get_snapshot("wits:tariff:USA:ALL:ALL") or _store.get_snapshot("wits:latest")
-    gdelt = _store.get_snapshot("gdelt:latest")
+    inputs = get_agent_runtime().snapshot().geo_inputs
+    wits, gdelt = inputs["wits"], inputs["gdelt"]
     if not wits:
         warnings.append("WITS unavailable; tariff pressure uses safe default")
     if not gdelt:
@@ -58,8 +60,7 @@ def _wits_gdelt() -> tuple[dict[str, Any] | None, dict[str, Any] | None, list[st
 
 
 def _overview_rows() -> list[dict[str, Any]]:
-    spy_hist = _history("SPY").get("history") or []
-    return [_analytics_for(t, spy_hist) for t in EQUITY_UNIVERSE]
+    return _analytics_rows(EQUITY_UNIVERSE)
 
 
 @router.get("/watchlist")
@@ -111,14 +112,14 @@ def tariff_exposure():
 def risk():
     rows = _overview_rows()
     exposure = tariff_exposure().get("scores", [])
-    signals = _risk_agent.evaluate(rows) + _tariff_agent.evaluate(exposure)
+    signals = _risk_agent().evaluate(rows) + _tariff_agent().evaluate(exposure)
     return {"signals": signals, "signal_count": len(signals), "ts": datetime.now(timezone.utc).isoformat()}
 
 
 @router.get("/sector-rotation")
 def sector_rotation():
     rows = _overview_rows()
-    signals = _sector_agent.evaluate(rows)
+    signals = _sector_agent().evaluate(rows)
     sectors: dict[str, list[float]] = {}
     for r in rows:
         sectors.setdefault(r.get("sector", "Unknown"), []).append(float(r.get("return_5d", 0.0)))
@@ -129,10 +130,10 @@ def sector_rotation():
 
 @router.get("/cross-asset")
 def cross_asset():
-    rows = {r["ticker"]: r for r in [_analytics_for(t) for t in ["SPY", "QQQ", "IWM"]]}
-    crypto = {"BTC": _store.get_snapshot("price:kraken:BTC_USD") or {}, "ETH": _store.get_snapshot("price:kraken:ETH_USD") or {}, "SOL": _store.get_snapshot("price:pyth:SOL_USD") or {}}
-    tariff = _store.get_snapshot("index:latest") or _store.get_snapshot("desk:index:latest") or {}
-    gdelt = _store.get_snapshot("gdelt:latest") or {}
+    rows = {r["ticker"]: r for r in _analytics_rows(["SPY", "QQQ", "IWM"])}
+    crypto = {"BTC": _store().get_snapshot("price:kraken:BTC_USD") or {}, "ETH": _store().get_snapshot("price:kraken:ETH_USD") or {}, "SOL": _store().get_snapshot("price:pyth:SOL_USD") or {}}
+    tariff = _store().get_snapshot("index:latest") or _store().get_snapshot("desk:index:latest") or {}
+    gdelt = _store().get_snapshot("gdelt:latest") or {}
     equity_vol = sum(float(r.get("realized_volatility", 0.0)) for r in rows.values()) / max(1, len(rows))
     tariff_level = float(tariff.get("tariff_index", tariff.get("value", 35.0)) or 35.0)
     risk_off = min(100.0, max(0.0, tariff_level * 0.55 + equity_vol * 55 + max(0.0, -rows["SPY"].get("return_5d", 0.0)) * 400))
@@ -4,18 +4,19 @@ from fastapi import APIRouter, HTTPException, Query
 
 from backend.core.schemas import EventResponse
 from backend.data.repositories.events_repo import EventsRepository
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/events", tags=["events"])
 
-_events_repo = EventsRepository()
+_events_repo = Lazy(EventsRepository)
 
 
 @router.get("/", response_model=list[EventResponse])
 def get_recent_events(limit: int = Query(default=50, ge=1, le=500)):
     try:
-        rows = _events_repo.get_recent(limit=limit)
+        rows = _events_repo().get_recent(limit=limit)
         results = []
         for r in rows:
             payload = r.get("payload", {})
@@ -38,7 +39,7 @@ def get_recent_events(limit: int = Query(default=50, ge=1, le=500)):
 @router.get("/by-type", response_model=list[EventResponse])
 def get_events_by_type(type: str = Query(...), limit: int = Query(default=20, ge=1, le=200)):
     try:
-        rows = _events_repo.get_by_type(event_type=type, limit=limit)
+        rows = _events_repo().get_by_type(event_type=type, limit=limit)
         results = []
         for r in rows:
             payload = r.get("payload", {})
@@ -7,18 +7,20 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from backend.core.schemas import ExecutionStatusResponse
-from backend.execution.router import ExecutionRouter
+from backend.execution.router import get_execution_router
 from backend.execution.jupiter_exec import JupiterExecutor
 from backend.data.repositories.positions_repo import PositionsRepository
-from backend.compute.smart_execution import create_smart_order, get_all_executions, get_execution
+from backend.compute.smart_execution import create_smart_order
+from backend.execution.smart_scheduler import get_smart_scheduler
+from backend.execution.trigger_engine import get_trigger_engine
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/execution", tags=["execution"])
 
-_exec_router = ExecutionRouter()
-_jupiter = JupiterExecutor()
-_positions_repo = PositionsRepository()
+_jupiter = Lazy(JupiterExecutor)
+_positions_repo = Lazy(PositionsRepository)
 
 
 class OrderRequest(BaseModel):
@@ -29,6 +31,8 @@ class OrderRequest(BaseModel):
     price: float | None = None
 
 
+class BatchOrderRequest(BaseModel):
+    orders: list[OrderRequest]
 
 
 class ConditionalOrderRequest(BaseModel):
@@ -57,40 +61,17 @@ class SmartOrderRequest(BaseModel):
     reference_price: float | None = None
 
 
-_conditional_orders: dict[str, dict[str, Any]] = {}
-
-
 def _latest_price(market: str, fallback: float | None = None) -> float | None:
     if fallback and fallback > 0:
         return fallback
     try:
-        info = _exec_router._get_live_price(market)
+        info = get_execution_router().get_live_price(market)
         price = float(info.get("price") or 0)
         return price if price > 0 else None
     except Exception:
         return None
 
 
-def _conditional_triggered(order: dict[str, Any], price: float | None) -> tuple[bool, str | None]:
-    if price is None:
-        return False, "missing price; evaluation skipped"
-    typ = (order.get("order_type") or "").lower()
-    side = (order.get("side") or "sell").lower()
-    trigger = order.get("trigger_price")
-    if typ == "trailing_stop":
-        if side == "sell":
-            order["peak_price"] = max(float(order.get("peak_price") or price), price)
-            trigger = order["peak_price"] - float(order.get("trailing_amount") or 0)
-        else:
-            order["trough_price"] = min(float(order.get("trough_price") or price), price)
-            trigger = order["trough_price"] + float(order.get("trailing_amount") or 0)
-        order["current_trigger_level"] = trigger
-    if typ in ("stop_loss", "trailing_stop"):
-        return (price <= float(trigger or 0), None) if side == "sell" else (price >= float(trigger or 0), None)
-    if typ == "take_profit":
-        return (price >= float(trigger or order.get("take_profit_price") or 0), None) if side == "sell" else (price <= float(trigger or order.get("take_profit_price") or 0), None)
-    return False, None
-
 class JupiterQuoteRequest(BaseModel):
     input_mint: str
     output_mint: str
@@ -112,7 +93,7 @@ def place_order(req: OrderRequest):
                 detail={"status": "error", "message": f"Invalid side '{req.side}' — must be 'buy' or 'sell'"},
             )
 
-        result = _exec_router.route_order(
+        result = get_execution_router().route_order(
             venue=req.venue,
             market=req.market,
             side=side,
@@ -124,7 +105,7 @@ def place_order(req: OrderRequest):
 
         fill_price = req.price or result.get("fill_price", 0.0)
 
-        _positions_repo.save_paper_trade(
+        _positions_repo().save_paper_trade(
             venue=req.venue,
             market=req.market,
             side=side,
@@ -142,11 +123,56 @@ def place_order(req: OrderRequest):
         raise HTTPException(status_code=500, detail={"status": "error", "message": "Failed to place order"})
 
 
+@router.post("/orders")
+def place_orders(req: BatchOrderRequest):
+    if not req.orders:
+        raise HTTPException(status_code=400, detail={"status": "error", "message": "Batch must contain at least one order"})
+    orders = []
+    for i, leg in enumerate(req.orders):
+        side = leg.side.lower().strip()
+        if side not in ("buy", "sell"):
+            raise HTTPException(
+                status_code=400,
+                detail={"status": "error", "message": f"Order {i}: invalid side '{leg.side}' — must be 'buy' or 'sell'"},
+            )
+        if leg.size <= 0:
+            raise HTTPException(status_code=400, detail={"status": "error", "message": f"Order {i}: size must be positive"})
+        orders.append({"venue": leg.venue, "market": leg.market, "side": side, "size": leg.size, "price": leg.price})
+
+    try:
+        result = get_execution_router().route_orders(orders)
+        if result.get("status") in ("blocked", "agent_blocked"):
+            raise HTTPException(status_code=403, detail=result)
+
+        _positions_repo().save_paper_trades([
+            {
+                "venue": r.get("venue", o["venue"]),
+                "market": o["market"],
+                "side": o["side"],
+                "size": o["size"],
+                "price": o["price"] or r.get("fill_price", 0.0),
+                "status": r.get("status", "unknown"),
+            }
+            for o, r in zip(orders, result["orders"])
+        ])
+        return result
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.error("Error placing order batch: %s", exc, exc_info=True)
+        raise HTTPException(status_code=500, detail={"status": "error", "message": "Failed to place order batch"})
+
+
+@router.get("/latency")
+def get_order_latency():
+    return {"stages": get_execution_router().latency.summary(), "ts": datetime.now(timezone.utc).isoformat()}
+
+
 @router.get("/positions")
 def get_positions():
     try:
-        positions = _exec_router.get_all_positions()
-        db_positions = _positions_repo.get_all()
+        positions = get_execution_router().get_all_positions()
+        db_positions = _positions_repo().get_all()
         return {
             "live_positions": positions,
             "db_positions": db_positions,
@@ -159,7 +185,7 @@ def get_positions():
 @router.get("/paper-trades")
 def get_paper_trades():
     try:
-        trades = _positions_repo.get_paper_trades(limit=50)
+        trades = _positions_repo().get_paper_trades(limit=50)
         return {"trades": trades, "count": len(trades)}
     except Exception as exc:
         logger.error("Error fetching paper trades: %s", exc, exc_info=True)
@@ -169,7 +195,7 @@ def get_paper_trades():
 @router.post("/jupiter/quote")
 def jupiter_quote(req: JupiterQuoteRequest):
     try:
-        result = _jupiter.get_quote(
+        result = _jupiter().get_quote(
             input_mint=req.input_mint,
             output_mint=req.output_mint,
             amount=req.amount,
@@ -188,12 +214,12 @@ def jupiter_quote(req: JupiterQuoteRequest):
 @router.post("/jupiter/swap")
 def jupiter_swap(req: JupiterSwapRequest):
     try:
-        build_result = _jupiter.build_swap(req.quote_response)
+        build_result = _jupiter().build_swap(req.quote_response)
         if build_result.get("status") == "error":
             raise HTTPException(status_code=400, detail=build_result)
 
         swap_tx = build_result.get("swap_tx", {})
-        exec_result = _jupiter.execute_swap(swap_tx)
+        exec_result = _jupiter().execute_swap(swap_tx)
         if exec_result.get("status") == "error":
             raise HTTPException(status_code=400, detail=exec_result)
 
@@ -211,20 +237,22 @@ def create_conditional_order(req: ConditionalOrderRequest):
     oid = str(uuid.uuid4())
     order = req.model_dump()
     order.update({"id": oid, "status": "active", "created_at": now, "updated_at": now, "triggered_order": None, "current_trigger_level": req.trigger_price})
-    _conditional_orders[oid] = order
     if req.order_type == "bracket_order":
+        order["status"] = "parent_bracket"
+        get_trigger_engine().add(order)
         for child_type, trig in (("take_profit", req.take_profit_price), ("stop_loss", req.stop_loss_price)):
             if trig:
                 cid = str(uuid.uuid4())
-                child = {**order, "id": cid, "order_type": child_type, "trigger_price": trig, "parent_id": oid, "status": "active", "created_at": now, "updated_at": now}
-                _conditional_orders[cid] = child
-        order["status"] = "parent_bracket"
-    return order
+                child = {**order, "id": cid, "order_type": child_type, "trigger_price": trig, "current_trigger_level": trig, "parent_id": oid, "status": "active", "created_at": now, "updated_at": now}
+                get_trigger_engine().add(child)
+        return order
+    return get_trigger_engine().add(order)
 
 
 @router.get("/conditional-orders")
 def list_conditional_orders():
-    return {"orders": list(_conditional_orders.values()), "count": len(_conditional_orders), "ts": datetime.now(timezone.utc).isoformat()}
+    orders = get_trigger_engine().get_orders()
+    return {"orders": orders, "count": len(orders), "ts": datetime.now(timezone.utc).isoformat()}
 
 
 @router.post("/conditional-orders/evaluate")
@@ -232,47 +260,46 @@ def evaluate_conditional_orders(body: dict[str, Any] | None = None):
     body = body or {}
     triggered = []
     warnings = []
-    for oid, order in list(_conditional_orders.items()):
-        if order.get("status") != "active":
-            continue
-        price = _latest_price(order.get("market", ""), body.get("prices", {}).get(order.get("market", "")) if isinstance(body.get("prices"), dict) else body.get("price"))
-        yes, warn = _conditional_triggered(order, price)
-        if warn:
-            warnings.append({"id": oid, "warning": warn})
+    for market, order_ids in get_trigger_engine().active_by_market().items():
+        price = _latest_price(market, body.get("prices", {}).get(market) if isinstance(body.get("prices"), dict) else body.get("price"))
+        if price is None:
+            warnings.extend({"id": oid, "warning": "missing price; evaluation skipped"} for oid in order_ids)
             continue
-        if yes:
-            result = _exec_router.route_order(order["venue"], order["market"], order["side"], float(order["size"]), price)
-            order["status"] = "triggered"
-            order["triggered_at"] = datetime.now(timezone.utc).isoformat()
-            order["triggered_order"] = result
-            triggered.append(order)
-    return {"triggered": triggered, "warnings": warnings, "orders": list(_conditional_orders.values()), "ts": datetime.now(timezone.utc).isoformat()}
+        triggered.extend(get_trigger_engine().on_price(market, price))
+    return {"triggered": triggered, "warnings": warnings, "orders": get_trigger_engine().get_orders(), "ts": datetime.now(timezone.utc).isoformat()}
 
 
 @router.delete("/conditional-order/{order_id}")
 def delete_conditional_order(order_id: str):
-    order = _conditional_orders.get(order_id)
+    order = get_trigger_engine().cancel(order_id)
     if not order:
         return {"status": "not_found", "id": order_id}
-    order["status"] = "cancelled"
-    order["updated_at"] = datetime.now(timezone.utc).isoformat()
     return {"status": "cancelled", "id": order_id}
 
 
 @router.post("/smart-order")
 def smart_order(req: SmartOrderRequest):
-    return create_smart_order(req.venue, req.market, req.side, req.total_size, req.n_slices, req.interval_seconds, req.mode, req.max_slippage_bps, req.reference_price or 0.0)
+    plan = create_smart_order(req.venue, req.market, req.side, req.total_size, req.n_slices, req.interval_seconds, req.mode, req.max_slippage_bps, req.reference_price or 0.0)
+    return get_smart_scheduler().submit(plan)
 
 
 @router.get("/smart-orders")
 def smart_orders():
-    orders = get_all_executions(limit=50)
+    orders = get_smart_scheduler().recent(limit=50)
     return {"orders": orders, "count": len(orders), "ts": datetime.now(timezone.utc).isoformat()}
 
 
 @router.get("/smart-order/{order_id}")
 def smart_order_detail(order_id: str):
-    order = get_execution(order_id)
+    order = get_smart_scheduler().get(order_id)
+    if not order:
+        return {"status": "not_found", "id": order_id}
+    return order
+
+
+@router.post("/smart-order/{order_id}/abort")
+def smart_order_abort(order_id: str):
+    order = get_smart_scheduler().abort(order_id)
     if not order:
         return {"status": "not_found", "id": order_id}
     return order
@@ -3,15 +3,17 @@ from __future__ import annotations
 from fastapi import APIRouter
 from backend.compute.portfolio_explainability import explain_portfolio, explain_recommendation
 from backend.compute.capital_allocator import allocate
+from backend.agents.runtime import get_agent_runtime
 from backend.core.state_store import StateStore
+from backend.core.lazy import Lazy
 
 router = APIRouter(prefix="/api/explain", tags=["explain"])
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 @router.get("/portfolio")
 def portfolio_explanation():
-    return explain_portfolio(allocate({}), (_store.get_snapshot("agents:signals") or {}).get("signals", []), _store.get_snapshot("data_quality:latest") or {})
+    return explain_portfolio(allocate({}), get_agent_runtime().signals(), _store().get_snapshot("data_quality:latest") or {})
 
 
 @router.get("/recommendation/{rec_id}")
@@ -5,18 +5,19 @@ from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
 from backend.compute.funding_arb import detect_arb, get_history
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/funding-arb", tags=["funding-arb"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 @router.get("/latest")
 def get_latest():
     try:
-        hl_snap = _store.get_snapshot("funding:hyperliquid") or {}
-        drift_snap = _store.get_snapshot("funding:drift") or {}
+        hl_snap = _store().get_snapshot("funding:hyperliquid") or {}
+        drift_snap = _store().get_snapshot("funding:drift") or {}
 
         hl_funding = hl_snap.get("funding_rate", 0.0)
         drift_funding = drift_snap.get("funding_rate", 0.0)
@@ -25,7 +26,7 @@ def get_latest():
         drift_ts = drift_snap.get("ts", now)
 
         result = detect_arb(hl_funding, drift_funding, hl_ts, drift_ts)
-        _store.set_snapshot("funding_arb:latest", result, ttl=60)
+        _store().set_snapshot("funding_arb:latest", result, ttl=60)
         return result
     except Exception as exc:
         logger.error("Error detecting funding arb: %s", exc, exc_info=True)
@@ -4,8 +4,9 @@ from datetime import datetime, timezone
 from typing import Any
 from fastapi import APIRouter
 
-from backend.core.state_store import StateStore
-from backend.compute.geopolitical_risk import compute_geopolitical_index, build_geopolitical_events
+from backend.agents.runtime import GEO_AGENTS, get_agent_runtime
+from backend.compute.signal_pipeline import get_signal_pipeline
+from backend.compute.geopolitical_risk import build_geopolitical_events
 from backend.compute.sanctions_risk import score_sanctions, sanctions_impact, sanctions_entities
 from backend.compute.conflict_escalation import score_conflicts, conflict_market_impact
 from backend.compute.shipping_energy_risk import score_chokepoints, score_energy_shock, supply_chain_impact
@@ -18,28 +19,19 @@ from backend.agents.energy_shock_agent import EnergyShockAgent
 from backend.agents.protection_agent import ProtectionAgent
 
 router = APIRouter(prefix="/api/geopolitical", tags=["geopolitical"])
-_store = StateStore()
 
 
 def _state() -> dict[str, Any]:
-    try:
-        return {
-            "gdelt": _store.get_snapshot("gdelt:latest"),
-            "wits": _store.get_snapshot("wits:tariff:USA:ALL:ALL") or _store.get_snapshot("wits:latest"),
-            "stablecoin": _store.get_snapshot("stablecoin:health:latest") or _store.get_snapshot("stablecoin:health"),
-            "cross_asset": _store.get_snapshot("cross_asset:contagion:latest"),
-        }
-    except Exception:
-        return {"provider_error": True}
+    return dict(get_agent_runtime().snapshot().geo_inputs)
 
 
 def _idx() -> dict[str, Any]:
-    return compute_geopolitical_index(_state())
+    return dict(get_agent_runtime().snapshot().geo_index)
 
 
 @router.get("/index")
 def geopolitical_index():
-    return _idx()
+    return get_signal_pipeline().get("geopolitical")
 
 
 @router.get("/events")
@@ -146,8 +138,7 @@ def scenario_run(body: dict[str, Any] | None = None):
 
 @router.get("/agents/signals")
 def geopolitical_agent_signals():
-    idx = _idx()
-    return {"signals": _geo_signals(idx), "agent_count": 5, "timestamp": datetime.now(timezone.utc).isoformat()}
+    return {"signals": get_agent_runtime().signals(GEO_AGENTS), "agent_count": len(GEO_AGENTS), "timestamp": datetime.now(timezone.utc).isoformat()}
 
 
 def _geo_signals(index: dict[str, Any], protection: dict[str, Any] | None = None) -> list[dict[str, Any]]:
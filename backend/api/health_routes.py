@@ -5,15 +5,18 @@ from typing import Any
 
 from fastapi import APIRouter
 
+from backend.core import cluster
 from backend.core.schemas import HealthResponse
 from backend.core.state_store import StateStore
 from backend.data.db import check_connection
+from backend.logging_config import logging_stats
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/health", tags=["health"])
 
-_state_store = StateStore()
+_state_store = Lazy(StateStore)
 _start_time = time.time()
 
 _FEED_DEFINITIONS: list[dict[str, Any]] = [
@@ -48,7 +51,7 @@ def _get_feed_status(feed_def: dict[str, Any], now: datetime) -> dict[str, Any]:
     }
 
     try:
-        snapshot = _state_store.get_snapshot(key)
+        snapshot = _state_store().get_snapshot(key)
         if snapshot is None:
             result["status"] = "error"
             return result
@@ -99,7 +102,7 @@ def health_check():
         db_ok = False
 
     try:
-        r = _state_store.get_redis()
+        r = _state_store().get_redis()
         redis_ok = r is not None
     except Exception:
         redis_ok = False
@@ -132,6 +135,16 @@ def feed_status():
     }
 
 
+@router.get("/cluster")
+def cluster_status():
+    return {**cluster.status(), "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/logging")
+def logging_status():
+    return {**logging_stats(), "ts": datetime.now(timezone.utc).isoformat()}
+
+
 @router.get("/redis")
 def redis_health():
     global _redis_last_error, _redis_last_ok_ts
@@ -148,7 +161,7 @@ def redis_health():
     }
 
     try:
-        r = _state_store.get_redis()
+        r = _state_store().get_redis()
         if r is None:
             result["fallback_mode"] = True
             result["last_error"] = _redis_last_error or "Redis unavailable"
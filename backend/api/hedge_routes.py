@@ -4,45 +4,50 @@ from datetime import datetime, timezone
 from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
-from backend.compute.hedge_ratio import compute_full_hedge_analysis
+from backend.compute.hedge_ratio import (
+    DEFAULT_WINDOW,
+    HEDGE_MATRIX_KEY,
+    compute_macro_correlations,
+    correlations_from_matrix,
+    get_hedge_engine,
+    hedge_analysis_from_matrix,
+)
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/hedge", tags=["hedge"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
+_ASSETS = ["SOL", "BTC", "ETH"]
 
-def _get_return_series() -> dict:
-    returns = {}
 
-    for asset in ["SOL", "BTC", "ETH"]:
-        snap = _store.get_snapshot(f"returns:{asset.lower()}")
-        if snap and isinstance(snap.get("returns"), list):
-            returns[asset] = snap["returns"]
+def _current_matrix() -> dict:
+    """The streaming engine's matrix; followers read the leader's published snapshot."""
+    engine = get_hedge_engine()
+    if engine.sample_size > 0:
+        return engine.snapshot()
+    return _store().get_snapshot(HEDGE_MATRIX_KEY) or engine.snapshot()
 
-    if not returns:
-        returns = {"SOL": [], "BTC": [], "ETH": []}
 
-    return returns
+def _macro_correlations() -> dict:
+    keys = [f"returns:{a.lower()}" for a in _ASSETS]
+    snaps = _store().get_snapshots([*keys, "shock:history"])
+    shock = snaps["shock:history"] or {}
+    if not isinstance(shock.get("values"), list):
+        return {}
+    returns = {
+        a: snap["returns"]
+        for a, key in zip(_ASSETS, keys)
+        if (snap := snaps[key]) and isinstance(snap.get("returns"), list)
+    }
+    return compute_macro_correlations(returns, shock["values"], DEFAULT_WINDOW)
 
 
 @router.get("/latest")
 def get_hedge_latest():
     try:
-        returns = _get_return_series()
-
-        idx_snap = _store.get_snapshot("index:latest") or {}
-        shock_series_snap = _store.get_snapshot("shock:history")
-        macro_shock_series = None
-        if shock_series_snap and isinstance(shock_series_snap.get("values"), list):
-            macro_shock_series = shock_series_snap["values"]
-
-        result = compute_full_hedge_analysis(
-            returns=returns,
-            macro_shock_series=macro_shock_series,
-            window=30,
-        )
-        return result
+        return hedge_analysis_from_matrix(_current_matrix(), _macro_correlations())
     except Exception as exc:
         logger.error("Hedge analysis error: %s", exc, exc_info=True)
         return {
@@ -51,7 +56,7 @@ def get_hedge_latest():
             "macro_correlations": {},
             "best_hedge": None,
             "best_hedge_effectiveness": 0,
-            "window": 30,
+            "window": DEFAULT_WINDOW,
             "assets": [],
             "ts": datetime.now(timezone.utc).isoformat(),
         }
@@ -60,19 +65,22 @@ def get_hedge_latest():
 @router.get("/correlations")
 def get_correlations():
     try:
-        returns = _get_return_series()
-        from backend.compute.hedge_ratio import compute_rolling_correlations
-        result = compute_rolling_correlations(returns, window=30)
-        return result
+        return correlations_from_matrix(_current_matrix())
     except Exception as exc:
         logger.error("Correlation error: %s", exc, exc_info=True)
-        return {"correlations": {}, "assets": [], "window": 30, "ts": datetime.now(timezone.utc).isoformat()}
+        return {"correlations": {}, "assets": [], "window": DEFAULT_WINDOW, "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/matrix")
+def get_hedge_matrix():
+    return _current_matrix()
+
 
 @router.get("/cross-asset")
 def get_cross_asset_hedges():
     try:
         from backend.compute.cross_asset_hedging import recommend_cross_asset_hedges
-        return recommend_cross_asset_hedges(_store.get_snapshot("portfolio:risk:latest") or {})
+        return recommend_cross_asset_hedges(_store().get_snapshot("portfolio:risk:latest") or {})
     except Exception as exc:
         logger.error("Cross-asset hedge error: %s", exc, exc_info=True)
         return {"recommendations": [], "proposal_only": True, "auto_trade": False, "warnings": [str(exc)], "ts": datetime.now(timezone.utc).isoformat()}
@@ -8,20 +8,21 @@ from backend.core.timeutils import window_to_seconds
 from backend.core.state_store import StateStore
 from backend.data.repositories.index_repo import IndexRepository
 from backend.data.repositories.events_repo import EventsRepository
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/index", tags=["index"])
 
-_index_repo = IndexRepository()
-_events_repo = EventsRepository()
-_store = StateStore()
+_index_repo = Lazy(IndexRepository)
+_events_repo = Lazy(EventsRepository)
+_store = Lazy(StateStore)
 
 
 @router.get("/latest", response_model=IndexLatestResponse)
 def get_latest():
     try:
-        row = _index_repo.get_latest()
+        row = _index_repo().get_latest()
         if not row:
             return IndexLatestResponse(
                 tariff_index=0.0,
@@ -48,7 +49,7 @@ def get_latest():
 def get_history(window: str = Query(default="7d")):
     try:
         seconds = window_to_seconds(window)
-        rows = _index_repo.get_history(seconds)
+        rows = _index_repo().get_history(seconds)
         points = []
         for r in rows:
             entry = {
@@ -67,7 +68,7 @@ def get_history(window: str = Query(default="7d")):
 @router.get("/components", response_model=IndexComponentsResponse)
 def get_components():
     try:
-        comps = _index_repo.get_components()
+        comps = _index_repo().get_components()
         comp_dict = {c["name"]: c["value"] for c in comps}
         return IndexComponentsResponse(
             wits_weight=comp_dict.get("wits_weight", 0.0),
@@ -83,8 +84,8 @@ def get_components():
 @router.get("/alerts", response_model=list[AlertResponse])
 def get_alerts():
     try:
-        index_events = _events_repo.get_by_type("INDEX_UPDATE", limit=10)
-        shock_events = _events_repo.get_by_type("SHOCK_SPIKE", limit=10)
+        index_events = _events_repo().get_by_type("INDEX_UPDATE", limit=10)
+        shock_events = _events_repo().get_by_type("SHOCK_SPIKE", limit=10)
         all_events = index_events + shock_events
         all_events.sort(key=lambda e: e.get("ts", ""), reverse=True)
         alerts = []
@@ -119,7 +120,7 @@ def get_macro_terminal():
     }
 
     try:
-        history_rows = _index_repo.get_history(86400 * 30)
+        history_rows = _index_repo().get_history(86400 * 30)
         if history_rows:
             for r in history_rows:
                 ts_str = r["ts"].isoformat() if isinstance(r["ts"], datetime) else str(r["ts"])
@@ -144,7 +145,7 @@ def get_macro_terminal():
     country_names = {"156": "China", "276": "EU", "USA": "USA", "CHN": "China", "EU": "EU"}
     country_wts = []
     for c in WITS_COUNTRIES:
-        snap = _store.get_snapshot(f"wits:tariff:840:{c}:TOTAL")
+        snap = _store().get_snapshot(f"wits:tariff:840:{c}:TOTAL")
         weight = 0.0
         tariff = 0.0
         if snap and snap.get("records"):
@@ -166,7 +167,7 @@ def get_macro_terminal():
     result["country_weights"] = country_wts
 
     try:
-        history_rows = _index_repo.get_history(86400 * 7)
+        history_rows = _index_repo().get_history(86400 * 7)
         if history_rows and len(history_rows) >= 3:
             deltas = []
             for i in range(1, len(history_rows)):
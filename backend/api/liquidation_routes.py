@@ -1,34 +1,73 @@
 import logging
 from datetime import datetime, timezone
 
-from fastapi import APIRouter
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query
 
 from backend.core.state_store import StateStore
-from backend.compute.liquidation_heatmap import compute_heatmap
+from backend.compute.liquidation_heatmap import MAX_GRID_CELLS, compute_heatmap
+from backend.execution.router import get_execution_router
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/liquidation", tags=["liquidation"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
+
+
+def _axis(max_value: float | None, step: float | None, start: float) -> list[float] | None:
+    if max_value is None or step is None:
+        return None
+    count = int((max_value - start) / step) + 1
+    if count > MAX_GRID_CELLS:
+        raise HTTPException(status_code=400, detail=f"Axis of {count} steps exceeds the {MAX_GRID_CELLS}-cell grid limit")
+    return np.arange(start, max_value + step / 2, step).tolist()
+
+
+def _marks(positions: list[dict]) -> dict[str, float]:
+    """Live price per position market; markets without one are left out."""
+    exec_router = get_execution_router()
+    marks = {}
+    for market in {p.get("market") for p in positions if p.get("market") and not p.get("mark_price")}:
+        try:
+            price = float(exec_router.get_live_price(market).get("price") or 0.0)
+        except Exception:
+            logger.warning("No mark price for %s", market, exc_info=True)
+            continue
+        if price > 0:
+            marks[market] = price
+    return marks
 
 
 @router.get("/heatmap")
-def get_heatmap():
+def get_heatmap(
+    max_leverage: float | None = Query(default=None, ge=1, le=200),
+    leverage_step: float | None = Query(default=None, gt=0),
+    max_drop_pct: float | None = Query(default=None, gt=0, le=100),
+    drop_step_pct: float | None = Query(default=None, gt=0),
+):
+    leverage_levels = _axis(max_leverage, leverage_step, 1.0)
+    price_drops_pct = _axis(max_drop_pct, drop_step_pct, drop_step_pct or 0.0)
     try:
-        price_snap = _store.get_snapshot("price:pyth:SOL_USD") or _store.get_snapshot("price:sol:pyth") or {}
+        price_snap = _store().get_snapshot("price:pyth:SOL_USD") or _store().get_snapshot("price:sol:pyth") or {}
         current_price = price_snap.get("price", 100.0)
 
-        risk_snap = _store.get_snapshot("risk:status") or {}
+        risk_snap = _store().get_snapshot("risk:status") or {}
         margin_usage = risk_snap.get("margin_usage", 0.3)
 
-        regime = _store.get_snapshot("regime:latest") or {}
+        regime = _store().get_snapshot("regime:latest") or {}
         vol_regime = regime.get("vol_regime", "normal")
         vol_map = {"low": 0.3, "normal": 0.5, "high": 0.8, "extreme": 1.2}
         vol = vol_map.get(vol_regime, 0.5)
 
-        positions = []
-        result = compute_heatmap(current_price, positions, vol, margin_usage)
-        _store.set_snapshot("liquidation:heatmap", result, ttl=60)
+        positions = get_execution_router().get_all_positions()
+
+        result = compute_heatmap(
+            current_price, positions, vol, margin_usage,
+            leverage_levels=leverage_levels, price_drops_pct=price_drops_pct, marks=_marks(positions),
+        )
+        if leverage_levels is None and price_drops_pct is None:
+            _store().set_snapshot("liquidation:heatmap", result, ttl=60)
         return result
     except Exception as exc:
         logger.error("Error computing liquidation heatmap: %s", exc, exc_info=True)
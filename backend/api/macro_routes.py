@@ -3,14 +3,15 @@ from __future__ import annotations
 from fastapi import APIRouter
 from backend.core.state_store import StateStore
 from backend.compute.macro_events import build_macro_events, compute_impact, compute_event_reaction
+from backend.core.lazy import Lazy
 
 router = APIRouter(prefix="/api/macro", tags=["macro"])
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 def _events():
-    wits = _store.get_snapshot("wits:tariff:USA:ALL:ALL") or _store.get_snapshot("wits:latest")
-    gdelt = _store.get_snapshot("gdelt:latest")
+    wits = _store().get_snapshot("wits:tariff:USA:ALL:ALL") or _store().get_snapshot("wits:latest")
+    gdelt = _store().get_snapshot("gdelt:latest")
     return build_macro_events(wits, gdelt)
 
 
@@ -22,11 +23,11 @@ def macro_events():
 @router.get("/events/impact")
 def macro_events_impact():
     events = _events().get("events", [])
-    return compute_impact(events, _store.get_snapshot("desk:market:latest") or {})
+    return compute_impact(events, _store().get_snapshot("desk:market:latest") or {})
 
 
 @router.get("/events/{event_id}/reaction")
 def macro_event_reaction(event_id: str):
     events = _events().get("events", [])
     event = next((e for e in events if e.get("id") == event_id), events[0] if events else {"id": event_id, "title": "fallback event", "score": 0, "severity": "low", "degraded": True})
-    return compute_event_reaction(event, _store.get_snapshot("desk:market:latest") or {})
+    return compute_event_reaction(event, _store().get_snapshot("desk:market:latest") or {})
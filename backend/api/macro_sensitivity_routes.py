@@ -4,14 +4,15 @@ from fastapi import APIRouter
 from backend.api.equities_routes import _overview_rows
 from backend.core.state_store import StateStore
 from backend.compute.macro_sensitivity import score_assets, score_asset_sensitivity
+from backend.core.lazy import Lazy
 
 router = APIRouter(prefix="/api/macro-sensitivity", tags=["macro-sensitivity"])
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 def _inputs():
-    idx = _store.get_snapshot("index:latest") or {}
-    gdelt = _store.get_snapshot("gdelt:latest") or {}
+    idx = _store().get_snapshot("index:latest") or {}
+    gdelt = _store().get_snapshot("gdelt:latest") or {}
     return float(idx.get("rate_of_change", idx.get("change", 0.0)) or 0.0), float(gdelt.get("shock_score", gdelt.get("tone_shock", 0.0)) or 0.0), not bool(idx) or not bool(gdelt)
 
 
@@ -8,20 +8,21 @@ from backend.core.timeutils import window_to_seconds
 from backend.core.state_store import StateStore
 from backend.core.price_validator import PriceValidator
 from backend.data.repositories.market_repo import MarketRepository
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/markets", tags=["markets"])
 
-_market_repo = MarketRepository()
-_store = StateStore()
-_validator = PriceValidator()
+_market_repo = Lazy(MarketRepository)
+_store = Lazy(StateStore)
+_validator = Lazy(PriceValidator)
 
 
 @router.get("/latest", response_model=list[MarketDataResponse])
 def get_latest():
     try:
-        rows = _market_repo.get_all_latest()
+        rows = _market_repo().get_all_latest()
         results = []
         for r in rows:
             results.append(MarketDataResponse(
@@ -41,7 +42,7 @@ def get_latest():
 def get_history(venue: str = Query(default="hyperliquid"), window: str = Query(default="1h")):
     try:
         seconds = window_to_seconds(window)
-        rows = _market_repo.get_history(venue, seconds)
+        rows = _market_repo().get_history(venue, seconds)
         return {"venue": venue, "window": window, "count": len(rows), "ticks": rows}
     except Exception as exc:
         logger.error("Error fetching market history: %s", exc, exc_info=True)
@@ -51,7 +52,7 @@ def get_history(venue: str = Query(default="hyperliquid"), window: str = Query(d
 @router.get("/funding")
 def get_funding():
     try:
-        rows = _market_repo.get_latest_funding()
+        rows = _market_repo().get_latest_funding()
         return {"funding_rates": rows, "count": len(rows)}
     except Exception as exc:
         logger.error("Error fetching funding rates: %s", exc, exc_info=True)
@@ -63,9 +64,9 @@ def get_integrity():
     prices = {}
     feed_ts = {}
     for venue in ["pyth", "kraken", "coingecko"]:
-        snap = _store.get_snapshot(f"price:{venue}:SOL_USD")
+        snap = _store().get_snapshot(f"price:{venue}:SOL_USD")
         if not snap:
-            snap = _store.get_snapshot(f"price:sol:{venue}")
+            snap = _store().get_snapshot(f"price:sol:{venue}")
         if snap and snap.get("price"):
             prices[venue] = snap["price"]
             feed_ts[venue] = snap.get("ts", datetime.now(timezone.utc).isoformat())
@@ -83,6 +84,6 @@ def get_integrity():
             "ts": datetime.now(timezone.utc).isoformat(),
         }
 
-    result = _validator.validate(prices, feed_timestamps=feed_ts)
-    _store.set_snapshot("price:integrity", result, ttl=60)
+    result = _validator().validate(prices, feed_timestamps=feed_ts)
+    _store().set_snapshot("price:integrity", result, ttl=60)
     return result
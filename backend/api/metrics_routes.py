@@ -1,4 +1,5 @@
 import logging
+import time
 from datetime import datetime, timezone
 
 from fastapi import APIRouter
@@ -8,13 +9,12 @@ from backend.compute.execution_metrics import get_execution_metrics
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/metrics", tags=["metrics"])
 
-_metrics = get_execution_metrics()
 
 
 @router.get("/eqi")
 def get_eqi():
     try:
-        return _metrics.get_eqi()
+        return get_execution_metrics().get_eqi()
     except Exception as exc:
         logger.error("Error fetching EQI: %s", exc, exc_info=True)
         return {
@@ -29,10 +29,29 @@ def get_eqi():
         }
 
 
+@router.get("/eqi/lifetime")
+def get_lifetime_eqi():
+    try:
+        return get_execution_metrics().get_lifetime_eqi()
+    except Exception as exc:
+        logger.error("Error fetching lifetime EQI: %s", exc, exc_info=True)
+        return {"eqi_score": 0, "fill_count": 0, "window": "lifetime", "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/eqi/window")
+def get_eqi_window(hours: float = 24.0, venue: str | None = None, market: str | None = None):
+    try:
+        end = time.time()
+        return get_execution_metrics().get_eqi_window(end - max(hours, 0.0) * 3600.0, end, venue=venue, market=market)
+    except Exception as exc:
+        logger.error("Error fetching EQI window: %s", exc, exc_info=True)
+        return {"eqi_score": 0, "fill_count": 0, "venue": venue, "market": market, "ts": datetime.now(timezone.utc).isoformat()}
+
+
 @router.get("/anomalies")
 def get_anomalies():
     try:
-        eqi = _metrics.get_eqi()
+        eqi = get_execution_metrics().get_eqi()
         return {"anomalies": eqi.get("anomalies", []), "ts": datetime.now(timezone.utc).isoformat()}
     except Exception:
         return {"anomalies": [], "ts": datetime.now(timezone.utc).isoformat()}
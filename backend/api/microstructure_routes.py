@@ -4,17 +4,19 @@ from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
 from backend.compute.microstructure import MicrostructureAnalyzer
+from backend.compute.dislocation_scanner import SCAN_SNAPSHOT_KEY
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/microstructure", tags=["microstructure"])
 
-_analyzer = MicrostructureAnalyzer()
-_store = StateStore()
+_analyzer = Lazy(MicrostructureAnalyzer)
+_store = Lazy(StateStore)
 
 
 @router.get("/imbalance")
 def get_imbalance():
-    cached = _store.get_snapshot("microstructure:latest")
+    cached = _store().get_snapshot("microstructure:latest")
     if cached:
         return cached
     return {
@@ -29,26 +31,34 @@ def get_imbalance():
 def get_dislocations():
     prices = {}
     for venue in ["pyth", "kraken", "coingecko", "hyperliquid", "drift"]:
-        snap = _store.get_snapshot(f"price:sol:{venue}")
+        snap = _store().get_snapshot(f"price:sol:{venue}")
         if snap and snap.get("price"):
             prices[venue] = snap["price"]
 
     if len(prices) < 2:
         return {"alerts": [], "ts": datetime.now(timezone.utc).isoformat()}
 
-    alerts = _analyzer.detect_dislocation(prices)
+    alerts = _analyzer().detect_dislocation(prices)
     return {"alerts": alerts, "ts": datetime.now(timezone.utc).isoformat()}
 
 
+@router.get("/dislocations/scan")
+def get_dislocation_scan():
+    cached = _store().get_snapshot(SCAN_SNAPSHOT_KEY)
+    if cached:
+        return cached
+    return {"symbols": [], "alerts": [], "ts": datetime.now(timezone.utc).isoformat()}
+
+
 @router.get("/basis")
 def get_basis():
-    perp_snap = _store.get_snapshot("price:sol:hyperliquid")
-    spot_snap = _store.get_snapshot("price:sol:kraken")
+    perp_snap = _store().get_snapshot("price:sol:hyperliquid")
+    spot_snap = _store().get_snapshot("price:sol:kraken")
 
     if not perp_snap or not spot_snap:
         return {"basis": None, "ts": datetime.now(timezone.utc).isoformat()}
 
-    opp = _analyzer.detect_basis_opportunity(
+    opp = _analyzer().detect_basis_opportunity(
         perp_snap.get("price", 0),
         spot_snap.get("price", 0),
     )
@@ -1,21 +1,25 @@
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
 
-from backend.ml.feature_store import build_features
-from backend.ml.inference import predict, get_cached_prediction
-from backend.ml.training import train_offline, get_training_history
-from backend.ml.explainability import explain
+from backend.ml.feature_store import build_feature_matrix, build_features
+from backend.ml.inference import predict, predict_batch, get_cached_prediction
+from backend.ml.feature_history import DEFAULT_HORIZON_S, collect_state, get_feature_history
+from backend.ml.model_registry import get_model_registry
+from backend.ml.training import get_trained_model, get_training_history, promote_model_version, validate_samples
+from backend.ml.training_jobs import TrainingQueueFull, get_training_queue
+from backend.ml.explainability import contribution_rows, explain, explain_batch, summarise_attributions
 from backend.core.state_store import StateStore
 from backend.core.event_bus import EventBus, EventType
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ml", tags=["ml"])
 
-_store = StateStore()
-_bus = EventBus()
+_store = Lazy(StateStore)
+_bus = Lazy(EventBus)
 
 _FEATURES_KEY = "desk:ml:features:latest"
 _FEATURES_TTL = 120
@@ -24,69 +28,21 @@ _PREDICTION_TTL = 120
 
 
 def _collect_state() -> dict[str, Any]:
-    state: dict[str, Any] = {}
-
-    idx = _store.get_snapshot("desk:index:latest") or _store.get_snapshot("index:latest")
-    if idx:
-        state["tariff_index"] = idx.get("value", 30.0)
-        state["tariff_delta"] = idx.get("rate_of_change", 0.0)
-
-    shock = _store.get_snapshot("desk:shock:latest") or _store.get_snapshot("shock:latest")
-    if shock:
-        state["shock_score"] = shock.get("shock_score", 0.0)
-
-    pred = _store.get_snapshot("predict:latest")
-    if pred:
-        state["predictor_confidence"] = pred.get("confidence", 0.5)
-
-    arb = _store.get_snapshot("funding_arb:latest")
-    if arb:
-        state["funding_skew"] = arb.get("hl_rate", 0.0)
-
-    basis = _store.get_snapshot("basis:latest")
-    if basis:
-        state["basis_spread"] = basis.get("basis_bps", 0.0) / 10000.0
-
-    vr = _store.get_snapshot("desk:vol_regime:latest") or _store.get_snapshot("vol_regime:latest")
-    if vr:
-        state["vol_regime"] = vr.get("regime", "normal")
-
-    stable = _store.get_snapshot("stablecoin:health:latest")
-    if stable:
-        assets = stable.get("assets", {})
-        if assets:
-            state["stable_health"] = sum(
-                1.0 - min(abs(a.get("depeg_bps", 0)) / 100.0, 1.0)
-                for a in assets.values()
-            ) / len(assets)
-
-    sf = _store.get_snapshot("stable_flow:latest")
-    if sf:
-        state["stable_flow"] = sf.get("momentum", 0.0)
-
-    eqi = _store.get_snapshot("execution:metrics:latest")
-    if eqi:
-        state["exec_quality"] = eqi.get("eqi_score", 0.8)
-
-    ms = _store.get_snapshot("microstructure:latest")
-    if ms:
-        state["orderbook_imbalance"] = ms.get("imbalance", 0.0)
-
-    return state
+    return collect_state(_store())
 
 
 @router.get("/features/latest")
 def get_latest_features():
-    cached = _store.get_snapshot(_FEATURES_KEY)
+    cached = _store().get_snapshot(_FEATURES_KEY)
     if cached:
         return cached
 
     state = _collect_state()
     result = build_features(state)
 
-    _store.set_snapshot(_FEATURES_KEY, result, ttl=_FEATURES_TTL)
+    _store().set_snapshot(_FEATURES_KEY, result, ttl=_FEATURES_TTL)
 
-    _bus.emit(
+    _bus().emit(
         EventType.ML_FEATURES_UPDATED,
         source="ml_routes",
         payload={"feature_count": len(result.get("features", {}))},
@@ -97,7 +53,7 @@ def get_latest_features():
 
 @router.get("/prediction/latest")
 def get_latest_prediction():
-    cached = _store.get_snapshot(_PREDICTION_KEY)
+    cached = _store().get_snapshot(_PREDICTION_KEY)
     if cached:
         return cached
 
@@ -116,9 +72,9 @@ def get_latest_prediction():
         "ts": datetime.now(timezone.utc).isoformat(),
     }
 
-    _store.set_snapshot(_PREDICTION_KEY, result, ttl=_PREDICTION_TTL)
+    _store().set_snapshot(_PREDICTION_KEY, result, ttl=_PREDICTION_TTL)
 
-    _bus.emit(
+    _bus().emit(
         EventType.ML_INFERENCE_UPDATE,
         source="ml_routes",
         payload={
@@ -131,8 +87,80 @@ def get_latest_prediction():
     return result
 
 
-@router.post("/train/offline")
+@router.post("/predict/batch")
+def predict_states_batch(body: dict[str, Any] | None = None):
+    """Score a list of raw states (e.g. a replay window) in one vectorised pass."""
+    states = (body or {}).get("states", [])
+    if not isinstance(states, list):
+        return {"success": False, "reason": "'states' must be a list of state dicts", "ts": datetime.now(timezone.utc).isoformat()}
+
+    batch = predict_batch(build_feature_matrix(states))
+    return {
+        "success": True,
+        "n": len(states),
+        "model_type": batch["model_type"],
+        "probability": [round(float(p), 4) for p in batch["probability"]],
+        "prediction": [int(c) for c in batch["prediction"]],
+        "confidence": [round(float(c), 3) for c in batch["confidence"]],
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _enqueue(kind: str, params: dict[str, Any]) -> dict[str, Any]:
+    try:
+        job = get_training_queue().submit(kind, params)
+    except TrainingQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return {"success": True, "job": job, "ts": datetime.now(timezone.utc).isoformat()}
+
+
+def _invalidate_prediction(job: dict[str, Any]) -> None:
+    _store().set_snapshot(_PREDICTION_KEY, None, ttl=1)
+
+
+get_training_queue().add_completion_listener(_invalidate_prediction)
+
+
+def _attribution_payload(X, ts: list | None = None, top_rows: int = 0) -> dict[str, Any]:
+    batch = explain_batch(X)
+    contributions = batch["contributions"]
+    payload: dict[str, Any] = {
+        "n": len(contributions),
+        "method": batch["method"],
+        "summary": summarise_attributions(contributions),
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+    if ts is not None:
+        payload["window"] = {"start": ts[0].isoformat(), "end": ts[-1].isoformat()} if ts else None
+    if top_rows:
+        payload["rows"] = [
+            {"base_value": round(float(batch["base_value"][i]), 6), "top_drivers": contribution_rows(contributions[i])[:top_rows]}
+            for i in range(len(contributions))
+        ]
+    return payload
+
+
+@router.post("/explain/batch")
+def explain_states_batch(body: dict[str, Any] | None = None):
+    """Attribute a list of raw states in one call; per-row top drivers plus a batch summary."""
+    body = body or {}
+    states = body.get("states", [])
+    if not isinstance(states, list):
+        return {"success": False, "reason": "'states' must be a list of state dicts", "ts": datetime.now(timezone.utc).isoformat()}
+    return _attribution_payload(build_feature_matrix(states), top_rows=int(body.get("top", 5)))
+
+
+@router.get("/explain/history")
+def explain_history(hours: float = Query(24.0, gt=0, le=24 * 90)):
+    """Mean feature attributions over the materialised feature history for the last ``hours``."""
+    end = datetime.now(timezone.utc)
+    X, ts = get_feature_history().window(end - timedelta(hours=hours), end)
+    return _attribution_payload(X, ts)
+
+
+@router.post("/train/offline", status_code=202)
 def train_model_offline(body: dict[str, Any] | None = None):
+    """Queue a training job on caller-supplied samples; poll ``/train/jobs/{job_id}`` for the result."""
     body = body or {}
 
     samples = body.get("samples", [])
@@ -146,21 +174,50 @@ def train_model_offline(body: dict[str, Any] | None = None):
             "ts": datetime.now(timezone.utc).isoformat(),
         }
 
-    result = train_offline(samples, labels, method=method)
+    invalid = validate_samples(samples, labels)
+    if invalid is not None:
+        return invalid
 
-    if result.get("success"):
-        _store.set_snapshot(_PREDICTION_KEY, None, ttl=1)
-        _bus.emit(
-            EventType.ML_MODEL_TRAINED,
-            source="ml_routes",
-            payload={
-                "method": result.get("method"),
-                "n_samples": result.get("n_samples"),
-                "train_accuracy": result.get("train_accuracy"),
-            },
-        )
+    return _enqueue("samples", {"samples": samples, "labels": labels, "method": method})
+
+
+@router.post("/train/history", status_code=202)
+def train_model_from_history(body: dict[str, Any] | None = None):
+    """Queue a training job on materialised feature rows with point-in-time forward-return labels."""
+    body = body or {}
+    try:
+        params = {
+            "start": datetime.fromisoformat(body["start"]) if body.get("start") else None,
+            "end": datetime.fromisoformat(body["end"]) if body.get("end") else None,
+            "horizon_seconds": int(body.get("horizon_seconds", DEFAULT_HORIZON_S)),
+            "threshold": float(body.get("threshold", 0.0)),
+            "method": str(body.get("method", "logistic")),
+        }
+    except (TypeError, ValueError) as exc:
+        return {"success": False, "reason": f"Invalid window: {exc}", "ts": datetime.now(timezone.utc).isoformat()}
+
+    return _enqueue("history", params)
 
-    return result
+
+@router.get("/train/jobs")
+def list_training_jobs():
+    return {"jobs": get_training_queue().list(), "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/train/jobs/{job_id}")
+def get_training_job(job_id: str):
+    job = get_training_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job
+
+
+@router.delete("/train/jobs/{job_id}")
+def cancel_training_job(job_id: str):
+    job = get_training_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown training job {job_id}")
+    return job
 
 
 @router.get("/training/history")
@@ -169,3 +226,29 @@ def get_training_history_route():
         "history": get_training_history(),
         "ts": datetime.now(timezone.utc).isoformat(),
     }
+
+
+@router.get("/models")
+def list_models():
+    registry = get_model_registry()
+    loaded = get_trained_model() or {}
+    return {
+        "active_version": registry.active_version(),
+        "loaded_version": loaded.get("version"),
+        "versions": registry.list_versions(),
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+@router.post("/models/{version}/promote")
+def promote_model(version: str):
+    """Point every worker at ``version``; this worker swaps now, others on their next registry poll."""
+    registry = get_model_registry()
+    if version not in {m["version"] for m in registry.list_versions()}:
+        raise HTTPException(status_code=404, detail=f"Unknown model version {version}")
+    try:
+        promote_model_version(version)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    _store().set_snapshot(_PREDICTION_KEY, None, ttl=1)
+    return {"success": True, "active_version": version, "ts": datetime.now(timezone.utc).isoformat()}
@@ -5,20 +5,21 @@ from fastapi import APIRouter, Query
 
 from backend.core.state_store import StateStore
 from backend.compute.portfolio_optimizer import optimize as portfolio_optimize
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 @router.get("/proposal")
 def get_proposal(method: str = Query("risk_parity")):
     try:
-        idx = _store.get_snapshot("index:latest") or {}
-        regime = _store.get_snapshot("regime:latest") or {}
-        carry_snap = _store.get_snapshot("carry:latest") or {}
-        predict = _store.get_snapshot("prediction:latest") or {}
+        idx = _store().get_snapshot("index:latest") or {}
+        regime = _store().get_snapshot("regime:latest") or {}
+        carry_snap = _store().get_snapshot("carry:latest") or {}
+        predict = _store().get_snapshot("prediction:latest") or {}
 
         vol_regime = regime.get("vol_regime", "normal")
         macro_regime = "risk_off" if idx.get("shock_score", 0) > 1.5 else "normal"
@@ -35,7 +36,7 @@ def get_proposal(method: str = Query("risk_parity")):
         }
 
         result = portfolio_optimize(inputs)
-        _store.set_snapshot("portfolio:proposal", result, ttl=60)
+        _store().set_snapshot("portfolio:proposal", result, ttl=60)
         return result
     except Exception as exc:
         logger.error("Error computing portfolio proposal: %s", exc, exc_info=True)
@@ -2,25 +2,19 @@ from __future__ import annotations
 
 from typing import Any
 from fastapi import APIRouter
-from backend.core.state_store import StateStore
-from backend.compute.geopolitical_risk import compute_geopolitical_index
+from backend.agents.runtime import get_agent_runtime
 from backend.compute.portfolio_protection import protection_protocol
 
 router = APIRouter(prefix="/api/protection", tags=["protection"])
-_store = StateStore()
 
 
 def _geo():
-    try:
-        state = {"gdelt": _store.get_snapshot("gdelt:latest"), "wits": _store.get_snapshot("wits:tariff:USA:ALL:ALL") or _store.get_snapshot("wits:latest"), "stablecoin": _store.get_snapshot("stablecoin:health:latest")}
-    except Exception:
-        state = {"provider_error": True}
-    return compute_geopolitical_index(state)
+    return dict(get_agent_runtime().snapshot().geo_index)
 
 
 @router.get("/status")
 def protection_status():
-    return protection_protocol({"geopolitical_index": _geo(), "data_quality": _geo().get("data_quality", "degraded")})
+    return dict(get_agent_runtime().snapshot().protection)
 
 
 @router.post("/preview")
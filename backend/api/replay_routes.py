@@ -5,17 +5,18 @@ from fastapi import APIRouter
 
 from backend.core.event_bus import EventBus
 from backend.compute.replay_engine import run_replay, get_latest_replay
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/replay", tags=["replay"])
 
-_bus = EventBus()
+_bus = Lazy(EventBus)
 
 
 @router.post("/run")
 def run_replay_endpoint(body: dict = {}):
     try:
-        events = _bus.get_recent(limit=body.get("limit", 200))
+        events = _bus().get_recent(limit=body.get("limit", 200))
         result = run_replay(
             events=events,
             strategy_config=body.get("strategy_config"),
@@ -5,27 +5,20 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
 from backend.core.schemas import RiskStatusResponse, StressTestResult
-from backend.compute.risk_engine import RiskEngine
+from backend.compute.risk_engine import get_risk_engine
 from backend.compute.stress_tests import StressTestRunner
-from backend.compute.regime_memory import RegimeMemory
+from backend.compute.regime_memory import classify_regime, get_regime_memory
 from backend.core.state_store import StateStore
-from backend.execution.router import ExecutionRouter
+from backend.execution.router import get_execution_router
 from backend import config
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/risk", tags=["risk"])
 
-_risk_engine = RiskEngine(
-    max_leverage=config.MAX_LEVERAGE,
-    max_margin_pct=config.MAX_MARGIN_USAGE,
-    max_daily_loss=config.MAX_DAILY_LOSS,
-    cooldown_seconds=config.COOLDOWN_SECONDS,
-)
-_stress_runner = StressTestRunner()
-_state_store = StateStore()
-_exec_router = ExecutionRouter()
-_regime_memory = RegimeMemory()
+_stress_runner = Lazy(StressTestRunner)
+_state_store = Lazy(StateStore)
 
 
 class StressTestRequest(BaseModel):
@@ -36,8 +29,8 @@ class StressTestRequest(BaseModel):
 @router.get("/status", response_model=RiskStatusResponse)
 def get_status():
     try:
-        status = _risk_engine.get_status()
-        throttle = _state_store.get_risk_throttle()
+        status = get_risk_engine().get_status()
+        throttle = _state_store().get_risk_throttle()
         return RiskStatusResponse(
             throttle_active=throttle.get("active", False) or status.get("throttle_active", False),
             throttle_reason=throttle.get("reason", "") or status.get("throttle_reason", ""),
@@ -57,8 +50,8 @@ def get_status():
 @router.post("/stress-test", response_model=StressTestResult)
 def run_stress_test(req: StressTestRequest):
     try:
-        positions = _exec_router.get_all_positions()
-        result = _stress_runner.run_scenario(
+        positions = get_execution_router().get_all_positions()
+        result = _stress_runner().run_scenario(
             scenario_name=req.scenario,
             positions=positions,
             params=req.params or {},
@@ -92,25 +85,24 @@ def get_guardrails():
 @router.get("/regime-analogs")
 def get_regime_analogs():
     try:
-        idx = _state_store.get_snapshot("index:latest") or {}
-        regime = _state_store.get_snapshot("regime:latest") or {}
+        idx = _state_store().get_snapshot("index:latest") or {}
+        regime = _state_store().get_snapshot("regime:latest") or {}
 
-        shock_score = idx.get("shock_score", 0)
-        shock_state = "high" if shock_score > 1.5 else ("elevated" if shock_score > 0.5 else "normal")
-        funding_regime = regime.get("funding_regime", "neutral")
-        vol_regime = regime.get("vol_regime", "normal")
+        current = classify_regime(idx, regime)
+        analogs = get_regime_memory().find_analogues(**current)
+        outcomes = get_regime_memory().get_outcome_distribution(**current)
+        summary = get_regime_memory().get_summary()
 
-        analogs = _regime_memory.find_analogues(shock_state, funding_regime, vol_regime)
-        outcomes = _regime_memory.get_outcome_distribution(shock_state, funding_regime, vol_regime)
-        summary = _regime_memory.get_summary()
+        price_snap = _state_store().get_snapshot("price:pyth:SOL_USD") or {}
+        nearest = []
+        if price_snap.get("price"):
+            tariff_index = float(idx.get("tariff_index", idx.get("index_level", 0.0)) or 0.0)
+            nearest = get_regime_memory().find_nearest(tariff_index, float(price_snap["price"]), k=10)
 
         return {
-            "current_regime": {
-                "shock_state": shock_state,
-                "funding_regime": funding_regime,
-                "vol_regime": vol_regime,
-            },
+            "current_regime": current,
             "analogs": analogs,
+            "nearest_analogs": nearest,
             "outcome_distribution": outcomes,
             "memory_summary": summary,
             "ts": datetime.now(timezone.utc).isoformat(),
@@ -120,6 +112,7 @@ def get_regime_analogs():
         return {
             "current_regime": {},
             "analogs": [],
+            "nearest_analogs": [],
             "outcome_distribution": {},
             "memory_summary": {},
             "ts": datetime.now(timezone.utc).isoformat(),
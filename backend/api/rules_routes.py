@@ -7,19 +7,20 @@ from backend.core.schemas import RuleActionResponse
 from backend.compute.rules_engine import RulesEngine
 from backend.compute.adaptive_weights import compute_weights
 from backend.core.state_store import StateStore
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/rules", tags=["rules"])
 
-_rules_engine = RulesEngine()
-_state_store = StateStore()
+_rules_engine = Lazy(RulesEngine)
+_state_store = Lazy(StateStore)
 
 
 @router.get("/evaluate", response_model=list[RuleActionResponse])
 def evaluate_rules():
     try:
-        snapshot = _state_store.get_snapshot("desk:context") or {}
+        snapshot = _state_store().get_snapshot("desk:context") or {}
         context = {
             "tariff_rate_of_change": snapshot.get("tariff_rate_of_change", 0.0),
             "vol_regime": snapshot.get("vol_regime", "normal"),
@@ -31,7 +32,7 @@ def evaluate_rules():
             "market": snapshot.get("market", "SOL-PERP"),
             "suggested_size": snapshot.get("suggested_size", 0.0),
         }
-        actions = _rules_engine.evaluate(context)
+        actions = _rules_engine().evaluate(context)
         results = []
         for a in actions:
             results.append(RuleActionResponse(
@@ -55,7 +56,7 @@ def evaluate_rules():
 def get_status():
     try:
         rules_info = []
-        for rule in _rules_engine.rules:
+        for rule in _rules_engine().rules:
             rules_info.append({
                 "name": rule["name"],
                 "action_type": rule["action_type"],
@@ -74,9 +75,9 @@ def get_status():
 @router.get("/adaptive-weights")
 def get_adaptive_weights():
     try:
-        idx = _state_store.get_snapshot("index:latest") or {}
-        regime = _state_store.get_snapshot("regime:latest") or {}
-        funding = _state_store.get_snapshot("funding:hyperliquid") or {}
+        idx = _state_store().get_snapshot("index:latest") or {}
+        regime = _state_store().get_snapshot("regime:latest") or {}
+        funding = _state_store().get_snapshot("funding:hyperliquid") or {}
 
         shock_score = idx.get("shock_score", 0)
         tariff_index = idx.get("tariff_index", 0)
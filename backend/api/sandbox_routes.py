@@ -4,30 +4,52 @@ from datetime import datetime, timezone
 from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
-from backend.compute.strategy_sandbox import run_sandbox, get_latest, get_history
+from backend.compute.strategy_sandbox import (
+    run_sandbox, run_leaderboard, get_latest, get_latest_leaderboard, get_history,
+)
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/sandbox", tags=["sandbox"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
+
+
+_MARKET_STATE_KEYS = (
+    "price:pyth:SOL_USD", "price:sol:pyth", "index:latest", "regime:latest", "microstructure:latest",
+    "dislocation:scan", "funding:hyperliquid", "funding:drift", "carry:latest",
+)
 
 
 def _build_market_state() -> dict:
+    snaps = _store().get_snapshots(_MARKET_STATE_KEYS)
     state = {}
-    price_snap = _store.get_snapshot("price:pyth:SOL_USD") or _store.get_snapshot("price:sol:pyth") or {}
+    price_snap = snaps["price:pyth:SOL_USD"] or snaps["price:sol:pyth"] or {}
     state["current_price"] = price_snap.get("price", 100.0)
 
-    idx = _store.get_snapshot("index:latest") or {}
+    idx = snaps["index:latest"] or {}
     state["tariff_index"] = idx.get("tariff_index", 0)
+    state["tariff_rate_of_change"] = idx.get("rate_of_change", 0)
     state["shock_score"] = idx.get("shock_score", 0)
 
-    regime = _store.get_snapshot("regime:latest") or {}
+    regime = snaps["regime:latest"] or {}
     state["vol_regime"] = regime.get("vol_regime", "normal")
     state["funding_regime"] = regime.get("funding_regime", "neutral")
 
-    micro = _store.get_snapshot("microstructure:latest") or {}
+    micro = snaps["microstructure:latest"] or {}
     state["spread_bps"] = micro.get("spread_bps", 5.0)
 
+    scan = snaps["dislocation:scan"] or {}
+    sol = next((row for row in scan.get("symbols", []) if row.get("symbol") == "SOL_USD"), {})
+    state["divergence_bps"] = sol.get("spread_bps", 0.0)
+
+    funding = snaps["funding:hyperliquid"] or snaps["funding:drift"] or {}
+    state["funding_rate"] = funding.get("funding_rate", 0.0)
+
+    carry = snaps["carry:latest"] or {}
+    scores = carry.get("scores") or [{}]
+    state["carry_score"] = scores[0].get("annualized_carry", 0.0)
+
     state["price_change_pct"] = 0.0
     state["volatility"] = 0.03
     return state
@@ -49,6 +71,34 @@ def run_comparison(body: dict = {}):
         return {"error": "Sandbox run failed", "ts": datetime.now(timezone.utc).isoformat()}
 
 
+@router.post("/leaderboard")
+def run_leaderboard_comparison(body: dict = {}):
+    try:
+        market_state = _build_market_state()
+        market_state.update(body.get("market_state", {}))
+        return run_leaderboard(
+            configs=body.get("configs"),
+            market_state=market_state,
+            n_paths=body.get("n_paths", 1000),
+            n_steps=body.get("n_steps", 24),
+            horizon_hours=body.get("horizon_hours", 24.0),
+            seed=body.get("seed"),
+        )
+    except ValueError as exc:
+        return {"error": str(exc), "ts": datetime.now(timezone.utc).isoformat()}
+    except Exception as exc:
+        logger.error("Sandbox leaderboard failed: %s", exc, exc_info=True)
+        return {"error": "Sandbox leaderboard failed", "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/leaderboard/latest")
+def get_latest_leaderboard_result():
+    result = get_latest_leaderboard()
+    if result:
+        return result
+    return {"message": "No sandbox leaderboard run yet", "ts": datetime.now(timezone.utc).isoformat()}
+
+
 @router.get("/latest")
 def get_latest_result():
     result = get_latest()
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 from fastapi import APIRouter
-from backend.core.state_store import StateStore
+from backend.agents.runtime import get_agent_runtime
 from backend.compute.signal_attribution import compute_signal_outcomes, attribution_summary
 
 router = APIRouter(prefix="/api/signals", tags=["signals"])
-_store = StateStore()
 
 
 def _signals():
-    return (_store.get_snapshot("agents:signals") or {}).get("signals", [])
+    return get_agent_runtime().signals()
 
 
 @router.get("/outcomes")
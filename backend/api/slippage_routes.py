@@ -4,19 +4,20 @@ from datetime import datetime, timezone
 from fastapi import APIRouter
 
 from backend.core.state_store import StateStore
-from backend.compute.slippage_model import compute_max_safe_sizes, get_multi_venue_slippage
+from backend.compute.slippage_model import compute_max_safe_sizes, get_multi_venue_slippage, get_slippage_calibrator
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/slippage", tags=["slippage"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 def _get_venue_params() -> dict:
     venues = {}
 
-    micro = _store.get_snapshot("microstructure:latest") or {}
-    eqi_snap = _store.get_snapshot("eqi:latest") or {}
+    micro = _store().get_snapshot("microstructure:latest") or {}
+    eqi_snap = _store().get_snapshot("eqi:latest") or {}
 
     venues["hyperliquid"] = {
         "ob_depth": micro.get("liquidity_depth", 0),
@@ -25,7 +26,7 @@ def _get_venue_params() -> dict:
         "recent_slippage_bps": eqi_snap.get("avg_slippage_bps", 0),
     }
 
-    solana_snap = _store.get_snapshot("solana:quality") or {}
+    solana_snap = _store().get_snapshot("solana:quality") or {}
     venues["jupiter"] = {
         "ob_depth": 0,
         "spread_bps": solana_snap.get("components", {}).get("spread_score", 5.0),
@@ -47,7 +48,7 @@ def _get_venue_params() -> dict:
 def get_latest():
     try:
         venue_data = _get_venue_params()
-        result = get_multi_venue_slippage(venue_data)
+        result = get_multi_venue_slippage(venue_data, get_slippage_calibrator().get_models(list(venue_data)))
         return result
     except Exception as exc:
         logger.error("Slippage model error: %s", exc, exc_info=True)
@@ -66,8 +67,19 @@ def estimate_slippage(body: dict = {}):
             volatility=params.get("volatility", 0.03),
             recent_slippage_bps=params.get("recent_slippage_bps", 0),
             venue=venue,
+            model=get_slippage_calibrator().get_model(venue),
         )
         return result
     except Exception as exc:
         logger.error("Slippage estimate error: %s", exc, exc_info=True)
         return {"venue": body.get("venue", "unknown"), "error": "estimation_failed", "ts": datetime.now(timezone.utc).isoformat()}
+
+
+@router.get("/model")
+def get_fitted_models():
+    try:
+        venues = list(_get_venue_params())
+        return {"models": get_slippage_calibrator().get_models(venues), "ts": datetime.now(timezone.utc).isoformat()}
+    except Exception as exc:
+        logger.error("Slippage model lookup error: %s", exc, exc_info=True)
+        return {"models": {}, "ts": datetime.now(timezone.utc).isoformat()}
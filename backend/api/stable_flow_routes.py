@@ -6,11 +6,12 @@ from fastapi import APIRouter
 from backend.core.state_store import StateStore
 from backend.compute.stable_flow import compute_flow_momentum, get_history
 from backend.compute.stablecoin_health import StablecoinHealthMonitor
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/stable-flow", tags=["stable-flow"])
 
-_store = StateStore()
+_store = Lazy(StateStore)
 
 
 @router.get("/latest")
@@ -19,22 +20,22 @@ def get_latest():
         stable_prices = {}
         stable_volumes = {}
         for symbol in StablecoinHealthMonitor.STABLES:
-            snap = _store.get_snapshot(f"price:{symbol.lower()}:pyth")
+            snap = _store().get_snapshot(f"price:{symbol.lower()}:pyth")
             if not snap:
-                snap = _store.get_snapshot(f"price:{symbol.lower()}:kraken")
+                snap = _store().get_snapshot(f"price:{symbol.lower()}:kraken")
             if snap and snap.get("price"):
                 stable_prices[symbol] = snap["price"]
-            vol_snap = _store.get_snapshot(f"volume:{symbol.lower()}")
+            vol_snap = _store().get_snapshot(f"volume:{symbol.lower()}")
             if vol_snap and vol_snap.get("volume"):
                 stable_volumes[symbol] = vol_snap["volume"]
 
         total_mc = 0
-        mc_snap = _store.get_snapshot("market:total_cap")
+        mc_snap = _store().get_snapshot("market:total_cap")
         if mc_snap:
             total_mc = mc_snap.get("total_market_cap", 0)
 
         result = compute_flow_momentum(stable_prices, stable_volumes, total_mc)
-        _store.set_snapshot("stable_flow:latest", result, ttl=60)
+        _store().set_snapshot("stable_flow:latest", result, ttl=60)
         return result
     except Exception as exc:
         logger.error("Error computing stable flow: %s", exc, exc_info=True)
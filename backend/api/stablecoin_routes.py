@@ -4,22 +4,23 @@ from fastapi import APIRouter, Query
 
 from backend.core.state_store import StateStore
 from backend.compute.stablecoin_health import StablecoinHealthMonitor
+from backend.core.lazy import Lazy
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/stablecoins", tags=["stablecoins"])
 
-_monitor = StablecoinHealthMonitor()
-_store = StateStore()
+_monitor = Lazy(StablecoinHealthMonitor)
+_store = Lazy(StateStore)
 
 
 def _get_stable_prices() -> dict[str, float]:
     prices = {}
     for symbol in StablecoinHealthMonitor.STABLES:
-        snap = _store.get_snapshot(f"price:{symbol.lower()}:pyth")
+        snap = _store().get_snapshot(f"price:{symbol.lower()}:pyth")
         if snap and snap.get("price"):
             prices[symbol] = snap["price"]
         else:
-            snap = _store.get_snapshot(f"price:{symbol.lower()}:kraken")
+            snap = _store().get_snapshot(f"price:{symbol.lower()}:kraken")
             if snap and snap.get("price"):
                 prices[symbol] = snap["price"]
             else:
@@ -30,14 +31,14 @@ def _get_stable_prices() -> dict[str, float]:
 @router.get("/latest")
 def get_latest():
     prices = _get_stable_prices()
-    health = _monitor.compute_health(prices)
-    _store.set_snapshot("stablecoin:health", health, ttl=60)
+    health = _monitor().compute_health(prices)
+    _store().set_snapshot("stablecoin:health", health, ttl=60)
     return health
 
 
 @router.get("/history")
 def get_history(window: str = Query("7d")):
-    cached = _store.get_snapshot("stablecoin:history")
+    cached = _store().get_snapshot("stablecoin:history")
     if cached:
         return cached
     return {"window": window, "points": []}
@@ -45,16 +46,16 @@ def get_history(window: str = Query("7d")):
 
 @router.get("/health")
 def get_health():
-    cached = _store.get_snapshot("stablecoin:health")
+    cached = _store().get_snapshot("stablecoin:health")
     if cached:
-        alerts = _monitor.get_alerts(cached)
+        alerts = _monitor().get_alerts(cached)
         stress_data = {}
         for symbol, data in cached.items():
             if isinstance(data, dict):
-                stress = _monitor.detect_stress(
+                stress = _monitor().detect_stress(
                     data.get("depeg_bps", 0), 0.0, 0.0
                 )
-                peg_prob = _monitor.compute_peg_break_probability(data.get("depeg_bps", 0))
+                peg_prob = _monitor().compute_peg_break_probability(data.get("depeg_bps", 0))
                 stress_data[symbol] = {
                     **data,
                     "stress": stress,
@@ -63,13 +64,13 @@ def get_health():
         return {"health": stress_data, "alerts": alerts, "ts": datetime.now(timezone.utc).isoformat()}
 
     prices = _get_stable_prices()
-    health = _monitor.compute_health(prices)
+    health = _monitor().compute_health(prices)
     return {"health": health, "alerts": [], "ts": datetime.now(timezone.utc).isoformat()}
 
 
 @router.get("/alerts")
 def get_alerts():
-    cached = _store.get_snapshot("stablecoin:health")
+    cached = _store().get_snapshot("stablecoin:health")
     if cached:
-        return {"alerts": _monitor.get_alerts(cached)}
+        return {"alerts": _monitor().get_alerts(cached)}
     return {"alerts": []}
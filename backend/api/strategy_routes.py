@@ -5,14 +5,15 @@ from fastapi import APIRouter
 
 from backend.compute.strategy_performance import compute_strategy_performance
 from backend.data.repositories.positions_repo import PositionsRepository
+from backend.core.lazy import Lazy
 
 router = APIRouter(prefix="/api/strategy", tags=["strategy"])
-_repo = PositionsRepository()
+_repo = Lazy(PositionsRepository)
 
 
 @router.get("/performance")
 def performance():
-    trades = _repo.get_paper_trades(limit=500)
+    trades = _repo().get_paper_trades(limit=500)
     if not trades:
         now = datetime.now(timezone.utc).isoformat()
         trades = [
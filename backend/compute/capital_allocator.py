@@ -1,11 +1,17 @@
 import logging
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Mapping
 
 logger = logging.getLogger(__name__)
 
 VENUES = ["hyperliquid", "drift", "jupiter_spot", "stablecoins", "cash"]
 
+ALLOCATION_STATE_KEYS = (
+    "desk:index:latest", "index:latest", "desk:shock:latest", "shock:latest",
+    "desk:vol_regime:latest", "vol_regime:latest", "predict:latest", "funding_arb:latest", "basis:latest",
+    "stablecoin:health:latest", "execution:metrics:latest", "price:integrity:latest", "portfolio:latest",
+)
+
 CAPS = {
     "hyperliquid": 0.50,
     "drift": 0.40,
@@ -55,6 +61,61 @@ def _apply_caps(weights: dict[str, float]) -> dict[str, float]:
     return _normalize(capped)
 
 
+def build_allocation_state(snaps: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the ``allocate`` input from the ``ALLOCATION_STATE_KEYS`` snapshots."""
+    state: dict[str, Any] = {}
+
+    idx = snaps.get("desk:index:latest") or snaps.get("index:latest")
+    if idx:
+        state["tariff_index"] = idx.get("value", 30.0)
+        state["tariff_shock"] = min(idx.get("value", 30.0) / 100.0, 1.0)
+
+    shock = snaps.get("desk:shock:latest") or snaps.get("shock:latest")
+    if shock:
+        state["shock_score"] = shock.get("shock_score", 0.0)
+
+    snap = snaps.get("desk:vol_regime:latest") or snaps.get("vol_regime:latest")
+    if snap:
+        state["vol_regime"] = snap.get("regime", "normal")
+
+    pred = snaps.get("predict:latest")
+    if pred:
+        state["predictor_confidence"] = pred.get("confidence", 0.5)
+        state["predictor_prob"] = pred.get("probability", 0.5)
+
+    arb = snaps.get("funding_arb:latest")
+    if arb:
+        state["funding_arb_score"] = abs(arb.get("spread_pct", 0.0))
+
+    basis = snaps.get("basis:latest")
+    if basis:
+        state["basis_opportunity"] = basis.get("feasibility_score", 0.0)
+
+    stable = snaps.get("stablecoin:health:latest")
+    if stable:
+        assets = stable.get("assets", {})
+        if assets:
+            avg_health = sum(
+                1.0 - min(abs(a.get("depeg_bps", 0)) / 100.0, 1.0)
+                for a in assets.values()
+            ) / len(assets)
+            state["stable_health"] = avg_health
+
+    eqi = snaps.get("execution:metrics:latest")
+    if eqi:
+        state["exec_quality"] = eqi.get("eqi_score", 0.8)
+
+    integrity = snaps.get("price:integrity:latest")
+    if integrity:
+        state["price_integrity"] = integrity.get("status", "ok")
+
+    portfolio = snaps.get("portfolio:latest")
+    if portfolio:
+        state["portfolio_weights"] = portfolio.get("allocation", {})
+
+    return state
+
+
 def allocate(state: dict[str, Any] | None = None) -> dict[str, Any]:
     state = state or {}
     reasoning: list[str] = []
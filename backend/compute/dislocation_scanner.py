@@ -0,0 +1,288 @@
+import json
+import time
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+
+from backend.config import PRICE_FRESHNESS_THRESHOLD_S
+from backend.core.event_bus import EventBus, EventType
+from backend.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ["SOL_USD", "BTC_USD", "ETH_USD"]
+DEFAULT_VENUES = ["pyth", "kraken", "coingecko", "hyperliquid", "drift"]
+DEFAULT_THRESHOLD_BPS = 30.0
+DEFAULT_COOLDOWN_SECONDS = 60
+SCAN_SNAPSHOT_KEY = "dislocation:scan"
+
+_COINGECKO_IDS = {"SOL": "SOLANA", "BTC": "BITCOIN", "ETH": "ETHEREUM"}
+_BASE_ALIASES = {**{v: k for k, v in _COINGECKO_IDS.items()}, "XBT": "BTC"}
+_USD_QUOTES = ("USDC", "USDT", "USD")
+
+
+def normalise_symbol(symbol: str) -> str:
+    """Canonical ``BASE_USD`` for every ingest format.
+
+    ``SOLUSD`` (Kraken), ``SOL/USD`` (Pyth), ``SOLANA/USD`` (CoinGecko) and
+    ``SOL-PERP`` (Drift) all map to ``SOL_USD``; stablecoin quotes count as USD.
+    """
+    base, _, quote = symbol.upper().replace("/", "_").replace("-", "_").partition("_")
+    if not quote:
+        for candidate in _USD_QUOTES:
+            if base.endswith(candidate) and len(base) > len(candidate):
+                base, quote = base[:-len(candidate)], candidate
+                break
+    if quote in ("", "PERP") or quote in _USD_QUOTES:
+        quote = "USD"
+    return f"{_BASE_ALIASES.get(base, base)}_{quote}"
+
+
+def _snapshot_keys(symbol: str, venue: str) -> list[str]:
+    base, _, quote = symbol.partition("_")
+    quote = quote or "USD"
+    keys = [
+        f"price:{venue}:{base}_{quote}",
+        f"price:{venue}:{base}/{quote}",
+        f"price:{venue}:{base}{quote}",
+        f"price:{base.lower()}:{venue}",
+    ]
+    if venue == "coingecko" and base in _COINGECKO_IDS:
+        keys.append(f"price:{venue}:{_COINGECKO_IDS[base]}/{quote}")
+    return keys
+
+
+def _parse_ts(raw: Any) -> float | None:
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    if isinstance(raw, str):
+        try:
+            return datetime.fromisoformat(raw).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+class DislocationScanner:
+
+    def __init__(
+        self,
+        symbols: list[str] | None = None,
+        venues: list[str] | None = None,
+        threshold_bps: float = DEFAULT_THRESHOLD_BPS,
+        cooldown_seconds: float = DEFAULT_COOLDOWN_SECONDS,
+        max_age_seconds: float = PRICE_FRESHNESS_THRESHOLD_S * 4,
+        state_store: StateStore | None = None,
+        event_bus: EventBus | None = None,
+    ):
+        self.threshold_bps = threshold_bps
+        self.cooldown_seconds = cooldown_seconds
+        self.max_age_seconds = max_age_seconds
+        self._store = state_store or StateStore()
+        self._bus = event_bus or EventBus()
+
+        self._symbols: list[str] = []
+        self._venues: list[str] = []
+        self._symbol_idx: dict[str, int] = {}
+        self._venue_idx: dict[str, int] = {}
+        self._prices = np.full((0, 0), np.nan)
+        self._updated_at = np.zeros((0, 0))
+        self._last_alert_at = np.zeros(0)
+        # Ingest jobs update cells on the event loop while scans run in a worker thread.
+        self._lock = threading.Lock()
+
+        for venue in venues or DEFAULT_VENUES:
+            self._venue_index(venue)
+        for symbol in symbols or DEFAULT_SYMBOLS:
+            self._symbol_index(symbol)
+
+    def _symbol_index(self, symbol: str) -> int:
+        symbol = normalise_symbol(symbol)
+        idx = self._symbol_idx.get(symbol)
+        if idx is None:
+            idx = len(self._symbols)
+            self._symbols.append(symbol)
+            self._symbol_idx[symbol] = idx
+            self._prices = np.pad(self._prices, ((0, 1), (0, 0)), constant_values=np.nan)
+            self._updated_at = np.pad(self._updated_at, ((0, 1), (0, 0)))
+            self._last_alert_at = np.pad(self._last_alert_at, (0, 1), constant_values=-np.inf)
+        return idx
+
+    def _venue_index(self, venue: str) -> int:
+        venue = venue.lower()
+        idx = self._venue_idx.get(venue)
+        if idx is None:
+            idx = len(self._venues)
+            self._venues.append(venue)
+            self._venue_idx[venue] = idx
+            self._prices = np.pad(self._prices, ((0, 0), (0, 1)), constant_values=np.nan)
+            self._updated_at = np.pad(self._updated_at, ((0, 0), (0, 1)))
+        return idx
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    @property
+    def venues(self) -> list[str]:
+        return list(self._venues)
+
+    def update(self, symbol: str, venue: str, price: float, ts: float | None = None) -> None:
+        with self._lock:
+            i = self._symbol_index(symbol)
+            j = self._venue_index(venue)
+            self._prices[i, j] = price if price and price > 0 else np.nan
+            self._updated_at[i, j] = ts if ts is not None else time.time()
+
+    def refresh_from_store(self) -> int:
+        r = self._store.get_redis()
+        if r is None:
+            return 0
+
+        with self._lock:
+            cells = [(i, j) for i in range(len(self._symbols)) for j in range(len(self._venues))]
+            cell_keys = [_snapshot_keys(self._symbols[i], self._venues[j]) for i, j in cells]
+        flat_keys = [k for keys in cell_keys for k in keys]
+        try:
+            raw_values = r.mget(flat_keys)
+        except Exception:
+            logger.warning("Dislocation scanner price read failed", exc_info=True)
+            return 0
+
+        fresh = []
+        offset = 0
+        for (i, j), keys in zip(cells, cell_keys):
+            values = raw_values[offset:offset + len(keys)]
+            offset += len(keys)
+            for raw in values:
+                if raw is None:
+                    continue
+                try:
+                    snap = json.loads(raw)
+                    price = float(snap.get("price", 0))
+                except (TypeError, ValueError, json.JSONDecodeError):
+                    continue
+                if price <= 0:
+                    continue
+                fresh.append((i, j, price, _parse_ts(snap.get("ts")) or time.time()))
+                break
+        with self._lock:
+            for i, j, price, ts in fresh:
+                # A tick pushed by ``update`` since the read is newer than the snapshot.
+                if ts >= self._updated_at[i, j]:
+                    self._prices[i, j] = price
+                    self._updated_at[i, j] = ts
+        return len(fresh)
+
+    def _view(self) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+        with self._lock:
+            return list(self._symbols), list(self._venues), self._prices.copy(), self._updated_at.copy()
+
+    def compute_spreads(self, now: float | None = None) -> list[dict]:
+        now = now if now is not None else time.time()
+        symbols, venues, prices, updated_at = self._view()
+        if not symbols or not venues:
+            return []
+
+        valid = ((now - updated_at) <= self.max_age_seconds) & (prices > 0)
+        counts = valid.sum(axis=1)
+        has_pair = counts >= 2
+
+        rows = np.arange(len(symbols))
+        hi_venue = np.argmax(np.where(valid, prices, -np.inf), axis=1)
+        lo_venue = np.argmin(np.where(valid, prices, np.inf), axis=1)
+        hi = prices[rows, hi_venue]
+        lo = prices[rows, lo_venue]
+        mid = (hi + lo) / 2.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            spread_bps = np.where(has_pair & (mid > 0), (hi - lo) / mid * 10000.0, 0.0)
+
+        results = []
+        for i, symbol in enumerate(symbols):
+            if not has_pair[i]:
+                results.append({
+                    "symbol": symbol,
+                    "venue_count": int(counts[i]),
+                    "spread_bps": 0.0,
+                    "dislocated": False,
+                })
+                continue
+            results.append({
+                "symbol": symbol,
+                "venue_count": int(counts[i]),
+                "high_venue": venues[int(hi_venue[i])],
+                "high_price": round(float(hi[i]), 4),
+                "low_venue": venues[int(lo_venue[i])],
+                "low_price": round(float(lo[i]), 4),
+                "spread_bps": round(float(spread_bps[i]), 2),
+                "dislocated": bool(spread_bps[i] > self.threshold_bps),
+            })
+        return results
+
+    def consensus_prices(self, now: float | None = None) -> dict[str, float]:
+        now = now if now is not None else time.time()
+        symbols, _, prices, updated_at = self._view()
+        valid = ((now - updated_at) <= self.max_age_seconds) & (prices > 0)
+        has_any = valid.any(axis=1)
+        if not has_any.any():
+            return {}
+        with np.errstate(all="ignore"):
+            medians = np.nanmedian(np.where(valid[has_any], prices[has_any], np.nan), axis=1)
+        symbols = [s for s, ok in zip(symbols, has_any) if ok]
+        return {s: float(m) for s, m in zip(symbols, medians)}
+
+    def scan(self, now: float | None = None, emit: bool = True) -> dict:
+        now = now if now is not None else time.time()
+        spreads = self.compute_spreads(now)
+
+        alerts = []
+        for row in spreads:
+            if not row["dislocated"]:
+                continue
+            with self._lock:
+                i = self._symbol_idx[row["symbol"]]
+                if now - self._last_alert_at[i] < self.cooldown_seconds:
+                    continue
+                self._last_alert_at[i] = now
+            alerts.append(row)
+            if emit:
+                self._emit_alert(row)
+
+        result = {
+            "symbols": spreads,
+            "alerts": alerts,
+            "venues": self.venues,
+            "threshold_bps": self.threshold_bps,
+            "cooldown_seconds": self.cooldown_seconds,
+            "ts": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        }
+        return result
+
+    def _emit_alert(self, row: dict) -> None:
+        try:
+            self._bus.emit(
+                EventType.PRICE_DISLOCATION_ALERT,
+                source="dislocation_scanner",
+                payload={
+                    "message": (
+                        f"{row['symbol']} {row['high_venue']} vs {row['low_venue']} "
+                        f"deviation {row['spread_bps']:.0f}bps"
+                    ),
+                    "symbol": row["symbol"],
+                    "high_venue": row["high_venue"],
+                    "low_venue": row["low_venue"],
+                    "spread_bps": row["spread_bps"],
+                    "threshold_bps": self.threshold_bps,
+                },
+            )
+        except Exception:
+            logger.debug("Failed to emit dislocation alert", exc_info=True)
+
+    def run_once(self) -> dict:
+        self.refresh_from_store()
+        result = self.scan()
+        self._store.set_snapshot(SCAN_SNAPSHOT_KEY, result, ttl=120)
+        return result
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import math
+import warnings
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+
 
 def _safe_float(v: Any, default: float = 0.0) -> float:
     try:
@@ -78,32 +81,147 @@ def beta_proxy(closes: list[float], spy_closes: list[float]) -> float:
     return round(cov / var, 4) if var > 0 else 1.0
 
 
+def _right_align(panel: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    valid = np.isfinite(panel) & (panel > 0)
+    order = np.argsort(valid, axis=0, kind="stable")
+    aligned = np.take_along_axis(np.where(valid, panel, np.nan), order, axis=0)
+    return aligned, order
+
+
+def _lookback_change(closes: np.ndarray, counts: np.ndarray, lookback: int, cap: bool = True) -> np.ndarray:
+    d = closes.shape[0]
+    k = np.minimum(lookback, counts - 1) if cap else np.full_like(counts, lookback)
+    ok = (counts > k) & (k >= 0)
+    cols = np.arange(closes.shape[1])
+    last = closes[d - 1, cols] if d else np.zeros(len(cols))
+    base = closes[np.clip(d - 1 - k, 0, max(d - 1, 0)), cols] if d else np.zeros(len(cols))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(ok & (base != 0), last / base - 1.0, 0.0)
+
+
+def analyze_panel(
+    tickers: list[str],
+    closes: np.ndarray,
+    volumes: np.ndarray | None = None,
+    spy_closes: np.ndarray | list[float] | None = None,
+    sectors: dict[str, str] | None = None,
+    data_ts: list[Any] | None = None,
+) -> list[dict[str, Any]]:
+    """Compute per-ticker analytics for a (dates × tickers) close panel in one pass.
+
+    Missing or non-positive closes are dropped per column and the remaining
+    bars are aligned on the most recent date, matching the per-ticker list
+    semantics of ``analyze_history``.
+    """
+    raw = np.asarray(closes, dtype=float).reshape(-1, len(tickers))
+    c, order = _right_align(raw)
+    d, t = c.shape
+    counts = np.isfinite(c).sum(axis=0)
+    if volumes is None:
+        vol = np.zeros_like(c)
+    else:
+        vol = np.take_along_axis(np.nan_to_num(np.asarray(volumes, dtype=float).reshape(d, t)), order, axis=0)
+        vol = np.where(np.isfinite(c), vol, np.nan)
+
+    spy = np.asarray(spy_closes if spy_closes is not None else [], dtype=float)
+    spy = spy[np.isfinite(spy) & (spy > 0)]
+    spy_1m = float(_lookback_change(spy[:, None], np.array([spy.size]), 21)[0]) if spy.size else 0.0
+
+    daily = _lookback_change(c, counts, 1, cap=False)
+    ret_5d = _lookback_change(c, counts, 5)
+    ret_1m = _lookback_change(c, counts, 21)
+
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        rets = c[1:] / c[:-1] - 1.0
+        recent = rets[-20:]
+        n_ret = np.isfinite(recent).sum(axis=0)
+        rv = np.where(n_ret >= 2, np.nanstd(recent, axis=0, ddof=1) * math.sqrt(252), 0.0)
+
+        peak = np.fmax.accumulate(c, axis=0)
+        dd = np.nanmax(np.where(peak > 0, (peak - c) / peak, np.nan), axis=0) if d else np.zeros(t)
+        dd = np.where(counts > 0, np.nan_to_num(dd), 0.0)
+
+        ma_20 = np.where(counts > 0, np.nanmean(c[-20:], axis=0), 0.0)
+        ma_50 = np.where(counts > 0, np.nanmean(c[-50:], axis=0), 0.0)
+
+        deltas = np.diff(c, axis=0)[-14:]
+        avg_gain = np.nansum(np.clip(deltas, 0.0, None), axis=0) / 14
+        avg_loss = np.nansum(np.clip(-deltas, 0.0, None), axis=0) / 14
+        rsi_val = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / np.where(avg_loss == 0, 1.0, avg_loss)))
+        rsi_val = np.where(counts > 14, rsi_val, 50.0)
+
+        beta = np.ones(t)
+        if spy.size >= 5 and d >= 2:
+            window = min(59, d - 1, spy.size - 1)
+            spy_rets = spy[1:] / spy[:-1] - 1.0
+            rb = spy_rets[-window:][:, None]
+            ra = rets[-window:]
+            m = np.minimum(np.minimum(counts, spy.size), 60) - 1
+            mask = np.arange(window)[:, None] >= (window - m)[None, :]
+            n_obs = mask.sum(axis=0)
+            mean_a = np.where(mask, ra, 0.0).sum(axis=0) / np.maximum(n_obs, 1)
+            mean_b = np.where(mask, rb, 0.0).sum(axis=0) / np.maximum(n_obs, 1)
+            cov = np.where(mask, (ra - mean_a) * (rb - mean_b), 0.0).sum(axis=0)
+            var = np.where(mask, (rb - mean_b) ** 2, 0.0).sum(axis=0)
+            beta = np.where((m >= 4) & (var > 0), cov / np.where(var > 0, var, 1.0), 1.0)
+
+        avg_vol = np.where(counts > 0, np.nanmean(vol[-20:], axis=0), 0.0)
+
+    last_price = c[-1] if d else np.zeros(t)
+    last_vol = np.nan_to_num(vol[-1]) if d else np.zeros(t)
+    now = datetime.now(timezone.utc).isoformat()
+    sectors = sectors or {}
+    rows = []
+    for j, ticker in enumerate(tickers):
+        has_data = counts[j] > 0
+        rows.append({
+            "ticker": ticker.upper(),
+            "sector": sectors.get(ticker.upper(), "Unknown"),
+            "price": round(float(last_price[j]), 4) if has_data else 0.0,
+            "daily_return": round(float(daily[j]), 6),
+            "return_5d": round(float(ret_5d[j]), 6),
+            "return_1m": round(float(ret_1m[j]), 6),
+            "realized_volatility": round(float(rv[j]), 6),
+            "max_drawdown": round(float(dd[j]), 6),
+            "ma_20": round(float(ma_20[j]), 4),
+            "ma_50": round(float(ma_50[j]), 4),
+            "rsi": round(float(rsi_val[j]), 2),
+            "beta_proxy": round(float(beta[j]), 4),
+            "relative_strength_vs_spy": round(float(ret_1m[j]) - spy_1m, 6),
+            "volume": int(last_vol[j]) if has_data else 0,
+            "avg_volume_20d": int(avg_vol[j]),
+            "volume_vs_avg": round(float(last_vol[j] / avg_vol[j]) if avg_vol[j] > 0 else 1.0, 4),
+            "data_ts": data_ts[j] if data_ts else None,
+            "ts": now,
+        })
+    return rows
+
+
+def build_panel(histories: dict[str, list[dict[str, Any]]]) -> tuple[list[str], np.ndarray, np.ndarray, list[Any]]:
+    tickers = list(histories)
+    depth = max((len(h) for h in histories.values()), default=0)
+    closes = np.full((depth, len(tickers)), np.nan)
+    volumes = np.zeros((depth, len(tickers)))
+    data_ts = []
+    for j, ticker in enumerate(tickers):
+        rows = [r for r in histories[ticker] if _safe_float(r.get("close")) > 0]
+        if rows:
+            closes[depth - len(rows):, j] = [_safe_float(r.get("close")) for r in rows]
+            volumes[depth - len(rows):, j] = [_safe_float(r.get("volume")) for r in rows]
+        data_ts.append(rows[-1].get("ts") if rows else datetime.now(timezone.utc).isoformat())
+    return tickers, closes, volumes, data_ts
+
+
+def analyze_universe(
+    histories: dict[str, list[dict[str, Any]]],
+    spy_history: list[dict[str, Any]] | None = None,
+    sectors: dict[str, str] | None = None,
+) -> list[dict[str, Any]]:
+    tickers, closes, volumes, data_ts = build_panel(histories)
+    spy_closes = [_safe_float(r.get("close")) for r in (spy_history or [])]
+    return analyze_panel(tickers, closes, volumes, spy_closes, sectors, data_ts)
+
+
 def analyze_history(ticker: str, history: list[dict[str, Any]], spy_history: list[dict[str, Any]] | None = None, sector: str = "Unknown") -> dict[str, Any]:
-    rows = [r for r in history if _safe_float(r.get("close")) > 0]
-    closes = [_safe_float(r.get("close")) for r in rows]
-    volumes = [_safe_float(r.get("volume")) for r in rows]
-    last = rows[-1] if rows else {"close": 0, "volume": 0, "ts": datetime.now(timezone.utc).isoformat()}
-    spy_closes = [_safe_float(r.get("close")) for r in (spy_history or []) if _safe_float(r.get("close")) > 0]
-    spy_1m = pct_change(spy_closes, min(21, len(spy_closes) - 1)) if spy_closes else 0.0
-    one_m = pct_change(closes, min(21, len(closes) - 1)) if closes else 0.0
-    avg_vol = sum(volumes[-20:]) / len(volumes[-20:]) if volumes else 0.0
-    return {
-        "ticker": ticker.upper(),
-        "sector": sector,
-        "price": round(_safe_float(last.get("close")), 4),
-        "daily_return": round(pct_change(closes, 1), 6),
-        "return_5d": round(pct_change(closes, min(5, len(closes) - 1)), 6),
-        "return_1m": round(one_m, 6),
-        "realized_volatility": realized_volatility(closes),
-        "max_drawdown": max_drawdown(closes),
-        "ma_20": moving_average(closes, min(20, len(closes))),
-        "ma_50": moving_average(closes, min(50, len(closes))),
-        "rsi": rsi(closes),
-        "beta_proxy": beta_proxy(closes, spy_closes),
-        "relative_strength_vs_spy": round(one_m - spy_1m, 6),
-        "volume": int(_safe_float(last.get("volume"))),
-        "avg_volume_20d": int(avg_vol),
-        "volume_vs_avg": round((_safe_float(last.get("volume")) / avg_vol) if avg_vol > 0 else 1.0, 4),
-        "data_ts": last.get("ts"),
-        "ts": datetime.now(timezone.utc).isoformat(),
-    }
+    return analyze_universe({ticker: history}, spy_history, {ticker.upper(): sector})[0]
@@ -1,22 +1,122 @@
+import json
 import logging
+import threading
 import time
 from collections import defaultdict, deque
 from datetime import datetime, timezone
 from typing import Any
 
+from backend.compute.quantile_sketch import DDSketch
+from backend.core.cluster import WORKER_ID
+from backend.core.state_store import StateStore
+
 logger = logging.getLogger(__name__)
 
 ROLLING_WINDOW = 100
+ANOMALY_LOOKBACK_FILLS = 20
 SLIPPAGE_ANOMALY_THRESHOLD_BPS = 50.0
 SLIPPAGE_ANOMALY_ZSCORE = 2.5
 
+GRANULARITY_SECONDS = {"hourly": 3600, "daily": 86400}
+SKETCH_RETENTION_SECONDS = {"hourly": 30 * 86400, "daily": 400 * 86400}
+MEMORY_BUCKETS = {"hourly": 48, "daily": 14}
+SKETCH_KEY_PREFIX = "eqi:sketch:"
+HOURLY_WINDOW_LIMIT_S = 7 * 86400
+
+
+class FillSketch:
+
+    def __init__(self):
+        self.latency = DDSketch()
+        self.slippage = DDSketch()
+
+    def add(self, latency_ms: float, slippage_bps: float) -> None:
+        self.latency.add(latency_ms)
+        self.slippage.add(slippage_bps)
+
+    def merge(self, other: "FillSketch") -> "FillSketch":
+        self.latency.merge(other.latency)
+        self.slippage.merge(other.slippage)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.latency.count
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"latency": self.latency.to_dict(), "slippage": self.slippage.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "FillSketch":
+        sketch = cls()
+        sketch.latency = DDSketch.from_dict(data.get("latency") or {})
+        sketch.slippage = DDSketch.from_dict(data.get("slippage") or {})
+        return sketch
+
+    def summary(self) -> dict[str, Any]:
+        lat_p95 = self.latency.quantile(0.95)
+        slip_p95 = self.slippage.quantile(0.95)
+        latency_score = max(0.0, 100.0 - (lat_p95 / 10.0))
+        slippage_score = max(0.0, 100.0 - (slip_p95 / 5.0))
+        eqi = max(0.0, min(100.0, (latency_score * 0.4 + slippage_score * 0.6)))
+        return {
+            "eqi_score": round(eqi, 2),
+            "fill_count": self.count,
+            "latency_p50_ms": round(self.latency.quantile(0.50), 2),
+            "latency_p95_ms": round(lat_p95, 2),
+            "latency_p99_ms": round(self.latency.quantile(0.99), 2),
+            "slippage_mean_bps": round(self.slippage.mean, 2),
+            "slippage_p50_bps": round(self.slippage.quantile(0.50), 2),
+            "slippage_p95_bps": round(slip_p95, 2),
+            "slippage_p99_bps": round(self.slippage.quantile(0.99), 2),
+        }
+
+
+class RollingFillSketch:
+    """Sketch of roughly the last ``window`` fills, kept as ``chunks`` mergeable sub-sketches.
+
+    Each chunk holds ``window / chunks`` fills; once full a new chunk starts and
+    the oldest is dropped, so the summary covers between ``window - window / chunks``
+    and ``window`` fills without keeping the raw values.
+    """
+
+    def __init__(self, window: int, chunks: int = 10):
+        self._chunk_size = max(window // chunks, 1)
+        self._chunks: deque[FillSketch] = deque(maxlen=chunks)
+
+    def add(self, latency_ms: float, slippage_bps: float) -> None:
+        if not self._chunks or self._chunks[-1].count >= self._chunk_size:
+            self._chunks.append(FillSketch())
+        self._chunks[-1].add(latency_ms, slippage_bps)
+
+    @property
+    def count(self) -> int:
+        return sum(chunk.count for chunk in self._chunks)
+
+    def merged(self) -> FillSketch:
+        merged = FillSketch()
+        for chunk in self._chunks:
+            merged.merge(chunk)
+        return merged
+
 
 class ExecutionMetrics:
 
-    def __init__(self, rolling_window: int = ROLLING_WINDOW):
+    def __init__(self, rolling_window: int = ROLLING_WINDOW, state_store: StateStore | None = None):
         self._rolling_window = rolling_window
+        self._store = state_store or StateStore()
+        self._lock = threading.Lock()
         self._fills: dict[str, deque] = defaultdict(lambda: deque(maxlen=self._rolling_window))
         self._all_fills: deque = deque(maxlen=self._rolling_window * 10)
+        self._venue_moments: dict[str, list[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        self._recent: deque = deque(maxlen=ANOMALY_LOOKBACK_FILLS)
+
+        self._recent_overall = RollingFillSketch(self._rolling_window * 10)
+        self._recent_by_venue: dict[str, RollingFillSketch] = defaultdict(lambda: RollingFillSketch(self._rolling_window))
+        self._overall = FillSketch()
+        self._by_venue: dict[str, FillSketch] = defaultdict(FillSketch)
+        self._buckets: dict[str, dict[int, dict[str, FillSketch]]] = {g: {} for g in GRANULARITY_SECONDS}
+        self._dirty: set[tuple[str, int]] = set()
 
     def record_fill(
         self,
@@ -26,6 +126,8 @@ class ExecutionMetrics:
         fill_price: float,
         venue: str,
         market: str,
+        size_usd: float = 0.0,
+        depth_usd: float = 0.0,
     ) -> dict[str, Any]:
         latency_ms = max((fill_ts - order_ts) * 1000.0, 0.0)
 
@@ -48,11 +150,37 @@ class ExecutionMetrics:
             "latency_ms": latency_ms,
             "slippage_bps": slippage_bps,
             "signed_slippage_bps": signed_slippage_bps,
+            "size_usd": size_usd,
+            "depth_usd": depth_usd,
             "recorded_at": datetime.now(timezone.utc).isoformat(),
         }
 
-        self._fills[venue].append(record)
-        self._all_fills.append(record)
+        with self._lock:
+            venue_fills = self._fills[venue]
+            moments = self._venue_moments[venue]
+            if len(venue_fills) == venue_fills.maxlen:
+                evicted = venue_fills[0]["slippage_bps"]
+                moments[0] -= 1
+                moments[1] -= evicted
+                moments[2] -= evicted * evicted
+            venue_fills.append(record)
+            moments[0] += 1
+            moments[1] += slippage_bps
+            moments[2] += slippage_bps * slippage_bps
+            self._all_fills.append(record)
+
+            self._recent_overall.add(latency_ms, slippage_bps)
+            self._recent_by_venue[venue].add(latency_ms, slippage_bps)
+            self._overall.add(latency_ms, slippage_bps)
+            self._by_venue[venue].add(latency_ms, slippage_bps)
+            scope = f"{venue}|{market}"
+            for granularity, width in GRANULARITY_SECONDS.items():
+                bucket = int(fill_ts // width * width)
+                sketches = self._buckets[granularity].setdefault(bucket, {})
+                sketches.setdefault(scope, FillSketch()).add(latency_ms, slippage_bps)
+                self._dirty.add((granularity, bucket))
+
+            self._recent.append((record, self.detect_slippage_anomaly(slippage_bps, venue)))
 
         logger.debug(
             "Fill recorded: venue=%s market=%s latency=%.1fms slippage=%.2fbps",
@@ -61,78 +189,178 @@ class ExecutionMetrics:
 
         return record
 
+    def iter_fills(self) -> list[dict[str, Any]]:
+        with self._lock:
+            return list(self._all_fills)
+
+    def _empty_eqi(self) -> dict[str, Any]:
+        return {
+            "eqi_score": 100.0,
+            "fill_count": 0,
+            "latency_p50_ms": 0.0,
+            "latency_p95_ms": 0.0,
+            "slippage_mean_bps": 0.0,
+            "slippage_p50_bps": 0.0,
+            "slippage_p95_bps": 0.0,
+            "anomalies": [],
+            "venue_breakdown": {},
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+
+    @staticmethod
+    def _venue_breakdown(sketches: dict[str, FillSketch]) -> dict[str, dict[str, Any]]:
+        venue_breakdown = {}
+        for venue, sketch in sketches.items():
+            summary = sketch.summary()
+            venue_breakdown[venue] = {
+                "fill_count": summary["fill_count"],
+                "latency_p50_ms": summary["latency_p50_ms"],
+                "latency_p95_ms": summary["latency_p95_ms"],
+                "slippage_mean_bps": summary["slippage_mean_bps"],
+                "slippage_p95_bps": summary["slippage_p95_bps"],
+            }
+        return venue_breakdown
+
     def get_eqi(self) -> dict[str, Any]:
-        all_records = list(self._all_fills)
-        if not all_records:
-            return {
-                "eqi_score": 100.0,
-                "fill_count": 0,
-                "latency_p50_ms": 0.0,
-                "latency_p95_ms": 0.0,
-                "slippage_mean_bps": 0.0,
-                "slippage_p50_bps": 0.0,
-                "slippage_p95_bps": 0.0,
-                "anomalies": [],
-                "venue_breakdown": {},
-                "ts": datetime.now(timezone.utc).isoformat(),
+        """EQI over the recent window: the last ~``rolling_window * 10`` fills, ~``rolling_window`` per venue."""
+        with self._lock:
+            overall = self._recent_overall.merged()
+            by_venue = {venue: sketch.merged() for venue, sketch in self._recent_by_venue.items()}
+            recent = list(self._recent)
+        if overall.count == 0:
+            return self._empty_eqi()
+
+        anomalies = [
+            {
+                "venue": r["venue"],
+                "market": r["market"],
+                "slippage_bps": r["slippage_bps"],
+                "details": anomaly,
             }
+            for r, anomaly in recent
+            if anomaly["is_anomaly"]
+        ]
 
-        latencies = sorted(r["latency_ms"] for r in all_records)
-        slippages = sorted(r["slippage_bps"] for r in all_records)
+        return {
+            **overall.summary(),
+            "anomalies": anomalies,
+            "venue_breakdown": self._venue_breakdown(by_venue),
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
 
-        lat_p50 = _percentile(latencies, 50)
-        lat_p95 = _percentile(latencies, 95)
-        slip_mean = sum(slippages) / len(slippages)
-        slip_p50 = _percentile(slippages, 50)
-        slip_p95 = _percentile(slippages, 95)
+    def get_lifetime_eqi(self) -> dict[str, Any]:
+        """EQI over every fill this process has recorded."""
+        with self._lock:
+            overall = FillSketch().merge(self._overall)
+            by_venue = {venue: FillSketch().merge(sketch) for venue, sketch in self._by_venue.items()}
+        if overall.count == 0:
+            return {**self._empty_eqi(), "window": "lifetime"}
+        return {
+            **overall.summary(),
+            "venue_breakdown": self._venue_breakdown(by_venue),
+            "window": "lifetime",
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
 
-        latency_score = max(0.0, 100.0 - (lat_p95 / 10.0))
-        slippage_score = max(0.0, 100.0 - (slip_p95 / 5.0))
-        eqi = max(0.0, min(100.0, (latency_score * 0.4 + slippage_score * 0.6)))
+    def _load_buckets(self, granularity: str, buckets: list[int]) -> dict[int, list[dict[str, FillSketch]]]:
+        """Every worker's sketches for each bucket; this worker's in-memory ones replace its persisted copy."""
+        with self._lock:
+            local = {b: self._buckets[granularity][b] for b in buckets if b in self._buckets[granularity]}
+        loaded = {b: [sketches] for b, sketches in local.items()}
+        r = self._store.get_redis()
+        if r is None:
+            return loaded
+        try:
+            pipe = r.pipeline()
+            for b in buckets:
+                pipe.hgetall(f"{SKETCH_KEY_PREFIX}{granularity}:{b}")
+            raw_buckets = pipe.execute()
+        except Exception:
+            logger.warning("EQI sketch read failed", exc_info=True)
+            return loaded
+        for b, fields in zip(buckets, raw_buckets):
+            for worker, raw in (fields or {}).items():
+                if worker == WORKER_ID and b in local:
+                    continue
+                try:
+                    data = json.loads(raw)
+                    sketches = {scope: FillSketch.from_dict(d) for scope, d in data.get("sketches", {}).items()}
+                except (TypeError, ValueError):
+                    continue
+                loaded.setdefault(b, []).append(sketches)
+        return loaded
 
-        anomalies = []
-        for r in all_records[-20:]:
-            anomaly = self.detect_slippage_anomaly(r["slippage_bps"], r["venue"])
-            if anomaly["is_anomaly"]:
-                anomalies.append({
-                    "venue": r["venue"],
-                    "market": r["market"],
-                    "slippage_bps": r["slippage_bps"],
-                    "details": anomaly,
-                })
+    def get_eqi_window(
+        self,
+        start_ts: float,
+        end_ts: float | None = None,
+        venue: str | None = None,
+        market: str | None = None,
+    ) -> dict[str, Any]:
+        end_ts = end_ts if end_ts is not None else time.time()
+        granularity = "hourly" if end_ts - start_ts <= HOURLY_WINDOW_LIMIT_S else "daily"
+        width = GRANULARITY_SECONDS[granularity]
+        first = int(start_ts // width * width)
+        buckets = list(range(first, int(end_ts) + 1, width))
 
-        venue_breakdown = {}
-        for venue, records in self._fills.items():
-            recs = list(records)
-            if not recs:
-                continue
-            v_lats = sorted(r["latency_ms"] for r in recs)
-            v_slips = sorted(r["slippage_bps"] for r in recs)
-            venue_breakdown[venue] = {
-                "fill_count": len(recs),
-                "latency_p50_ms": _percentile(v_lats, 50),
-                "latency_p95_ms": _percentile(v_lats, 95),
-                "slippage_mean_bps": sum(v_slips) / len(v_slips),
-                "slippage_p95_bps": _percentile(v_slips, 95),
-            }
+        merged = FillSketch()
+        for worker_sketches in self._load_buckets(granularity, buckets).values():
+            for sketches in worker_sketches:
+                for scope, sketch in sketches.items():
+                    v, _, m = scope.partition("|")
+                    if (venue is None or v == venue) and (market is None or m == market):
+                        merged.merge(sketch)
 
         return {
-            "eqi_score": round(eqi, 2),
-            "fill_count": len(all_records),
-            "latency_p50_ms": round(lat_p50, 2),
-            "latency_p95_ms": round(lat_p95, 2),
-            "slippage_mean_bps": round(slip_mean, 2),
-            "slippage_p50_bps": round(slip_p50, 2),
-            "slippage_p95_bps": round(slip_p95, 2),
-            "anomalies": anomalies,
-            "venue_breakdown": venue_breakdown,
+            **merged.summary(),
+            "venue": venue,
+            "market": market,
+            "granularity": granularity,
+            "bucket_count": len(buckets),
+            "start": datetime.fromtimestamp(first, tz=timezone.utc).isoformat(),
+            "end": datetime.fromtimestamp(end_ts, tz=timezone.utc).isoformat(),
             "ts": datetime.now(timezone.utc).isoformat(),
         }
 
+    def flush(self, now: float | None = None) -> int:
+        now = now if now is not None else time.time()
+        with self._lock:
+            dirty = sorted(self._dirty)
+            self._dirty.clear()
+            payloads = [
+                (g, b, {scope: sk.to_dict() for scope, sk in self._buckets[g].get(b, {}).items()})
+                for g, b in dirty
+            ]
+
+        written = 0
+        r = self._store.get_redis() if payloads else None
+        if r is not None:
+            try:
+                pipe = r.pipeline()
+                for granularity, bucket, sketches in payloads:
+                    key = f"{SKETCH_KEY_PREFIX}{granularity}:{bucket}"
+                    pipe.hset(key, WORKER_ID, json.dumps({"granularity": granularity, "bucket": bucket, "sketches": sketches}))
+                    pipe.expire(key, SKETCH_RETENTION_SECONDS[granularity])
+                pipe.execute()
+                written = len(payloads)
+            except Exception:
+                logger.warning("EQI sketch flush failed", exc_info=True)
+        if payloads and not written:
+            with self._lock:
+                self._dirty.update((g, b) for g, b, _ in payloads)
+
+        with self._lock:
+            for granularity, width in GRANULARITY_SECONDS.items():
+                horizon = now - MEMORY_BUCKETS[granularity] * width
+                for bucket in [b for b in self._buckets[granularity] if b < horizon]:
+                    if (granularity, bucket) not in self._dirty:
+                        del self._buckets[granularity][bucket]
+        return written
+
     def detect_slippage_anomaly(self, slippage_bps: float, venue: str) -> dict[str, Any]:
-        venue_records = list(self._fills.get(venue, []))
+        n, total, total_sq = self._venue_moments.get(venue, (0, 0.0, 0.0))
 
-        if len(venue_records) < 5:
+        if n < 5:
             is_anomaly = slippage_bps > SLIPPAGE_ANOMALY_THRESHOLD_BPS
             return {
                 "is_anomaly": is_anomaly,
@@ -143,9 +371,8 @@ class ExecutionMetrics:
                 "reason": f"slippage {slippage_bps:.1f}bps exceeds threshold {SLIPPAGE_ANOMALY_THRESHOLD_BPS}bps" if is_anomaly else "within threshold",
             }
 
-        historical = [r["slippage_bps"] for r in venue_records]
-        mean_slip = sum(historical) / len(historical)
-        variance = sum((x - mean_slip) ** 2 for x in historical) / len(historical)
+        mean_slip = total / n
+        variance = max(total_sq / n - mean_slip * mean_slip, 0.0)
         std_slip = variance ** 0.5
 
         if std_slip < 0.01:
@@ -177,18 +404,6 @@ class ExecutionMetrics:
         }
 
 
-def _percentile(sorted_values: list[float], pct: float) -> float:
-    if not sorted_values:
-        return 0.0
-    k = (len(sorted_values) - 1) * (pct / 100.0)
-    f = int(k)
-    c = f + 1
-    if c >= len(sorted_values):
-        return sorted_values[-1]
-    d = k - f
-    return sorted_values[f] + d * (sorted_values[c] - sorted_values[f])
-
-
 _instance: ExecutionMetrics | None = None
 
 
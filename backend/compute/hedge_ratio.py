@@ -1,12 +1,19 @@
 import logging
 import math
+import threading
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+
+from backend.config import HEDGE_CORR_WINDOW, HEDGE_EWMA_HALF_LIFE
+
 logger = logging.getLogger(__name__)
 
 DEFAULT_WINDOW = 30
 MIN_OBSERVATIONS = 5
+STREAMING_ASSETS = ["SOL", "BTC", "ETH"]
+HEDGE_MATRIX_KEY = "hedge:matrix"
 
 
 def compute_rolling_correlations(
@@ -16,11 +23,16 @@ def compute_rolling_correlations(
     assets = list(returns.keys())
     correlations = {}
 
+    lengths = {a: min(len(returns.get(a, [])), window) for a in assets}
+    common_n = min(lengths.values()) if lengths else 0
+    corr_matrix = None
+    if common_n >= MIN_OBSERVATIONS and len(set(lengths.values())) == 1:
+        panel = np.array([returns[a][-common_n:] for a in assets], dtype=float)
+        corr_matrix = _correlation_matrix(np.cov(panel, bias=True))
+
     for i, a1 in enumerate(assets):
-        for a2 in assets[i + 1:]:
-            r1 = returns.get(a1, [])
-            r2 = returns.get(a2, [])
-            n = min(len(r1), len(r2), window)
+        for j, a2 in enumerate(assets[i + 1:], start=i + 1):
+            n = min(lengths[a1], lengths[a2])
             if n < MIN_OBSERVATIONS:
                 correlations[f"{a1}_vs_{a2}"] = {
                     "correlation": None,
@@ -30,9 +42,11 @@ def compute_rolling_correlations(
                 }
                 continue
 
-            s1 = r1[-n:]
-            s2 = r2[-n:]
-            corr = _pearson(s1, s2)
+            if corr_matrix is not None:
+                corr = corr_matrix[i, j]
+                corr = None if np.isnan(corr) else float(corr)
+            else:
+                corr = _pearson(returns[a1][-n:], returns[a2][-n:])
             correlations[f"{a1}_vs_{a2}"] = {
                 "correlation": round(corr, 4) if corr is not None else None,
                 "sample_size": n,
@@ -65,11 +79,7 @@ def compute_hedge_ratios(
             "ts": datetime.now(timezone.utc).isoformat(),
         }
 
-    y = asset_returns[-n:]
-    x = hedge_returns[-n:]
-
-    cov = _covariance(y, x)
-    var_x = _variance(x)
+    var_y, var_x, cov = _moments(asset_returns[-n:], hedge_returns[-n:])
 
     if var_x < 1e-12:
         return {
@@ -85,12 +95,10 @@ def compute_hedge_ratios(
 
     beta = cov / var_x
 
-    var_y = _variance(y)
     if var_y < 1e-12:
         r_squared = 0.0
     else:
-        corr = _pearson(y, x)
-        r_squared = corr * corr if corr is not None else 0.0
+        r_squared = cov * cov / (var_x * var_y)
 
     hedge_effectiveness = r_squared
 
@@ -128,6 +136,20 @@ def compute_full_hedge_analysis(
             )
             hedge_ratios[f"{primary_asset}_hedged_by_{hedge_asset}"] = hr
 
+    return _analysis(
+        corr_result["correlations"],
+        hedge_ratios,
+        compute_macro_correlations(returns, macro_shock_series, window),
+        window,
+        list(returns.keys()),
+    )
+
+
+def compute_macro_correlations(
+    returns: dict[str, list[float]],
+    macro_shock_series: list[float] | None,
+    window: int = DEFAULT_WINDOW,
+) -> dict[str, dict[str, Any]]:
     macro_correlations = {}
     if macro_shock_series and len(macro_shock_series) >= MIN_OBSERVATIONS:
         for asset in returns:
@@ -139,7 +161,61 @@ def compute_full_hedge_analysis(
                     "correlation_with_macro_shock": round(corr, 4) if corr is not None else None,
                     "sample_size": n,
                 }
+    return macro_correlations
+
+
+def correlations_from_matrix(matrix: dict[str, Any]) -> dict[str, Any]:
+    """``compute_rolling_correlations`` response built from a ``StreamingHedgeEngine.snapshot()``."""
+    assets = list(matrix.get("assets") or [])
+    n = int(matrix.get("sample_size") or 0)
+    window = matrix.get("window") or DEFAULT_WINDOW
+    corr = matrix.get("correlation") or {}
+    correlations = {}
+    for i, a1 in enumerate(assets):
+        for a2 in assets[i + 1:]:
+            if n < MIN_OBSERVATIONS:
+                correlations[f"{a1}_vs_{a2}"] = {
+                    "correlation": None,
+                    "sample_size": n,
+                    "window": window,
+                    "note": f"Insufficient data ({n} < {MIN_OBSERVATIONS})",
+                }
+                continue
+            correlations[f"{a1}_vs_{a2}"] = {
+                "correlation": (corr.get(a1) or {}).get(a2),
+                "sample_size": n,
+                "window": window,
+            }
+    return {
+        "correlations": correlations,
+        "assets": assets,
+        "window": window,
+        "ts": matrix.get("ts") or datetime.now(timezone.utc).isoformat(),
+    }
 
+
+def hedge_analysis_from_matrix(
+    matrix: dict[str, Any],
+    macro_correlations: dict[str, dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """``compute_full_hedge_analysis`` response built from a ``StreamingHedgeEngine.snapshot()``."""
+    window = matrix.get("window") or DEFAULT_WINDOW
+    return _analysis(
+        correlations_from_matrix(matrix)["correlations"],
+        {name: {**hr, "window": window} for name, hr in (matrix.get("hedge_ratios") or {}).items()},
+        macro_correlations or {},
+        window,
+        list(matrix.get("assets") or []),
+    )
+
+
+def _analysis(
+    correlations: dict[str, Any],
+    hedge_ratios: dict[str, dict[str, Any]],
+    macro_correlations: dict[str, dict[str, Any]],
+    window: int,
+    assets: list[str],
+) -> dict[str, Any]:
     best_hedge = None
     best_effectiveness = 0
     for name, hr in hedge_ratios.items():
@@ -149,13 +225,13 @@ def compute_full_hedge_analysis(
             best_hedge = name
 
     return {
-        "correlations": corr_result["correlations"],
+        "correlations": correlations,
         "hedge_ratios": hedge_ratios,
         "macro_correlations": macro_correlations,
         "best_hedge": best_hedge,
         "best_hedge_effectiveness": round(best_effectiveness, 4),
         "window": window,
-        "assets": list(returns.keys()),
+        "assets": assets,
         "ts": datetime.now(timezone.utc).isoformat(),
     }
 
@@ -171,35 +247,216 @@ def _recommend_leg(beta: float) -> str:
         return "drift_perp_hedge"
 
 
-def _mean(data: list[float]) -> float:
-    if not data:
-        return 0.0
-    return sum(data) / len(data)
+def _moments(x: list[float], y: list[float]) -> tuple[float, float, float]:
+    n = min(len(x), len(y))
+    if n < 2:
+        return 0.0, 0.0, 0.0
+    cov = np.cov(np.array([x[:n], y[:n]], dtype=float), bias=True)
+    return float(cov[0, 0]), float(cov[1, 1]), float(cov[0, 1])
 
 
 def _variance(data: list[float]) -> float:
     if len(data) < 2:
         return 0.0
-    m = _mean(data)
-    return sum((x - m) ** 2 for x in data) / len(data)
+    return float(np.var(np.asarray(data, dtype=float)))
 
 
 def _covariance(x: list[float], y: list[float]) -> float:
-    n = min(len(x), len(y))
-    if n < 2:
-        return 0.0
-    mx = _mean(x[:n])
-    my = _mean(y[:n])
-    return sum((x[i] - mx) * (y[i] - my) for i in range(n)) / n
+    return _moments(x, y)[2]
 
 
 def _pearson(x: list[float], y: list[float]) -> float | None:
-    n = min(len(x), len(y))
-    if n < 2:
-        return None
-    cov = _covariance(x[:n], y[:n])
-    sx = math.sqrt(_variance(x[:n]))
-    sy = math.sqrt(_variance(y[:n]))
-    if sx < 1e-12 or sy < 1e-12:
+    var_x, var_y, cov = _moments(x, y)
+    if min(len(x), len(y)) < 2 or var_x < 1e-24 or var_y < 1e-24:
         return None
-    return cov / (sx * sy)
+    return cov / math.sqrt(var_x * var_y)
+
+
+def _correlation_matrix(cov: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.clip(np.diag(cov), 0.0, None))
+    denom = np.outer(std, std)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.where(denom > 1e-12, cov / denom, np.nan)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _beta_matrix(cov: np.ndarray) -> np.ndarray:
+    var = np.diag(cov)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(var[None, :] > 1e-12, cov / var[None, :], np.nan)
+
+
+class StreamingHedgeEngine:
+
+    def __init__(self, assets: list[str], window: int = DEFAULT_WINDOW, half_life: float | None = None):
+        if not assets:
+            raise ValueError("StreamingHedgeEngine needs at least one asset")
+        self.assets = list(assets)
+        self.window = max(int(window), 2)
+        self.half_life = half_life if half_life and half_life > 0 else None
+        self._idx = {a: i for i, a in enumerate(self.assets)}
+        n = len(self.assets)
+
+        self._count = 0
+        self._mean = np.zeros(n)
+        self._cov = np.zeros((n, n))
+        self._alpha = 1.0 - 0.5 ** (1.0 / self.half_life) if self.half_life else 0.0
+
+        self._buf = np.zeros((self.window, n))
+        self._pos = 0
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._last_prices: dict[str, float] = {}
+        # The scheduler feeds prices from a worker thread while routes read the matrix.
+        self._lock = threading.RLock()
+
+    @property
+    def mode(self) -> str:
+        return "ewma" if self.half_life else "window"
+
+    @property
+    def sample_size(self) -> int:
+        return self._count if self.half_life else min(self._count, self.window)
+
+    def update(self, returns: dict[str, float] | list[float] | np.ndarray) -> None:
+        with self._lock:
+            self._update(returns)
+
+    def _update(self, returns: dict[str, float] | list[float] | np.ndarray) -> None:
+        if isinstance(returns, dict):
+            missing = [a for a in self.assets if a not in returns]
+            if missing:
+                raise ValueError(f"Missing returns for {missing}")
+            x = np.array([float(returns[a]) for a in self.assets])
+        else:
+            x = np.asarray(returns, dtype=float)
+            if x.shape != (len(self.assets),):
+                raise ValueError(f"Expected {len(self.assets)} returns, got shape {x.shape}")
+
+        self._count += 1
+        if self.half_life:
+            if self._count == 1:
+                self._mean = x.copy()
+                return
+            diff = x - self._mean
+            self._mean += self._alpha * diff
+            self._cov = (1.0 - self._alpha) * (self._cov + self._alpha * np.outer(diff, diff))
+            return
+
+        if self._count > self.window:
+            old = self._buf[self._pos]
+            self._sum -= old
+            self._cross -= np.outer(old, old)
+        self._buf[self._pos] = x
+        self._sum += x
+        self._cross += np.outer(x, x)
+        self._pos = (self._pos + 1) % self.window
+        if self._pos == 0:
+            live = self._buf[:min(self._count, self.window)]
+            self._sum = live.sum(axis=0)
+            self._cross = live.T @ live
+
+    def update_prices(self, prices: dict[str, float]) -> bool:
+        if any(prices.get(a, 0) <= 0 for a in self.assets):
+            return False
+        with self._lock:
+            previous = self._last_prices
+            self._last_prices = {a: float(prices[a]) for a in self.assets}
+            if not previous:
+                return False
+            self._update({a: math.log(self._last_prices[a] / previous[a]) for a in self.assets})
+        return True
+
+    def extend(self, rows: list[dict[str, float]] | np.ndarray) -> None:
+        for row in rows:
+            self.update(row)
+
+    def covariance_matrix(self) -> np.ndarray:
+        with self._lock:
+            if self.half_life:
+                return self._cov.copy()
+            n = self.sample_size
+            if n == 0:
+                return np.zeros_like(self._cross)
+            mean = self._sum / n
+            return self._cross / n - np.outer(mean, mean)
+
+    def correlation_matrix(self) -> np.ndarray:
+        return _correlation_matrix(self.covariance_matrix())
+
+    def beta_matrix(self) -> np.ndarray:
+        return _beta_matrix(self.covariance_matrix())
+
+    def _state(self) -> tuple[int, np.ndarray]:
+        with self._lock:
+            return self.sample_size, self.covariance_matrix()
+
+    def hedge_ratio(self, asset: str, hedge: str) -> dict[str, Any]:
+        n, cov = self._state()
+        return self._hedge_ratio(asset, hedge, n, _beta_matrix(cov), _correlation_matrix(cov))
+
+    def _hedge_ratio(self, asset: str, hedge: str, n: int, beta_matrix: np.ndarray, corr_matrix: np.ndarray) -> dict[str, Any]:
+        i, j = self._idx[asset], self._idx[hedge]
+        if n < MIN_OBSERVATIONS:
+            return {
+                "hedge_ratio": None,
+                "r_squared": None,
+                "hedge_effectiveness": None,
+                "confidence": 0.0,
+                "sample_size": n,
+                "note": f"Insufficient data ({n} < {MIN_OBSERVATIONS})",
+            }
+        beta = beta_matrix[i, j]
+        corr = corr_matrix[i, j]
+        r_squared = 0.0 if np.isnan(corr) else float(corr * corr)
+        beta = 0.0 if np.isnan(beta) else float(beta)
+        confidence = min(0.95, 0.4 + min(n / self.window, 1.0) * 0.3 + r_squared * 0.25)
+        return {
+            "hedge_ratio": round(beta, 4),
+            "r_squared": round(r_squared, 4),
+            "hedge_effectiveness": round(r_squared, 4),
+            "confidence": round(confidence, 4),
+            "sample_size": n,
+            "recommended_hedge_leg": _recommend_leg(beta),
+        }
+
+    def snapshot(self) -> dict[str, Any]:
+        n, cov = self._state()
+        corr = _correlation_matrix(cov)
+        beta = _beta_matrix(cov)
+        primary = self.assets[0]
+
+        def _nested(matrix: np.ndarray) -> dict[str, dict[str, float | None]]:
+            return {
+                a: {b: (None if np.isnan(v) else round(float(v), 4)) for b, v in zip(self.assets, row)}
+                for a, row in zip(self.assets, matrix)
+            }
+
+        return {
+            "assets": self.assets,
+            "mode": self.mode,
+            "window": self.window,
+            "half_life": self.half_life,
+            "sample_size": n,
+            "correlation": _nested(corr),
+            "beta": _nested(beta),
+            "hedge_ratios": {
+                f"{primary}_hedged_by_{hedge}": self._hedge_ratio(primary, hedge, n, beta, corr)
+                for hedge in self.assets[1:]
+            },
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+_engine: StreamingHedgeEngine | None = None
+
+
+def get_hedge_engine() -> StreamingHedgeEngine:
+    global _engine
+    if _engine is None:
+        _engine = StreamingHedgeEngine(
+            STREAMING_ASSETS,
+            window=HEDGE_CORR_WINDOW,
+            half_life=HEDGE_EWMA_HALF_LIFE or None,
+        )
+    return _engine
@@ -2,63 +2,156 @@ import math
 import logging
 from datetime import datetime, timezone
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 LEVERAGE_LEVELS = [1, 2, 3, 5, 7, 10]
 PRICE_DROPS_PCT = [5, 10, 15, 20, 25, 30, 35, 40, 45, 50]
 
+MAX_GRID_CELLS = 250_000
+DEFAULT_POSITION_LEVERAGE = 3.0
+MAINTENANCE_MARGIN_PCT = 0.05
 
-def _liquidation_probability(leverage: int, drop_pct: float, vol: float, margin_usage: float) -> float:
-    maintenance_margin = 1.0 / leverage
-    loss_fraction = drop_pct / 100.0
-    effective_loss = loss_fraction * leverage
-    distance = maintenance_margin - (1.0 - effective_loss) if effective_loss >= (1.0 - maintenance_margin) else 0.0
-
-    if effective_loss >= 1.0:
-        return 1.0
 
-    vol_annual = max(vol, 0.01)
-    vol_daily = vol_annual / math.sqrt(365)
+def _axis_label(value: float) -> int | float:
+    value = float(value)
+    return int(value) if value.is_integer() else round(value, 4)
 
-    z = (loss_fraction) / (vol_daily * math.sqrt(1))
-    prob_from_vol = min(1.0, math.exp(-0.5 * z * z) if z > 0 else 1.0)
 
-    margin_factor = 0.5 + 0.5 * min(margin_usage, 1.0)
+def _probability(leverage: np.ndarray, drops_pct: np.ndarray, vol: float, margin_usage: float) -> np.ndarray:
+    lev = np.asarray(leverage, dtype=float)
+    loss_fraction = np.asarray(drops_pct, dtype=float) / 100.0
 
-    if effective_loss >= 1.0 - maintenance_margin:
-        base_prob = min(1.0, effective_loss / (1.0 - maintenance_margin + 0.001))
-    else:
-        base_prob = effective_loss / max(1.0 - maintenance_margin, 0.01)
+    maintenance_margin = 1.0 / lev
+    effective_loss = loss_fraction * lev
+    headroom = 1.0 - maintenance_margin
 
-    combined = base_prob * margin_factor * (0.6 + 0.4 * prob_from_vol)
-    return round(min(1.0, max(0.0, combined)), 4)
+    vol_daily = max(vol, 0.01) / math.sqrt(365)
+    z = loss_fraction / vol_daily
+    prob_from_vol = np.where(z > 0, np.minimum(1.0, np.exp(-0.5 * z * z)), 1.0)
 
+    margin_factor = 0.5 + 0.5 * min(margin_usage, 1.0)
 
-def compute_heatmap(current_price: float, positions: list, vol: float, margin_usage: float) -> dict:
+    base_prob = np.where(
+        effective_loss >= headroom,
+        np.minimum(1.0, effective_loss / (headroom + 0.001)),
+        effective_loss / np.maximum(headroom, 0.01),
+    )
+
+    combined = np.clip(base_prob * margin_factor * (0.6 + 0.4 * prob_from_vol), 0.0, 1.0)
+    combined = np.where(effective_loss >= 1.0, 1.0, combined)
+    return np.round(combined, 4)
+
+
+def _liquidation_probability(leverage: float, drop_pct: float, vol: float, margin_usage: float) -> float:
+    return float(_probability(np.float64(leverage), np.float64(drop_pct), vol, margin_usage))
+
+
+def _normalise_axis(values: list | None, default: list) -> np.ndarray:
+    arr = np.unique(np.asarray(values if values else default, dtype=float))
+    return arr[np.isfinite(arr)]
+
+
+def _mark_for(position: dict, marks: dict[str, float]) -> float:
+    return float(position.get("mark_price") or marks.get(position.get("market", "")) or 0.0)
+
+
+def compute_position_liquidation(
+    positions: list,
+    vol: float,
+    marks: dict[str, float] | None = None,
+    default_leverage: float = DEFAULT_POSITION_LEVERAGE,
+    maintenance_margin_pct: float = MAINTENANCE_MARGIN_PCT,
+) -> list[dict]:
+    """Liquidation price, distance and probability per position.
+
+    Each position is measured against its own ``mark_price`` or
+    ``marks[market]``; positions with neither are skipped rather than priced
+    off another market.
+    """
+    marks = marks or {}
+    positions = [p for p in (positions or []) if p.get("size") and _mark_for(p, marks) > 0]
+    if not positions:
+        return []
+
+    mark = np.array([_mark_for(p, marks) for p in positions])
+    size = np.array([float(p.get("size", 0.0)) for p in positions])
+    entry = np.array([float(p.get("entry_price") or 0.0) for p in positions])
+    entry = np.where(entry > 0, entry, mark)
+    margin = np.array([float(p.get("margin") or 0.0) for p in positions])
+    given_liq = np.array([float(p.get("liq_price") or np.nan) for p in positions])
+
+    direction = np.sign(size)
+    notional = np.abs(size) * entry
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leverage = np.where(margin > 0, notional / margin, default_leverage)
+    leverage = np.maximum(leverage, 1.0)
+
+    derived_liq = entry * (1.0 - direction * (1.0 / leverage - maintenance_margin_pct))
+    liq_price = np.where(np.isnan(given_liq), derived_liq, given_liq)
+    liq_price = np.maximum(liq_price, 0.0)
+
+    distance_pct = direction * (mark - liq_price) / mark * 100.0
+    vol_daily = max(vol, 0.01) / math.sqrt(365)
+    z = np.maximum(distance_pct, 0.0) / 100.0 / vol_daily
+    probs = np.array([math.erfc(v / math.sqrt(2.0)) for v in z])
+
+    return [
+        {
+            "venue": p.get("venue", "unknown"),
+            "market": p.get("market", "unknown"),
+            "side": "long" if direction[i] > 0 else "short",
+            "size": float(size[i]),
+            "notional": round(float(notional[i]), 2),
+            "leverage": round(float(leverage[i]), 2),
+            "liq_price": round(float(liq_price[i]), 4),
+            "liq_price_source": "reported" if not np.isnan(given_liq[i]) else "derived",
+            "liquidation_distance_pct": round(float(distance_pct[i]), 2),
+            "liquidation_probability": round(float(probs[i]), 4),
+        }
+        for i, p in enumerate(positions)
+    ]
+
+
+def compute_heatmap(
+    current_price: float,
+    positions: list,
+    vol: float,
+    margin_usage: float,
+    leverage_levels: list[float] | None = None,
+    price_drops_pct: list[float] | None = None,
+    marks: dict[str, float] | None = None,
+) -> dict:
     try:
         vol = max(vol, 0.0)
         margin_usage = max(0.0, min(margin_usage, 1.0))
         current_price = max(current_price, 0.01)
 
-        grid = {}
-        for lev in LEVERAGE_LEVELS:
-            row = {}
-            prev_prob = 0.0
-            for drop in PRICE_DROPS_PCT:
-                prob = _liquidation_probability(lev, drop, vol, margin_usage)
-                prob = max(prob, prev_prob)
-                row[str(drop)] = prob
-                prev_prob = prob
-            grid[str(lev)] = row
-
-        for drop in PRICE_DROPS_PCT:
-            prev_prob = 0.0
-            for lev in LEVERAGE_LEVELS:
-                current = grid[str(lev)][str(drop)]
-                enforced = max(current, prev_prob)
-                grid[str(lev)][str(drop)] = enforced
-                prev_prob = enforced
+        levs = _normalise_axis(leverage_levels, LEVERAGE_LEVELS)
+        drops = _normalise_axis(price_drops_pct, PRICE_DROPS_PCT)
+        if levs.size == 0 or drops.size == 0:
+            raise ValueError("Empty leverage or price-drop grid")
+        if levs[0] < 1.0:
+            raise ValueError("Leverage levels must be >= 1")
+        if drops[0] < 0.0:
+            raise ValueError("Price drops must be >= 0")
+        if levs.size * drops.size > MAX_GRID_CELLS:
+            raise ValueError(f"Grid of {levs.size * drops.size} cells exceeds limit of {MAX_GRID_CELLS}")
+        lev_axis = [_axis_label(v) for v in levs]
+        drop_axis = [_axis_label(v) for v in drops]
+
+        probs = _probability(levs[:, None], drops[None, :], vol, margin_usage)
+        probs = np.maximum.accumulate(probs, axis=1)
+        probs = np.maximum.accumulate(probs, axis=0)
+
+        drop_keys = [str(d) for d in drop_axis]
+        grid = {
+            str(lev): dict(zip(drop_keys, row))
+            for lev, row in zip(lev_axis, probs.tolist())
+        }
 
+        position_risk = compute_position_liquidation(positions, vol, marks)
         total_notional = 0.0
         for pos in (positions or []):
             size = abs(pos.get("size", 0))
@@ -67,23 +160,20 @@ def compute_heatmap(current_price: float, positions: list, vol: float, margin_us
 
         return {
             "current_price": current_price,
-            "leverage_levels": LEVERAGE_LEVELS,
-            "price_drops_pct": PRICE_DROPS_PCT,
+            "leverage_levels": lev_axis,
+            "price_drops_pct": drop_axis,
             "grid": grid,
             "vol_used": round(vol, 4),
             "margin_usage": round(margin_usage, 4),
             "total_notional": round(total_notional, 2),
             "positions_count": len(positions or []),
+            "positions": position_risk,
+            "nearest_liquidation_pct": min((p["liquidation_distance_pct"] for p in position_risk), default=None),
             "ts": datetime.now(timezone.utc).isoformat(),
         }
     except Exception as e:
         logger.warning("Liquidation heatmap computation failed: %s", e)
-        grid = {}
-        for lev in LEVERAGE_LEVELS:
-            row = {}
-            for drop in PRICE_DROPS_PCT:
-                row[str(drop)] = 0.0
-            grid[str(lev)] = row
+        grid = {str(lev): {str(drop): 0.0 for drop in PRICE_DROPS_PCT} for lev in LEVERAGE_LEVELS}
         return {
             "current_price": current_price if current_price else 0.0,
             "leverage_levels": LEVERAGE_LEVELS,
@@ -93,6 +183,8 @@ def compute_heatmap(current_price: float, positions: list, vol: float, margin_us
             "margin_usage": 0.0,
             "total_notional": 0.0,
             "positions_count": 0,
+            "positions": [],
+            "nearest_liquidation_pct": None,
             "ts": datetime.now(timezone.utc).isoformat(),
             "error": str(e),
         }
@@ -1,9 +1,12 @@
 import math
 import logging
 from datetime import datetime, timezone
+from typing import Any, Mapping
 
 logger = logging.getLogger(__name__)
 
+MACRO_FEATURE_KEYS = ("index:latest", "regime:latest", "divergence:spreads", "stablecoin:health", "microstructure:latest")
+
 
 class MacroPredictor:
 
@@ -80,3 +83,42 @@ class MacroPredictor:
 
     def encode_vol_regime(self, regime: str) -> float:
         return {"low": 0.0, "normal": 0.3, "high": 0.7, "extreme": 1.0}.get(regime, 0.3)
+
+
+def build_macro_features(snaps: Mapping[str, Any], predictor: MacroPredictor) -> dict:
+    """Build ``MacroPredictor.predict`` features from the ``MACRO_FEATURE_KEYS`` snapshots."""
+    features = {}
+
+    idx = snaps.get("index:latest")
+    if idx:
+        features["tariff_momentum"] = idx.get("rate_of_change", 0.0)
+        features["shock_score"] = idx.get("shock_score", 0.0)
+
+    regime = snaps.get("regime:latest")
+    if regime:
+        features["funding_regime_score"] = predictor.encode_funding_regime(regime.get("funding_regime", "neutral"))
+        features["vol_regime_score"] = predictor.encode_vol_regime(regime.get("vol_regime", "normal"))
+    else:
+        features["funding_regime_score"] = 0.0
+        features["vol_regime_score"] = 0.3
+
+    spreads = snaps.get("divergence:spreads")
+    if spreads and isinstance(spreads, list) and len(spreads) > 0:
+        features["cross_venue_spread_bps"] = spreads[0].get("spread_bps", 0)
+    else:
+        features["cross_venue_spread_bps"] = 0.0
+
+    stable = snaps.get("stablecoin:health")
+    if stable:
+        depeg_sum = sum(d.get("depeg_bps", 0) for d in stable.values() if isinstance(d, dict))
+        features["stablecoin_health_score"] = max(0, 1.0 - depeg_sum / 100.0)
+    else:
+        features["stablecoin_health_score"] = 1.0
+
+    micro = snaps.get("microstructure:latest")
+    if micro:
+        features["orderbook_imbalance"] = micro.get("imbalance", 0.0)
+    else:
+        features["orderbook_imbalance"] = 0.0
+
+    return features
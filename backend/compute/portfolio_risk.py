@@ -0,0 +1,141 @@
+import math
+from datetime import datetime, timezone
+from typing import Any, Mapping
+
+_SYMBOL_MAP = {
+    "SOL-PERP": "SOL_USD",
+    "BTC-PERP": "BTC_USD",
+    "ETH-PERP": "ETH_USD",
+}
+
+PORTFOLIO_RISK_KEYS = (
+    "execution:positions",
+    "stablecoin:health:latest",
+    *(f"price:{source}:{symbol}" for symbol in _SYMBOL_MAP.values() for source in ("pyth", "kraken", "coingecko")),
+)
+
+
+def open_positions(snaps: Mapping[str, Any]) -> list[dict[str, Any]]:
+    snap = snaps.get("execution:positions")
+    if snap:
+        return snap.get("positions", [])
+    return []
+
+
+def mark_price(snaps: Mapping[str, Any], market: str) -> float:
+    symbol = _SYMBOL_MAP.get(market, "SOL_USD")
+    for source in ["pyth", "kraken", "coingecko"]:
+        snap = snaps.get(f"price:{source}:{symbol}")
+        if snap and "price" in snap:
+            return float(snap["price"])
+    return 0.0
+
+
+def vol_estimate(snaps: Mapping[str, Any], market: str) -> float:
+    symbol = _SYMBOL_MAP.get(market, "SOL_USD")
+    for source in ["pyth", "kraken"]:
+        snap = snaps.get(f"price:{source}:{symbol}")
+        if snap and "vol_annualized" in snap:
+            return float(snap["vol_annualized"])
+    return 0.45
+
+
+def risk_summary(snaps: Mapping[str, Any]) -> dict[str, Any]:
+    """Exposure, VaR and concentration summary from the ``PORTFOLIO_RISK_KEYS`` snapshots."""
+    positions = open_positions(snaps)
+
+    total_long = 0.0
+    total_short = 0.0
+    venue_exposure: dict[str, float] = {}
+    asset_contributions: list[dict[str, Any]] = []
+    equity_curve: list[float] = []
+    total_pnl = 0.0
+
+    for pos in positions:
+        market = pos.get("market", "UNKNOWN")
+        size = float(pos.get("size", 0.0))
+        entry = float(pos.get("entry_price", 0.0))
+        side = pos.get("side", "long")
+        venue = pos.get("venue", "paper")
+
+        price = mark_price(snaps, market) or entry
+        notional = abs(size) * price
+        vol = vol_estimate(snaps, market)
+        risk_contrib = notional * vol
+
+        pnl = 0.0
+        if entry > 0 and price > 0:
+            if side == "long":
+                pnl = size * (price - entry)
+                total_long += notional
+            else:
+                pnl = -size * (price - entry)
+                total_short += notional
+
+        total_pnl += pnl
+        venue_exposure[venue] = venue_exposure.get(venue, 0.0) + notional
+
+        asset_contributions.append({
+            "market": market,
+            "venue": venue,
+            "side": side,
+            "notional": round(notional, 4),
+            "pnl": round(pnl, 4),
+            "risk_contribution": round(risk_contrib, 4),
+            "vol_estimate": round(vol, 4),
+        })
+
+    total_exposure = total_long + total_short
+    net_exposure = total_long - total_short
+    stable_snap = snaps.get("stablecoin:health:latest")
+    stable_alloc = 0.0
+    if stable_snap:
+        stable_alloc = stable_snap.get("total_value_usd", 0.0)
+
+    total_portfolio = total_exposure + stable_alloc if total_exposure + stable_alloc > 0 else 1.0
+    concentration_risk = max(
+        v / total_portfolio for v in venue_exposure.values()
+    ) if venue_exposure else 0.0
+
+    max_notional_position = max(
+        (a["notional"] for a in asset_contributions), default=0.0
+    )
+    concentration_by_asset = max_notional_position / total_portfolio if total_portfolio > 0 else 0.0
+
+    var_estimate = total_exposure * 0.45 * (1.65 / math.sqrt(252))
+    cvar_estimate = var_estimate * 1.35
+    liquidity_adj_risk = var_estimate * (1.0 + concentration_risk * 0.5)
+
+    drawdown = 0.0
+
+    warnings: list[str] = []
+    if concentration_risk > 0.6:
+        warnings.append(f"High venue concentration: {concentration_risk:.1%} in one venue")
+    if concentration_by_asset > 0.5:
+        warnings.append(f"High asset concentration: {concentration_by_asset:.1%} in one asset")
+    if total_exposure > total_portfolio * 2.0:
+        warnings.append("Leverage > 2x detected")
+    if len(positions) == 0:
+        warnings.append("No open positions")
+
+    result = {
+        "total_exposure": round(total_exposure, 4),
+        "long_exposure": round(total_long, 4),
+        "short_exposure": round(total_short, 4),
+        "net_exposure": round(net_exposure, 4),
+        "stablecoin_allocation": round(stable_alloc, 4),
+        "total_pnl": round(total_pnl, 4),
+        "var_95": round(var_estimate, 4),
+        "cvar_95": round(cvar_estimate, 4),
+        "max_drawdown": round(drawdown, 4),
+        "current_drawdown": round(drawdown, 4),
+        "concentration_risk_venue": round(concentration_risk, 4),
+        "concentration_risk_asset": round(concentration_by_asset, 4),
+        "liquidity_adjusted_risk": round(liquidity_adj_risk, 4),
+        "venue_exposure": {k: round(v, 4) for k, v in venue_exposure.items()},
+        "position_count": len(positions),
+        "warnings": warnings,
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+
+    return result
@@ -0,0 +1,113 @@
+import math
+from typing import Any
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+MIN_INDEXABLE_VALUE = 1e-9
+
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch).
+
+    Values are mapped to logarithmic buckets of ratio ``gamma``; any quantile
+    is returned within ``relative_accuracy`` of the true value.  Only
+    non-negative values are supported (latencies, absolute slippage).
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._sorted_keys: list[int] | None = None
+        self._cache: dict[float, float] = {}
+
+    def _key(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, key: int) -> float:
+        return 2.0 * self.gamma ** key / (self.gamma + 1.0)
+
+    def add(self, value: float, weight: int = 1) -> None:
+        value = max(float(value), 0.0)
+        if value <= MIN_INDEXABLE_VALUE:
+            self.zero_count += weight
+        else:
+            key = self._key(value)
+            if key not in self.bins:
+                self._sorted_keys = None
+            self.bins[key] = self.bins.get(key, 0) + weight
+        self.count += weight
+        self.sum += value * weight
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._cache.clear()
+
+    def merge(self, other: "DDSketch") -> "DDSketch":
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, n in other.bins.items():
+            if key not in self.bins:
+                self._sorted_keys = None
+            self.bins[key] = self.bins.get(key, 0) + n
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._cache.clear()
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        cached = self._cache.get(q)
+        if cached is not None:
+            return cached
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            result = 0.0
+        else:
+            if self._sorted_keys is None:
+                self._sorted_keys = sorted(self.bins)
+            seen = self.zero_count
+            result = self.max
+            for key in self._sorted_keys:
+                seen += self.bins[key]
+                if seen > rank:
+                    result = self._value(key)
+                    break
+            result = min(max(result, self.min), self.max)
+        self._cache[q] = result
+        return result
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "bins": {str(k): v for k, v in self.bins.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DDSketch":
+        sketch = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY))
+        sketch.bins = {int(k): int(v) for k, v in (data.get("bins") or {}).items()}
+        sketch.zero_count = int(data.get("zero_count", 0))
+        sketch.count = int(data.get("count", 0))
+        sketch.sum = float(data.get("sum", 0.0))
+        sketch.min = float(data["min"]) if data.get("min") is not None else math.inf
+        sketch.max = float(data["max"]) if data.get("max") is not None else -math.inf
+        return sketch
@@ -1,14 +1,276 @@
+import heapq
 import logging
+import math
+import threading
+import time
 from datetime import datetime, timezone
 
+import numpy as np
+
+from backend.core import cluster
+from backend.data.repositories.regime_repo import RegimeRepository
+
 logger = logging.getLogger(__name__)
 
+MAX_ENTRIES = 200_000
+MIN_MATCH_SCORE = 3
+HORIZONS = ("return_4h", "return_24h", "return_3d")
+TREE_REBUILD_FRACTION = 0.05
+FOLLOWER_RELOAD_S = 900.0
+
+
+class _KDTree:
+    """Static k-d tree over an ``(n, d)`` array; leaves hold up to ``leaf_size`` points."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 32):
+        self._points = points
+        self._order = np.arange(len(points))
+        self._nodes: list[tuple[int, int, int, float, int, int]] = []
+        self._leaf_size = max(int(leaf_size), 1)
+        if len(points):
+            self._build(0, len(points))
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _build(self, start: int, end: int) -> int:
+        node = len(self._nodes)
+        self._nodes.append((start, end, -1, 0.0, -1, -1))
+        if end - start <= self._leaf_size:
+            return node
+        idx = self._order[start:end]
+        pts = self._points[idx]
+        axis = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (end - start) // 2
+        self._order[start:end] = idx[np.argpartition(pts[:, axis], mid)]
+        split = float(self._points[self._order[start + mid], axis])
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self._nodes[node] = (start, end, axis, split, left, right)
+        return node
+
+    def query(self, point: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Distances and row indices of the ``k`` nearest points, closest first."""
+        k = min(int(k), len(self._points))
+        best_d = np.full(k, np.inf)
+        best_i = np.full(k, -1)
+        if k <= 0:
+            return best_d, best_i
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if bound > best_d[-1]:
+                continue
+            start, end, axis, split, left, right = self._nodes[node]
+            if axis < 0:
+                idx = self._order[start:end]
+                dist = np.linalg.norm(self._points[idx] - point, axis=1)
+                all_d = np.concatenate([best_d, dist])
+                all_i = np.concatenate([best_i, idx])
+                top = np.argsort(all_d, kind="stable")[:k]
+                best_d, best_i = all_d[top], all_i[top]
+                continue
+            gap = float(point[axis]) - split
+            near, far = (left, right) if gap < 0 else (right, left)
+            stack.append((far, max(bound, abs(gap))))
+            stack.append((near, bound))
+        return best_d, best_i
+
+
+def _match_score(key: tuple[str, str, str], shock_state: str, funding_regime: str, vol_regime: str) -> int:
+    return (3 if key[0] == shock_state else 0) + (2 if key[1] == funding_regime else 0) + (1 if key[2] == vol_regime else 0)
+
+
+def classify_regime(index_snapshot: dict, regime_snapshot: dict) -> dict[str, str]:
+    shock_score = index_snapshot.get("shock_score", 0)
+    return {
+        "shock_state": "high" if shock_score > 1.5 else ("elevated" if shock_score > 0.5 else "normal"),
+        "funding_regime": regime_snapshot.get("funding_regime", "neutral"),
+        "vol_regime": regime_snapshot.get("vol_regime", "normal"),
+    }
+
+
+_STATE_FIELDS = ("_history", "_labelled", "_by_id", "_stats", "_features", "_tree", "_tree_size", "_scale")
+
+
+def _entry_from_row(row: dict) -> dict:
+    return {
+        "id": row.get("id"),
+        "shock_state": row["shock_state"],
+        "funding_regime": row["funding_regime"],
+        "vol_regime": row["vol_regime"],
+        "tariff_index": float(row.get("tariff_index") or 0.0),
+        "price": float(row.get("price") or 0.0),
+        "ts": row["ts"].isoformat() if isinstance(row.get("ts"), datetime) else str(row.get("ts")),
+        **{h: row.get(h) for h in HORIZONS},
+    }
+
+
+def _new_stats() -> dict:
+    stats = {"count": 0, "first": None}
+    for h in HORIZONS:
+        stats[f"n_{h}"] = 0
+        stats[f"sum_{h}"] = 0.0
+        stats[f"wins_{h}"] = 0
+    return stats
+
 
 class RegimeMemory:
 
-    def __init__(self):
+    def __init__(
+        self,
+        repository: RegimeRepository | None = None,
+        max_entries: int = MAX_ENTRIES,
+        persist: bool = True,
+        shared: bool | None = None,
+        reload_s: float = FOLLOWER_RELOAD_S,
+    ):
+        self._repo = repository or RegimeRepository()
+        self._persist = persist
+        self._max_entries = max_entries
+        self._loaded = not persist
+        self._loaded_at = 0.0
+        self._dirty = False
+        self._warming = False
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        # Entries recorded while a reload is in flight, replayed onto the fresh copy.
+        self._recorded_during_load: list[dict] | None = None
+        # Only the scheduler leader records snapshots; followers reload from
+        # Postgres in the background once their copy is older than ``reload_s``.
+        self._shared = persist and (cluster.is_multi_worker() if shared is None else shared)
+        self._reload_s = reload_s
+        self._local_ids = 0
+        self._reset()
+
+    def _reset(self) -> None:
         self._history: list[dict] = []
-        self._max_entries = 500
+        self._labelled: dict[tuple[str, str, str], list[int]] = {}
+        self._by_id: dict[int, int] = {}
+        self._stats: dict[tuple[str, str, str], dict] = {}
+
+        self._features = np.zeros((0, 2))
+        self._tree = None
+        self._tree_size = 0
+        self._scale = np.ones(2)
+
+    def _stale(self) -> bool:
+        if self._dirty:
+            return True
+        return self._shared and not cluster.is_leader() and time.monotonic() - self._loaded_at > self._reload_s
+
+    def invalidate(self) -> None:
+        """Reload from Postgres in the background; the current copy keeps serving meanwhile."""
+        if self._persist:
+            self._dirty = True
+            self.warm_in_background()
+
+    def warm(self) -> None:
+        """Load from Postgres off to the side and swap the result in under the lock."""
+        if not self._persist:
+            return
+        with self._load_lock:
+            if self._loaded and not self._stale():
+                return
+            with self._lock:
+                self._dirty = False
+                self._recorded_during_load = []
+            try:
+                rows = self._repo.get_recent(self._max_entries)
+                fresh = RegimeMemory(repository=self._repo, max_entries=self._max_entries, persist=False)
+                for row in rows:
+                    fresh._append(_entry_from_row(row))
+                with self._lock:
+                    for entry in self._recorded_during_load or []:
+                        if entry["id"] not in fresh._by_id:
+                            fresh._append(entry)
+                    for field in _STATE_FIELDS:
+                        setattr(self, field, getattr(fresh, field))
+                    self._loaded = True
+                    self._loaded_at = time.monotonic()
+            finally:
+                self._recorded_during_load = None
+        if rows:
+            logger.info("Regime memory loaded %d snapshots", len(rows))
+
+    def warm_in_background(self) -> None:
+        with self._lock:
+            if self._warming:
+                return
+            self._warming = True
+
+        def _run() -> None:
+            try:
+                self.warm()
+            except Exception:
+                logger.warning("Regime memory load failed", exc_info=True)
+            finally:
+                self._warming = False
+
+        threading.Thread(target=_run, name="regime-memory-load", daemon=True).start()
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            # Only reached before the startup warm finishes; waits for it rather than loading twice.
+            self.warm()
+        elif self._stale():
+            self.warm_in_background()
+
+    @staticmethod
+    def _key(entry: dict) -> tuple[str, str, str]:
+        return entry["shock_state"], entry["funding_regime"], entry["vol_regime"]
+
+    @staticmethod
+    def _feature_row(tariff_index: float, price: float) -> list[float]:
+        return [float(tariff_index), math.log(price) if price > 0 else 0.0]
+
+    def _append(self, entry: dict) -> int:
+        idx = len(self._history)
+        self._history.append(entry)
+        key = self._key(entry)
+        self._by_id[entry["id"]] = idx
+        stats = self._stats.setdefault(key, _new_stats())
+        stats["count"] += 1
+        if stats["first"] is None:
+            stats["first"] = idx
+        self._apply_returns(key, idx, entry, sign=1)
+
+        if idx >= len(self._features):
+            grown = np.zeros((max(64, len(self._features) * 2), 2))
+            grown[:len(self._features)] = self._features
+            self._features = grown
+        self._features[idx] = self._feature_row(entry["tariff_index"], entry["price"])
+
+        if len(self._history) > self._max_entries * 1.1:
+            self._trim()
+        return idx
+
+    def _apply_returns(self, key: tuple[str, str, str], idx: int, entry: dict, sign: int) -> None:
+        stats = self._stats[key]
+        for h in HORIZONS:
+            value = entry.get(h)
+            if value is None:
+                continue
+            stats[f"n_{h}"] += sign
+            stats[f"sum_{h}"] += sign * value
+            stats[f"wins_{h}"] += sign * (1 if value > 0 else 0)
+        if sign > 0 and entry.get("return_4h") is not None:
+            labelled = self._labelled.setdefault(key, [])
+            pos = int(np.searchsorted(labelled, idx))
+            if pos == len(labelled) or labelled[pos] != idx:
+                labelled.insert(pos, idx)
+
+    def _trim(self) -> None:
+        entries = self._history[-self._max_entries:]
+        self._history = []
+        self._labelled.clear()
+        self._by_id.clear()
+        self._stats.clear()
+        self._features = np.zeros((0, 2))
+        self._tree = None
+        self._tree_size = 0
+        for entry in entries:
+            self._append(entry)
 
     def record(
         self,
@@ -17,30 +279,71 @@ class RegimeMemory:
         vol_regime: str,
         tariff_index: float,
         price: float,
-    ) -> None:
+    ) -> int:
+        """Store a snapshot and return its id, the key for ``update_returns``."""
+        self._ensure_loaded()
+        now = datetime.now(timezone.utc)
+        saved = self._repo.save_snapshot(shock_state, funding_regime, vol_regime, tariff_index, price, now) if self._persist else None
         entry = {
+            "id": saved.get("id") if saved else None,
             "shock_state": shock_state,
             "funding_regime": funding_regime,
             "vol_regime": vol_regime,
             "tariff_index": tariff_index,
             "price": price,
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": now.isoformat(),
             "return_4h": None,
             "return_24h": None,
             "return_3d": None,
         }
-        self._history.append(entry)
-        if len(self._history) > self._max_entries:
-            self._history = self._history[-self._max_entries:]
-
-    def update_returns(self, index: int, return_4h: float | None = None, return_24h: float | None = None, return_3d: float | None = None) -> None:
-        if 0 <= index < len(self._history):
-            if return_4h is not None:
-                self._history[index]["return_4h"] = return_4h
-            if return_24h is not None:
-                self._history[index]["return_24h"] = return_24h
-            if return_3d is not None:
-                self._history[index]["return_3d"] = return_3d
+        with self._lock:
+            if entry["id"] is None:
+                # Unpersisted rows get negative ids so they never collide with Postgres ones.
+                self._local_ids += 1
+                entry["id"] = -self._local_ids
+            self._append(entry)
+            if self._recorded_during_load is not None:
+                self._recorded_during_load.append(entry)
+        return entry["id"]
+
+    def _set_returns(self, index: int, values: dict) -> dict:
+        entry = self._history[index]
+        key = self._key(entry)
+        self._apply_returns(key, index, entry, sign=-1)
+        for h in HORIZONS:
+            if values.get(h) is not None:
+                entry[h] = values[h]
+        self._apply_returns(key, index, entry, sign=1)
+        return entry
+
+    def update_returns(self, snapshot_id: int, return_4h: float | None = None, return_24h: float | None = None, return_3d: float | None = None) -> None:
+        self._ensure_loaded()
+        with self._lock:
+            index = self._by_id.get(snapshot_id)
+            if index is None:
+                return
+            entry = self._set_returns(index, {"return_4h": return_4h, "return_24h": return_24h, "return_3d": return_3d})
+        if self._persist and entry["id"] > 0:
+            self._repo.update_returns(entry["id"], return_4h, return_24h, return_3d)
+
+    def label_outcomes(self) -> int:
+        self._ensure_loaded()
+        rows = self._repo.label_forward_returns() if self._persist else []
+        applied = 0
+        with self._lock:
+            for row in rows:
+                idx = self._by_id.get(row.get("id"))
+                if idx is None:
+                    continue
+                self._set_returns(idx, row)
+                applied += 1
+        if rows:
+            logger.info("Labelled %d regime snapshots (%d in memory)", len(rows), applied)
+        return len(rows)
+
+    def _ranked_keys(self, shock_state: str, funding_regime: str, vol_regime: str) -> list[tuple[int, tuple[str, str, str]]]:
+        scored = [(_match_score(k, shock_state, funding_regime, vol_regime), k) for k in self._stats]
+        return sorted((s, k) for s, k in scored if s >= MIN_MATCH_SCORE)[::-1]
 
     def find_analogues(
         self,
@@ -49,20 +352,20 @@ class RegimeMemory:
         vol_regime: str,
         max_results: int = 10,
     ) -> list[dict]:
-        matches = []
-        for entry in self._history:
-            score = 0
-            if entry["shock_state"] == shock_state:
-                score += 3
-            if entry["funding_regime"] == funding_regime:
-                score += 2
-            if entry["vol_regime"] == vol_regime:
-                score += 1
-            if score >= 3 and entry.get("return_4h") is not None:
-                matches.append({**entry, "match_score": score})
-
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
-        return matches[:max_results]
+        self._ensure_loaded()
+        with self._lock:
+            by_score: dict[int, list[list[int]]] = {}
+            for score, key in self._ranked_keys(shock_state, funding_regime, vol_regime):
+                if self._labelled.get(key):
+                    by_score.setdefault(score, []).append(self._labelled[key])
+
+            matches = []
+            for score in sorted(by_score, reverse=True):
+                for idx in heapq.merge(*by_score[score]):
+                    matches.append({**self._history[idx], "match_score": score})
+                    if len(matches) >= max_results:
+                        return matches
+            return matches
 
     def get_outcome_distribution(
         self,
@@ -70,70 +373,114 @@ class RegimeMemory:
         funding_regime: str,
         vol_regime: str,
     ) -> dict:
-        matches = []
-        for entry in self._history:
-            score = 0
-            if entry["shock_state"] == shock_state:
-                score += 3
-            if entry["funding_regime"] == funding_regime:
-                score += 2
-            if entry["vol_regime"] == vol_regime:
-                score += 1
-            if score >= 3:
-                matches.append({**entry, "match_score": score})
-
-        if not matches:
+        self._ensure_loaded()
+        with self._lock:
+            ranked = self._ranked_keys(shock_state, funding_regime, vol_regime)
+            if not ranked:
+                return {
+                    "avg_return_4h": 0.0,
+                    "avg_return_24h": 0.0,
+                    "avg_return_3d": 0.0,
+                    "win_rate_4h": 0.0,
+                    "win_rate_24h": 0.0,
+                    "count": 0,
+                    "best_analog": None,
+                    "ts": datetime.now(timezone.utc).isoformat(),
+                }
+
+            totals = _new_stats()
+            for _, key in ranked:
+                stats = self._stats[key]
+                for field in totals:
+                    if field != "first":
+                        totals[field] += stats[field]
+
+            def _avg(h: str) -> float:
+                n = totals[f"n_{h}"]
+                return totals[f"sum_{h}"] / n if n else 0.0
+
+            def _win(h: str) -> float:
+                n = totals[f"n_{h}"]
+                return totals[f"wins_{h}"] / n if n else 0.0
+
+            best_score = ranked[0][0]
+            best_idx = min(self._stats[k]["first"] for s, k in ranked if s == best_score)
+
             return {
-                "avg_return_4h": 0.0,
-                "avg_return_24h": 0.0,
-                "avg_return_3d": 0.0,
-                "win_rate_4h": 0.0,
-                "win_rate_24h": 0.0,
-                "count": 0,
-                "best_analog": None,
+                "avg_return_4h": round(_avg("return_4h"), 6),
+                "avg_return_24h": round(_avg("return_24h"), 6),
+                "avg_return_3d": round(_avg("return_3d"), 6),
+                "win_rate_4h": round(_win("return_4h"), 4),
+                "win_rate_24h": round(_win("return_24h"), 4),
+                "count": totals["count"],
+                "best_analog": {**self._history[best_idx], "match_score": best_score},
                 "ts": datetime.now(timezone.utc).isoformat(),
             }
 
-        returns_4h = [e["return_4h"] for e in matches if e.get("return_4h") is not None]
-        returns_24h = [e["return_24h"] for e in matches if e.get("return_24h") is not None]
-        returns_3d = [e["return_3d"] for e in matches if e.get("return_3d") is not None]
-
-        avg_4h = sum(returns_4h) / len(returns_4h) if returns_4h else 0.0
-        avg_24h = sum(returns_24h) / len(returns_24h) if returns_24h else 0.0
-        avg_3d = sum(returns_3d) / len(returns_3d) if returns_3d else 0.0
-
-        win_4h = sum(1 for r in returns_4h if r > 0) / len(returns_4h) if returns_4h else 0.0
-        win_24h = sum(1 for r in returns_24h if r > 0) / len(returns_24h) if returns_24h else 0.0
-
-        matches.sort(key=lambda x: x["match_score"], reverse=True)
-        best_analog = matches[0] if matches else None
-
-        return {
-            "avg_return_4h": round(avg_4h, 6),
-            "avg_return_24h": round(avg_24h, 6),
-            "avg_return_3d": round(avg_3d, 6),
-            "win_rate_4h": round(win_4h, 4),
-            "win_rate_24h": round(win_24h, 4),
-            "count": len(matches),
-            "best_analog": best_analog,
-            "ts": datetime.now(timezone.utc).isoformat(),
-        }
+    def _refresh_tree(self) -> None:
+        n = len(self._history)
+        if self._tree is not None and n - self._tree_size <= max(1, n * TREE_REBUILD_FRACTION):
+            return
+        if n == 0:
+            return
+        features = self._features[:n]
+        std = features.std(axis=0)
+        self._scale = np.where(std > 1e-12, std, 1.0)
+        self._tree = _KDTree(features / self._scale)
+        self._tree_size = n
+
+    def find_nearest(self, tariff_index: float, price: float, k: int = 10, labelled_only: bool = True) -> list[dict]:
+        self._ensure_loaded()
+        with self._lock:
+            self._refresh_tree()
+            n = len(self._history)
+            if n == 0 or k <= 0:
+                return []
+            query = np.array(self._feature_row(tariff_index, price)) / self._scale
+            fetch = min(n, k * 4 if labelled_only else k)
+
+            while True:
+                size = self._tree_size
+                dist, idx = self._tree.query(query, k=min(fetch, size))
+                candidates: list[tuple[float, int]] = list(zip(dist.tolist(), idx.tolist()))
+                if size < n:
+                    tail = np.linalg.norm(self._features[size:n] / self._scale - query, axis=1)
+                    candidates.extend((float(d), size + i) for i, d in enumerate(tail))
+                candidates.sort()
+
+                results = []
+                for d, i in candidates:
+                    entry = self._history[i]
+                    if labelled_only and entry.get("return_4h") is None:
+                        continue
+                    results.append({**entry, "distance": round(d, 6)})
+                    if len(results) >= k:
+                        return results
+                if fetch >= size:
+                    return results
+                fetch = min(size, fetch * 4)
 
     def get_summary(self) -> dict:
-        total = len(self._history)
-        with_returns = sum(1 for e in self._history if e.get("return_4h") is not None)
-
-        regime_counts = {}
-        for e in self._history:
-            key = f"{e['shock_state']}|{e['funding_regime']}|{e['vol_regime']}"
-            regime_counts[key] = regime_counts.get(key, 0) + 1
-
-        return {
-            "total_records": total,
-            "records_with_returns": with_returns,
-            "regime_distribution": regime_counts,
-            "ts": datetime.now(timezone.utc).isoformat(),
-        }
+        self._ensure_loaded()
+        with self._lock:
+            regime_counts = {"|".join(key): stats["count"] for key, stats in self._stats.items()}
+            return {
+                "total_records": len(self._history),
+                "records_with_returns": sum(stats["n_return_4h"] for stats in self._stats.values()),
+                "regime_distribution": regime_counts,
+                "ts": datetime.now(timezone.utc).isoformat(),
+            }
 
     def get_history(self, limit: int = 50) -> list[dict]:
+        self._ensure_loaded()
         return self._history[-limit:]
+
+
+_memory: RegimeMemory | None = None
+
+
+def get_regime_memory() -> RegimeMemory:
+    global _memory
+    if _memory is None:
+        _memory = RegimeMemory()
+    return _memory
@@ -1,6 +1,111 @@
+import re
+import threading
 import time
 from datetime import datetime, timezone
 
+from backend.config import (
+    COOLDOWN_SECONDS, MAX_ASSET_NOTIONAL, MAX_DAILY_LOSS, MAX_LEVERAGE, MAX_MARGIN_USAGE, MAX_VENUE_NOTIONAL,
+)
+
+
+def market_asset(market: str) -> str:
+    """Base asset of a market symbol: ``SOL-PERP``, ``SOL/USD`` and ``SOL_USD`` all map to ``SOL``."""
+    return re.split(r"[-/_]", market.upper(), maxsplit=1)[0]
+
+
+class ExposureIndex:
+    """Positions keyed by venue/market with running notional and margin totals.
+
+    Every fill replaces one key's contribution, so totals and the per-venue and
+    per-asset notional breakdowns stay current without rescanning the book and
+    a constraint check costs O(1) regardless of how many positions are open.
+    """
+
+    def __init__(self):
+        self._positions: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.total_notional = 0.0
+        self.total_margin = 0.0
+        self.venue_notional: dict[str, float] = {}
+        self.asset_notional: dict[str, float] = {}
+
+    @classmethod
+    def from_positions(cls, positions: list[dict]) -> "ExposureIndex":
+        index = cls()
+        for p in positions:
+            index.add_position(
+                p.get("venue", ""), p.get("market", ""), p.get("size", 0), p.get("entry_price", 0), p.get("margin", 0),
+            )
+        return index
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _apply(self, entry: dict, sign: int) -> None:
+        notional = sign * entry["notional"]
+        self.total_notional += notional
+        self.total_margin += sign * entry["margin"]
+        venue, asset = entry["venue"], market_asset(entry["market"])
+        self.venue_notional[venue] = self.venue_notional.get(venue, 0.0) + notional
+        self.asset_notional[asset] = self.asset_notional.get(asset, 0.0) + notional
+        if sign < 0:
+            if abs(self.venue_notional[venue]) < 1e-9:
+                del self.venue_notional[venue]
+            if abs(self.asset_notional[asset]) < 1e-9:
+                del self.asset_notional[asset]
+
+    def add_position(self, venue: str, market: str, size: float, entry_price: float, margin: float = 0.0) -> None:
+        """Accumulate a position snapshot row; rows sharing a key add their notionals."""
+        key = f"{venue}:{market}"
+        with self._lock:
+            entry = self._positions.get(key)
+            if entry is None:
+                entry = {"venue": venue, "market": market, "size": 0.0, "entry_price": 0.0, "notional": 0.0, "margin": 0.0}
+                self._positions[key] = entry
+            else:
+                self._apply(entry, -1)
+            entry["size"] += size
+            entry["entry_price"] = entry_price
+            entry["notional"] += abs(size * entry_price)
+            entry["margin"] += margin
+            self._apply(entry, 1)
+
+    def set_position(self, venue: str, market: str, size: float, entry_price: float, margin: float = 0.0) -> None:
+        """Replace the position at venue/market after a fill; a zero size removes it."""
+        key = f"{venue}:{market}"
+        with self._lock:
+            old = self._positions.pop(key, None)
+            if old is not None:
+                self._apply(old, -1)
+            if abs(size) < 1e-12:
+                return
+            entry = {
+                "venue": venue, "market": market, "size": size, "entry_price": entry_price,
+                "notional": abs(size * entry_price), "margin": margin,
+            }
+            self._positions[key] = entry
+            self._apply(entry, 1)
+
+    def get(self, venue: str, market: str) -> dict | None:
+        return self._positions.get(f"{venue}:{market}")
+
+    def is_reducing(self, venue: str, market: str, side: str) -> bool:
+        entry = self._positions.get(f"{venue}:{market}")
+        if entry is None:
+            return False
+        side = side.lower()
+        return (entry["size"] > 0 and side == "sell") or (entry["size"] < 0 and side == "buy")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "positions": len(self._positions),
+                "total_notional": round(self.total_notional, 2),
+                "total_margin": round(self.total_margin, 2),
+                "venue_notional": {k: round(v, 2) for k, v in self.venue_notional.items()},
+                "asset_notional": {k: round(v, 2) for k, v in self.asset_notional.items()},
+            }
+
 
 class RiskEngine:
 
@@ -10,69 +115,84 @@ class RiskEngine:
         max_margin_pct: float = 0.6,
         max_daily_loss: float = 500.0,
         cooldown_seconds: int = 300,
+        max_venue_notional: float = 0.0,
+        max_asset_notional: float = 0.0,
     ):
         self.max_leverage = max_leverage
         self.max_margin_pct = max_margin_pct
         self.max_daily_loss = max_daily_loss
         self.cooldown_seconds = cooldown_seconds
+        self.max_venue_notional = max_venue_notional
+        self.max_asset_notional = max_asset_notional
 
         self.throttle_active = False
         self.throttle_reason = ""
         self.last_action_ts: float = 0.0
         self.daily_pnl: float = 0.0
         self.daily_pnl_reset_date: str = ""
+        self.exposure = ExposureIndex()
+
+    def on_position(self, venue: str, market: str, position: dict | None) -> None:
+        """Fill listener: keep the live exposure index in step with the executor's book."""
+        if position is None:
+            self.exposure.set_position(venue, market, 0.0, 0.0)
+        else:
+            self.exposure.set_position(
+                venue, market, position.get("size", 0.0), position.get("entry_price", 0.0), position.get("margin", 0.0),
+            )
+
+    def _index(self, positions: list[dict] | None) -> ExposureIndex:
+        return self.exposure if positions is None else ExposureIndex.from_positions(positions)
 
     def _is_reducing(self, positions: list[dict], proposed_action: dict) -> bool:
-        side = proposed_action.get("side", "").lower()
-        market = proposed_action.get("market", "")
-        venue = proposed_action.get("venue", "")
-        key = f"{venue}:{market}"
-        for p in positions:
-            p_key = f"{p.get('venue', '')}:{p.get('market', '')}"
-            if p_key == key:
-                p_size = p.get("size", 0)
-                if (p_size > 0 and side == "sell") or (p_size < 0 and side == "buy"):
-                    return True
-        return False
+        return self._index(positions).is_reducing(
+            proposed_action.get("venue", ""), proposed_action.get("market", ""), proposed_action.get("side", ""),
+        )
 
-    def check_constraints(
+    def _concentration_reasons(self, venue_after: dict[str, float], asset_after: dict[str, float]) -> list[str]:
+        reasons = []
+        if self.max_venue_notional > 0:
+            for venue, notional in venue_after.items():
+                if notional > self.max_venue_notional:
+                    reasons.append(
+                        f"Venue exposure limit exceeded: {venue or 'unknown'} projected {notional:,.2f} > max {self.max_venue_notional:,.2f}"
+                    )
+        if self.max_asset_notional > 0:
+            for asset, notional in asset_after.items():
+                if notional > self.max_asset_notional:
+                    reasons.append(
+                        f"Asset exposure limit exceeded: {asset or 'unknown'} projected {notional:,.2f} > max {self.max_asset_notional:,.2f}"
+                    )
+        return reasons
+
+    def _evaluate(
         self,
-        positions: list[dict],
-        proposed_action: dict,
-        execution_mode: str = "paper",
+        is_reducing: bool,
+        projected_notional: float,
+        total_margin: float,
+        added_margin: float,
+        concentration: list[str],
+        execution_mode: str,
     ) -> tuple[bool, list[str]]:
         reasons: list[str] = []
-
-        is_reducing = self._is_reducing(positions, proposed_action)
+        total_equity = total_margin if total_margin > 0 else 1.0
 
         if self.throttle_active and not is_reducing:
             reasons.append(f"Throttle active: {self.throttle_reason}")
 
-        total_notional = sum(abs(p.get("size", 0) * p.get("entry_price", 0)) for p in positions)
-        total_margin = sum(p.get("margin", 0) for p in positions)
-        total_equity = total_margin if total_margin > 0 else 1.0
-
-        action_notional = abs(proposed_action.get("size", 0) * proposed_action.get("price", 0))
-
-        if is_reducing:
-            projected_notional = max(0, total_notional - action_notional)
-        else:
-            projected_notional = total_notional + action_notional
-
         projected_leverage = projected_notional / total_equity if total_equity > 0 else 0.0
-
         if not is_reducing and projected_leverage > self.max_leverage:
             reasons.append(
                 f"Leverage limit exceeded: projected {projected_leverage:.2f} > max {self.max_leverage:.2f}"
             )
 
         if not is_reducing:
-            action_margin = proposed_action.get("margin", action_notional / self.max_leverage)
-            projected_margin_usage = (total_margin + action_margin) / total_equity if total_equity > 0 else 0.0
+            projected_margin_usage = (total_margin + added_margin) / total_equity if total_equity > 0 else 0.0
             if projected_margin_usage > self.max_margin_pct:
                 reasons.append(
                     f"Margin usage exceeded: projected {projected_margin_usage:.2%} > max {self.max_margin_pct:.2%}"
                 )
+            reasons.extend(concentration)
 
         today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
         if self.daily_pnl_reset_date != today:
@@ -96,6 +216,119 @@ class RiskEngine:
 
         return allowed, reasons
 
+    def check_constraints(
+        self,
+        positions: list[dict] | None,
+        proposed_action: dict,
+        execution_mode: str = "paper",
+    ) -> tuple[bool, list[str]]:
+        """Check one order against current exposure.
+
+        With ``positions=None`` the live exposure index is used and the check
+        is O(1); passing a position list builds a throwaway index from it.
+        """
+        index = self._index(positions)
+        venue = proposed_action.get("venue", "")
+        market = proposed_action.get("market", "")
+        asset = market_asset(market)
+        action_notional = abs(proposed_action.get("size", 0) * proposed_action.get("price", 0))
+
+        with index._lock:
+            is_reducing = index.is_reducing(venue, market, proposed_action.get("side", ""))
+            total_notional = index.total_notional
+            total_margin = index.total_margin
+            venue_notional = index.venue_notional.get(venue, 0.0)
+            asset_notional = index.asset_notional.get(asset, 0.0)
+
+        if is_reducing:
+            projected_notional = max(0, total_notional - action_notional)
+        else:
+            projected_notional = total_notional + action_notional
+
+        action_margin = proposed_action.get("margin", action_notional / self.max_leverage)
+        concentration = self._concentration_reasons(
+            {venue: venue_notional + action_notional},
+            {asset: asset_notional + action_notional},
+        )
+        return self._evaluate(
+            is_reducing, projected_notional, total_margin, action_margin, concentration, execution_mode,
+        )
+
+    def check_batch(
+        self,
+        positions: list[dict] | None,
+        proposed_actions: list[dict],
+        execution_mode: str = "paper",
+    ) -> tuple[bool, list[str]]:
+        """Check a batch of orders as one unit against projected post-trade exposure.
+
+        Legs are netted per venue/market before limits are applied, so a batch
+        is judged on where it ends up rather than leg by leg.  It counts as
+        reducing only if no touched key's ``|net|`` grows; a rotation that
+        closes one market and opens another is not reducing, and concentration
+        limits are checked for the venues and assets of the keys that grow.
+        The batch is either allowed whole or rejected.
+        Only the keys the batch touches are revisited; the rest of the book
+        comes from the index totals.
+        """
+        index = self._index(positions)
+
+        with index._lock:
+            touched: dict[str, dict] = {}
+            added_margin = 0.0
+            for action in proposed_actions:
+                venue, market = action.get("venue", ""), action.get("market", "")
+                key = f"{venue}:{market}"
+                leg = touched.get(key)
+                if leg is None:
+                    entry = index.get(venue, market)
+                    leg = touched[key] = {
+                        "venue": venue,
+                        "market": market,
+                        "before": entry["notional"] if entry else 0.0,
+                        "start": entry["size"] if entry else 0.0,
+                        "margin": entry.get("margin", 0.0) if entry else 0.0,
+                        "net": entry["size"] if entry else 0.0,
+                        "mark": entry["entry_price"] if entry else 0.0,
+                    }
+                size = abs(action.get("size", 0))
+                signed = size if action.get("side", "").lower() == "buy" else -size
+                before = leg["net"]
+                leg["net"] = before + signed
+                leg["mark"] = action.get("price", 0) or leg["mark"]
+                growth = abs(leg["net"]) - abs(before)
+                if growth > 0:
+                    added_margin += action.get("margin", growth * leg["mark"] / self.max_leverage)
+
+            venue_after = dict(index.venue_notional)
+            asset_after = dict(index.asset_notional)
+            total_notional = index.total_notional
+            total_margin = index.total_margin
+
+        delta = 0.0
+        for leg in touched.values():
+            if leg["start"] and abs(leg["net"]) < abs(leg["start"]):
+                added_margin -= leg["margin"] * (1.0 - abs(leg["net"]) / abs(leg["start"]))
+            change = abs(leg["net"] * leg["mark"]) - leg["before"]
+            delta += change
+            asset = market_asset(leg["market"])
+            venue_after[leg["venue"]] = venue_after.get(leg["venue"], 0.0) + change
+            asset_after[asset] = asset_after.get(asset, 0.0) + change
+
+        projected_notional = total_notional + delta
+        growing = [leg for leg in touched.values() if abs(leg["net"]) > abs(leg["start"]) + 1e-12]
+        is_reducing = not growing
+
+        touched_venues = {leg["venue"] for leg in growing}
+        touched_assets = {market_asset(leg["market"]) for leg in growing}
+        concentration = self._concentration_reasons(
+            {v: n for v, n in venue_after.items() if v in touched_venues},
+            {a: n for a, n in asset_after.items() if a in touched_assets},
+        )
+        return self._evaluate(
+            is_reducing, projected_notional, total_margin, added_margin, concentration, execution_mode,
+        )
+
     def activate_throttle(self, reason: str) -> None:
         self.throttle_active = True
         self.throttle_reason = reason
@@ -119,6 +352,28 @@ class RiskEngine:
             "max_margin_pct": self.max_margin_pct,
             "max_daily_loss": self.max_daily_loss,
             "cooldown_seconds": self.cooldown_seconds,
+            "max_venue_notional": self.max_venue_notional,
+            "max_asset_notional": self.max_asset_notional,
             "daily_pnl": self.daily_pnl,
+            "exposure": self.exposure.snapshot(),
             "ts": datetime.now(timezone.utc).isoformat(),
         }
+
+
+
+_engine: RiskEngine | None = None
+
+
+def get_risk_engine() -> RiskEngine:
+    """Engine with the configured caps, shared by the execution router and the risk API."""
+    global _engine
+    if _engine is None:
+        _engine = RiskEngine(
+            max_leverage=MAX_LEVERAGE,
+            max_margin_pct=MAX_MARGIN_USAGE,
+            max_daily_loss=MAX_DAILY_LOSS,
+            cooldown_seconds=COOLDOWN_SECONDS,
+            max_venue_notional=MAX_VENUE_NOTIONAL,
+            max_asset_notional=MAX_ASSET_NOTIONAL,
+        )
+    return _engine
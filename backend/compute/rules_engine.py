@@ -3,7 +3,16 @@ from datetime import datetime, timezone
 
 class RulesEngine:
 
-    def __init__(self):
+    DEFAULT_THRESHOLDS = {
+        "tariff_roc": 5.0,
+        "shock_throttle": 2.0,
+        "carry_floor": -0.10,
+        "rotation_shock": 1.5,
+        "rotation_tariff_roc": 8.0,
+    }
+
+    def __init__(self, thresholds: dict[str, float] | None = None):
+        self.thresholds = {**self.DEFAULT_THRESHOLDS, **(thresholds or {})}
         self.rules = [
             {
                 "name": "tariff_vol_reduce",
@@ -37,6 +46,9 @@ class RulesEngine:
             },
         ]
 
+    def triggered_rules(self, context: dict) -> list[str]:
+        return [rule["name"] for rule in self.rules if rule["condition"](context)]
+
     def evaluate(self, context: dict) -> list[dict]:
         actions: list[dict] = []
         for rule in self.rules:
@@ -56,10 +68,10 @@ class RulesEngine:
     def _tariff_vol_condition(self, ctx: dict) -> bool:
         roc = ctx.get("tariff_rate_of_change", 0.0)
         vol_regime = ctx.get("vol_regime", "normal")
-        return roc > 5.0 and vol_regime in ("high", "extreme")
+        return roc > self.thresholds["tariff_roc"] and vol_regime in ("high", "extreme")
 
     def _shock_condition(self, ctx: dict) -> bool:
-        return ctx.get("shock_score", 0.0) > 2.0
+        return ctx.get("shock_score", 0.0) > self.thresholds["shock_throttle"]
 
     def _divergence_hedge_condition(self, ctx: dict) -> bool:
         divergence_active = ctx.get("divergence_alert_active", False)
@@ -67,12 +79,12 @@ class RulesEngine:
         return divergence_active and regime_flipped
 
     def _negative_carry_condition(self, ctx: dict) -> bool:
-        return ctx.get("carry_score", 0.0) < -0.10
+        return ctx.get("carry_score", 0.0) < self.thresholds["carry_floor"]
 
     def _stable_rotation_condition(self, ctx: dict) -> bool:
         shock = ctx.get("shock_score", 0.0)
         tariff_roc = ctx.get("tariff_rate_of_change", 0.0)
-        return shock > 1.5 or tariff_roc > 8.0
+        return shock > self.thresholds["rotation_shock"] or tariff_roc > self.thresholds["rotation_tariff_roc"]
 
     def _infer_side(self, action_type: str) -> str:
         if action_type in ("reduce_exposure", "reduce_long_perp", "rotate_to_stables"):
@@ -0,0 +1,303 @@
+"""Background signal DAG: recompute desk analytics only when their inputs change.
+
+Each node declares the Redis snapshots it reads and the upstream nodes it
+consumes.  A run fetches the union of all declared keys with one MGET, then
+walks the nodes in registration (topological) order and recomputes a node only
+when the digest of its raw inputs or the version of an upstream node changed,
+or when its result is older than ``max_age_s``.  Every recompute bumps the
+node's version and publishes ``{...result, "as_of", "version"}`` under
+``pipeline:<node>``, so GET handlers become cache reads.  A node's
+``on_publish(previous, current)`` hook (events, alerts) runs only for a
+published version bump, never for an unchanged recompute or a follower's
+inline run.  A node whose last compute failed keeps serving its last good
+value flagged ``stale`` with the ``error``.
+
+In multi-worker mode only the scheduler leader runs the DAG; followers serve
+``get`` from the leader's ``pipeline:<node>`` snapshots and compute inline,
+without publishing, only if the leader has not published that node yet.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Mapping
+
+from backend.config import PIPELINE_INTERVAL_S, PIPELINE_MAX_AGE_S
+from backend.core import cluster
+from backend.core.event_bus import EventBus, EventType
+from backend.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "pipeline:"
+
+NodeCompute = Callable[[Mapping[str, Any], Mapping[str, dict[str, Any]]], dict[str, Any]]
+NodePublishHook = Callable[[dict[str, Any] | None, dict[str, Any]], None]
+
+
+def _loads(raw: Any) -> Any:
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return None
+
+
+class PipelineNode:
+    __slots__ = ("name", "compute", "keys", "deps", "max_age_s", "publish_as", "on_publish", "digest", "version", "as_of", "computed_at", "value", "error")
+
+    def __init__(
+        self,
+        name: str,
+        compute: NodeCompute,
+        keys: tuple[str, ...],
+        deps: tuple[str, ...],
+        max_age_s: float,
+        publish_as: tuple[str, ...],
+        on_publish: NodePublishHook | None = None,
+    ):
+        self.name = name
+        self.compute = compute
+        self.keys = keys
+        self.deps = deps
+        self.max_age_s = max_age_s
+        self.publish_as = publish_as
+        self.on_publish = on_publish
+        self.digest: str | None = None
+        self.version = 0
+        self.as_of: str | None = None
+        self.computed_at = 0.0
+        self.value: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    def result(self) -> dict[str, Any] | None:
+        if self.value is None:
+            return None
+        return {**self.value, "as_of": self.as_of, "version": self.version}
+
+    def served(self) -> dict[str, Any]:
+        """``result()`` for readers: the last good value, flagged when the latest compute failed."""
+        result = self.result()
+        if self.error is None and result is not None:
+            return result
+        return {**(result or {"as_of": None, "version": self.version}), "stale": True, "error": self.error or "no result yet"}
+
+
+class SignalPipeline:
+
+    def __init__(
+        self,
+        state_store: StateStore | None = None,
+        event_bus: EventBus | None = None,
+        interval_s: float = PIPELINE_INTERVAL_S,
+        max_age_s: float = PIPELINE_MAX_AGE_S,
+    ):
+        self._store = state_store or StateStore()
+        self.event_bus = event_bus or EventBus()
+        self.interval_s = interval_s
+        self.max_age_s = max_age_s
+        self._nodes: dict[str, PipelineNode] = {}
+        self._lock = threading.RLock()
+        self._last_run = 0.0
+
+    @property
+    def nodes(self) -> list[str]:
+        return list(self._nodes)
+
+    def register(
+        self,
+        name: str,
+        compute: NodeCompute,
+        keys: tuple[str, ...] | list[str] = (),
+        deps: tuple[str, ...] | list[str] = (),
+        max_age_s: float | None = None,
+        publish_as: tuple[str, ...] | list[str] = (),
+        on_publish: NodePublishHook | None = None,
+    ) -> None:
+        missing = [d for d in deps if d not in self._nodes]
+        if missing:
+            raise ValueError(f"Pipeline node {name!r} depends on unregistered nodes: {missing}")
+        self._nodes[name] = PipelineNode(
+            name, compute, tuple(keys), tuple(deps), self.max_age_s if max_age_s is None else max_age_s, tuple(publish_as), on_publish,
+        )
+
+    def _read(self, keys: list[str]) -> dict[str, Any]:
+        r = self._store.get_redis()
+        if r is not None and keys:
+            try:
+                return dict(zip(keys, r.mget(keys)))
+            except Exception:
+                logger.warning("Signal pipeline input read failed", exc_info=True)
+        return dict.fromkeys(keys)
+
+    def _digest(self, node: PipelineNode, raw: Mapping[str, Any]) -> str:
+        parts = [raw.get(k) or "" for k in node.keys]
+        parts.extend(f"{d}@{self._nodes[d].version}" for d in node.deps)
+        return hashlib.blake2b("\x00".join(parts).encode(), digest_size=16).hexdigest()
+
+    def _publish(self, node: PipelineNode) -> None:
+        result = node.result()
+        ttl = int(max(node.max_age_s * 3, self.interval_s * 3, 60))
+        for key in (KEY_PREFIX + node.name, *node.publish_as):
+            self._store.set_snapshot(key, result, ttl=ttl)
+
+    def run(self, force: bool = False, publish: bool = True) -> list[str]:
+        """Recompute every node whose inputs changed; returns the names recomputed."""
+        with self._lock:
+            keys = sorted({k for node in self._nodes.values() for k in node.keys})
+            raw = self._read(keys)
+            snaps = {k: _loads(v) for k, v in raw.items()}
+            now = time.monotonic()
+            changed: list[str] = []
+            hooks: list[tuple[PipelineNode, dict[str, Any] | None, dict[str, Any]]] = []
+            for node in self._nodes.values():
+                digest = self._digest(node, raw)
+                stale = now - node.computed_at >= node.max_age_s
+                if not force and not stale and digest == node.digest and node.value is not None:
+                    continue
+                upstream = {d: self._nodes[d].value or {} for d in node.deps}
+                try:
+                    value = node.compute(snaps, upstream)
+                except Exception as exc:
+                    node.error = str(exc)
+                    logger.error("Signal pipeline node %s failed", node.name, exc_info=True)
+                    continue
+                node.error = None
+                node.digest = digest
+                node.computed_at = now
+                if value == node.value:
+                    continue
+                previous, node.value = node.value, value
+                node.version += 1
+                node.as_of = datetime.now(timezone.utc).isoformat()
+                if publish:
+                    self._publish(node)
+                    if node.on_publish is not None:
+                        hooks.append((node, previous, value))
+                changed.append(node.name)
+            self._last_run = time.monotonic()
+        for node, previous, value in hooks:
+            try:
+                node.on_publish(previous, value)
+            except Exception:
+                logger.warning("Signal pipeline publish hook for %s failed", node.name, exc_info=True)
+        if changed and publish:
+            self.event_bus.emit(EventType.SIGNAL_PIPELINE_UPDATED, source="signal_pipeline", payload={"nodes": {n: self._nodes[n].version for n in changed}})
+        return changed
+
+    def get(self, name: str) -> dict[str, Any]:
+        """Latest published result for ``name``, running the DAG inline only when
+        no background run has happened within twice the scheduling interval.
+
+        Never raises for a failed node: the last good value comes back with
+        ``stale`` and ``error`` set (an empty body if it never succeeded)."""
+        node = self._nodes.get(name)
+        if node is None:
+            raise KeyError(name)
+        follower = not cluster.is_leader()
+        if follower:
+            published = self._store.get_snapshot(KEY_PREFIX + name)
+            if published is not None:
+                return published
+        if node.value is None or time.monotonic() - self._last_run > 2 * self.interval_s:
+            self.run(publish=not follower)
+        return node.served()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            name: {"version": node.version, "as_of": node.as_of, "deps": list(node.deps), "inputs": len(node.keys), "error": node.error}
+            for name, node in self._nodes.items()
+        }
+
+
+def _index_node(snaps: Mapping[str, Any], upstream: Mapping[str, dict[str, Any]]) -> dict[str, Any]:
+    index = snaps.get("index:latest") or snaps.get("desk:index:latest") or {}
+    shock = snaps.get("shock:latest") or snaps.get("desk:shock:latest") or {}
+    return {"index": index, "shock": shock}
+
+
+def register_default_nodes(pipeline: SignalPipeline) -> SignalPipeline:
+    from backend.agents.runtime import SNAPSHOT_KEYS as AGENT_KEYS, get_agent_runtime
+    from backend.compute.agent_consensus import build_consensus
+    from backend.compute.capital_allocator import ALLOCATION_STATE_KEYS, allocate, build_allocation_state
+    from backend.compute.macro_predictor import MACRO_FEATURE_KEYS, MacroPredictor, build_macro_features
+    from backend.compute.portfolio_risk import PORTFOLIO_RISK_KEYS, risk_summary
+    from backend.compute.vol_regime_engine import VOL_STATE_KEYS, classify_regime, collect_vol_state
+
+    predictor = MacroPredictor()
+    runtime = get_agent_runtime()
+    bus = pipeline.event_bus
+
+    def vol_regime(snaps, upstream):
+        return classify_regime(collect_vol_state(snaps))
+
+    def vol_regime_published(previous, result):
+        before = (previous or {}).get("regime")
+        current = result.get("regime", "normal_volatility")
+        if before is not None and before != current:
+            bus.emit(EventType.VOL_REGIME_CHANGED, source="signal_pipeline", payload={"previous": before, "current": current, "confidence": result.get("confidence")})
+
+    def prediction(snaps, upstream):
+        features = build_macro_features(snaps, predictor)
+        result = predictor.predict(features)
+        result["input_features"] = features
+        return result
+
+    def geopolitical(snaps, upstream):
+        return dict(runtime.snapshot().geo_index)
+
+    def agents(snaps, upstream):
+        tick = runtime.tick()
+        return {"signals": list(tick.signals), "agent_count": len(runtime.agents), "agent_status": tick.agents, "ts": tick.ts}
+
+    def consensus(snaps, upstream):
+        return build_consensus(upstream["agents"].get("signals", []))
+
+    def allocation(snaps, upstream):
+        state = build_allocation_state(snaps)
+        regime = upstream["vol_regime"].get("regime")
+        if regime:
+            state["vol_regime"] = regime
+        pred = upstream["prediction"]
+        if pred:
+            state["predictor_prob"] = pred.get("prob_up_next_4h", 0.5)
+            state["predictor_confidence"] = pred.get("confidence", 0.5)
+        return allocate(state)
+
+    def portfolio_risk(snaps, upstream):
+        return risk_summary(snaps)
+
+    def portfolio_risk_published(previous, result):
+        bus.emit(
+            EventType.PORTFOLIO_RISK_UPDATE,
+            source="signal_pipeline",
+            payload={
+                "total_exposure": result["total_exposure"],
+                "var_95": result["var_95"],
+                "concentration_risk_venue": result["concentration_risk_venue"],
+                "warnings": result["warnings"],
+            },
+        )
+
+    pipeline.register("index", _index_node, keys=("index:latest", "desk:index:latest", "shock:latest", "desk:shock:latest"))
+    pipeline.register("vol_regime", vol_regime, keys=VOL_STATE_KEYS, deps=("index",), publish_as=("desk:vol_regime:latest",), on_publish=vol_regime_published)
+    pipeline.register("prediction", prediction, keys=MACRO_FEATURE_KEYS, deps=("index",), publish_as=("prediction:SOL",))
+    pipeline.register("geopolitical", geopolitical, keys=("gdelt:latest", "wits:tariff:USA:ALL:ALL", "wits:latest", "stablecoin:health:latest", "stablecoin:health", "cross_asset:contagion:latest"))
+    pipeline.register("agents", agents, keys=AGENT_KEYS, deps=("index", "geopolitical"))
+    pipeline.register("consensus", consensus, deps=("agents",))
+    pipeline.register("allocation", allocation, keys=ALLOCATION_STATE_KEYS, deps=("vol_regime", "prediction", "consensus"), publish_as=("desk:allocation:latest",))
+    pipeline.register("portfolio_risk", portfolio_risk, keys=PORTFOLIO_RISK_KEYS, publish_as=("desk:portfolio_risk:summary",), on_publish=portfolio_risk_published)
+    return pipeline
+
+
+_pipeline: SignalPipeline | None = None
+
+
+def get_signal_pipeline() -> SignalPipeline:
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = register_default_nodes(SignalPipeline())
+    return _pipeline
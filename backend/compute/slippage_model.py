@@ -1,13 +1,50 @@
 import logging
 import math
+import threading
 from datetime import datetime, timezone
 from typing import Any
 
+from backend.core.state_store import StateStore
+
 logger = logging.getLogger(__name__)
 
 SIZE_BUCKETS = [100, 500, 1000, 5000, 10000, 50000, 100000]
 SLIPPAGE_THRESHOLDS_BPS = [10, 25, 50]
 
+MIN_FILLS_FOR_FIT = 20
+MAX_SAFE_SIZE_USD = 1_000_000.0
+REFERENCE_DEPTH_USD = 50000.0
+CALIBRATION_DECAY = 0.98
+MODEL_KEY_PREFIX = "slippage:model:"
+
+
+def _heuristic_params(ob_depth: float, spread_bps: float, volatility: float, recent_slippage_bps: float) -> tuple[float, float, float]:
+    depth = max(ob_depth, 1000.0)
+    base_slip = max(spread_bps * 0.5, 0.5)
+    if recent_slippage_bps > 0:
+        base_slip = (base_slip + recent_slippage_bps) / 2.0
+    slope = 50.0 * (1.0 + volatility * 10.0) / depth
+    return base_slip, slope, depth
+
+
+def _fitted_slippage_bps(model: dict, size_usd: float, depth_usd: float) -> float:
+    depth = depth_usd if depth_usd > 0 else model.get("reference_depth_usd", REFERENCE_DEPTH_USD)
+    return model["intercept_bps"] + model["impact_coef"] * math.sqrt(max(size_usd, 0.0) / depth)
+
+
+def _invert_fitted(model: dict, threshold_bps: float, depth_usd: float) -> float:
+    depth = depth_usd if depth_usd > 0 else model.get("reference_depth_usd", REFERENCE_DEPTH_USD)
+    headroom = threshold_bps - model["intercept_bps"]
+    if headroom <= 0:
+        return 0.0
+    if model["impact_coef"] <= 0:
+        return float("inf")
+    return depth * (headroom / model["impact_coef"]) ** 2
+
+
+def _usable(model: dict | None) -> bool:
+    return bool(model) and model.get("n_fills", 0) >= MIN_FILLS_FOR_FIT and model.get("impact_coef", 0) > 0
+
 
 def estimate_slippage_curve(
     ob_depth: float = 0,
@@ -15,20 +52,17 @@ def estimate_slippage_curve(
     volatility: float = 0.03,
     recent_slippage_bps: float = 0,
     venue: str = "unknown",
+    model: dict | None = None,
 ) -> dict[str, Any]:
     curve = []
-    depth = max(ob_depth, 1000.0)
-
-    base_slip = max(spread_bps * 0.5, 0.5)
-
-    if recent_slippage_bps > 0:
-        base_slip = (base_slip + recent_slippage_bps) / 2.0
-
-    vol_multiplier = 1.0 + volatility * 10.0
+    fitted = _usable(model)
+    base_slip, slope, _depth = _heuristic_params(ob_depth, spread_bps, volatility, recent_slippage_bps)
 
     for size in SIZE_BUCKETS:
-        depth_ratio = size / depth
-        impact_bps = base_slip + depth_ratio * 50.0 * vol_multiplier
+        if fitted:
+            impact_bps = _fitted_slippage_bps(model, size, ob_depth)
+        else:
+            impact_bps = base_slip + size * slope
         impact_bps = round(impact_bps, 2)
         curve.append({
             "size_usd": size,
@@ -38,6 +72,7 @@ def estimate_slippage_curve(
     return {
         "venue": venue,
         "curve": curve,
+        "model_type": "fitted_sqrt" if fitted else "heuristic_linear",
         "inputs": {
             "ob_depth": ob_depth,
             "spread_bps": spread_bps,
@@ -55,24 +90,27 @@ def compute_max_safe_sizes(
     volatility: float = 0.03,
     recent_slippage_bps: float = 0,
     venue: str = "unknown",
+    model: dict | None = None,
 ) -> dict[str, Any]:
-    curve_data = estimate_slippage_curve(ob_depth, spread_bps, volatility, recent_slippage_bps, venue)
+    curve_data = estimate_slippage_curve(ob_depth, spread_bps, volatility, recent_slippage_bps, venue, model)
     curve = curve_data["curve"]
+    fitted = _usable(model)
+    base_slip, slope, _depth = _heuristic_params(ob_depth, spread_bps, volatility, recent_slippage_bps)
 
     safe_sizes = {}
     for threshold in SLIPPAGE_THRESHOLDS_BPS:
-        max_size = 0
-        for point in curve:
-            if point["expected_slippage_bps"] <= threshold:
-                max_size = point["size_usd"]
-            else:
-                break
-        safe_sizes[f"{threshold}bps"] = max_size
+        if fitted:
+            max_size = _invert_fitted(model, threshold, ob_depth)
+        else:
+            max_size = max(threshold - base_slip, 0.0) / slope
+        safe_sizes[f"{threshold}bps"] = round(min(max_size, MAX_SAFE_SIZE_USD), 2)
 
     notes = []
     if ob_depth == 0:
         notes.append("No orderbook depth data — estimates based on spread only")
-    if recent_slippage_bps == 0:
+    if fitted:
+        notes.append(f"Square-root impact curve fitted from {model['n_fills']:.0f} realised fills")
+    elif recent_slippage_bps == 0:
         notes.append("No recent slippage data — using model estimates only")
     if volatility > 0.05:
         notes.append("High volatility environment — actual slippage may exceed estimates")
@@ -82,6 +120,8 @@ def compute_max_safe_sizes(
         "max_safe_sizes": safe_sizes,
         "thresholds_bps": SLIPPAGE_THRESHOLDS_BPS,
         "slippage_curve": curve,
+        "model_type": curve_data["model_type"],
+        "model": model if fitted else None,
         "data_quality": curve_data["data_quality"],
         "notes": notes,
         "ts": datetime.now(timezone.utc).isoformat(),
@@ -111,7 +151,8 @@ def _compute_data_quality(ob_depth: float, spread_bps: float, recent_slippage: f
     }
 
 
-def get_multi_venue_slippage(venue_data: dict[str, dict]) -> dict[str, Any]:
+def get_multi_venue_slippage(venue_data: dict[str, dict], models: dict[str, dict] | None = None) -> dict[str, Any]:
+    models = models or {}
     results = {}
     for venue, params in venue_data.items():
         try:
@@ -121,6 +162,7 @@ def get_multi_venue_slippage(venue_data: dict[str, dict]) -> dict[str, Any]:
                 volatility=params.get("volatility", 0.03),
                 recent_slippage_bps=params.get("recent_slippage_bps", 0),
                 venue=venue,
+                model=models.get(venue),
             )
         except Exception:
             logger.debug("Slippage model failed for venue %s", venue, exc_info=True)
@@ -130,3 +172,111 @@ def get_multi_venue_slippage(venue_data: dict[str, dict]) -> dict[str, Any]:
         "venues": results,
         "ts": datetime.now(timezone.utc).isoformat(),
     }
+
+
+class SlippageCalibrator:
+
+    def __init__(self, state_store: StateStore | None = None, decay: float = CALIBRATION_DECAY):
+        self._store = state_store or StateStore()
+        self._decay = decay
+        self._stats: dict[str, dict[str, float]] = {}
+        self._last_fill_ts: float = 0.0
+        # The scheduler refits in a worker thread while routes read models.
+        self._lock = threading.RLock()
+
+    def _venue_stats(self, venue: str) -> dict[str, float]:
+        stats = self._stats.get(venue)
+        if stats is None:
+            stored = self._store.get_snapshot(f"{MODEL_KEY_PREFIX}{venue}") or {}
+            with self._lock:
+                stats = self._stats.setdefault(venue, dict(stored.get("stats") or {"w": 0.0, "sx": 0.0, "sy": 0.0, "sxx": 0.0, "sxy": 0.0, "n": 0.0}))
+        return stats
+
+    def observe(self, venue: str, size_usd: float, slippage_bps: float, depth_usd: float = 0.0) -> None:
+        if size_usd <= 0:
+            return
+        depth = depth_usd if depth_usd > 0 else REFERENCE_DEPTH_USD
+        x = math.sqrt(size_usd / depth)
+        stats = self._venue_stats(venue)
+        with self._lock:
+            stats["w"] += 1.0
+            stats["sx"] += x
+            stats["sy"] += slippage_bps
+            stats["sxx"] += x * x
+            stats["sxy"] += x * slippage_bps
+            stats["n"] += 1.0
+
+    def _decay_all(self) -> None:
+        with self._lock:
+            for stats in self._stats.values():
+                for key in ("w", "sx", "sy", "sxx", "sxy"):
+                    stats[key] *= self._decay
+
+    def fit(self, venue: str) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._venue_stats(venue))
+        w = stats["w"]
+        model = {
+            "venue": venue,
+            "form": "slippage_bps = intercept_bps + impact_coef * sqrt(size_usd / depth_usd)",
+            "intercept_bps": 0.0,
+            "impact_coef": 0.0,
+            "n_fills": stats["n"],
+            "effective_weight": round(w, 4),
+            "reference_depth_usd": REFERENCE_DEPTH_USD,
+            "fitted_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if w <= 0:
+            return model
+
+        mean_x = stats["sx"] / w
+        mean_y = stats["sy"] / w
+        var_x = stats["sxx"] / w - mean_x * mean_x
+        cov_xy = stats["sxy"] / w - mean_x * mean_y
+        if var_x > 1e-12:
+            slope = max(cov_xy / var_x, 0.0)
+        else:
+            slope = mean_y / mean_x if mean_x > 0 else 0.0
+        intercept = max(mean_y - slope * mean_x, 0.0)
+
+        model["intercept_bps"] = round(intercept, 4)
+        model["impact_coef"] = round(slope, 4)
+        return model
+
+    def fit_from_metrics(self, metrics) -> dict[str, dict]:
+        new_fills = [f for f in metrics.iter_fills() if f["fill_ts"] > self._last_fill_ts and f.get("size_usd", 0) > 0]
+        if new_fills:
+            self._decay_all()
+        for fill in new_fills:
+            self.observe(fill["venue"], fill["size_usd"], fill["slippage_bps"], fill.get("depth_usd", 0.0))
+            self._last_fill_ts = max(self._last_fill_ts, fill["fill_ts"])
+
+        models = {}
+        with self._lock:
+            venues = list(self._stats)
+        for venue in venues:
+            model = self.fit(venue)
+            models[venue] = model
+            with self._lock:
+                stats = dict(self._stats[venue])
+            self._store.set_snapshot(f"{MODEL_KEY_PREFIX}{venue}", {**model, "stats": stats})
+        return models
+
+    def get_model(self, venue: str) -> dict[str, Any] | None:
+        stats = self._venue_stats(venue)
+        if stats["n"] <= 0:
+            return None
+        return self.fit(venue)
+
+    def get_models(self, venues: list[str]) -> dict[str, dict]:
+        return {v: m for v in venues if (m := self.get_model(v)) is not None}
+
+
+_calibrator: SlippageCalibrator | None = None
+
+
+def get_slippage_calibrator() -> SlippageCalibrator:
+    global _calibrator
+    if _calibrator is None:
+        _calibrator = SlippageCalibrator()
+    return _calibrator
@@ -58,6 +58,11 @@ def create_smart_execution(
     return plan
 
 
+def restore_execution(plan: dict[str, Any]) -> dict[str, Any]:
+    _executions[plan["exec_id"]] = plan
+    return plan
+
+
 def get_execution(exec_id: str) -> dict[str, Any] | None:
     return _executions.get(exec_id)
 
@@ -94,11 +99,21 @@ def record_slice_fill(
     }
     plan["slices"].append(slice_record)
 
+    schedule = plan.get("schedule") or []
+    if plan["completed_slices"] <= len(schedule):
+        entry = schedule[plan["completed_slices"] - 1]
+        entry["status"] = "filled"
+        entry["filled_size"] = fill_size
+        entry["realized_slippage_bps"] = round(slippage_bps, 2)
+    if plan["total_size"] > 0:
+        plan["progress_pct"] = round(min(plan["executed_size"] / plan["total_size"], 1.0) * 100.0, 2)
+
     filled_slippages = [s["slippage_bps"] for s in plan["slices"]]
     if filled_slippages:
         plan["actual_slippage_bps"] = round(sum(filled_slippages) / len(filled_slippages), 2)
 
-    if plan["completed_slices"] >= plan["n_slices"]:
+    remaining = plan["total_size"] - plan["executed_size"]
+    if plan["completed_slices"] >= plan["n_slices"] or remaining <= 1e-8:
         plan["status"] = "completed"
         plan["completed_at"] = now.isoformat()
         logger.info("Smart execution completed: %s total_size=%.4f", exec_id[:8], plan["executed_size"])
@@ -1,63 +1,83 @@
+import json
 import logging
 import math
 import time
 from datetime import datetime, timezone
 from typing import Any
 
+import numpy as np
+
 from backend.compute.rules_engine import RulesEngine
-from backend.compute.monte_carlo import MonteCarloEngine
+from backend.compute.monte_carlo import MonteCarloEngine, MAX_N_PATHS
+from backend.core import cluster
+from backend.core.state_store import StateStore
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_CONFIG_A = {
     "name": "Config A (Default)",
-    "tariff_shock_threshold": 60.0,
+    "tariff_roc_threshold": 5.0,
+    "shock_throttle_threshold": 2.0,
     "divergence_threshold_bps": 30.0,
     "funding_flip_threshold": 0.0,
+    "carry_threshold": -0.10,
     "vol_scale_factor": 1.0,
-    "stable_rotation_trigger": 0.5,
+    "stable_rotation_trigger": 1.5,
+    "tariff_rotation_threshold": 8.0,
 }
 
 DEFAULT_CONFIG_B = {
     "name": "Config B (Aggressive)",
-    "tariff_shock_threshold": 40.0,
+    "tariff_roc_threshold": 3.0,
+    "shock_throttle_threshold": 1.5,
     "divergence_threshold_bps": 20.0,
     "funding_flip_threshold": -0.01,
+    "carry_threshold": -0.05,
     "vol_scale_factor": 1.5,
-    "stable_rotation_trigger": 0.3,
+    "stable_rotation_trigger": 1.0,
+    "tariff_rotation_threshold": 6.0,
+}
+
+# Config keys that override the matching RulesEngine thresholds.
+_THRESHOLD_KEYS = {
+    "tariff_roc_threshold": "tariff_roc",
+    "shock_throttle_threshold": "shock_throttle",
+    "carry_threshold": "carry_floor",
+    "stable_rotation_trigger": "rotation_shock",
+    "tariff_rotation_threshold": "rotation_tariff_roc",
 }
 
 _latest_result: dict[str, Any] | None = None
+_latest_leaderboard: dict[str, Any] | None = None
 _history: list[dict[str, Any]] = []
 MAX_HISTORY = 50
 
+# In multi-worker mode results are mirrored to Redis so every worker serves
+# the same latest result, leaderboard and history.
+LATEST_KEY = "sandbox:latest"
+LEADERBOARD_KEY = "sandbox:leaderboard:latest"
+HISTORY_KEY = "sandbox:history"
+_store: StateStore | None = None
 
-def _simulate_strategy(config: dict, market_state: dict) -> dict:
-    engine = RulesEngine()
-    actions = engine.evaluate(market_state)
+MAX_CONFIGS = 500
+LEADERBOARD_N_PATHS = 1000
+LEADERBOARD_N_STEPS = 24
+LEADERBOARD_SEED = 0
+SIGNIFICANCE_ALPHA = 0.05
 
-    decisions = []
-    pnl = 0.0
-    trades = 0
+_RULE_MULTIPLIERS = {
+    "tariff_vol_reduce": 0.5,
+    "shock_throttle": 0.5,
+    "divergence_hedge": 0.5,
+    "negative_carry_reduce": 0.75,
+    "stable_rotation": 0.2,
+}
 
-    for action in actions:
-        triggered = action.get("triggered", False)
-        if triggered:
-            trades += 1
-            size = action.get("size", 0.1) * config.get("vol_scale_factor", 1.0)
-            simulated_pnl = size * market_state.get("price_change_pct", 0) / 100.0
-            pnl += simulated_pnl
-            decisions.append({
-                "rule": action.get("rule", "unknown"),
-                "action": action.get("action", "none"),
-                "size": round(size, 4),
-                "simulated_pnl": round(simulated_pnl, 4),
-            })
-
-    mc_result = {}
+
+def _run_market_mc(market_state: dict) -> dict:
     try:
         mc_engine = MonteCarloEngine()
-        mc_result = mc_engine.run(
+        return mc_engine.run(
             current_price=market_state.get("current_price", 100.0),
             horizon_hours=24,
             n_paths=1000,
@@ -66,6 +86,49 @@ def _simulate_strategy(config: dict, market_state: dict) -> dict:
         )
     except Exception:
         logger.debug("MC simulation failed in sandbox", exc_info=True)
+        return {}
+
+
+def _rule_thresholds(config: dict) -> dict[str, float]:
+    return {name: float(config[key]) for key, name in _THRESHOLD_KEYS.items() if key in config}
+
+
+def _rule_context(config: dict, market_state: dict) -> dict:
+    """RulesEngine context for one config: the market state plus the alert flags its thresholds imply."""
+    context = dict(market_state)
+    if "divergence_bps" in market_state:
+        context["divergence_alert_active"] = (
+            abs(float(market_state["divergence_bps"])) >= float(config.get("divergence_threshold_bps", 30.0))
+        )
+    if "funding_rate" in market_state:
+        context["funding_regime_flipped"] = (
+            float(market_state["funding_rate"]) < float(config.get("funding_flip_threshold", 0.0))
+        )
+    return context
+
+
+def _simulate_strategy(config: dict, market_state: dict, mc_result: dict | None = None) -> dict:
+    engine = RulesEngine(_rule_thresholds(config))
+    actions = engine.evaluate(_rule_context(config, market_state))
+
+    decisions = []
+    pnl = 0.0
+    trades = 0
+
+    for action in actions:
+        trades += 1
+        size = (action.get("size") or 0.1) * config.get("vol_scale_factor", 1.0)
+        simulated_pnl = size * market_state.get("price_change_pct", 0) / 100.0
+        pnl += simulated_pnl
+        decisions.append({
+            "rule": action["rule_name"],
+            "action": action["action_type"],
+            "size": round(size, 4),
+            "simulated_pnl": round(simulated_pnl, 4),
+        })
+
+    if mc_result is None:
+        mc_result = _run_market_mc(market_state)
 
     var_95 = mc_result.get("var_95", 0)
     cvar_95 = mc_result.get("cvar_95", 0)
@@ -105,8 +168,9 @@ def run_sandbox(
     if "price_change_pct" not in market_state:
         market_state["price_change_pct"] = 0.0
 
-    result_a = _simulate_strategy(config_a, market_state)
-    result_b = _simulate_strategy(config_b, market_state)
+    mc_result = _run_market_mc(market_state)
+    result_a = _simulate_strategy(config_a, market_state, mc_result)
+    result_b = _simulate_strategy(config_b, market_state, mc_result)
 
     winner = "A" if result_a["total_pnl"] >= result_b["total_pnl"] else "B"
     pnl_diff = abs(result_a["total_pnl"] - result_b["total_pnl"])
@@ -140,13 +204,230 @@ def run_sandbox(
     _history.append(result)
     if len(_history) > MAX_HISTORY:
         _history.pop(0)
+    _share_result(result)
 
     return result
 
 
+def _shared_store() -> StateStore | None:
+    global _store
+    if not cluster.is_multi_worker():
+        return None
+    if _store is None:
+        _store = StateStore()
+    return _store
+
+
+def _share_result(result: dict[str, Any]) -> None:
+    store = _shared_store()
+    if store is None:
+        return
+    store.set_snapshot(LATEST_KEY, result)
+    r = store.get_redis()
+    if r is None:
+        return
+    try:
+        pipe = r.pipeline()
+        pipe.rpush(HISTORY_KEY, json.dumps(result, default=str))
+        pipe.ltrim(HISTORY_KEY, -MAX_HISTORY, -1)
+        pipe.execute()
+    except Exception:
+        logger.warning("Failed to share sandbox history", exc_info=True)
+
+
+def _simulate_market_paths(
+    market_state: dict,
+    n_paths: int,
+    n_steps: int,
+    horizon_hours: float,
+    seed: int | None,
+) -> np.ndarray:
+    current_price = float(market_state.get("current_price", 100.0))
+    volatility = float(market_state.get("volatility", 0.03))
+    drift = float(market_state.get("drift", 0.0))
+    dt = horizon_hours / n_steps / (365.25 * 24.0)
+
+    rng = np.random.default_rng(seed)
+    z = rng.standard_normal((n_paths, n_steps))
+    log_returns = (drift - 0.5 * volatility ** 2) * dt + volatility * math.sqrt(dt) * z
+    return current_price * np.exp(np.cumsum(log_returns, axis=1)) - current_price
+
+
+def _config_arrays(configs: list[dict]) -> dict[str, np.ndarray]:
+    return {"vol_scale_factor": np.array([float(c["vol_scale_factor"]) for c in configs])}
+
+
+def _triggered_rules(configs: list[dict], market_state: dict) -> dict[str, np.ndarray]:
+    """Per-rule boolean mask over configs, evaluated by RulesEngine with each config's thresholds."""
+    names = [rule["name"] for rule in RulesEngine().rules]
+    fired = {name: np.zeros(len(configs), dtype=bool) for name in names}
+    cache: dict[tuple, list[str]] = {}
+    for i, config in enumerate(configs):
+        thresholds = _rule_thresholds(config)
+        context = _rule_context(config, market_state)
+        key = (
+            tuple(sorted(thresholds.items())),
+            context.get("divergence_alert_active"),
+            context.get("funding_regime_flipped"),
+        )
+        rules = cache.get(key)
+        if rules is None:
+            rules = cache[key] = RulesEngine(thresholds).triggered_rules(context)
+        for name in rules:
+            fired[name][i] = True
+    return fired
+
+
+def _paired_p_values(t_stats: np.ndarray) -> np.ndarray:
+    return np.array([math.erfc(abs(t) / math.sqrt(2.0)) for t in t_stats])
+
+
+def run_leaderboard(
+    configs: list[dict] | None = None,
+    market_state: dict | None = None,
+    n_paths: int = LEADERBOARD_N_PATHS,
+    n_steps: int = LEADERBOARD_N_STEPS,
+    horizon_hours: float = 24.0,
+    seed: int | None = None,
+) -> dict[str, Any]:
+    """Rank configs by risk-adjusted PnL (mean / std) over one set of simulated paths.
+
+    Every config is scored on the same paths, drawn from ``seed`` (or
+    ``LEADERBOARD_SEED``), so rankings from repeated runs on the same market
+    state are comparable.  Ties fall back to expected PnL.
+    """
+    global _latest_leaderboard
+
+    configs = configs or [DEFAULT_CONFIG_A, DEFAULT_CONFIG_B]
+    if len(configs) > MAX_CONFIGS:
+        raise ValueError(f"At most {MAX_CONFIGS} configs per leaderboard run, got {len(configs)}")
+    configs = [
+        {**DEFAULT_CONFIG_A, "name": f"Config {i + 1}", **(cfg or {})}
+        for i, cfg in enumerate(configs)
+    ]
+    market_state = market_state or {}
+    n_paths = min(max(int(n_paths), 100), MAX_N_PATHS)
+    n_steps = min(max(int(n_steps), 1), 288)
+    seed = LEADERBOARD_SEED if seed is None else seed
+
+    current_price = float(market_state.get("current_price", 100.0))
+    position_size = float(market_state.get("position_size", 1.0))
+    spread_bps = float(market_state.get("spread_bps", 5.0))
+
+    unit_paths = _simulate_market_paths(market_state, n_paths, n_steps, horizon_hours, seed)
+    terminal = unit_paths[:, -1]
+    with_origin = np.concatenate([np.zeros((n_paths, 1)), unit_paths], axis=1)
+    unit_drawdown = np.max(np.maximum.accumulate(with_origin, axis=1) - with_origin, axis=1)
+    unit_runup = np.max(with_origin - np.minimum.accumulate(with_origin, axis=1), axis=1)
+
+    params = _config_arrays(configs)
+    triggered = _triggered_rules(configs, market_state)
+    gross = position_size * params["vol_scale_factor"]
+    exposure = gross.copy()
+    trade_count = np.zeros(len(configs), dtype=int)
+    for rule, fired in triggered.items():
+        exposure = np.where(fired, exposure * _RULE_MULTIPLIERS[rule], exposure)
+        trade_count += fired.astype(int)
+
+    slippage_bps = spread_bps * 0.5
+    cost = np.abs(gross - exposure) * current_price * slippage_bps / 10000.0
+
+    pnl = exposure[:, None] * terminal[None, :] - cost[:, None]
+    pnl_sorted = np.sort(pnl, axis=1)
+    tail_95 = max(int(0.05 * n_paths), 1)
+    expected = pnl.mean(axis=1)
+    std = pnl.std(axis=1)
+    var_95 = -np.percentile(pnl, 5, axis=1)
+    cvar_95 = -pnl_sorted[:, :tail_95].mean(axis=1)
+    hit_rate = (pnl > 0).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        risk_adjusted = np.where(std > 1e-12, expected / std, 0.0)
+    max_drawdown = np.where(
+        exposure[:, None] >= 0,
+        exposure[:, None] * unit_drawdown[None, :],
+        -exposure[:, None] * unit_runup[None, :],
+    ).mean(axis=1)
+
+    order = np.lexsort((-expected, -np.round(risk_adjusted, 12)))
+    leader = int(order[0])
+    diff = pnl - pnl[leader]
+    diff_mean = diff.mean(axis=1)
+    diff_se = diff.std(axis=1, ddof=1) / math.sqrt(n_paths)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_stats = np.where(diff_se > 0, diff_mean / diff_se, 0.0)
+    p_values = np.where(diff_se > 0, _paired_p_values(t_stats), np.where(diff_mean != 0, 0.0, 1.0))
+
+    rules = list(triggered)
+    leaderboard = []
+    for rank, i in enumerate(order, start=1):
+        i = int(i)
+        leaderboard.append({
+            "rank": rank,
+            "config_name": configs[i].get("name", f"Config {i + 1}"),
+            "config": configs[i],
+            "exposure": round(float(exposure[i]), 6),
+            "triggered_rules": [r for r in rules if triggered[r][i]],
+            "trade_count": int(trade_count[i]),
+            "expected_pnl": round(float(expected[i]), 6),
+            "std_pnl": round(float(std[i]), 6),
+            "risk_adjusted": round(float(risk_adjusted[i]), 6),
+            "hit_rate": round(float(hit_rate[i]), 4),
+            "var_95": round(float(var_95[i]), 4),
+            "cvar_95": round(float(cvar_95[i]), 4),
+            "max_drawdown": round(float(max_drawdown[i]), 6),
+            "avg_slippage_est_bps": round(slippage_bps, 2),
+            "diff_vs_leader": round(float(diff_mean[i]), 6),
+            "t_stat": round(float(t_stats[i]), 4),
+            "p_value": round(float(p_values[i]), 6),
+            "significantly_worse": bool(i != leader and p_values[i] < SIGNIFICANCE_ALPHA and diff_mean[i] < 0),
+        })
+
+    result = {
+        "leaderboard": leaderboard,
+        "leader": leaderboard[0]["config_name"],
+        "n_configs": len(configs),
+        "n_paths": n_paths,
+        "n_steps": n_steps,
+        "horizon_hours": horizon_hours,
+        "seed": seed,
+        "significance_alpha": SIGNIFICANCE_ALPHA,
+        "ranked_by": "risk_adjusted",
+        "market_state_used": {
+            "current_price": current_price,
+            "volatility": market_state.get("volatility", 0.03),
+            "tariff_index": market_state.get("tariff_index", 0.0),
+            "tariff_rate_of_change": market_state.get("tariff_rate_of_change", 0.0),
+            "shock_score": market_state.get("shock_score", 0.0),
+            "vol_regime": market_state.get("vol_regime", "normal"),
+            "divergence_bps": market_state.get("divergence_bps", 0.0),
+            "funding_rate": market_state.get("funding_rate", 0.0),
+            "carry_score": market_state.get("carry_score", 0.0),
+        },
+        "ts": datetime.now(timezone.utc).isoformat(),
+    }
+    _latest_leaderboard = result
+    store = _shared_store()
+    if store is not None:
+        store.set_snapshot(LEADERBOARD_KEY, result)
+    return result
+
+
 def get_latest() -> dict[str, Any] | None:
-    return _latest_result
+    store = _shared_store()
+    return (store.get_snapshot(LATEST_KEY) if store else None) or _latest_result
+
+
+def get_latest_leaderboard() -> dict[str, Any] | None:
+    store = _shared_store()
+    return (store.get_snapshot(LEADERBOARD_KEY) if store else None) or _latest_leaderboard
 
 
 def get_history() -> list[dict[str, Any]]:
+    store = _shared_store()
+    r = store.get_redis() if store else None
+    if r is not None:
+        try:
+            return [json.loads(raw) for raw in r.lrange(HISTORY_KEY, 0, -1)]
+        except Exception:
+            logger.warning("Failed to read shared sandbox history", exc_info=True)
     return list(_history)
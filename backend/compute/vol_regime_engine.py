@@ -1,17 +1,69 @@
 import logging
 import math
 from datetime import datetime, timezone
-from typing import Any
+from typing import Any, Mapping
 
 logger = logging.getLogger(__name__)
 
 REGIMES = ["low_volatility", "normal_volatility", "high_volatility", "shock_regime", "liquidity_crunch"]
 
+VOL_STATE_KEYS = (
+    "desk:index:latest", "index:latest", "desk:shock:latest", "shock:latest",
+    "price:pyth:SOL_USD", "price:kraken:SOL_USD", "price:coingecko:SOL_USD",
+    "stablecoin:health:latest", "microstructure:latest", "execution:metrics:latest", "divergence:latest",
+)
+
 
 def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
+def collect_vol_state(snaps: Mapping[str, Any]) -> dict[str, Any]:
+    """Build the ``classify_regime`` input from the ``VOL_STATE_KEYS`` snapshots."""
+    state: dict[str, Any] = {}
+
+    idx = snaps.get("desk:index:latest") or snaps.get("index:latest")
+    if idx:
+        state["tariff_index"] = idx.get("value", 30.0)
+
+    shock = snaps.get("desk:shock:latest") or snaps.get("shock:latest")
+    if shock:
+        state["shock_score"] = shock.get("shock_score", 0.0)
+
+    for source in ["pyth", "kraken", "coingecko"]:
+        snap = snaps.get(f"price:{source}:SOL_USD")
+        if snap and "vol_annualized" in snap:
+            state["annualized_vol"] = snap["vol_annualized"]
+            break
+    if "annualized_vol" not in state:
+        state["annualized_vol"] = 0.45
+
+    stable = snaps.get("stablecoin:health:latest")
+    if stable:
+        assets = stable.get("assets", {})
+        if assets:
+            state["stable_health"] = sum(
+                1.0 - min(abs(a.get("depeg_bps", 0)) / 100.0, 1.0)
+                for a in assets.values()
+            ) / len(assets)
+
+    ms = snaps.get("microstructure:latest")
+    if ms:
+        state["orderbook_depth_score"] = max(0.0, 1.0 - abs(ms.get("imbalance", 0.0)))
+        state["funding_skew"] = ms.get("funding_rate", 0.0)
+
+    eqi = snaps.get("execution:metrics:latest")
+    if eqi:
+        state["exec_quality"] = eqi.get("eqi_score", 0.8)
+
+    div = snaps.get("divergence:latest")
+    if div:
+        alerts = div.get("alerts", [])
+        state["divergence_score"] = min(len(alerts) / 5.0, 1.0)
+
+    return state
+
+
 def classify_regime(state: dict[str, Any] | None = None) -> dict[str, Any]:
     state = state or {}
 
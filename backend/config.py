@@ -70,8 +70,36 @@ MAX_LEVERAGE: float = _env_float("MAX_LEVERAGE", 3.0)
 MAX_MARGIN_USAGE: float = _env_float("MAX_MARGIN_USAGE", 0.6)
 MAX_DAILY_LOSS: float = _env_float("MAX_DAILY_LOSS", 500.0)
 COOLDOWN_SECONDS: int = _env_int("COOLDOWN_SECONDS", 300)
+MAX_VENUE_NOTIONAL: float = _env_float("MAX_VENUE_NOTIONAL", 0.0)
+MAX_ASSET_NOTIONAL: float = _env_float("MAX_ASSET_NOTIONAL", 0.0)
 
 PRICE_FRESHNESS_THRESHOLD_S: int = _env_int("PRICE_FRESHNESS_THRESHOLD_S", 30)
+EQUITY_CACHE_DIR: str = _env("EQUITY_CACHE_DIR", "")
+EQUITY_CACHE_TTL_S: int = _env_int("EQUITY_CACHE_TTL_S", 900)
+EQUITY_FETCH_CONCURRENCY: int = _env_int("EQUITY_FETCH_CONCURRENCY", 8)
+
+HEDGE_CORR_WINDOW: int = _env_int("HEDGE_CORR_WINDOW", 30)
+HEDGE_EWMA_HALF_LIFE: float = _env_float("HEDGE_EWMA_HALF_LIFE", 0.0)
+
+PRETRADE_CONTEXT_TTL_MS: float = _env_float("PRETRADE_CONTEXT_TTL_MS", 250.0)
+
+MODEL_REGISTRY_DIR: str = _env("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "model_registry"))
+MODEL_REGISTRY_POLL_S: float = _env_float("MODEL_REGISTRY_POLL_S", 5.0)
+ML_TRAINING_WORKERS: int = _env_int("ML_TRAINING_WORKERS", 1)
+ML_TRAINING_MAX_PENDING: int = _env_int("ML_TRAINING_MAX_PENDING", 4)
+
+AGENT_TICK_MS: float = _env_float("AGENT_TICK_MS", 1000.0)
+AGENT_BUDGET_MS: float = _env_float("AGENT_BUDGET_MS", 250.0)
+AGENT_RUNTIME_WORKERS: int = _env_int("AGENT_RUNTIME_WORKERS", 16)
+PIPELINE_INTERVAL_S: float = _env_float("PIPELINE_INTERVAL_S", 5.0)
+PIPELINE_MAX_AGE_S: float = _env_float("PIPELINE_MAX_AGE_S", 60.0)
+
+STARTUP_IMPORT_BUDGET_MS: float = _env_float("STARTUP_IMPORT_BUDGET_MS", 1200.0)
+
+DESK_WORKERS: int = _env_int("DESK_WORKERS", _env_int("WEB_CONCURRENCY", 1))
+LEADER_LEASE_TTL_S: float = _env_float("LEADER_LEASE_TTL_S", 15.0)
+LEADER_RENEW_S: float = _env_float("LEADER_RENEW_S", 5.0)
+
 PRICE_INTEGRITY_BLOCK_LIVE: bool = _env("PRICE_INTEGRITY_BLOCK_LIVE", "1") in ("1", "true", "yes")
 
 LOG_LEVEL: str = _env("LOG_LEVEL", "INFO").upper()
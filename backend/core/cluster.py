@@ -0,0 +1,185 @@
+"""Multi-worker coordination.
+
+With ``DESK_WORKERS > 1`` (one process per uvicorn worker) every worker serves
+the API, but only the holder of a Redis lease runs the ingest scheduler, the
+signal pipeline and the order engines (conditional triggers, smart execution).
+Followers forward order-engine mutations to the leader through Redis command
+queues and read shared state from Redis or Postgres.  With a single worker the
+process is always the leader and none of this touches Redis.
+
+Ownership of mutable desk state in multi-worker mode:
+
+* paper positions: Redis hash ``paper:positions``, updated transactionally
+* conditional orders and smart executions: leader memory, persisted to Postgres
+* regime memory: written by the leader, followers reload it from Postgres periodically
+* sandbox history, training jobs, pipeline results: Redis snapshots
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from backend.config import DESK_WORKERS, LEADER_LEASE_TTL_S, LEADER_RENEW_S
+from backend.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+LEASE_PREFIX = "cluster:leader:"
+COMMAND_PREFIX = "cluster:commands:"
+
+_RENEW_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('pexpire', KEYS[1], ARGV[2]) else return 0 end"
+_RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def is_multi_worker() -> bool:
+    return DESK_WORKERS > 1
+
+
+class LeaderLease:
+    """Redis ``SET NX PX`` lease; the holder renews it every ``refresh`` call.
+
+    If Redis is unreachable the holder steps down rather than risk two
+    schedulers running at once; the lease is re-acquired on the next refresh.
+    """
+
+    def __init__(self, state_store: StateStore | None = None, name: str = "scheduler", ttl_s: float = LEADER_LEASE_TTL_S, worker_id: str = WORKER_ID):
+        self._store = state_store or StateStore()
+        self.key = f"{LEASE_PREFIX}{name}"
+        self.ttl_ms = int(ttl_s * 1000)
+        self.worker_id = worker_id
+        self._leader = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_leader(self) -> bool:
+        return self._leader
+
+    def _try_hold(self) -> bool:
+        r = self._store.get_redis()
+        if r is None:
+            return False
+        try:
+            if self._leader and r.eval(_RENEW_SCRIPT, 1, self.key, self.worker_id, self.ttl_ms):
+                return True
+            return bool(r.set(self.key, self.worker_id, nx=True, px=self.ttl_ms))
+        except Exception:
+            logger.warning("Leader lease refresh failed for %s", self.key, exc_info=True)
+            return False
+
+    def refresh(self) -> bool:
+        with self._lock:
+            held = self._try_hold()
+            changed = held != self._leader
+            self._leader = held
+        if changed:
+            logger.info("Worker %s %s leadership of %s", self.worker_id, "acquired" if held else "lost", self.key)
+        return held
+
+    def release(self) -> None:
+        with self._lock:
+            if not self._leader:
+                return
+            self._leader = False
+            r = self._store.get_redis()
+            if r is not None:
+                try:
+                    r.eval(_RELEASE_SCRIPT, 1, self.key, self.worker_id)
+                except Exception:
+                    logger.warning("Leader lease release failed for %s", self.key, exc_info=True)
+        logger.info("Worker %s released %s", self.worker_id, self.key)
+
+    def holder(self) -> str | None:
+        r = self._store.get_redis()
+        if r is None:
+            return None
+        try:
+            return r.get(self.key)
+        except Exception:
+            return None
+
+
+class CommandQueue:
+    """Redis list of ``{"op", "payload", "worker"}`` commands drained by the leader."""
+
+    def __init__(self, name: str, state_store: StateStore | None = None):
+        self._store = state_store or StateStore()
+        self.key = f"{COMMAND_PREFIX}{name}"
+
+    def push(self, op: str, payload: dict[str, Any]) -> bool:
+        r = self._store.get_redis()
+        if r is None:
+            return False
+        try:
+            r.rpush(self.key, json.dumps({"op": op, "payload": payload, "worker": WORKER_ID}, default=str))
+            return True
+        except Exception:
+            logger.warning("Failed to queue %s command on %s", op, self.key, exc_info=True)
+            return False
+
+    def drain(self, limit: int = 256) -> list[dict[str, Any]]:
+        r = self._store.get_redis()
+        if r is None:
+            return []
+        try:
+            pipe = r.pipeline()
+            pipe.lrange(self.key, 0, limit - 1)
+            pipe.ltrim(self.key, limit, -1)
+            raw, _ = pipe.execute()
+        except Exception:
+            logger.warning("Failed to drain %s", self.key, exc_info=True)
+            return []
+        commands = []
+        for item in raw:
+            try:
+                commands.append(json.loads(item))
+            except (TypeError, ValueError):
+                logger.warning("Dropping malformed command on %s", self.key)
+        return commands
+
+
+_lease: LeaderLease | None = None
+
+
+def get_leader_lease() -> LeaderLease:
+    global _lease
+    if _lease is None:
+        _lease = LeaderLease()
+    return _lease
+
+
+def is_leader() -> bool:
+    """True in single-worker mode, otherwise only on the worker holding the scheduler lease."""
+    return not is_multi_worker() or get_leader_lease().is_leader
+
+
+async def maintain_leadership(on_change: Callable[[bool], Awaitable[None]], lease: LeaderLease | None = None, renew_s: float = LEADER_RENEW_S) -> None:
+    """Refresh the lease every ``renew_s`` and await ``on_change(is_leader)`` on each transition."""
+    lease = lease or get_leader_lease()
+    leader = False
+    while True:
+        held = await asyncio.to_thread(lease.refresh)
+        if held != leader:
+            leader = held
+            try:
+                await on_change(held)
+            except Exception:
+                logger.error("Leadership change handler failed", exc_info=True)
+        await asyncio.sleep(renew_s)
+
+
+def status() -> dict[str, Any]:
+    lease = get_leader_lease()
+    return {
+        "workers": DESK_WORKERS,
+        "multi_worker": is_multi_worker(),
+        "worker_id": lease.worker_id,
+        "is_leader": is_leader(),
+        "leader": lease.holder() if is_multi_worker() else lease.worker_id,
+    }
@@ -1,5 +1,7 @@
 import os
 import json
+import queue
+import threading
 import uuid
 import logging
 from datetime import datetime, timezone
@@ -83,6 +85,7 @@ class EventType:
     BACKTEST_COMPLETED = "BACKTEST_COMPLETED"
     VOL_REGIME_CHANGED = "VOL_REGIME_CHANGED"
     PORTFOLIO_RISK_UPDATE = "PORTFOLIO_RISK_UPDATE"
+    SIGNAL_PIPELINE_UPDATED = "SIGNAL_PIPELINE_UPDATED"
     REDIS_DEGRADED = "REDIS_DEGRADED"
     REDIS_RECOVERED = "REDIS_RECOVERED"
     # Phase 7 — Execution + Risk Intelligence
@@ -106,6 +109,7 @@ class EventType:
     FEED_RECOVERED = "FEED_RECOVERED"
     PRICE_AUTHORITY_CHANGED = "PRICE_AUTHORITY_CHANGED"
     TRADE_DEBUG_REPLAY_RUN = "TRADE_DEBUG_REPLAY_RUN"
+    ORDER_BATCH_ROUTED = "ORDER_BATCH_ROUTED"
 
     ALL = [
         INDEX_UPDATE, SHOCK_SPIKE, DIVERGENCE_ALERT, FUNDING_REGIME_FLIP,
@@ -136,7 +140,7 @@ class EventType:
         CAPITAL_ALLOCATION_UPDATE, REBALANCE_PREVIEW_CREATED,
         ML_FEATURES_UPDATED, ML_MODEL_TRAINED, ML_INFERENCE_UPDATE,
         BACKTEST_STARTED, BACKTEST_COMPLETED,
-        VOL_REGIME_CHANGED, PORTFOLIO_RISK_UPDATE,
+        VOL_REGIME_CHANGED, PORTFOLIO_RISK_UPDATE, SIGNAL_PIPELINE_UPDATED,
         REDIS_DEGRADED, REDIS_RECOVERED,
         # Phase 7
         ALLOCATION_SIZE_ADJUSTED, ALLOCATION_LIMIT_BREACH,
@@ -148,11 +152,13 @@ class EventType:
         SMART_EXECUTION_COMPLETED, SMART_EXECUTION_ABORTED,
         STRATEGY_PERFORMANCE_UPDATE,
         FEED_STALE, FEED_ERROR, FEED_RECOVERED, PRICE_AUTHORITY_CHANGED,
-        TRADE_DEBUG_REPLAY_RUN,
+        TRADE_DEBUG_REPLAY_RUN, ORDER_BATCH_ROUTED,
     ]
 
 
 CHANNEL = "desk:events"
+EVENT_QUEUE_SIZE = 10_000
+EVENT_BATCH_SIZE = 200
 
 _CREATE_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS events (
@@ -167,17 +173,69 @@ CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts DESC);
 """
 
 
+class _EventDispatcher:
+    """Single daemon thread that delivers queued events in small batches."""
+
+    def __init__(self, maxsize: int = EVENT_QUEUE_SIZE):
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="event-dispatcher", daemon=True)
+                self._thread.start()
+
+    def submit(self, bus: "EventBus", event: dict[str, Any]) -> bool:
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((bus, event))
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < EVENT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            by_bus: dict[int, tuple["EventBus", list[dict[str, Any]]]] = {}
+            for bus, event in batch:
+                by_bus.setdefault(id(bus), (bus, []))[1].append(event)
+            for bus, events in by_bus.values():
+                try:
+                    bus._deliver(events)
+                except Exception:
+                    logger.warning("Background event delivery failed", exc_info=True)
+            for _ in batch:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+
+_dispatcher = _EventDispatcher()
+
+
 class EventBus:
 
     def __init__(
         self,
         redis_url: str | None = None,
         database_url: str | None = None,
+        background: bool = False,
     ):
         self._redis_url = redis_url or os.environ.get("REDIS_URL", "redis://localhost:6379")
         self._database_url = database_url or os.environ.get("DATABASE_URL", "")
         self._redis: redis.Redis | None = None
         self._table_ensured = False
+        self._background = background
 
     def _get_redis(self) -> redis.Redis | None:
         if self._redis is not None:
@@ -217,23 +275,14 @@ class EventBus:
         finally:
             conn.close()
 
-    def emit(self, event_type: str, source: str, payload: dict[str, Any] | None = None) -> str:
-        event_id = str(uuid.uuid4())
-        now = datetime.now(timezone.utc)
-        payload = payload or {}
-
-        event_data = {
-            "id": event_id,
-            "event_type": event_type,
-            "source": source,
-            "payload": payload,
-            "ts": now.isoformat(),
-        }
-
+    def _deliver(self, events: list[dict[str, Any]]) -> None:
         r = self._get_redis()
         if r is not None:
             try:
-                r.publish(CHANNEL, json.dumps(event_data, default=str))
+                pipe = r.pipeline(transaction=False)
+                for event in events:
+                    pipe.publish(CHANNEL, json.dumps(event, default=str))
+                pipe.execute()
             except Exception:
                 logger.warning("Failed to publish event to Redis", exc_info=True)
 
@@ -242,18 +291,42 @@ class EventBus:
         if conn is not None:
             try:
                 with conn.cursor() as cur:
-                    cur.execute(
+                    cur.executemany(
                         "INSERT INTO events (id, event_type, source, payload, ts) VALUES (%s, %s, %s, %s, %s)",
-                        (event_id, event_type, source, json.dumps(payload, default=str), now),
+                        [
+                            (e["id"], e["event_type"], e["source"], json.dumps(e["payload"], default=str), e["ts"])
+                            for e in events
+                        ],
                     )
             except Exception:
                 logger.warning("Failed to persist event to Postgres", exc_info=True)
             finally:
                 conn.close()
 
-        logger.info("Event emitted: %s from %s [%s]", event_type, source, event_id)
+    def emit(self, event_type: str, source: str, payload: dict[str, Any] | None = None) -> str:
+        event_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        payload = payload or {}
+
+        event_data = {
+            "id": event_id,
+            "event_type": event_type,
+            "source": source,
+            "payload": payload,
+            "ts": now.isoformat(),
+        }
+
+        if not (self._background and _dispatcher.submit(self, event_data)):
+            self._deliver([event_data])
+
+        logger.debug("Event emitted: %s from %s [%s]", event_type, source, event_id)
         return event_id
 
+    @staticmethod
+    def flush() -> None:
+        """Block until every background event queued so far is delivered."""
+        _dispatcher.flush()
+
     def get_recent(self, limit: int = 50) -> list[dict[str, Any]]:
         self._ensure_table()
         conn = self._get_pg_conn()
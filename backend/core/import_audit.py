@@ -0,0 +1,86 @@
+"""Startup import-time audit.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+reports the total import time, the slowest modules and which of the heavy
+analytics dependencies were pulled in.  The API keeps pandas, scikit-learn and
+yfinance off the startup path; they load on the first request that needs them.
+
+    python -m backend.core.import_audit [module] [--top N]
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+from backend.config import STARTUP_IMPORT_BUDGET_MS
+
+HEAVY_MODULES = ("pandas", "sklearn", "yfinance", "scipy", "joblib")
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, int]]:
+    """``(module, self_us, cumulative_us)`` for every line of ``-X importtime`` output."""
+    rows: list[tuple[str, int, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue
+        rows.append((parts[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def measure_startup(module: str = "main", top: int = 15, budget_ms: float = STARTUP_IMPORT_BUDGET_MS) -> dict[str, Any]:
+    env = {**os.environ, "START_LOCAL_REDIS": "0"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(_ROOT),
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {proc.stderr.strip().splitlines()[-1:]}")
+    rows = parse_importtime(proc.stderr)
+    total = next((cum for name, _, cum in reversed(rows) if name == module), sum(s for _, s, _ in rows))
+    loaded = {name for name, _, _ in rows}
+    total_ms = round(total / 1000.0, 1)
+    return {
+        "module": module,
+        "total_ms": total_ms,
+        "budget_ms": budget_ms,
+        "within_budget": total_ms <= budget_ms,
+        "module_count": len(rows),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+        "slowest": [
+            {"module": name, "self_ms": round(s / 1000.0, 1), "cumulative_ms": round(c / 1000.0, 1)}
+            for name, s, c in sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+        ],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    top = 15
+    if "--top" in args:
+        i = args.index("--top")
+        top = int(args[i + 1])
+        del args[i:i + 2]
+    report = measure_startup(args[0] if args else "main", top=top)
+    print(f"import {report['module']}: {report['total_ms']} ms (budget {report['budget_ms']} ms, {report['module_count']} modules)")
+    print(f"heavy modules loaded: {', '.join(report['heavy_loaded']) or 'none'}")
+    for row in report["slowest"]:
+        print(f"  {row['self_ms']:>8.1f} ms  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+    return 0 if report["within_budget"] and not report["heavy_loaded"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Deferred construction for module-level singletons.
+
+Routers hold their stores, repositories and engines as ``Lazy(factory)`` and
+call ``_x()`` at request time, so importing ``main`` builds none of them.
+"""
+import threading
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """Builds ``factory()`` on first call and returns the same instance afterwards."""
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._instance: T | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> T:
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+                instance = self._instance
+        return instance
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
@@ -39,52 +39,72 @@ class PriceResult:
         }
 
 
+def price_keys(symbol: str) -> list[tuple[str, str]]:
+    """(venue, cache key) pairs for ``symbol`` in authority priority order."""
+    symbol_key = symbol.upper().replace("/", "_").replace("-", "_")
+    return [(venue, f"{_CACHE_KEY_PREFIX}{venue}:{symbol_key}") for venue in _VENUE_PRIORITY]
+
+
+def _from_snapshot(symbol: str, venue: str, cached: dict[str, Any] | None) -> PriceResult | None:
+    try:
+        if cached is None:
+            return None
+        price = float(cached.get("price", 0))
+        if price <= 0:
+            return None
+        confidence = float(cached.get("confidence", 0.5))
+        ts_raw = cached.get("ts")
+        if ts_raw:
+            if isinstance(ts_raw, str):
+                try:
+                    ts = datetime.fromisoformat(ts_raw)
+                except ValueError:
+                    ts = datetime.now(timezone.utc)
+            elif isinstance(ts_raw, (int, float)):
+                ts = datetime.fromtimestamp(ts_raw, tz=timezone.utc)
+            else:
+                ts = datetime.now(timezone.utc)
+        else:
+            ts = datetime.now(timezone.utc)
+
+        logger.debug("Price hit for %s from %s: %.4f", symbol, venue, price)
+        return PriceResult(
+            price=price,
+            confidence=confidence,
+            source=venue,
+            ts=ts,
+            found=True,
+        )
+    except Exception:
+        logger.warning("Error reading price cache for %s/%s", venue, symbol, exc_info=True)
+        return None
+
+
+def _not_found(symbol: str) -> PriceResult:
+    logger.info("No cached price found for %s across venues %s", symbol, _VENUE_PRIORITY)
+    return PriceResult(price=0.0, confidence=0.0, source="none", found=False)
+
+
+def resolve_price(symbol: str, snapshots: list[tuple[str, dict[str, Any] | None]]) -> PriceResult:
+    """Pick the first usable price from ``(venue, snapshot)`` pairs in priority order."""
+    for venue, cached in snapshots:
+        result = _from_snapshot(symbol, venue, cached)
+        if result is not None:
+            return result
+    return _not_found(symbol)
+
+
 class PriceAuthority:
 
     def __init__(self, state_store: StateStore | None = None):
         self._store = state_store or StateStore()
 
     def get_price(self, symbol: str) -> PriceResult:
-        symbol_key = symbol.upper().replace("/", "_").replace("-", "_")
-
-        for venue in _VENUE_PRIORITY:
-            cache_key = f"{_CACHE_KEY_PREFIX}{venue}:{symbol_key}"
-            try:
-                cached = self._store.get_snapshot(cache_key)
-                if cached is None:
-                    continue
-                price = float(cached.get("price", 0))
-                if price <= 0:
-                    continue
-                confidence = float(cached.get("confidence", 0.5))
-                ts_raw = cached.get("ts")
-                if ts_raw:
-                    if isinstance(ts_raw, str):
-                        try:
-                            ts = datetime.fromisoformat(ts_raw)
-                        except ValueError:
-                            ts = datetime.now(timezone.utc)
-                    elif isinstance(ts_raw, (int, float)):
-                        ts = datetime.fromtimestamp(ts_raw, tz=timezone.utc)
-                    else:
-                        ts = datetime.now(timezone.utc)
-                else:
-                    ts = datetime.now(timezone.utc)
-
-                logger.debug("Price hit for %s from %s: %.4f", symbol, venue, price)
-                return PriceResult(
-                    price=price,
-                    confidence=confidence,
-                    source=venue,
-                    ts=ts,
-                    found=True,
-                )
-            except Exception:
-                logger.warning("Error reading price cache for %s/%s", venue, symbol, exc_info=True)
-                continue
-
-        logger.info("No cached price found for %s across venues %s", symbol, _VENUE_PRIORITY)
-        return PriceResult(price=0.0, confidence=0.0, source="none", found=False)
+        for venue, cache_key in price_keys(symbol):
+            result = _from_snapshot(symbol, venue, self._store.get_snapshot(cache_key))
+            if result is not None:
+                return result
+        return _not_found(symbol)
 
     def set_price(self, symbol: str, venue: str, price: float, confidence: float = 1.0) -> None:
         symbol_key = symbol.upper().replace("/", "_").replace("-", "_")
@@ -10,6 +10,7 @@ logger = logging.getLogger(__name__)
 
 _THROTTLE_KEY = "risk:throttle"
 _IDEMPOTENCY_PREFIX = "idem:"
+_ALERT_THROTTLE_PREFIX = "throttle:"
 
 
 class StateStore:
@@ -63,6 +64,26 @@ class StateStore:
             logger.warning("Failed to get snapshot for key=%s", key, exc_info=True)
             return None
 
+    def get_snapshots(self, keys: list[str] | tuple[str, ...]) -> dict[str, Any]:
+        """Read several snapshots with one MGET; missing or unreadable keys map to None."""
+        result: dict[str, Any] = dict.fromkeys(keys)
+        r = self.get_redis()
+        if r is None or not keys:
+            return result
+        try:
+            raw_values = r.mget(list(keys))
+        except Exception:
+            logger.warning("Failed to get snapshots for %d keys", len(keys), exc_info=True)
+            return result
+        for key, raw in zip(keys, raw_values):
+            if raw is None:
+                continue
+            try:
+                result[key] = json.loads(raw)
+            except (TypeError, ValueError):
+                logger.warning("Failed to decode snapshot for key=%s", key)
+        return result
+
     def set_risk_throttle(self, on: bool, reason: str = "", expiry_seconds: int = 300) -> bool:
         r = self.get_redis()
         if r is None:
@@ -101,6 +122,16 @@ class StateStore:
             logger.warning("Failed to get risk throttle", exc_info=True)
             return {"active": False, "reason": "", "ts": ""}
 
+    def check_throttle(self, name: str, cooldown_seconds: int = 60) -> bool:
+        r = self.get_redis()
+        if r is None:
+            return True
+        try:
+            return bool(r.set(f"{_ALERT_THROTTLE_PREFIX}{name}", "1", ex=cooldown_seconds, nx=True))
+        except Exception:
+            logger.warning("Failed to check throttle name=%s", name, exc_info=True)
+            return True
+
     def set_idempotency_key(self, key: str, ttl: int = 60) -> bool:
         r = self.get_redis()
         if r is None:
@@ -61,6 +61,7 @@ CREATE INDEX IF NOT EXISTS idx_events_event_type ON events (event_type);
 CREATE INDEX IF NOT EXISTS idx_index_history_ts ON index_history (ts DESC);
 CREATE INDEX IF NOT EXISTS idx_market_ticks_ts ON market_ticks (ts DESC);
 CREATE INDEX IF NOT EXISTS idx_market_ticks_venue ON market_ticks (venue);
+CREATE INDEX IF NOT EXISTS idx_market_ticks_symbol_ts ON market_ticks (symbol, ts);
 CREATE INDEX IF NOT EXISTS idx_funding_ticks_ts ON funding_ticks (ts DESC);
 CREATE INDEX IF NOT EXISTS idx_positions_ts ON positions (ts DESC);
 CREATE INDEX IF NOT EXISTS idx_paper_trades_ts ON paper_trades (ts DESC);
@@ -78,6 +79,10 @@ CREATE TABLE IF NOT EXISTS regime_snapshots (
 );
 
 CREATE INDEX IF NOT EXISTS idx_regime_snapshots_ts ON regime_snapshots (ts DESC);
+ALTER TABLE regime_snapshots ADD COLUMN IF NOT EXISTS return_3d FLOAT;
+CREATE INDEX IF NOT EXISTS idx_regime_snapshots_key ON regime_snapshots (shock_state, funding_regime, vol_regime);
+CREATE INDEX IF NOT EXISTS idx_regime_snapshots_unlabelled ON regime_snapshots (ts)
+    WHERE return_4h IS NULL OR return_24h IS NULL OR return_3d IS NULL;
 
 CREATE TABLE IF NOT EXISTS stablecoin_ticks (
     id SERIAL PRIMARY KEY,
@@ -108,6 +113,18 @@ CREATE TABLE IF NOT EXISTS conditional_orders (
 );
 CREATE INDEX IF NOT EXISTS idx_conditional_orders_status ON conditional_orders (status);
 
+CREATE TABLE IF NOT EXISTS smart_executions (
+    exec_id VARCHAR(64) PRIMARY KEY,
+    venue VARCHAR(50) NOT NULL,
+    market VARCHAR(50) NOT NULL,
+    status VARCHAR(30) NOT NULL DEFAULT 'active',
+    plan JSONB NOT NULL DEFAULT '{}',
+    next_slice_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_smart_executions_status ON smart_executions (status);
+
 CREATE TABLE IF NOT EXISTS agent_signal_history (
     id SERIAL PRIMARY KEY,
     agent VARCHAR(100) NOT NULL,
@@ -119,3 +136,26 @@ CREATE TABLE IF NOT EXISTS agent_signal_history (
     ts TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 CREATE INDEX IF NOT EXISTS idx_agent_signal_history_ts ON agent_signal_history (ts DESC);
+
+CREATE TABLE IF NOT EXISTS ml_features (
+    id SERIAL PRIMARY KEY,
+    symbol VARCHAR(20) NOT NULL,
+    price FLOAT NOT NULL DEFAULT 0.0,
+    tariff_index FLOAT NOT NULL,
+    tariff_delta FLOAT NOT NULL,
+    shock_score FLOAT NOT NULL,
+    shock_abs FLOAT NOT NULL,
+    funding_skew FLOAT NOT NULL,
+    basis_spread FLOAT NOT NULL,
+    vol_regime_encoded FLOAT NOT NULL,
+    stable_health FLOAT NOT NULL,
+    stable_flow FLOAT NOT NULL,
+    divergence_score FLOAT NOT NULL,
+    orderbook_imbalance FLOAT NOT NULL,
+    liquidity_score FLOAT NOT NULL,
+    slippage_score FLOAT NOT NULL,
+    exec_quality FLOAT NOT NULL,
+    predictor_conf FLOAT NOT NULL,
+    ts TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_ml_features_symbol_ts ON ml_features (symbol, ts);
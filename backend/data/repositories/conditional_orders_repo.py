@@ -0,0 +1,75 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from backend.data.db import execute_query, execute_write
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = "id, venue, market, side, size, order_type, trigger_price, limit_price, trailing_amount, parent_id, status, payload, created_at, updated_at"
+
+
+class ConditionalOrderRepository:
+
+    def save_orders(self, orders: list[dict]) -> int:
+        if not orders:
+            return 0
+        now = datetime.now(timezone.utc)
+        try:
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(orders))
+            params = [
+                v
+                for o in orders
+                for v in (
+                    o["id"], o.get("venue", "paper"), o["market"], o["side"], float(o["size"]), o["order_type"],
+                    o.get("trigger_price"), o.get("limit_price"), o.get("trailing_amount"), o.get("parent_id"),
+                    o["status"], json.dumps(o, default=str), o.get("created_at") or now, now,
+                )
+            ]
+            return execute_write(
+                f"""INSERT INTO conditional_orders ({_COLUMNS}) VALUES {placeholders}
+                    ON CONFLICT (id) DO UPDATE
+                    SET status = EXCLUDED.status, payload = EXCLUDED.payload, updated_at = EXCLUDED.updated_at""",
+                params,
+            )
+        except Exception:
+            logger.error("Failed to save conditional orders", exc_info=True)
+            return 0
+
+    def save_order(self, order: dict) -> bool:
+        return self.save_orders([order]) > 0
+
+    def get_active(self) -> list[dict]:
+        try:
+            rows = execute_query(
+                """SELECT payload FROM conditional_orders
+                   WHERE status IN ('active', 'parent_bracket')
+                   ORDER BY created_at ASC"""
+            )
+            return [r["payload"] if isinstance(r["payload"], dict) else json.loads(r["payload"]) for r in rows]
+        except Exception:
+            logger.error("Failed to load active conditional orders", exc_info=True)
+            return []
+
+    def get_order(self, order_id: str) -> dict | None:
+        try:
+            rows = execute_query("SELECT payload FROM conditional_orders WHERE id = %s", (order_id,))
+            if not rows:
+                return None
+            payload = rows[0]["payload"]
+            return payload if isinstance(payload, dict) else json.loads(payload)
+        except Exception:
+            logger.error("Failed to load conditional order %s", order_id, exc_info=True)
+            return None
+
+    def get_recent(self, limit: int = 500) -> list[dict]:
+        """The newest ``limit`` orders, oldest first like the leader's in-memory book."""
+        try:
+            rows = execute_query(
+                "SELECT payload FROM conditional_orders ORDER BY created_at DESC LIMIT %s",
+                (limit,),
+            )
+            return [r["payload"] if isinstance(r["payload"], dict) else json.loads(r["payload"]) for r in reversed(rows)]
+        except Exception:
+            logger.error("Failed to load conditional orders", exc_info=True)
+            return []
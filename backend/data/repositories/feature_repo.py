@@ -0,0 +1,91 @@
+import logging
+from datetime import datetime, timezone
+
+from backend.data.db import execute_query, execute_returning
+from backend.data.repositories.regime_repo import LABEL_SYMBOLS, TICK_TOLERANCE_S
+from backend.ml.feature_store import FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+_FEATURE_COLUMNS = ", ".join(FEATURE_NAMES)
+
+
+class FeatureRepository:
+
+    def save_row(self, symbol: str, price: float, features: dict[str, float], ts: datetime | None = None) -> dict | None:
+        placeholders = ", ".join(["%s"] * (len(FEATURE_NAMES) + 3))
+        try:
+            return execute_returning(
+                f"""INSERT INTO ml_features (symbol, price, {_FEATURE_COLUMNS}, ts)
+                   VALUES ({placeholders}) RETURNING id, symbol, price, ts""",
+                (symbol, price, *(features.get(name, 0.0) for name in FEATURE_NAMES), ts or datetime.now(timezone.utc)),
+            )
+        except Exception:
+            logger.error("Failed to save ML feature row", exc_info=True)
+            return None
+
+    def get_window(self, start: datetime, end: datetime, symbol: str = "SOL_USD", limit: int = 50_000) -> list[dict]:
+        try:
+            return execute_query(
+                f"""SELECT ts, price, {_FEATURE_COLUMNS} FROM ml_features
+                   WHERE symbol = %s AND ts >= %s AND ts < %s
+                   ORDER BY ts LIMIT %s""",
+                (symbol, start, end, limit),
+            )
+        except Exception:
+            logger.error("Failed to load ML feature window", exc_info=True)
+            return []
+
+    def get_training_rows(
+        self,
+        start: datetime,
+        end: datetime,
+        horizon_seconds: int,
+        symbol: str = "SOL_USD",
+        label_symbols: list[str] | None = None,
+    ) -> list[dict]:
+        """Feature rows in ``[start, end)`` joined to their forward return.
+
+        The label is the first tick at or after ``ts + horizon`` (within
+        ``TICK_TOLERANCE_S``) and must itself be at or before ``end``, so a
+        training set cut at ``end`` only contains outcomes that were knowable
+        at ``end``.  Rows whose label has not been realised are dropped.
+        """
+        sql = f"""
+            SELECT f.ts, f.price, {", ".join(f"f.{name}" for name in FEATURE_NAMES)},
+                   fwd.price / f.price - 1.0 AS forward_return
+            FROM ml_features f
+            JOIN LATERAL (
+                SELECT t.price FROM market_ticks t
+                WHERE t.symbol = ANY(%(label_symbols)s)
+                  AND t.ts >= f.ts + make_interval(secs => %(horizon)s)
+                  AND t.ts < f.ts + make_interval(secs => %(horizon)s + %(tolerance)s)
+                  AND t.ts <= %(end)s
+                ORDER BY t.ts LIMIT 1
+            ) fwd ON TRUE
+            WHERE f.symbol = %(symbol)s
+              AND f.price > 0
+              AND f.ts >= %(start)s
+              AND f.ts < %(end)s
+            ORDER BY f.ts
+        """
+        try:
+            return execute_query(sql, {
+                "label_symbols": label_symbols or LABEL_SYMBOLS,
+                "horizon": horizon_seconds,
+                "tolerance": TICK_TOLERANCE_S,
+                "symbol": symbol,
+                "start": start,
+                "end": end,
+            })
+        except Exception:
+            logger.error("Failed to load ML training rows", exc_info=True)
+            return []
+
+    def count(self, symbol: str = "SOL_USD") -> int:
+        try:
+            row = execute_returning("SELECT COUNT(*) AS n FROM ml_features WHERE symbol = %s", (symbol,))
+            return int(row["n"]) if row else 0
+        except Exception:
+            logger.error("Failed to count ML feature rows", exc_info=True)
+            return 0
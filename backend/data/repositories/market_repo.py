@@ -2,7 +2,7 @@ import json
 import logging
 from datetime import datetime, timezone
 
-from backend.data.db import execute_query, execute_returning
+from backend.data.db import execute_query, execute_returning, execute_write
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +26,21 @@ class MarketRepository:
             logger.error("Failed to save market tick", exc_info=True)
             return None
 
+    def save_ticks(self, ticks: list[tuple[str, str, float]]) -> int:
+        if not ticks:
+            return 0
+        now = datetime.now(timezone.utc)
+        try:
+            placeholders = ", ".join(["(%s, %s, %s, %s)"] * len(ticks))
+            params = [v for symbol, venue, price in ticks for v in (symbol, venue, price, now)]
+            return execute_write(
+                f"INSERT INTO market_ticks (symbol, venue, price, ts) VALUES {placeholders}",
+                params,
+            )
+        except Exception:
+            logger.error("Failed to save market ticks", exc_info=True)
+            return 0
+
     def save_funding_tick(
         self,
         venue: str,
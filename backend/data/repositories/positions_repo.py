@@ -1,7 +1,7 @@
 import logging
 from datetime import datetime, timezone
 
-from backend.data.db import execute_query, execute_returning
+from backend.data.db import execute_query, execute_returning, execute_write
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +61,25 @@ class PositionsRepository:
             logger.error("Failed to save paper trade", exc_info=True)
             return None
 
+    def save_paper_trades(self, trades: list[dict]) -> int:
+        if not trades:
+            return 0
+        now = datetime.now(timezone.utc)
+        try:
+            placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(trades))
+            params = [
+                v
+                for t in trades
+                for v in (t["venue"], t["market"], t["side"], t["size"], t["price"], t.get("order_type", "limit"), t.get("status", "paper_filled"), now)
+            ]
+            return execute_write(
+                f"INSERT INTO paper_trades (venue, market, side, size, price, order_type, status, ts) VALUES {placeholders}",
+                params,
+            )
+        except Exception:
+            logger.error("Failed to save paper trades", exc_info=True)
+            return 0
+
     def get_paper_trades(self, limit: int = 50) -> list[dict]:
         try:
             return execute_query(
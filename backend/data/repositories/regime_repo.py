@@ -0,0 +1,112 @@
+import logging
+from datetime import datetime, timezone
+
+from backend.data.db import execute_query, execute_returning
+
+logger = logging.getLogger(__name__)
+
+HORIZON_SECONDS = {"return_4h": 4 * 3600, "return_24h": 24 * 3600, "return_3d": 72 * 3600}
+LABEL_SYMBOLS = ["SOL_USD", "SOL/USD", "SOLUSD"]
+TICK_TOLERANCE_S = 3600
+LABEL_LOOKBACK_S = HORIZON_SECONDS["return_3d"] + 4 * 86400
+
+_COLUMNS = "id, shock_state, funding_regime, vol_regime, tariff_index, price, return_4h, return_24h, return_3d, ts"
+
+
+class RegimeRepository:
+
+    def save_snapshot(
+        self,
+        shock_state: str,
+        funding_regime: str,
+        vol_regime: str,
+        tariff_index: float,
+        price: float,
+        ts: datetime | None = None,
+    ) -> dict | None:
+        try:
+            return execute_returning(
+                f"""INSERT INTO regime_snapshots (shock_state, funding_regime, vol_regime, tariff_index, price, ts)
+                   VALUES (%s, %s, %s, %s, %s, %s) RETURNING {_COLUMNS}""",
+                (shock_state, funding_regime, vol_regime, tariff_index, price, ts or datetime.now(timezone.utc)),
+            )
+        except Exception:
+            logger.error("Failed to save regime snapshot", exc_info=True)
+            return None
+
+    def get_recent(self, limit: int = 200_000) -> list[dict]:
+        try:
+            rows = execute_query(
+                f"SELECT {_COLUMNS} FROM regime_snapshots ORDER BY ts DESC LIMIT %s",
+                (limit,),
+            )
+            rows.reverse()
+            return rows
+        except Exception:
+            logger.error("Failed to load regime snapshots", exc_info=True)
+            return []
+
+    def update_returns(self, snapshot_id: int, return_4h: float | None, return_24h: float | None, return_3d: float | None) -> None:
+        try:
+            execute_returning(
+                """UPDATE regime_snapshots
+                   SET return_4h = COALESCE(%s, return_4h),
+                       return_24h = COALESCE(%s, return_24h),
+                       return_3d = COALESCE(%s, return_3d)
+                   WHERE id = %s RETURNING id""",
+                (return_4h, return_24h, return_3d, snapshot_id),
+            )
+        except Exception:
+            logger.error("Failed to update regime snapshot returns", exc_info=True)
+
+    def label_forward_returns(
+        self,
+        symbols: list[str] | None = None,
+        batch_size: int = 5000,
+        lookback_seconds: int = LABEL_LOOKBACK_S,
+    ) -> list[dict]:
+        """Fill elapsed forward-return horizons for unlabelled snapshots in one statement.
+
+        Each pending snapshot is joined to the first tick at or after
+        ``ts + horizon`` (within ``TICK_TOLERANCE_S``); only rows with at least
+        one new label are written back.
+        """
+        labels = ",\n".join(
+            f"""(SELECT t.price FROM market_ticks t
+                    WHERE t.symbol = ANY(%(symbols)s)
+                      AND t.ts >= p.ts + INTERVAL '{secs} seconds'
+                      AND t.ts < p.ts + INTERVAL '{secs + TICK_TOLERANCE_S} seconds'
+                    ORDER BY t.ts LIMIT 1) / p.price - 1.0 AS {col}"""
+            for col, secs in HORIZON_SECONDS.items()
+        )
+        sql = f"""
+            WITH pending AS (
+                SELECT id, price, ts FROM regime_snapshots
+                WHERE price > 0
+                  AND (return_4h IS NULL OR return_24h IS NULL OR return_3d IS NULL)
+                  AND ts <= NOW() - INTERVAL '{min(HORIZON_SECONDS.values())} seconds'
+                  AND ts >= NOW() - %(lookback)s * INTERVAL '1 second'
+                ORDER BY ts
+                LIMIT %(batch)s
+            ),
+            labels AS (
+                SELECT p.id,
+                {labels}
+                FROM pending p
+            )
+            UPDATE regime_snapshots s
+            SET return_4h = COALESCE(s.return_4h, l.return_4h),
+                return_24h = COALESCE(s.return_24h, l.return_24h),
+                return_3d = COALESCE(s.return_3d, l.return_3d)
+            FROM labels l
+            WHERE s.id = l.id
+              AND ((s.return_4h IS NULL AND l.return_4h IS NOT NULL)
+                OR (s.return_24h IS NULL AND l.return_24h IS NOT NULL)
+                OR (s.return_3d IS NULL AND l.return_3d IS NOT NULL))
+            RETURNING s.id, s.return_4h, s.return_24h, s.return_3d
+        """
+        try:
+            return execute_query(sql, {"symbols": symbols or LABEL_SYMBOLS, "lookback": lookback_seconds, "batch": batch_size})
+        except Exception:
+            logger.error("Failed to label regime snapshot returns", exc_info=True)
+            return []
@@ -0,0 +1,60 @@
+import json
+import logging
+from datetime import datetime, timezone
+
+from backend.data.db import execute_query, execute_write
+
+logger = logging.getLogger(__name__)
+
+
+class SmartExecutionRepository:
+
+    def save_plan(self, plan: dict) -> bool:
+        try:
+            execute_write(
+                """INSERT INTO smart_executions (exec_id, venue, market, status, plan, next_slice_at, created_at, updated_at)
+                   VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                   ON CONFLICT (exec_id) DO UPDATE
+                   SET status = EXCLUDED.status, plan = EXCLUDED.plan,
+                       next_slice_at = EXCLUDED.next_slice_at, updated_at = EXCLUDED.updated_at""",
+                (
+                    plan["exec_id"], plan["venue"], plan["market"], plan["status"], json.dumps(plan, default=str),
+                    plan.get("next_slice_at"), plan.get("created_at"), datetime.now(timezone.utc),
+                ),
+            )
+            return True
+        except Exception:
+            logger.error("Failed to save smart execution plan", exc_info=True)
+            return False
+
+    def get_active(self) -> list[dict]:
+        try:
+            rows = execute_query(
+                "SELECT plan FROM smart_executions WHERE status = 'active' ORDER BY next_slice_at ASC"
+            )
+            return [r["plan"] if isinstance(r["plan"], dict) else json.loads(r["plan"]) for r in rows]
+        except Exception:
+            logger.error("Failed to load active smart executions", exc_info=True)
+            return []
+
+    def get_plan(self, exec_id: str) -> dict | None:
+        try:
+            rows = execute_query("SELECT plan FROM smart_executions WHERE exec_id = %s", (exec_id,))
+            if not rows:
+                return None
+            plan = rows[0]["plan"]
+            return plan if isinstance(plan, dict) else json.loads(plan)
+        except Exception:
+            logger.error("Failed to load smart execution %s", exec_id, exc_info=True)
+            return None
+
+    def get_recent(self, limit: int = 20) -> list[dict]:
+        try:
+            rows = execute_query(
+                "SELECT plan FROM smart_executions ORDER BY created_at DESC LIMIT %s",
+                (limit,),
+            )
+            return [r["plan"] if isinstance(r["plan"], dict) else json.loads(r["plan"]) for r in rows]
+        except Exception:
+            logger.error("Failed to load recent smart executions", exc_info=True)
+            return []
@@ -1,19 +1,79 @@
+import json
 import uuid
 import logging
+import threading
+from collections import deque
+from collections.abc import Callable
 from datetime import datetime, timezone
 
+from backend.core.cluster import is_multi_worker
 from backend.core.event_bus import EventBus, EventType
 from backend.core.models import PositionState
+from backend.core.state_store import StateStore
 
 logger = logging.getLogger(__name__)
 
+PAPER_BOOK_KEY = "paper:positions"
+PAPER_BOOK_VERSION_KEY = "paper:positions:version"
+
+
+def apply_fill(positions: dict[str, dict], venue: str, market: str, side: str, size: float, price: float) -> None:
+    """Net a fill into ``positions`` (keyed ``venue:market``), averaging entry on adds."""
+    key = f"{venue}:{market}"
+    signed_size = size if side.lower() == "buy" else -size
+
+    if key in positions:
+        existing = positions[key]
+        old_size = existing["size"]
+        old_entry = existing["entry_price"]
+
+        new_size = old_size + signed_size
+
+        if abs(new_size) < 1e-12:
+            del positions[key]
+            return
+
+        if (old_size > 0 and signed_size > 0) or (old_size < 0 and signed_size < 0):
+            total_cost = abs(old_size) * old_entry + abs(signed_size) * price
+            new_entry = total_cost / abs(new_size) if abs(new_size) > 0 else price
+        else:
+            new_entry = old_entry if abs(new_size) >= abs(old_size) else price
+
+        existing["size"] = new_size
+        existing["entry_price"] = new_entry
+    else:
+        positions[key] = {
+            "venue": venue,
+            "market": market,
+            "size": signed_size,
+            "entry_price": price,
+            "pnl": 0.0,
+            "margin": 0.0,
+        }
+
 
 class PaperExecutor:
+    """Simulated fills against a paper book.
+
+    With ``shared=True`` (the default in multi-worker mode) the book lives in
+    the ``paper:positions`` Redis hash: each fill is applied in a WATCH/MULTI
+    transaction on its ``venue:market`` field and bumps a version counter, and
+    ``sync`` pulls fills made by other workers.  A fill that cannot be written
+    (Redis unreachable) is applied locally and queued; queued fills are replayed
+    into the shared book in order before the next fill or sync.
+    """
 
-    def __init__(self, event_bus: EventBus | None = None):
+    def __init__(self, event_bus: EventBus | None = None, state_store: StateStore | None = None, shared: bool | None = None):
         self.event_bus = event_bus or EventBus()
+        self.shared = is_multi_worker() if shared is None else shared
+        self._store = state_store or (StateStore() if self.shared else None)
+        self._book_version: str | None = None
+        self._pending_fills: deque[tuple[str, str, str, float, float]] = deque()
         self._positions: dict[str, dict] = {}
         self._orders: dict[str, dict] = {}
+        self._positions_view: list[dict] | None = None
+        self._position_listeners: list[Callable[[str, str, dict | None], None]] = []
+        self._lock = threading.Lock()
         self.enabled = True
         logger.info("PaperExecutor initialised (paper mode)")
 
@@ -26,16 +86,40 @@ class PaperExecutor:
         order_type: str = "limit",
         price: float | None = None,
         data_context: dict | None = None,
+        emit_events: bool = True,
     ) -> dict:
         order_id = str(uuid.uuid4())
         now = datetime.now(timezone.utc)
         fill_price = price if price is not None and price > 0 else 0.0
         ctx = data_context or {}
 
-        self.event_bus.emit(
-            EventType.ORDER_SENT,
-            source="paper_executor",
-            payload={
+        if emit_events:
+            self.event_bus.emit(
+                EventType.ORDER_SENT,
+                source="paper_executor",
+                payload={
+                    "order_id": order_id,
+                    "venue": venue,
+                    "market": market,
+                    "side": side,
+                    "size": size,
+                    "order_type": order_type,
+                    "price": fill_price,
+                    "tariff_ts": ctx.get("tariff_ts"),
+                    "shock_ts": ctx.get("shock_ts"),
+                    "price_ts": ctx.get("price_ts"),
+                    "price_source": ctx.get("price_source", "unknown"),
+                    "price_asof_ts": ctx.get("price_asof_ts"),
+                    "integrity_status": ctx.get("integrity_status", "OK"),
+                    "execution_mode": ctx.get("execution_mode", "paper"),
+                    "data_age_ms": ctx.get("data_age_ms"),
+                    "data_quality": ctx.get("data_quality", "OK"),
+                    "message": f"Paper {side.upper()} {size} {market} @ {fill_price:.4f}",
+                },
+            )
+
+        with self._lock:
+            self._orders[order_id] = {
                 "order_id": order_id,
                 "venue": venue,
                 "market": market,
@@ -43,56 +127,35 @@ class PaperExecutor:
                 "size": size,
                 "order_type": order_type,
                 "price": fill_price,
-                "tariff_ts": ctx.get("tariff_ts"),
-                "shock_ts": ctx.get("shock_ts"),
-                "price_ts": ctx.get("price_ts"),
-                "price_source": ctx.get("price_source", "unknown"),
-                "price_asof_ts": ctx.get("price_asof_ts"),
-                "integrity_status": ctx.get("integrity_status", "OK"),
-                "execution_mode": ctx.get("execution_mode", "paper"),
-                "data_age_ms": ctx.get("data_age_ms"),
-                "data_quality": ctx.get("data_quality", "OK"),
-                "message": f"Paper {side.upper()} {size} {market} @ {fill_price:.4f}",
-            },
-        )
-
-        self._orders[order_id] = {
-            "order_id": order_id,
-            "venue": venue,
-            "market": market,
-            "side": side,
-            "size": size,
-            "order_type": order_type,
-            "price": fill_price,
-            "status": "paper_filled",
-            "fill_price": fill_price,
-            "ts": now.isoformat(),
-        }
-
-        self._update_position(venue, market, side, size, fill_price)
-
-        self.event_bus.emit(
-            EventType.ORDER_FILLED,
-            source="paper_executor",
-            payload={
-                "order_id": order_id,
-                "venue": venue,
-                "market": market,
-                "side": side,
-                "size": size,
+                "status": "paper_filled",
                 "fill_price": fill_price,
-                "tariff_ts": ctx.get("tariff_ts"),
-                "shock_ts": ctx.get("shock_ts"),
-                "price_ts": ctx.get("price_ts"),
-                "price_source": ctx.get("price_source", "unknown"),
-                "price_asof_ts": ctx.get("price_asof_ts"),
-                "integrity_status": ctx.get("integrity_status", "OK"),
-                "execution_mode": ctx.get("execution_mode", "paper"),
-                "data_age_ms": ctx.get("data_age_ms"),
-                "data_quality": ctx.get("data_quality", "OK"),
-                "message": f"Paper {side.upper()} {size} {market} filled @ {fill_price:.4f}",
-            },
-        )
+                "ts": now.isoformat(),
+            }
+            self._update_position(venue, market, side, size, fill_price)
+
+        if emit_events:
+            self.event_bus.emit(
+                EventType.ORDER_FILLED,
+                source="paper_executor",
+                payload={
+                    "order_id": order_id,
+                    "venue": venue,
+                    "market": market,
+                    "side": side,
+                    "size": size,
+                    "fill_price": fill_price,
+                    "tariff_ts": ctx.get("tariff_ts"),
+                    "shock_ts": ctx.get("shock_ts"),
+                    "price_ts": ctx.get("price_ts"),
+                    "price_source": ctx.get("price_source", "unknown"),
+                    "price_asof_ts": ctx.get("price_asof_ts"),
+                    "integrity_status": ctx.get("integrity_status", "OK"),
+                    "execution_mode": ctx.get("execution_mode", "paper"),
+                    "data_age_ms": ctx.get("data_age_ms"),
+                    "data_quality": ctx.get("data_quality", "OK"),
+                    "message": f"Paper {side.upper()} {size} {market} filled @ {fill_price:.4f}",
+                },
+            )
 
         logger.info(
             "Paper order filled: %s %s %s size=%.4f price=%.4f id=%s",
@@ -119,6 +182,13 @@ class PaperExecutor:
         return {"order_id": order_id, "status": "not_found"}
 
     def get_positions(self) -> list[dict]:
+        with self._lock:
+            if self._positions_view is None:
+                self._positions_view = self._build_positions()
+            view = self._positions_view
+        return [dict(p) for p in view]
+
+    def _build_positions(self) -> list[dict]:
         results = []
         for key, pos in self._positions.items():
             size = pos["size"]
@@ -135,36 +205,109 @@ class PaperExecutor:
             )
         return results
 
-    def _update_position(self, venue: str, market: str, side: str, size: float, price: float) -> None:
-        key = f"{venue}:{market}"
-        signed_size = size if side.lower() == "buy" else -size
-
-        if key in self._positions:
-            existing = self._positions[key]
-            old_size = existing["size"]
-            old_entry = existing["entry_price"]
+    def add_position_listener(self, listener: Callable[[str, str, dict | None], None]) -> None:
+        """Call ``listener(venue, market, position)`` after every fill; ``position`` is None once flat."""
+        self._position_listeners.append(listener)
 
-            new_size = old_size + signed_size
+    def _notify_position(self, venue: str, market: str) -> None:
+        position = self._positions.get(f"{venue}:{market}")
+        for listener in self._position_listeners:
+            try:
+                listener(venue, market, position)
+            except Exception:
+                logger.error("Position listener failed for %s:%s", venue, market, exc_info=True)
 
-            if abs(new_size) < 1e-12:
-                del self._positions[key]
+    def _update_position(self, venue: str, market: str, side: str, size: float, price: float) -> None:
+        if self.shared:
+            if self._replay_pending() and self._apply_shared_fill(venue, market, side, size, price):
                 return
+            self._pending_fills.append((venue, market, side, size, price))
+            logger.warning("Queued paper fill for %s:%s until the shared book is reachable (%d pending)",
+                           venue, market, len(self._pending_fills))
+        self._apply_fill(venue, market, side, size, price)
+        self._notify_position(venue, market)
+
+    def _replay_pending(self) -> bool:
+        """Write queued fills to the shared book in order; True once none are left."""
+        while self._pending_fills:
+            if not self._apply_shared_fill(*self._pending_fills[0]):
+                return False
+            self._pending_fills.popleft()
+        return True
+
+    def _apply_shared_fill(self, venue: str, market: str, side: str, size: float, price: float) -> bool:
+        """Apply one fill to the shared book and adopt the resulting field locally."""
+        r = self._store.get_redis()
+        if r is None:
+            return False
+        field = f"{venue}:{market}"
+        result: dict[str, dict | None] = {}
 
-            if (old_size > 0 and signed_size > 0) or (old_size < 0 and signed_size < 0):
-                total_cost = abs(old_size) * old_entry + abs(signed_size) * price
-                new_entry = total_cost / abs(new_size) if abs(new_size) > 0 else price
+        def txn(pipe) -> None:
+            raw = pipe.hget(PAPER_BOOK_KEY, field)
+            book = {field: json.loads(raw)} if raw else {}
+            apply_fill(book, venue, market, side, size, price)
+            result["position"] = book.get(field)
+            pipe.multi()
+            if field in book:
+                pipe.hset(PAPER_BOOK_KEY, field, json.dumps(book[field]))
             else:
-                new_entry = old_entry if abs(new_size) >= abs(old_size) else price
+                pipe.hdel(PAPER_BOOK_KEY, field)
+            pipe.incr(PAPER_BOOK_VERSION_KEY)
 
-            existing["size"] = new_size
-            existing["entry_price"] = new_entry
+        try:
+            version = r.transaction(txn, PAPER_BOOK_KEY)[-1]
+        except Exception:
+            logger.warning("Shared paper book update failed for %s", field, exc_info=True)
+            return False
+
+        position = result["position"]
+        if position is None:
+            self._positions.pop(field, None)
         else:
-            self._positions[key] = {
-                "venue": venue,
-                "market": market,
-                "size": signed_size,
-                "entry_price": price,
-                "pnl": 0.0,
-                "margin": 0.0,
-            }
+            self._positions[field] = position
+        # Only our own write happened since the last sync: the local book is current.
+        if self._book_version is not None and int(version) == int(self._book_version) + 1:
+            self._book_version = str(version)
+        self._positions_view = None
+        self._notify_position(venue, market)
+        return True
+
+    def sync(self) -> int:
+        """Pull the shared book if another worker changed it; returns how many positions changed.
+
+        Listeners are notified for every changed key, so the risk engine's
+        exposure index tracks fills made on any worker.
+        """
+        if not self.shared:
+            return 0
+        with self._lock:
+            if not self._replay_pending():
+                return 0
+            r = self._store.get_redis()
+            if r is None:
+                return 0
+            try:
+                if r.get(PAPER_BOOK_VERSION_KEY) == self._book_version:
+                    return 0
+                pipe = r.pipeline()
+                pipe.get(PAPER_BOOK_VERSION_KEY)
+                pipe.hgetall(PAPER_BOOK_KEY)
+                version, raw = pipe.execute()
+            except Exception:
+                logger.warning("Shared paper book read failed", exc_info=True)
+                return 0
+            book = {key: json.loads(value) for key, value in raw.items()}
+            changed = [key for key in set(book) | set(self._positions) if book.get(key) != self._positions.get(key)]
+            self._positions = book
+            self._book_version = version
+            self._positions_view = None
+        for key in changed:
+            venue, _, market = key.partition(":")
+            self._notify_position(venue, market)
+        return len(changed)
 
+    def _apply_fill(self, venue: str, market: str, side: str, size: float, price: float) -> None:
+        """Net a fill into the local book; callers hold ``_lock``."""
+        apply_fill(self._positions, venue, market, side, size, price)
+        self._positions_view = None
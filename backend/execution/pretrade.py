@@ -0,0 +1,134 @@
+"""Pre-trade context and stage latency tracking for ExecutionRouter.
+
+Everything ``route_order`` needs from Redis before it can decide on an order —
+the venue price cascade for the symbol plus the index, integrity and
+microstructure snapshots — is fetched with a single MGET and shared by every
+order for that symbol within ``PRETRADE_CONTEXT_TTL_MS``.
+"""
+import json
+import logging
+import threading
+import time
+from typing import Any
+
+from backend.config import PRETRADE_CONTEXT_TTL_MS
+from backend.compute.quantile_sketch import DDSketch
+from backend.core.price_authority import PriceResult, price_keys, resolve_price
+from backend.core.state_store import StateStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOL = "SOL_USD"
+CONTEXT_KEYS = ("index:latest", "price:integrity", "microstructure:latest", "price:pyth:SOL_USD")
+
+
+def _loads(raw: Any) -> dict[str, Any] | None:
+    if raw is None:
+        return None
+    try:
+        value = json.loads(raw)
+        return value if isinstance(value, dict) else None
+    except (TypeError, ValueError):
+        return None
+
+
+class PreTradeContext:
+    __slots__ = ("symbol", "price", "snapshots", "loaded_at")
+
+    def __init__(self, symbol: str, price: PriceResult, snapshots: dict[str, dict[str, Any] | None], loaded_at: float):
+        self.symbol = symbol
+        self.price = price
+        self.snapshots = snapshots
+        self.loaded_at = loaded_at
+
+    def snapshot(self, key: str) -> dict[str, Any] | None:
+        return self.snapshots.get(key)
+
+
+class PreTradeContextCache:
+
+    def __init__(self, state_store: StateStore | None = None, ttl_ms: float = PRETRADE_CONTEXT_TTL_MS):
+        self._store = state_store or StateStore()
+        self.ttl_seconds = max(ttl_ms, 0.0) / 1000.0
+        self._cache: dict[str, PreTradeContext] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, symbol: str) -> PreTradeContext:
+        venue_keys = price_keys(symbol)
+        keys = [key for _, key in venue_keys] + list(CONTEXT_KEYS)
+        raw_values: list[Any] = [None] * len(keys)
+        r = self._store.get_redis()
+        if r is not None:
+            try:
+                raw_values = r.mget(keys)
+            except Exception:
+                logger.warning("Pre-trade context read failed for %s", symbol, exc_info=True)
+        parsed = [_loads(raw) for raw in raw_values]
+        n = len(venue_keys)
+        price = resolve_price(symbol, [(venue, snap) for (venue, _), snap in zip(venue_keys, parsed[:n])])
+        return PreTradeContext(symbol, price, dict(zip(CONTEXT_KEYS, parsed[n:])), time.monotonic())
+
+    def get(self, symbol: str = DEFAULT_SYMBOL) -> PreTradeContext:
+        now = time.monotonic()
+        with self._lock:
+            ctx = self._cache.get(symbol)
+        if ctx is not None and now - ctx.loaded_at < self.ttl_seconds:
+            return ctx
+        ctx = self._load(symbol)
+        with self._lock:
+            self._cache[symbol] = ctx
+        return ctx
+
+    def invalidate(self, symbol: str | None = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(symbol, None)
+
+
+class StageLatency:
+    """Lifetime latency quantiles per ``route_order`` stage, in milliseconds."""
+
+    def __init__(self):
+        self._sketches: dict[str, DDSketch] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            sketch = self._sketches.get(stage)
+            if sketch is None:
+                sketch = self._sketches[stage] = DDSketch()
+            sketch.add(seconds * 1000.0)
+
+    def clock(self) -> "StageClock":
+        return StageClock(self)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                stage: {
+                    "count": sketch.count,
+                    "p50_ms": round(sketch.quantile(0.50), 3),
+                    "p99_ms": round(sketch.quantile(0.99), 3),
+                    "mean_ms": round(sketch.mean, 3),
+                    "max_ms": round(sketch.max, 3),
+                }
+                for stage, sketch in self._sketches.items()
+            }
+
+
+class StageClock:
+    __slots__ = ("_latency", "_start", "_last")
+
+    def __init__(self, latency: StageLatency):
+        self._latency = latency
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = time.perf_counter()
+        self._latency.record(stage, now - self._last)
+        self._last = now
+
+    def total(self, stage: str = "total") -> None:
+        self._latency.record(stage, time.perf_counter() - self._start)
@@ -1,13 +1,18 @@
+import time
+import uuid
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 from backend.config import EXECUTION_MODE, PRICE_FRESHNESS_THRESHOLD_S, PRICE_INTEGRITY_BLOCK_LIVE
 from backend.core.event_bus import EventBus, EventType
 from backend.core.state_store import StateStore
-from backend.core.price_authority import PriceAuthority
-from backend.compute.risk_engine import RiskEngine
+from backend.compute.risk_engine import RiskEngine, get_risk_engine
+from backend.compute.execution_metrics import get_execution_metrics
 from backend.agents.execution_agent import ExecutionAgent
 from backend.execution.paper_exec import PaperExecutor
+from backend.execution.pretrade import PreTradeContext, PreTradeContextCache, StageClock, StageLatency
 from backend.execution.hyperliquid_exec import HyperliquidExecutor
 from backend.execution.drift_exec import DriftExecutor
 
@@ -24,14 +29,16 @@ def _symbol_from_market(market: str) -> str:
 class ExecutionRouter:
 
     def __init__(self, event_bus: EventBus | None = None, risk_engine: RiskEngine | None = None):
-        self.event_bus = event_bus or EventBus()
-        self.risk_engine = risk_engine or RiskEngine()
+        self.event_bus = event_bus or EventBus(background=True)
+        self.risk_engine = risk_engine or get_risk_engine()
         self.mode = EXECUTION_MODE
         self._store = StateStore()
-        self._price_authority = PriceAuthority(state_store=self._store)
+        self._pretrade = PreTradeContextCache(state_store=self._store)
+        self.latency = StageLatency()
         self._exec_agent = ExecutionAgent()
 
         self.paper = PaperExecutor(event_bus=self.event_bus)
+        self.paper.add_position_listener(self.risk_engine.on_position)
 
         self.hyperliquid: HyperliquidExecutor | None = None
         self.drift: DriftExecutor | None = None
@@ -49,9 +56,8 @@ class ExecutionRouter:
 
         logger.info("ExecutionRouter initialised mode=%s", self.mode)
 
-    def _get_live_price(self, market: str) -> dict:
-        symbol = _symbol_from_market(market)
-        result = self._price_authority.get_price(symbol)
+    def _get_live_price(self, market: str, ctx: PreTradeContext | None = None) -> dict:
+        result = (ctx or self._pretrade.get(_symbol_from_market(market))).price
         now = datetime.now(timezone.utc)
 
         if not result.found or result.price <= 0:
@@ -76,11 +82,12 @@ class ExecutionRouter:
             "found": True,
         }
 
-    def _get_data_context(self, live_price: dict | None = None) -> dict:
+    def _get_data_context(self, live_price: dict | None = None, pretrade: PreTradeContext | None = None) -> dict:
+        pretrade = pretrade or self._pretrade.get()
         ctx = {"execution_mode": self.mode}
         now = datetime.now(timezone.utc)
 
-        idx = self._store.get_snapshot("index:latest")
+        idx = pretrade.snapshot("index:latest")
         if idx:
             ctx["tariff_ts"] = idx.get("ts", now.isoformat())
             ctx["shock_ts"] = idx.get("ts", now.isoformat())
@@ -94,7 +101,7 @@ class ExecutionRouter:
             ctx["price_asof_ts"] = live_price["ts"]
             ctx["data_age_ms"] = int(live_price["age_s"] * 1000)
         else:
-            price_snap = self._store.get_snapshot("price:pyth:SOL_USD")
+            price_snap = pretrade.snapshot("price:pyth:SOL_USD")
             if price_snap:
                 ctx["price_ts"] = price_snap.get("ts", now.isoformat())
                 ctx["price_source"] = "pyth"
@@ -109,7 +116,7 @@ class ExecutionRouter:
                 ctx["price_ts"] = now.isoformat()
                 ctx["price_source"] = "none"
 
-        integrity = self._store.get_snapshot("price:integrity")
+        integrity = pretrade.snapshot("price:integrity")
         if integrity:
             ctx["integrity_status"] = integrity.get("status", "OK")
         else:
@@ -117,19 +124,28 @@ class ExecutionRouter:
 
         return ctx
 
-    def _get_market_state(self) -> dict:
+    def _get_market_state(self, pretrade: PreTradeContext | None = None) -> dict:
+        pretrade = pretrade or self._pretrade.get()
         ms = {}
-        micro = self._store.get_snapshot("microstructure:latest")
+        micro = pretrade.snapshot("microstructure:latest")
         if micro:
             ms["spread_bps"] = micro.get("spread_bps", 0)
             ms["liquidity_depth"] = micro.get("liquidity_depth", 0)
-        integrity = self._store.get_snapshot("price:integrity")
+        integrity = pretrade.snapshot("price:integrity")
         if integrity:
             ms["price_integrity"] = integrity.get("status", "OK")
         else:
             ms["price_integrity"] = "OK"
         return ms
 
+    def get_live_price(self, market: str) -> dict:
+        """Latest price for ``market`` with its source, age and freshness flag."""
+        return self._get_live_price(market)
+
+    def get_market_state(self, market: str | None = None) -> dict:
+        """Spread, book depth and price-integrity status from the pre-trade snapshot."""
+        return self._get_market_state(self._pretrade.get(_symbol_from_market(market)) if market else None)
+
     def route_order(
         self,
         venue: str,
@@ -138,12 +154,21 @@ class ExecutionRouter:
         size: float,
         price: float | None = None,
     ) -> dict:
+        clock = self.latency.clock()
+        try:
+            return self._route_order(venue, market, side, size, price, clock)
+        finally:
+            clock.total()
+
+    def _route_order(self, venue: str, market: str, side: str, size: float, price: float | None, clock: StageClock) -> dict:
         now = datetime.now(timezone.utc)
 
-        live_price_info = self._get_live_price(market)
+        pretrade = self._pretrade.get(_symbol_from_market(market))
+        live_price_info = self._get_live_price(market, pretrade)
         fill_price = price if price is not None and price > 0 else live_price_info.get("price", 0.0)
 
-        data_ctx = self._get_data_context(live_price_info)
+        data_ctx = self._get_data_context(live_price_info, pretrade)
+        clock.lap("context")
 
         if not live_price_info.get("found") and fill_price <= 0:
             self.event_bus.emit(
@@ -228,7 +253,6 @@ class ExecutionRouter:
                     },
                 )
 
-        positions = self.paper.get_positions()
         proposed = {
             "venue": venue,
             "market": market,
@@ -237,7 +261,9 @@ class ExecutionRouter:
             "price": fill_price,
         }
 
-        allowed, reasons = self.risk_engine.check_constraints(positions, proposed, execution_mode=self.mode)
+        self.paper.sync()
+        allowed, reasons = self.risk_engine.check_constraints(None, proposed, execution_mode=self.mode)
+        clock.lap("risk")
         if not allowed:
             self.event_bus.emit(
                 EventType.RISK_THROTTLE_ON,
@@ -253,8 +279,9 @@ class ExecutionRouter:
             }
 
         if self.mode == "live":
-            market_state = self._get_market_state()
+            market_state = self._get_market_state(pretrade)
             check = self._exec_agent.pre_trade_check(proposed, market_state)
+            clock.lap("agent")
             if not check.get("allowed", True):
                 self.event_bus.emit(
                     EventType.AGENT_BLOCKED,
@@ -279,6 +306,7 @@ class ExecutionRouter:
                 venue=venue, market=market, side=side, size=size, price=fill_price,
                 data_context=data_ctx,
             )
+            clock.lap("execute")
             result["execution_mode"] = "paper"
             return result
 
@@ -293,9 +321,12 @@ class ExecutionRouter:
             return result
 
         try:
+            order_ts = time.time()
             result = executor.place_order(
                 market=market, side=side, size=size, price=fill_price,
             )
+            clock.lap("execute")
+            self._record_fill(order_ts, venue, market, size, fill_price, result, market_state)
             result["execution_mode"] = "live"
             result["venue"] = venue
             result.update(data_ctx)
@@ -309,6 +340,199 @@ class ExecutionRouter:
             result["execution_mode"] = "paper_fallback"
             return result
 
+    def route_orders(self, orders: list[dict]) -> dict:
+        clock = self.latency.clock()
+        try:
+            return self._route_orders(orders, clock)
+        finally:
+            clock.total("batch_total")
+
+    def _route_orders(self, orders: list[dict], clock: StageClock) -> dict:
+        now = datetime.now(timezone.utc)
+        batch_id = str(uuid.uuid4())
+
+        contexts: dict[str, PreTradeContext] = {}
+        live_prices: dict[str, dict] = {}
+        data_ctxs: dict[str, dict] = {}
+        for order in orders:
+            market = order["market"]
+            if market in live_prices:
+                continue
+            symbol = _symbol_from_market(market)
+            if symbol not in contexts:
+                contexts[symbol] = self._pretrade.get(symbol)
+            live_prices[market] = self._get_live_price(market, contexts[symbol])
+            data_ctxs[market] = self._get_data_context(live_prices[market], contexts[symbol])
+
+        proposed = []
+        reasons = []
+        for order in orders:
+            market = order["market"]
+            live = live_prices[market]
+            price = order.get("price")
+            fill_price = price if price is not None and price > 0 else live.get("price", 0.0)
+            if not live.get("found") and fill_price <= 0:
+                reasons.append(f"No price data available for {market}")
+            elif not live.get("fresh", True) and live.get("found"):
+                if self.mode == "live":
+                    reasons.append(f"Price data stale for {market} ({live.get('age_s', 0):.0f}s old)")
+                else:
+                    data_ctxs[market]["data_quality"] = "DEGRADED"
+            if data_ctxs[market].get("integrity_status") == "WARNING":
+                if self.mode == "live" and PRICE_INTEGRITY_BLOCK_LIVE:
+                    reasons.append(f"Price integrity WARNING for {market}")
+                else:
+                    data_ctxs[market]["data_quality"] = data_ctxs[market].get("data_quality", "DEGRADED")
+            proposed.append({
+                "venue": order.get("venue", "paper"),
+                "market": market,
+                "side": order["side"],
+                "size": order["size"],
+                "price": fill_price,
+            })
+        clock.lap("batch_context")
+
+        summary = {"batch_id": batch_id, "n_orders": len(proposed), "execution_mode": self.mode}
+        if reasons:
+            reasons = list(dict.fromkeys(reasons))
+            self.event_bus.emit(
+                EventType.TRADE_BLOCKED_STALE_DATA,
+                source="execution_router",
+                payload={**summary, "reason": "; ".join(reasons), "orders": proposed},
+            )
+            return {"status": "blocked", "reasons": reasons, **summary, "orders": proposed, "ts": now.isoformat()}
+
+        self.paper.sync()
+        allowed, reasons = self.risk_engine.check_batch(None, proposed, execution_mode=self.mode)
+        clock.lap("batch_risk")
+        if not allowed:
+            self.event_bus.emit(
+                EventType.RISK_THROTTLE_ON,
+                source="execution_router",
+                payload={**summary, "reasons": reasons, "proposed": proposed},
+            )
+            logger.warning("Order batch %s blocked by risk engine: %s", batch_id[:8], reasons)
+            return {"status": "blocked", "reasons": reasons, **summary, "orders": proposed, "ts": now.isoformat()}
+
+        market_states: dict[str, dict] = {}
+        if self.mode == "live":
+            by_symbol = {symbol: self._get_market_state(ctx) for symbol, ctx in contexts.items()}
+            market_states = {leg["market"]: by_symbol[_symbol_from_market(leg["market"])] for leg in proposed}
+            agent_reasons = []
+            for leg in proposed:
+                check = self._exec_agent.pre_trade_check(leg, market_states[leg["market"]])
+                if not check.get("allowed", True):
+                    agent_reasons.extend(f"{leg['market']}: {r}" for r in check.get("reasons", []))
+            clock.lap("batch_agent")
+            if agent_reasons:
+                self.event_bus.emit(
+                    EventType.AGENT_BLOCKED,
+                    source="execution_agent",
+                    payload={
+                        **summary,
+                        "reasons": agent_reasons,
+                        "proposed": proposed,
+                        "message": "Order batch blocked by execution agent: " + "; ".join(agent_reasons),
+                    },
+                )
+                return {"status": "agent_blocked", "reasons": agent_reasons, **summary, "orders": proposed, "ts": now.isoformat()}
+
+        results = self._execute_batch(proposed, data_ctxs, market_states)
+        clock.lap("batch_execute")
+
+        filled = sum(1 for r in results if r.get("status") in ("paper_filled", "ok", "filled"))
+        status = "filled" if filled == len(results) else ("partial" if filled else "failed")
+        notional = sum(abs(leg["size"] * leg["price"]) for leg in proposed)
+        self.event_bus.emit(
+            EventType.ORDER_BATCH_ROUTED,
+            source="execution_router",
+            payload={
+                **summary,
+                "status": status,
+                "filled": filled,
+                "notional": round(notional, 2),
+                "orders": [
+                    {k: r.get(k) for k in ("order_id", "venue", "market", "side", "size", "fill_price", "status", "execution_mode")}
+                    for r in results
+                ],
+                "message": f"Batch of {len(results)} orders routed: {filled} filled, notional {notional:,.2f}",
+            },
+        )
+        return {"status": status, **summary, "filled": filled, "orders": results, "ts": now.isoformat()}
+
+    def _paper_fill(self, leg: dict, data_ctx: dict, execution_mode: str) -> dict:
+        result = self.paper.place_order(
+            venue=leg["venue"], market=leg["market"], side=leg["side"], size=leg["size"], price=leg["price"],
+            data_context=data_ctx, emit_events=False,
+        )
+        result["execution_mode"] = execution_mode
+        return result
+
+    def _execute_leg(self, leg: dict, data_ctx: dict, market_state: dict) -> dict:
+        if self.mode == "paper":
+            return self._paper_fill(leg, data_ctx, "paper")
+        executor = self._get_live_executor(leg["venue"])
+        if executor is None:
+            return self._paper_fill(leg, data_ctx, "paper_fallback")
+        try:
+            order_ts = time.time()
+            result = executor.place_order(market=leg["market"], side=leg["side"], size=leg["size"], price=leg["price"])
+            self._record_fill(order_ts, leg["venue"], leg["market"], leg["size"], leg["price"], result, market_state)
+            result["execution_mode"] = "live"
+            result["venue"] = leg["venue"]
+            return result
+        except Exception as exc:
+            logger.error("Live execution failed for %s, falling back to paper: %s", leg["venue"], exc, exc_info=True)
+            return self._paper_fill(leg, data_ctx, "paper_fallback")
+
+    def _execute_batch(self, legs: list[dict], data_ctxs: dict[str, dict], market_states: dict[str, dict]) -> list[dict]:
+        """Send legs to their executors, one worker per venue, preserving leg order."""
+        by_venue: dict[str, list[int]] = {}
+        for i, leg in enumerate(legs):
+            venue = "paper" if self.mode == "paper" else leg["venue"].lower()
+            by_venue.setdefault(venue, []).append(i)
+
+        results: list[dict] = [{} for _ in legs]
+
+        def run(indices: list[int]) -> None:
+            for i in indices:
+                market = legs[i]["market"]
+                results[i] = self._execute_leg(legs[i], data_ctxs[market], market_states.get(market, {}))
+
+        if len(by_venue) == 1:
+            run(next(iter(by_venue.values())))
+        else:
+            with ThreadPoolExecutor(max_workers=len(by_venue), thread_name_prefix="order-batch") as pool:
+                list(pool.map(run, by_venue.values()))
+        return results
+
+    def _record_fill(
+        self,
+        order_ts: float,
+        venue: str,
+        market: str,
+        size: float,
+        expected_price: float,
+        result: dict,
+        market_state: dict,
+    ) -> None:
+        realised = result.get("fill_price") or result.get("avg_price")
+        if result.get("status") != "ok" or not realised or expected_price <= 0:
+            return
+        try:
+            get_execution_metrics().record_fill(
+                order_ts=order_ts,
+                fill_ts=time.time(),
+                expected_price=expected_price,
+                fill_price=float(realised),
+                venue=venue,
+                market=market,
+                size_usd=abs(size) * expected_price,
+                depth_usd=float(market_state.get("liquidity_depth", 0) or 0),
+            )
+        except Exception:
+            logger.debug("Failed to record fill metrics", exc_info=True)
+
     def _get_live_executor(self, venue: str):
         venue_lower = venue.lower()
         if venue_lower == "hyperliquid" and self.hyperliquid and self.hyperliquid.enabled:
@@ -318,6 +542,7 @@ class ExecutionRouter:
         return None
 
     def get_all_positions(self) -> list[dict]:
+        self.paper.sync()
         positions = list(self.paper.get_positions())
 
         if self.mode == "live":
@@ -342,5 +567,21 @@ class ExecutionRouter:
             "hyperliquid_enabled": self.hyperliquid.enabled if self.hyperliquid else False,
             "drift_enabled": self.drift.enabled if self.drift else False,
             "risk_status": self.risk_engine.get_status(),
+            "latency": self.latency.summary(),
         }
 
+
+
+_router: ExecutionRouter | None = None
+_router_lock = threading.Lock()
+
+
+def get_execution_router() -> ExecutionRouter:
+    """Process-wide router shared by the API, trigger engine and smart scheduler,
+    so paper fills, positions and risk state live in one place."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ExecutionRouter()
+    return _router
@@ -0,0 +1,283 @@
+import asyncio
+import heapq
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from backend.compute.smart_execution import abort_execution, get_all_executions, get_execution, record_slice_fill, restore_execution
+from backend.core import cluster
+from backend.data.repositories.smart_execution_repo import SmartExecutionRepository
+from backend.execution.router import ExecutionRouter, get_execution_router
+
+logger = logging.getLogger(__name__)
+
+MAX_TICK_SECONDS = 1.0
+MAX_CONCURRENT_SLICES = 16
+MAX_DEPTH_PARTICIPATION = 0.10
+MIN_SLICE_FACTOR = 0.25
+MAX_EXTRA_SLICES = 10
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+def _parse_ts(raw: Any) -> float:
+    if isinstance(raw, (int, float)):
+        return float(raw)
+    try:
+        return datetime.fromisoformat(str(raw)).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+def plan_slice_size(plan: dict[str, Any], price: float, depth_usd: float) -> float:
+    """Size the next slice from the schedule, realised slippage and book depth.
+
+    The scheduled target shrinks in proportion to how far realised slippage
+    exceeds ``max_slippage_bps`` and is capped at ``MAX_DEPTH_PARTICIPATION``
+    of visible depth.  The last slot sweeps the remainder unless extra slots
+    were added to absorb size deferred by those caps.
+    """
+    remaining = max(plan["total_size"] - plan["executed_size"], 0.0)
+    if remaining <= 0:
+        return 0.0
+    slot = plan["completed_slices"]
+    if slot >= plan["n_slices"] - 1:
+        target = remaining
+    else:
+        schedule = plan.get("schedule") or []
+        target = schedule[slot]["target_size"] if slot < len(schedule) else plan["slice_size"]
+
+    actual = float(plan.get("actual_slippage_bps") or 0.0)
+    limit = float(plan.get("max_slippage_bps") or 0.0)
+    if plan["slices"] and limit > 0 and actual > limit:
+        target *= max(MIN_SLICE_FACTOR, limit / actual)
+    if depth_usd > 0 and price > 0:
+        target = min(target, depth_usd * MAX_DEPTH_PARTICIPATION / price)
+    return round(min(target, remaining), 8)
+
+
+class SmartExecutionScheduler:
+    """Fires smart-order slices when they come due.
+
+    In multi-worker mode (``shared``) only the scheduler leader runs the loop.
+    Followers persist submissions and aborts, queue them for the leader on a
+    Redis command queue, and read plans back from Postgres.
+    """
+
+    def __init__(
+        self,
+        router: ExecutionRouter | None = None,
+        repository: SmartExecutionRepository | None = None,
+        max_concurrency: int = MAX_CONCURRENT_SLICES,
+        shared: bool | None = None,
+        commands: cluster.CommandQueue | None = None,
+    ):
+        self._router = router or ExecutionRouter()
+        self._repo = repository or SmartExecutionRepository()
+        self._max_concurrency = max_concurrency
+        self._shared = cluster.is_multi_worker() if shared is None else shared
+        self._commands = commands or (cluster.CommandQueue("smart_executions") if self._shared else None)
+        self._heap: list[tuple[float, str]] = []
+        self._due: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._plan_locks: dict[str, threading.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._due)
+
+    def _schedule(self, exec_id: str, due: float) -> None:
+        with self._lock:
+            self._due[exec_id] = due
+            heapq.heappush(self._heap, (due, exec_id))
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _plan_lock(self, exec_id: str) -> threading.Lock:
+        """Serialises a slice and an abort on the same plan."""
+        with self._lock:
+            return self._plan_locks.setdefault(exec_id, threading.Lock())
+
+    def _finish(self, exec_id: str) -> None:
+        self._failures.pop(exec_id, None)
+        with self._lock:
+            self._due.pop(exec_id, None)
+            self._plan_locks.pop(exec_id, None)
+
+    def _follower(self) -> bool:
+        return self._shared and not cluster.is_leader()
+
+    def submit(self, plan: dict[str, Any]) -> dict[str, Any]:
+        restore_execution(plan)
+        self._repo.save_plan(plan)
+        if self._follower():
+            self._commands.push("submit", {"exec_id": plan["exec_id"]})
+        elif plan["status"] == "active":
+            self._schedule(plan["exec_id"], _parse_ts(plan["next_slice_at"]))
+        return plan
+
+    def abort(self, exec_id: str, reason: str = "user_cancelled") -> dict[str, Any] | None:
+        if self._follower():
+            stored = self._repo.get_plan(exec_id)
+            if stored is None:
+                return None
+            restore_execution(stored)
+        with self._plan_lock(exec_id):
+            plan = abort_execution(exec_id, reason)
+            if plan:
+                self._finish(exec_id)
+                self._repo.save_plan(plan)
+        if plan and self._follower():
+            self._commands.push("abort", {"exec_id": exec_id, "reason": reason})
+        return plan
+
+    def get(self, exec_id: str) -> dict[str, Any] | None:
+        if self._follower():
+            return self._repo.get_plan(exec_id)
+        return get_execution(exec_id)
+
+    def recent(self, limit: int = 20) -> list[dict[str, Any]]:
+        if self._follower():
+            return self._repo.get_recent(limit)
+        return get_all_executions(limit=limit)
+
+    def _drain(self) -> None:
+        """Pick up plans submitted or aborted on follower workers (leader only)."""
+        if not self._shared:
+            return
+        for command in self._commands.drain():
+            payload = command.get("payload") or {}
+            exec_id = payload.get("exec_id")
+            if command.get("op") == "submit":
+                plan = self._repo.get_plan(exec_id)
+                if plan and plan["status"] == "active":
+                    restore_execution(plan)
+                    self._schedule(exec_id, _parse_ts(plan["next_slice_at"]))
+            elif command.get("op") == "abort":
+                with self._plan_lock(exec_id):
+                    abort_execution(exec_id, payload.get("reason", "user_cancelled"))
+                    self._finish(exec_id)
+
+    def resume(self) -> int:
+        plans = self._repo.get_active()
+        for plan in plans:
+            self.submit(plan)
+        if plans:
+            logger.info("Resumed %d smart execution plans", len(plans))
+        return len(plans)
+
+    def _pop_due(self, now: float) -> list[str]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                ts, exec_id = heapq.heappop(self._heap)
+                if self._due.get(exec_id) == ts:
+                    del self._due[exec_id]
+                    due.append(exec_id)
+        return due
+
+    def fire_slice(self, exec_id: str) -> dict[str, Any] | None:
+        with self._plan_lock(exec_id):
+            return self._fire_slice(exec_id)
+
+    def _fire_slice(self, exec_id: str) -> dict[str, Any] | None:
+        plan = get_execution(exec_id)
+        if not plan or plan["status"] != "active":
+            return None
+
+        live = self._router.get_live_price(plan["market"])
+        reference = float(live.get("price") or 0.0) or float((plan.get("schedule") or [{}])[0].get("reference_price") or 0.0)
+        depth = float(self._router.get_market_state(plan["market"]).get("liquidity_depth", 0) or 0)
+        size = plan_slice_size(plan, reference, depth)
+        remaining = plan["total_size"] - plan["executed_size"]
+        is_last_slot = plan["completed_slices"] >= plan["n_slices"] - 1
+        if is_last_slot and size < remaining - 1e-8 and plan.get("extra_slices", 0) < MAX_EXTRA_SLICES:
+            plan["n_slices"] += 1
+            plan["extra_slices"] = plan.get("extra_slices", 0) + 1
+
+        result = self._router.route_order(plan["venue"], plan["market"], plan["side"], size, None)
+        now = datetime.now(timezone.utc)
+        fill_price = float(result.get("fill_price") or result.get("avg_price") or result.get("price") or 0.0)
+        if result.get("status") in ("blocked", "agent_blocked", "error") or fill_price <= 0:
+            failures = self._failures.get(exec_id, 0) + 1
+            self._failures[exec_id] = failures
+            plan.setdefault("slice_errors", []).append({"ts": now.isoformat(), "size": size, "result": result.get("reasons") or result.get("status")})
+            if failures >= MAX_CONSECUTIVE_FAILURES:
+                abort_execution(exec_id, reason=f"{failures} consecutive slice failures")
+            else:
+                plan["next_slice_at"] = (now + timedelta(seconds=plan["interval_seconds"])).isoformat()
+        else:
+            self._failures.pop(exec_id, None)
+            slippage = abs(fill_price - reference) / reference * 10000.0 if reference > 0 else 0.0
+            record_slice_fill(exec_id, fill_price, size, slippage)
+
+        self._repo.save_plan(plan)
+        if plan["status"] == "active":
+            self._schedule(exec_id, _parse_ts(plan["next_slice_at"]))
+        else:
+            self._finish(exec_id)
+        return plan
+
+    async def _fire(self, exec_id: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            try:
+                await asyncio.to_thread(self.fire_slice, exec_id)
+            except Exception:
+                logger.error("Smart execution slice failed for %s", exec_id[:8], exc_info=True)
+
+    async def run(self) -> None:
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        while True:
+            self._wakeup.clear()
+            if self._shared:
+                await asyncio.to_thread(self._drain)
+            for exec_id in self._pop_due(time.time()):
+                task = asyncio.create_task(self._fire(exec_id, semaphore), name=f"smart-slice-{exec_id[:8]}")
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+            with self._lock:
+                next_due = self._heap[0][0] if self._heap else None
+            timeout = MAX_TICK_SECONDS if next_due is None else min(max(next_due - time.time(), 0.0), MAX_TICK_SECONDS)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(self.resume)
+        self._task = asyncio.create_task(self.run(), name="smart-execution-scheduler")
+        logger.info("Smart execution scheduler started with %d pending plans", self.pending)
+
+    async def stop(self) -> None:
+        """Stop scheduling new slices and wait for the ones already firing to finish."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._inflight:
+            logger.info("Waiting for %d in-flight smart execution slices", len(self._inflight))
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
+
+
+_scheduler: SmartExecutionScheduler | None = None
+
+
+def get_smart_scheduler(router: ExecutionRouter | None = None) -> SmartExecutionScheduler:
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SmartExecutionScheduler(router=router or get_execution_router())
+    return _scheduler
@@ -0,0 +1,346 @@
+import heapq
+import itertools
+import logging
+import math
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.core import cluster
+from backend.data.repositories.conditional_orders_repo import ConditionalOrderRepository
+from backend.compute.dislocation_scanner import normalise_symbol
+from backend.execution.router import ExecutionRouter, get_execution_router
+
+logger = logging.getLogger(__name__)
+
+BELOW = "below"
+ABOVE = "above"
+COMPACT_RATIO = 4
+
+
+def trigger_direction(order: dict[str, Any]) -> str | None:
+    """Which way price must cross the trigger level for ``order`` to fire."""
+    typ = (order.get("order_type") or "").lower()
+    side = (order.get("side") or "sell").lower()
+    if typ in ("stop_loss", "trailing_stop"):
+        return BELOW if side == "sell" else ABOVE
+    if typ == "take_profit":
+        return ABOVE if side == "sell" else BELOW
+    return None
+
+
+def _extreme_key(order: dict[str, Any], field: str, sign: int) -> float:
+    value = order.get(field)
+    return sign * float(value) if value is not None else -math.inf
+
+
+class _TriggerBook:
+    """Per-symbol trigger levels kept in heaps with lazy deletion.
+
+    ``below`` is a max-heap of levels that fire when price falls to them and
+    ``above`` a min-heap of levels that fire when price rises to them.
+    ``peaks``/``troughs`` order trailing stops by their reference extreme so a
+    tick only ratchets the stops it actually moves.  Superseded entries stay in
+    the heaps and are skipped on pop until the book is compacted.
+    """
+
+    __slots__ = ("below", "above", "peaks", "troughs", "order_ids", "last_price")
+
+    def __init__(self):
+        self.below: list[tuple[float, int, str]] = []
+        self.above: list[tuple[float, int, str]] = []
+        self.peaks: list[tuple[float, int, str]] = []
+        self.troughs: list[tuple[float, int, str]] = []
+        self.order_ids: set[str] = set()
+        self.last_price: float | None = None
+
+    @property
+    def heap_size(self) -> int:
+        return len(self.below) + len(self.above) + len(self.peaks) + len(self.troughs)
+
+
+class ConditionalTriggerEngine:
+    """Price-triggered order book.
+
+    In multi-worker mode (``shared``) the scheduler leader owns the book:
+    followers persist new orders and cancellations to Postgres, queue them
+    for the leader on a Redis command queue, and read orders back from
+    Postgres.  Only the leader evaluates triggers, so an order fires once.
+    """
+
+    def __init__(
+        self,
+        router: ExecutionRouter | None = None,
+        repository: ConditionalOrderRepository | None = None,
+        persist: bool = True,
+        shared: bool | None = None,
+        commands: cluster.CommandQueue | None = None,
+    ):
+        self._router = router or ExecutionRouter()
+        self._repo = repository or ConditionalOrderRepository()
+        self._persist = persist
+        self._shared = cluster.is_multi_worker() if shared is None else shared
+        self._commands = commands or (cluster.CommandQueue("conditional_orders") if self._shared else None)
+        self._loaded = not persist
+        self._lock = threading.RLock()
+        self._seq = itertools.count()
+        self._orders: dict[str, dict[str, Any]] = {}
+        self._books: dict[str, _TriggerBook] = {}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            orders = self._repo.get_active()
+            for order in orders:
+                self._orders[order["id"]] = order
+                if order.get("status") == "active":
+                    self._index(order)
+            if orders:
+                logger.info("Trigger engine restored %d conditional orders", len(orders))
+
+    def _follower(self) -> bool:
+        return self._shared and not cluster.is_leader()
+
+    def _drain(self) -> None:
+        """Apply orders and cancellations queued by follower workers (leader only)."""
+        if not self._shared or self._follower():
+            return
+        for command in self._commands.drain():
+            payload = command.get("payload") or {}
+            with self._lock:
+                if command.get("op") == "add" and payload.get("id") not in self._orders:
+                    self._orders[payload["id"]] = payload
+                    if payload.get("status") == "active":
+                        self._index(payload)
+                elif command.get("op") == "cancel" and payload.get("id") in self._orders:
+                    self._cancel_local(payload["id"])
+
+    def reset(self) -> None:
+        """Forget the in-memory book; it is restored from Postgres on next use.
+
+        Called when this worker becomes leader so orders added while another
+        worker owned the book are picked up.
+        """
+        with self._lock:
+            self._orders.clear()
+            self._books.clear()
+            self._loaded = not self._persist
+
+    def _save(self, orders: list[dict[str, Any]]) -> None:
+        if self._persist and orders:
+            self._repo.save_orders(orders)
+
+    def _book(self, market: str) -> _TriggerBook:
+        symbol = normalise_symbol(market)
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _TriggerBook()
+        return book
+
+    def _set_level(self, book: _TriggerBook, order: dict[str, Any], level: float) -> None:
+        order["current_trigger_level"] = level
+        if trigger_direction(order) == BELOW:
+            heapq.heappush(book.below, (-level, next(self._seq), order["id"]))
+        else:
+            heapq.heappush(book.above, (level, next(self._seq), order["id"]))
+
+    def _index(self, order: dict[str, Any]) -> None:
+        direction = trigger_direction(order)
+        if direction is None:
+            return
+        book = self._book(order["market"])
+        book.order_ids.add(order["id"])
+        typ = order["order_type"].lower()
+        if typ == "trailing_stop":
+            trail = float(order.get("trailing_amount") or 0)
+            if direction == BELOW:
+                peak = order.get("peak_price")
+                heapq.heappush(book.peaks, (_extreme_key(order, "peak_price", 1), next(self._seq), order["id"]))
+                if peak is not None:
+                    self._set_level(book, order, float(peak) - trail)
+            else:
+                trough = order.get("trough_price")
+                heapq.heappush(book.troughs, (_extreme_key(order, "trough_price", -1), next(self._seq), order["id"]))
+                if trough is not None:
+                    self._set_level(book, order, float(trough) + trail)
+            return
+        level = order.get("trigger_price")
+        if level is None and typ == "take_profit":
+            level = order.get("take_profit_price")
+        if level is not None:
+            self._set_level(book, order, float(level))
+
+    def _live(self, order_id: str) -> dict[str, Any] | None:
+        order = self._orders.get(order_id)
+        return order if order is not None and order.get("status") == "active" else None
+
+    def _compact(self, book: _TriggerBook) -> None:
+        orders = [self._orders[oid] for oid in book.order_ids if self._live(oid)]
+        book.below, book.above, book.peaks, book.troughs = [], [], [], []
+        book.order_ids = set()
+        for order in orders:
+            self._index(order)
+
+    def add(self, order: dict[str, Any]) -> dict[str, Any]:
+        if self._follower():
+            self._save([order])
+            self._commands.push("add", order)
+            return order
+        self._ensure_loaded()
+        with self._lock:
+            self._orders[order["id"]] = order
+            if order.get("status") == "active":
+                self._index(order)
+        self._save([order])
+        return order
+
+    def _cancel_local(self, order_id: str) -> dict[str, Any] | None:
+        order = self._orders.get(order_id)
+        if order is None:
+            return None
+        order["status"] = "cancelled"
+        order["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._books.get(normalise_symbol(order["market"]), _TriggerBook()).order_ids.discard(order_id)
+        return order
+
+    def cancel(self, order_id: str) -> dict[str, Any] | None:
+        if self._follower():
+            order = self._repo.get_order(order_id)
+            if order is None:
+                return None
+            order["status"] = "cancelled"
+            order["updated_at"] = datetime.now(timezone.utc).isoformat()
+            self._save([order])
+            self._commands.push("cancel", {"id": order_id})
+            return order
+        self._ensure_loaded()
+        self._drain()
+        with self._lock:
+            order = self._cancel_local(order_id)
+            if order is None:
+                return None
+        self._save([order])
+        return order
+
+    def get_orders(self) -> list[dict[str, Any]]:
+        if self._follower():
+            return self._repo.get_recent()
+        self._ensure_loaded()
+        self._drain()
+        with self._lock:
+            return list(self._orders.values())
+
+    def active_by_market(self) -> dict[str, list[str]]:
+        if self._follower():
+            return {}
+        self._ensure_loaded()
+        self._drain()
+        with self._lock:
+            markets: dict[str, list[str]] = {}
+            for book in self._books.values():
+                for oid in book.order_ids:
+                    order = self._live(oid)
+                    if order is not None:
+                        markets.setdefault(order["market"], []).append(oid)
+            return markets
+
+    def on_price(self, market: str, price: float) -> list[dict[str, Any]]:
+        """Apply one price tick and route every order whose trigger it crossed.
+
+        Trailing stops ratchet before levels are checked, matching the
+        on-demand evaluator: a sell stop trails the highest price seen since
+        it was first priced and fires once price falls ``trailing_amount``
+        below it.
+        """
+        if self._follower():
+            return []
+        self._ensure_loaded()
+        self._drain()
+        if not price or price <= 0:
+            return []
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            book = self._books.get(normalise_symbol(market))
+            if book is None:
+                return []
+            book.last_price = price
+            moved: dict[str, dict[str, Any]] = {}
+
+            while book.peaks and book.peaks[0][0] < price:
+                peak, _, oid = heapq.heappop(book.peaks)
+                order = self._live(oid)
+                if order is None or _extreme_key(order, "peak_price", 1) != peak:
+                    continue
+                order["peak_price"] = price
+                heapq.heappush(book.peaks, (price, next(self._seq), oid))
+                self._set_level(book, order, price - float(order.get("trailing_amount") or 0))
+                moved[oid] = order
+
+            while book.troughs and -book.troughs[0][0] > price:
+                neg_trough, _, oid = heapq.heappop(book.troughs)
+                order = self._live(oid)
+                if order is None or _extreme_key(order, "trough_price", -1) != neg_trough:
+                    continue
+                order["trough_price"] = price
+                heapq.heappush(book.troughs, (-price, next(self._seq), oid))
+                self._set_level(book, order, price + float(order.get("trailing_amount") or 0))
+                moved[oid] = order
+
+            fired: list[dict[str, Any]] = []
+            while book.below and -book.below[0][0] >= price:
+                neg_level, _, oid = heapq.heappop(book.below)
+                order = self._live(oid)
+                if order is not None and order.get("current_trigger_level") == -neg_level:
+                    fired.append(order)
+            while book.above and book.above[0][0] <= price:
+                level, _, oid = heapq.heappop(book.above)
+                order = self._live(oid)
+                if order is not None and order.get("current_trigger_level") == level:
+                    fired.append(order)
+            for order in fired:
+                order["status"] = "triggering"
+                book.order_ids.discard(order["id"])
+                moved.pop(order["id"], None)
+            for order in moved.values():
+                order["updated_at"] = now
+
+            if book.heap_size > COMPACT_RATIO * len(book.order_ids) + 64:
+                self._compact(book)
+
+        for order in fired:
+            try:
+                result = self._router.route_order(order["venue"], order["market"], order["side"], float(order["size"]), price)
+                order["triggered_order"] = result
+                if result.get("status") in ("blocked", "agent_blocked"):
+                    logger.warning("Conditional order %s rejected by the router: %s", order["id"][:8], result.get("reasons"))
+                    order["status"] = "rejected"
+                    order["error"] = "; ".join(map(str, result.get("reasons") or [])) or result["status"]
+                else:
+                    order["status"] = "triggered"
+            except Exception as exc:
+                logger.error("Conditional order %s failed to route: %s", order["id"][:8], exc, exc_info=True)
+                order["status"] = "failed"
+                order["error"] = str(exc)
+            order["triggered_at"] = order["updated_at"] = datetime.now(timezone.utc).isoformat()
+        self._save(fired + list(moved.values()))
+        return fired
+
+    def on_prices(self, prices: dict[str, float]) -> list[dict[str, Any]]:
+        fired = []
+        for symbol, price in prices.items():
+            fired.extend(self.on_price(symbol, price))
+        return fired
+
+
+_engine: ConditionalTriggerEngine | None = None
+
+
+def get_trigger_engine(router: ExecutionRouter | None = None) -> ConditionalTriggerEngine:
+    global _engine
+    if _engine is None:
+        _engine = ConditionalTriggerEngine(router=router or get_execution_router())
+    return _engine
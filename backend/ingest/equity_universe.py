@@ -0,0 +1,199 @@
+"""Cached, concurrent loader for the equity universe.
+
+Daily bars are fetched through one provider cascade (yfinance batch download,
+then Stooq → demo data for tickers the batch missed) and cached on disk per
+ticker with an as-of date.  Once a ticker is cached, refreshes only request the
+last few sessions and merge them into the stored bars.  Stored bars are kept to
+the same 3mo window a full fetch returns, so the analytics see the same history
+however it was assembled.  Degraded (demo) results are kept in memory briefly
+but never written to disk.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+
+from backend.config import EQUITY_CACHE_DIR, EQUITY_CACHE_TTL_S, EQUITY_FETCH_CONCURRENCY
+from backend.ingest import stooq_ingest, yfinance_ingest
+
+logger = logging.getLogger(__name__)
+
+FULL_PERIOD = "3mo"
+WINDOW_DAYS = 92
+DEGRADED_TTL_S = 60
+
+
+def _period_for_gap(days: int) -> str:
+    if days <= 3:
+        return "5d"
+    if days <= 25:
+        return "1mo"
+    return FULL_PERIOD
+
+
+def _within_window(history: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Bars no older than ``WINDOW_DAYS`` before the latest one."""
+    if not history:
+        return history
+    try:
+        cutoff = (date.fromisoformat(str(history[-1].get("ts", ""))[:10]) - timedelta(days=WINDOW_DAYS)).isoformat()
+    except ValueError:
+        return history
+    return [r for r in history if str(r.get("ts", ""))[:10] >= cutoff]
+
+
+def _merge_bars(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    merged = {str(r.get("ts", ""))[:10]: r for r in old}
+    merged.update({str(r.get("ts", ""))[:10]: r for r in new})
+    return [merged[k] for k in sorted(merged)]
+
+
+def fetch_with_cascade(ticker: str, period: str = FULL_PERIOD, batch_tried: bool = False) -> dict[str, Any]:
+    """yfinance → Stooq → demo for one ticker; ``batch_tried`` skips yfinance after a batch miss."""
+    ticker = ticker.upper().strip()
+    attempts = [{"name": "yfinance"}] if batch_tried else []
+    result = None
+    if not batch_tried:
+        result = yfinance_ingest.fetch_history(ticker, period=period)
+        attempts.append(result.get("provider_status", {}))
+    if result is None or result.get("degraded"):
+        result = stooq_ingest.fetch_history(ticker)
+        attempts.append(result.get("provider_status", {}))
+    result["provider_chain"] = [a.get("name") for a in attempts]
+    return result
+
+
+class EquityUniverseLoader:
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        ttl_seconds: float = EQUITY_CACHE_TTL_S,
+        max_workers: int = EQUITY_FETCH_CONCURRENCY,
+    ):
+        self.cache_dir = cache_dir or EQUITY_CACHE_DIR or os.path.join(tempfile.gettempdir(), "equity_cache")
+        self.ttl_seconds = ttl_seconds
+        self.max_workers = max(1, max_workers)
+        self._memory: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.cache_dir, f"{ticker.replace('/', '_')}.json")
+
+    def _read_disk(self, ticker: str) -> dict[str, Any] | None:
+        try:
+            with open(self._path(ticker), encoding="utf-8") as fh:
+                entry = json.load(fh)
+            return entry if isinstance(entry.get("history"), list) else None
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, ticker: str, entry: dict[str, Any]) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = self._path(ticker) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(entry, fh)
+            os.replace(tmp, self._path(ticker))
+        except OSError:
+            logger.warning("Equity cache write failed for %s", ticker, exc_info=True)
+
+    def _cached(self, ticker: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._memory.get(ticker)
+        if entry is None:
+            entry = self._read_disk(ticker)
+            if entry is not None:
+                with self._lock:
+                    self._memory[ticker] = entry
+        return entry
+
+    @staticmethod
+    def _is_fresh(entry: dict[str, Any], now: float, ttl: float) -> bool:
+        if entry.get("as_of") != date.fromtimestamp(now).isoformat():
+            return False
+        ttl = DEGRADED_TTL_S if entry.get("degraded") else ttl
+        return now - float(entry.get("fetched_at", 0.0)) < ttl
+
+    def _store(self, ticker: str, result: dict[str, Any], previous: dict[str, Any] | None, now: float) -> dict[str, Any]:
+        degraded = bool(result.get("degraded"))
+        if degraded and previous and not previous.get("degraded"):
+            stale = dict(previous)
+            stale["provider_status"] = {
+                "name": "equity_cache",
+                "status": "stale",
+                "message": f"refresh failed; serving bars as of {previous.get('as_of')}",
+                "ts": datetime.now(timezone.utc).isoformat(),
+            }
+            return stale
+
+        history = result.get("history") or []
+        if previous and not degraded and not previous.get("degraded"):
+            history = _merge_bars(previous.get("history") or [], history)
+        entry = {
+            "ticker": ticker,
+            "history": _within_window(history),
+            "provider_status": result.get("provider_status", {}),
+            "provider_chain": result.get("provider_chain", []),
+            "degraded": degraded,
+            "as_of": date.fromtimestamp(now).isoformat(),
+            "fetched_at": now,
+        }
+        with self._lock:
+            self._memory[ticker] = entry
+        if not degraded:
+            self._write_disk(ticker, entry)
+        return entry
+
+    def load(self, tickers: list[str], force: bool = False) -> dict[str, dict[str, Any]]:
+        now = time.time()
+        tickers = list(dict.fromkeys(t.upper().strip() for t in tickers))
+        results: dict[str, dict[str, Any]] = {}
+        previous: dict[str, dict[str, Any] | None] = {}
+        by_period: dict[str, list[str]] = {}
+
+        for ticker in tickers:
+            entry = self._cached(ticker)
+            if entry is not None and not force and self._is_fresh(entry, now, self.ttl_seconds):
+                results[ticker] = entry
+                continue
+            previous[ticker] = entry
+            if entry is None or entry.get("degraded"):
+                period = FULL_PERIOD
+            else:
+                gap = (date.fromtimestamp(now) - date.fromisoformat(entry["as_of"])).days
+                period = _period_for_gap(gap)
+            by_period.setdefault(period, []).append(ticker)
+
+        for period, group in by_period.items():
+            fetched = yfinance_ingest.fetch_history_batch(group, period=period)
+            missing = [t for t in group if t not in fetched]
+            if missing:
+                workers = min(self.max_workers, len(missing))
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="equity-fetch") as pool:
+                    for ticker, result in zip(missing, pool.map(lambda t: fetch_with_cascade(t, period, batch_tried=True), missing)):
+                        fetched[ticker] = result
+            for ticker in group:
+                results[ticker] = self._store(ticker, fetched[ticker], previous.get(ticker), now)
+
+        return {t: results[t] for t in tickers}
+
+    def get(self, ticker: str, force: bool = False) -> dict[str, Any]:
+        return self.load([ticker], force=force)[ticker.upper().strip()]
+
+
+_loader: EquityUniverseLoader | None = None
+
+
+def get_equity_loader() -> EquityUniverseLoader:
+    global _loader
+    if _loader is None:
+        _loader = EquityUniverseLoader()
+    return _loader
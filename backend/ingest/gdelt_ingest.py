@@ -1,13 +1,18 @@
+from __future__ import annotations
+
 import logging
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
 import httpx
-import pandas as pd
 
 from backend.config import GDELT_KEYWORDS
 from backend.core.event_bus import EventBus, EventType
 from backend.core.state_store import StateStore
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 GDELT_DOC_API = "https://api.gdeltproject.org/api/v2/doc/doc"
@@ -26,6 +31,8 @@ class GDELTIngestor:
         keywords: list[str] | None = None,
         countries: list[str] | None = None,
     ) -> pd.DataFrame:
+        import pandas as pd
+
         keywords = keywords or GDELT_KEYWORDS
         query_str = " OR ".join(f'"{kw}"' for kw in keywords)
         if countries:
@@ -60,6 +67,8 @@ class GDELTIngestor:
             return pd.DataFrame()
 
     def _parse_articles(self, articles: list[dict]) -> pd.DataFrame:
+        import pandas as pd
+
         records = []
         for art in articles:
             tone_str = art.get("tone", "0,0,0,0,0,0,0")
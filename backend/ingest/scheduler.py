@@ -4,7 +4,19 @@ import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from backend.core.event_bus import EventBus
+from backend.core.models import PriceTick
 from backend.core.state_store import StateStore
+from backend.compute.dislocation_scanner import DislocationScanner
+from backend.compute.execution_metrics import get_execution_metrics
+from backend.compute.hedge_ratio import HEDGE_MATRIX_KEY, StreamingHedgeEngine, get_hedge_engine
+from backend.compute.regime_memory import classify_regime, get_regime_memory
+from backend.compute.slippage_model import get_slippage_calibrator
+from backend.data.repositories.market_repo import MarketRepository
+from backend.execution.trigger_engine import get_trigger_engine
+from backend.compute.signal_pipeline import get_signal_pipeline
+from backend.config import MODEL_REGISTRY_POLL_S, PIPELINE_INTERVAL_S
+from backend.ml.feature_history import get_feature_history
+from backend.ml.training import refresh_model
 from backend.ingest.wits_ingest import WITSIngestor
 from backend.ingest.gdelt_ingest import GDELTIngestor
 from backend.ingest.kraken_ingest import KrakenIngestor
@@ -14,6 +26,9 @@ from backend.ingest.drift_ingest import DriftIngestor
 
 logger = logging.getLogger(__name__)
 
+# Jobs every worker runs; everything else runs only on the scheduler leader.
+WORKER_JOBS = frozenset({"ml_model_refresh", "eqi_sketch_flush"})
+
 
 class IngestScheduler:
 
@@ -28,8 +43,10 @@ class IngestScheduler:
         self.coingecko = CoinGeckoIngestor(state_store=self.state_store)
         self.pyth = PythIngestor(state_store=self.state_store)
         self.drift = DriftIngestor(state_store=self.state_store)
+        self.dislocation_scanner = DislocationScanner(state_store=self.state_store, event_bus=self.event_bus)
+        self.market_repo = MarketRepository()
 
-    def schedule_all(self) -> None:
+    def schedule_all(self, leader: bool = True) -> None:
         self.scheduler.add_job(
             self._run_wits, "interval", hours=6, id="wits_ingest",
             name="WITS Tariff Ingest", replace_existing=True,
@@ -54,10 +71,65 @@ class IngestScheduler:
             self._run_drift, "interval", seconds=60, id="drift_ingest",
             name="Drift Market Ingest", replace_existing=True,
         )
+        self.scheduler.add_job(
+            self._run_dislocation_scan, "interval", seconds=5, id="dislocation_scan",
+            name="Cross-Venue Dislocation Scan", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_conditional_triggers, "interval", seconds=5, id="conditional_triggers",
+            name="Conditional Order Triggers", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_slippage_calibration, "interval", minutes=5, id="slippage_calibration",
+            name="Slippage Model Calibration", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_hedge_update, "interval", seconds=60, id="hedge_update",
+            name="Streaming Hedge Matrix Update", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_regime_snapshot, "interval", minutes=15, id="regime_snapshot",
+            name="Regime Memory Snapshot", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_consensus_ticks, "interval", seconds=60, id="consensus_ticks",
+            name="Consensus Price Ticks", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_regime_labelling, "interval", minutes=15, id="regime_labelling",
+            name="Regime Outcome Labelling", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_eqi_sketch_flush, "interval", seconds=60, id="eqi_sketch_flush",
+            name="EQI Sketch Persistence", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_feature_snapshot, "interval", minutes=5, id="ml_feature_snapshot",
+            name="ML Feature Materialisation", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_model_refresh, "interval", seconds=MODEL_REGISTRY_POLL_S, id="ml_model_refresh",
+            name="ML Model Registry Refresh", replace_existing=True,
+        )
+        self.scheduler.add_job(
+            self._run_signal_pipeline, "interval", seconds=PIPELINE_INTERVAL_S, id="signal_pipeline",
+            name="Signal Pipeline", replace_existing=True,
+        )
 
         self.scheduler.start()
+        self.set_leader(leader)
         logger.info("IngestScheduler started with %d jobs", len(self.scheduler.get_jobs()))
 
+    def set_leader(self, leader: bool) -> None:
+        """Resume the ingest and engine jobs on the leader and pause them elsewhere."""
+        for job in self.scheduler.get_jobs():
+            if job.id in WORKER_JOBS:
+                continue
+            if leader:
+                job.resume()
+            else:
+                job.pause()
+
     def stop(self) -> None:
         self.scheduler.shutdown(wait=False)
         logger.info("IngestScheduler stopped")
@@ -76,31 +148,136 @@ class IngestScheduler:
         except Exception:
             logger.error("GDELT ingest job failed", exc_info=True)
 
+    def _observe(self, tick: PriceTick | None) -> None:
+        """Push a fresh venue tick straight into the dislocation scanner."""
+        if tick is not None:
+            self.dislocation_scanner.update(tick.symbol, tick.venue, tick.price, tick.ts.timestamp())
+
     async def _run_kraken(self) -> None:
         try:
-            await self.kraken.fetch_ticker()
+            self._observe(await self.kraken.fetch_ticker())
             logger.debug("Kraken ingest completed")
         except Exception:
             logger.error("Kraken ingest job failed", exc_info=True)
 
     async def _run_coingecko(self) -> None:
         try:
-            await self.coingecko.fetch_price()
+            self._observe(await self.coingecko.fetch_price())
             logger.debug("CoinGecko ingest completed")
         except Exception:
             logger.error("CoinGecko ingest job failed", exc_info=True)
 
     async def _run_pyth(self) -> None:
         try:
-            await self.pyth.fetch_price()
+            self._observe(await self.pyth.fetch_price())
             logger.debug("Pyth ingest completed")
         except Exception:
             logger.error("Pyth ingest job failed", exc_info=True)
 
     async def _run_drift(self) -> None:
         try:
-            await self.drift.fetch_market_data()
+            self._observe(await self.drift.fetch_market_data())
             await self.drift.fetch_funding()
             logger.debug("Drift ingest completed")
         except Exception:
             logger.error("Drift ingest job failed", exc_info=True)
+
+    async def _run_dislocation_scan(self) -> None:
+        try:
+            result = await asyncio.to_thread(self.dislocation_scanner.run_once)
+            logger.debug("Dislocation scan completed: %d alerts", len(result["alerts"]))
+        except Exception:
+            logger.error("Dislocation scan job failed", exc_info=True)
+
+    async def _run_conditional_triggers(self) -> None:
+        try:
+            prices = self.dislocation_scanner.consensus_prices()
+            fired = await asyncio.to_thread(get_trigger_engine().on_prices, prices)
+            if fired:
+                logger.info("Conditional triggers fired: %d orders", len(fired))
+        except Exception:
+            logger.error("Conditional trigger job failed", exc_info=True)
+
+    async def _run_slippage_calibration(self) -> None:
+        try:
+            models = await asyncio.to_thread(get_slippage_calibrator().fit_from_metrics, get_execution_metrics())
+            logger.debug("Slippage calibration completed for %d venues", len(models))
+        except Exception:
+            logger.error("Slippage calibration job failed", exc_info=True)
+
+    def _update_hedge_matrix(self, engine: StreamingHedgeEngine) -> None:
+        prices = self.dislocation_scanner.consensus_prices()
+        consensus = {a: prices.get(f"{a}_USD", 0.0) for a in engine.assets}
+        if engine.update_prices(consensus):
+            self.state_store.set_snapshot(HEDGE_MATRIX_KEY, engine.snapshot(), ttl=600)
+
+    async def _run_hedge_update(self) -> None:
+        try:
+            engine = get_hedge_engine()
+            await asyncio.to_thread(self._update_hedge_matrix, engine)
+            logger.debug("Hedge matrix update completed (n=%d)", engine.sample_size)
+        except Exception:
+            logger.error("Hedge matrix update job failed", exc_info=True)
+
+    async def _run_regime_snapshot(self) -> None:
+        try:
+            price = self.dislocation_scanner.consensus_prices().get("SOL_USD")
+            if not price:
+                logger.debug("Regime snapshot skipped: no fresh SOL price")
+                return
+            idx = self.state_store.get_snapshot("index:latest") or {}
+            regime = self.state_store.get_snapshot("regime:latest") or {}
+            tariff_index = float(idx.get("tariff_index", idx.get("index_level", 0.0)) or 0.0)
+            await asyncio.to_thread(get_regime_memory().record, tariff_index=tariff_index, price=price, **classify_regime(idx, regime))
+            logger.debug("Regime snapshot recorded")
+        except Exception:
+            logger.error("Regime snapshot job failed", exc_info=True)
+
+    async def _run_consensus_ticks(self) -> None:
+        try:
+            prices = self.dislocation_scanner.consensus_prices()
+            ticks = [(symbol, "consensus", price) for symbol, price in prices.items()]
+            await asyncio.to_thread(self.market_repo.save_ticks, ticks)
+            logger.debug("Consensus ticks saved: %d", len(ticks))
+        except Exception:
+            logger.error("Consensus tick job failed", exc_info=True)
+
+    async def _run_regime_labelling(self) -> None:
+        try:
+            labelled = await asyncio.to_thread(get_regime_memory().label_outcomes)
+            logger.debug("Regime labelling completed: %d rows", labelled)
+        except Exception:
+            logger.error("Regime labelling job failed", exc_info=True)
+
+    async def _run_eqi_sketch_flush(self) -> None:
+        try:
+            written = await asyncio.to_thread(get_execution_metrics().flush)
+            logger.debug("EQI sketch flush completed: %d buckets", written)
+        except Exception:
+            logger.error("EQI sketch flush job failed", exc_info=True)
+
+    async def _run_feature_snapshot(self) -> None:
+        try:
+            price = self.dislocation_scanner.consensus_prices().get("SOL_USD")
+            if not price:
+                logger.debug("Feature snapshot skipped: no fresh SOL price")
+                return
+            await asyncio.to_thread(get_feature_history().materialise, price)
+            logger.debug("ML feature row materialised")
+        except Exception:
+            logger.error("ML feature snapshot job failed", exc_info=True)
+
+    async def _run_model_refresh(self) -> None:
+        try:
+            version = await asyncio.to_thread(refresh_model)
+            if version:
+                logger.info("Hot-swapped to promoted ML model %s", version)
+        except Exception:
+            logger.error("ML model refresh job failed", exc_info=True)
+
+    async def _run_signal_pipeline(self) -> None:
+        try:
+            changed = await asyncio.to_thread(get_signal_pipeline().run)
+            logger.debug("Signal pipeline run completed: %s", changed or "no changes")
+        except Exception:
+            logger.error("Signal pipeline job failed", exc_info=True)
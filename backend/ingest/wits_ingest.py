@@ -1,13 +1,18 @@
+from __future__ import annotations
+
 import logging
 from datetime import datetime, timezone
+from typing import TYPE_CHECKING
 
 import httpx
-import pandas as pd
 
 from backend.config import WITS_COUNTRIES, WITS_PRODUCTS
 from backend.core.event_bus import EventBus, EventType
 from backend.core.state_store import StateStore
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
 WITS_BASE_URL = "https://wits.worldbank.org/API/V1/SDMX/V21/rest/data"
@@ -31,6 +36,8 @@ class WITSIngestor:
         partner: str = "156",
         product: str = "TOTAL",
     ) -> pd.DataFrame:
+        import pandas as pd
+
         url = f"{WITS_BASE_URL}/DF_WITS_Tariff/{reporter}.{partner}.{product}"
         try:
             async with httpx.AsyncClient(timeout=30.0) as client:
@@ -62,6 +69,8 @@ class WITSIngestor:
         return records
 
     def _fallback_data(self) -> pd.DataFrame:
+        import pandas as pd
+
         logger.info("Returning sample WITS tariff data")
         return pd.DataFrame(_SAMPLE_TARIFF_DATA)
 
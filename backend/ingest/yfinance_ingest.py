@@ -68,26 +68,32 @@ def demo_history(ticker: str, days: int = 90) -> list[dict[str, Any]]:
     return rows
 
 
+def frame_rows(hist: Any) -> list[dict[str, Any]]:
+    rows: list[dict[str, Any]] = []
+    if hist is None or hist.empty:
+        return rows
+    for idx, row in hist.tail(365).iterrows():
+        ts = idx.to_pydatetime().astimezone(timezone.utc).isoformat() if hasattr(idx, "to_pydatetime") else datetime.now(timezone.utc).isoformat()
+        close = float(row.get("Close", 0) or 0)
+        if not math.isfinite(close) or close <= 0:
+            continue
+        rows.append({
+            "ts": ts,
+            "open": float(row.get("Open", close) or close),
+            "high": float(row.get("High", close) or close),
+            "low": float(row.get("Low", close) or close),
+            "close": close,
+            "volume": int(row.get("Volume", 0) or 0),
+        })
+    return rows
+
+
 def fetch_history(ticker: str, period: str = "3mo", interval: str = "1d") -> dict[str, Any]:
     ticker = ticker.upper().strip()
     try:
         import yfinance as yf  # type: ignore
         hist = yf.Ticker(ticker).history(period=period, interval=interval, auto_adjust=False)
-        rows: list[dict[str, Any]] = []
-        if hist is not None and not hist.empty:
-            for idx, row in hist.tail(365).iterrows():
-                ts = idx.to_pydatetime().astimezone(timezone.utc).isoformat() if hasattr(idx, "to_pydatetime") else datetime.now(timezone.utc).isoformat()
-                close = float(row.get("Close", 0) or 0)
-                if close <= 0:
-                    continue
-                rows.append({
-                    "ts": ts,
-                    "open": float(row.get("Open", close) or close),
-                    "high": float(row.get("High", close) or close),
-                    "low": float(row.get("Low", close) or close),
-                    "close": close,
-                    "volume": int(row.get("Volume", 0) or 0),
-                })
+        rows = frame_rows(hist)
         if rows:
             return {"ticker": ticker, "history": rows, "provider_status": _provider("yfinance", "ok", "MVP research-grade provider"), "degraded": False}
         raise RuntimeError("empty yfinance response")
@@ -96,6 +102,44 @@ def fetch_history(ticker: str, period: str = "3mo", interval: str = "1d") -> dic
         return {"ticker": ticker, "history": rows, "provider_status": _provider("yfinance", "degraded", f"fallback demo data: {exc}"), "degraded": True}
 
 
+def fetch_history_batch(tickers: list[str], period: str = "3mo", interval: str = "1d") -> dict[str, dict[str, Any]]:
+    """Download several tickers in one yfinance request.
+
+    Only tickers with real bars are returned; callers fall back per ticker for
+    the rest.  Any provider error yields an empty mapping.
+    """
+    tickers = [t.upper().strip() for t in tickers]
+    if not tickers:
+        return {}
+    try:
+        import yfinance as yf  # type: ignore
+        frame = yf.download(tickers, period=period, interval=interval, group_by="ticker", auto_adjust=False, threads=True, progress=False)
+    except Exception:
+        return {}
+    if frame is None or frame.empty:
+        return {}
+
+    results: dict[str, dict[str, Any]] = {}
+    columns = getattr(frame.columns, "get_level_values", None)
+    top_level = set(columns(0)) if columns is not None and getattr(frame.columns, "nlevels", 1) > 1 else set()
+    for ticker in tickers:
+        try:
+            if top_level:
+                if ticker not in top_level:
+                    continue
+                sub = frame[ticker].dropna(how="all")
+            elif len(tickers) == 1:
+                sub = frame.dropna(how="all")
+            else:
+                continue
+            rows = frame_rows(sub)
+        except Exception:
+            continue
+        if rows:
+            results[ticker] = {"ticker": ticker, "history": rows, "provider_status": _provider("yfinance", "ok", "MVP research-grade provider (batch)"), "degraded": False}
+    return results
+
+
 def fetch_quote(ticker: str) -> dict[str, Any]:
     data = fetch_history(ticker, period="1mo")
     hist = data.get("history", [])
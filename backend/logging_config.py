@@ -1,27 +1,170 @@
+"""JSON logging with a non-blocking handler and per-logger rate limits.
+
+Callers only resolve the message (and any traceback) and put the record on a
+bounded queue; a ``QueueListener`` thread formats it and writes to stdout.
+When the queue is full, records below WARNING are dropped and counted rather
+than blocking the caller; WARNING and above are written synchronously to the
+same stream instead.  ``LOG_RATE_LIMITS`` (``"logger=per_second,..."``) caps chatty
+loggers below WARNING with a token bucket; the next record let through carries
+the number suppressed since the last one.  ``logging_stats()`` reports both
+counters.
+"""
+import atexit
+import copy
 import os
 import sys
 import json
 import logging
-from datetime import datetime, timezone
+import logging.handlers
+import queue
+import threading
+import time
+
+_encode = json.JSONEncoder(default=str, ensure_ascii=False).encode
 
 
 class StructuredFormatter(logging.Formatter):
+    """One JSON object per line; ``ts`` comes from ``record.created``."""
+
+    def __init__(self):
+        super().__init__()
+        self._second = -1
+        self._prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._second:
+            self._prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = second
+        return f"{self._prefix}.{int((created - second) * 1e6):06d}+00:00"
 
     def format(self, record: logging.LogRecord) -> str:
         entry = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
         }
         if record.exc_info and record.exc_info[0] is not None:
             entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
         if hasattr(record, "extra_data"):
             entry["data"] = record.extra_data
-        return json.dumps(entry, default=str)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            entry["suppressed"] = suppressed
+        return _encode(entry)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per configured logger (and its children) for records below WARNING."""
+
+    def __init__(self, limits: dict[str, float] | None = None):
+        super().__init__()
+        self._limits = dict(limits or {})
+        self._resolved: dict[str, str | None] = {}
+        self._buckets: dict[str, list[float]] = {}
+        self._pending: dict[str, int] = {}
+        self.dropped: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, name: str) -> str | None:
+        key = self._resolved.get(name, "")
+        if key != "":
+            return key
+        key, probe = None, name
+        while probe:
+            if probe in self._limits:
+                key = probe
+                break
+            probe = probe.rpartition(".")[0]
+        self._resolved[name] = key
+        return key
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self._limits:
+            return True
+        key = self._limit_for(record.name)
+        if key is None:
+            return True
+        rate = self._limits[key]
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [rate, record.created]
+            bucket[0] = min(rate, bucket[0] + (record.created - bucket[1]) * rate)
+            bucket[1] = record.created
+            if bucket[0] < 1.0:
+                self._pending[key] = self._pending.get(key, 0) + 1
+                self.dropped[key] = self.dropped.get(key, 0) + 1
+                return False
+            bucket[0] -= 1.0
+            record.suppressed = self._pending.pop(key, 0)
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Resolves the message on the caller's thread and never blocks on a full queue.
+
+    On overflow, records below WARNING are dropped; WARNING and above go to
+    ``overflow`` synchronously (or are counted as dropped if there is none).
+    """
+
+    def __init__(self, log_queue: queue.Queue, overflow: logging.Handler | None = None):
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self.overflowed = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        exc_text = record.exc_text
+        if record.exc_info and record.exc_info[0] is not None and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING and self.overflow is not None:
+                self.overflowed += 1
+                self.overflow.handle(record)
+            else:
+                self.dropped += 1
+
+
+def parse_rate_limits(raw: str) -> dict[str, float]:
+    limits = {}
+    for item in raw.split(","):
+        name, _, rate = item.strip().partition("=")
+        try:
+            if name and float(rate) > 0:
+                limits[name] = float(rate)
+        except ValueError:
+            continue
+    return limits
+
+
+_listener: logging.handlers.QueueListener | None = None
+_queue_handler: NonBlockingQueueHandler | None = None
+_rate_filter: RateLimitFilter | None = None
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
 
 
 def setup_logging(level: str | None = None) -> None:
+    global _listener, _queue_handler, _rate_filter
     log_level = (level or os.environ.get("LOG_LEVEL", "INFO")).upper()
     numeric_level = getattr(logging, log_level, logging.INFO)
 
@@ -30,11 +173,24 @@ def setup_logging(level: str | None = None) -> None:
 
     if root.handlers:
         root.handlers.clear()
+    _stop_listener()
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(numeric_level)
-    handler.setFormatter(StructuredFormatter())
-    root.addHandler(handler)
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setLevel(numeric_level)
+    stream.setFormatter(StructuredFormatter())
+
+    _rate_filter = RateLimitFilter(parse_rate_limits(os.environ.get("LOG_RATE_LIMITS", "backend.execution.paper_exec=50")))
+    if os.environ.get("LOG_ASYNC", "1") in ("1", "true", "yes"):
+        _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=int(os.environ.get("LOG_QUEUE_SIZE", "10000") or 10000)), overflow=stream)
+        _queue_handler.setLevel(numeric_level)
+        _queue_handler.addFilter(_rate_filter)
+        _listener = logging.handlers.QueueListener(_queue_handler.queue, stream, respect_handler_level=True)
+        _listener.start()
+        root.addHandler(_queue_handler)
+    else:
+        _queue_handler = None
+        stream.addFilter(_rate_filter)
+        root.addHandler(stream)
 
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -44,6 +200,18 @@ def setup_logging(level: str | None = None) -> None:
     logging.getLogger("apscheduler.scheduler").setLevel(logging.WARNING)
 
 
+atexit.register(_stop_listener)
+
+
+def logging_stats() -> dict:
+    return {
+        "async": _queue_handler is not None,
+        "queue_depth": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped_queue_full": _queue_handler.dropped if _queue_handler else 0,
+        "written_sync_queue_full": _queue_handler.overflowed if _queue_handler else 0,
+        "rate_limited": dict(_rate_filter.dropped) if _rate_filter else {},
+    }
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
-
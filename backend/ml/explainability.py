@@ -2,7 +2,9 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from backend.ml.feature_store import FEATURE_NAMES, features_to_vector
+import numpy as np
+
+from backend.ml.feature_store import FEATURE_DEFAULTS, FEATURE_NAMES, features_to_matrix
 from backend.ml.training import get_trained_model
 
 logger = logging.getLogger(__name__)
@@ -43,66 +45,96 @@ _FEATURE_DIRECTION = {
     "predictor_conf": 1,
 }
 
-_FEATURE_BASELINES = {
-    "tariff_index": 30.0,
-    "tariff_delta": 0.0,
-    "shock_score": 0.0,
-    "shock_abs": 0.0,
-    "funding_skew": 0.0,
-    "basis_spread": 0.0,
-    "vol_regime_encoded": 0.25,
-    "stable_health": 1.0,
-    "stable_flow": 0.0,
-    "divergence_score": 0.0,
-    "orderbook_imbalance": 0.0,
-    "liquidity_score": 0.8,
-    "slippage_score": 0.1,
-    "exec_quality": 0.8,
-    "predictor_conf": 0.5,
-}
+_DIRECTION = np.array([_FEATURE_DIRECTION.get(name, 1) for name in FEATURE_NAMES], dtype=np.float64)
+_BASELINE = np.array([FEATURE_DEFAULTS[name] for name in FEATURE_NAMES], dtype=np.float64)
+_NORM = np.maximum(np.abs(_BASELINE) + 1.0, 1.0)
 
 
-def _try_shap(model_data: dict, features: dict[str, float]) -> list[dict[str, Any]] | None:
-    try:
-        import shap
-        model = model_data["model"]
-        scaler = model_data.get("scaler")
-        vec = [features_to_vector(features)]
-        if scaler is not None:
-            vec = scaler.transform(vec)
-        explainer = shap.LinearExplainer(model, vec)
-        shap_vals = explainer.shap_values(vec)
-        if hasattr(shap_vals, "__len__") and len(shap_vals) > 0:
-            vals = shap_vals[0] if len(shap_vals[0]) == len(FEATURE_NAMES) else shap_vals
-            contributions = []
-            for i, name in enumerate(FEATURE_NAMES):
-                val = float(vals[i]) if i < len(vals) else 0.0
-                contributions.append({
-                    "feature": name,
-                    "contribution": round(val, 6),
-                    "direction": "positive" if val > 0 else "negative",
-                    "description": _FEATURE_DESCRIPTIONS.get(name, name),
-                })
-            contributions.sort(key=lambda x: abs(x["contribution"]), reverse=True)
-            return contributions
-    except Exception as exc:
-        logger.debug("SHAP unavailable or failed: %s", exc)
-    return None
+def _linear_contributions(model_data: dict, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Exact additive attribution for a linear model: coef × scaled value, in log-odds.
 
+    With a fitted StandardScaler the scaled training mean is zero, so each term
+    is the feature's contribution relative to the average training row and the
+    terms plus the intercept reproduce the decision function.
+    """
+    model = model_data["model"]
+    scaler = model_data.get("scaler")
+    Xs = scaler.transform(X) if scaler is not None else X
+    contributions = np.asarray(Xs, dtype=np.float64) * np.asarray(model.coef_[0], dtype=np.float64)
+    return contributions, np.full(len(X), float(np.ravel(model.intercept_)[0]))
 
-def explain(features: dict[str, float]) -> dict[str, Any]:
+
+def _tree_contributions(model_data: dict, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Path-dependent TreeSHAP contributions from the booster's native ``pred_contrib`` output."""
+    raw = np.asarray(model_data["model"].predict(X, pred_contrib=True), dtype=np.float64)
+    return raw[:, :-1], raw[:, -1]
+
+
+def _heuristic_contributions(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    return _DIRECTION * (X - _BASELINE) / _NORM * 0.1, np.zeros(len(X))
+
+
+def explain_batch(X: np.ndarray) -> dict[str, Any]:
+    """Attribute every row of a feature matrix in one call.
+
+    Returns ``contributions`` as an ``(n, len(FEATURE_NAMES))`` array,
+    ``base_value`` per row (intercept or tree expected value, in model output
+    units) and the ``method`` used: ``linear_attribution`` for logistic
+    models, ``tree_shap`` for boosters exposing ``pred_contrib``, else
+    ``heuristic`` from the directional baselines.
+    """
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
     model_data = get_trained_model()
+    if model_data is not None and len(X):
+        try:
+            if hasattr(model_data["model"], "coef_"):
+                contributions, base = _linear_contributions(model_data, X)
+                return {"contributions": contributions, "base_value": base, "method": "linear_attribution"}
+            if model_data.get("type") == "lgbm":
+                contributions, base = _tree_contributions(model_data, X)
+                return {"contributions": contributions, "base_value": base, "method": "tree_shap"}
+        except Exception as exc:
+            logger.debug("Model attribution failed, using heuristic: %s", exc)
+    contributions, base = _heuristic_contributions(X)
+    return {"contributions": contributions, "base_value": base, "method": "heuristic"}
 
-    shap_contribs = None
-    if model_data is not None:
-        shap_contribs = _try_shap(model_data, features)
 
-    if shap_contribs is not None:
-        contributions = shap_contribs
-        method = "shap"
-    else:
-        contributions = _heuristic_contributions(features, model_data)
-        method = "coefficient_proxy" if model_data else "heuristic"
+def contribution_rows(contributions: np.ndarray) -> list[dict[str, Any]]:
+    """One attribution row as feature records sorted by absolute contribution."""
+    rows = [
+        {
+            "feature": name,
+            "contribution": round(float(contributions[i]), 6),
+            "direction": "positive" if contributions[i] > 0 else "negative",
+            "description": _FEATURE_DESCRIPTIONS.get(name, name),
+        }
+        for i, name in enumerate(FEATURE_NAMES)
+    ]
+    rows.sort(key=lambda x: abs(x["contribution"]), reverse=True)
+    return rows
+
+
+def summarise_attributions(contributions: np.ndarray) -> list[dict[str, Any]]:
+    """Per-feature mean and mean-absolute contribution over a batch, largest first."""
+    if len(contributions) == 0:
+        return []
+    mean = contributions.mean(axis=0)
+    mean_abs = np.abs(contributions).mean(axis=0)
+    order = np.argsort(-mean_abs)
+    return [
+        {
+            "feature": FEATURE_NAMES[i],
+            "mean_contribution": round(float(mean[i]), 6),
+            "mean_abs_contribution": round(float(mean_abs[i]), 6),
+            "description": _FEATURE_DESCRIPTIONS.get(FEATURE_NAMES[i], FEATURE_NAMES[i]),
+        }
+        for i in order
+    ]
+
+
+def explain(features: dict[str, float]) -> dict[str, Any]:
+    batch = explain_batch(features_to_matrix([features], FEATURE_DEFAULTS))
+    contributions = contribution_rows(batch["contributions"][0])
 
     top_positive = [c for c in contributions if c["contribution"] > 0][:3]
     top_negative = [c for c in contributions if c["contribution"] < 0][:3]
@@ -111,53 +143,7 @@ def explain(features: dict[str, float]) -> dict[str, Any]:
         "contributions": contributions,
         "top_positive_drivers": top_positive,
         "top_negative_drivers": top_negative,
-        "method": method,
+        "method": batch["method"],
+        "base_value": round(float(batch["base_value"][0]), 6),
         "ts": datetime.now(timezone.utc).isoformat(),
     }
-
-
-def _heuristic_contributions(
-    features: dict[str, float],
-    model_data: dict | None,
-) -> list[dict[str, Any]]:
-    if model_data is not None and model_data.get("type") == "sklearn_logistic":
-        try:
-            model = model_data["model"]
-            coefs = model.coef_[0]
-            scaler = model_data.get("scaler")
-            vec = features_to_vector(features)
-            if scaler is not None:
-                vec_scaled = scaler.transform([vec])[0]
-            else:
-                vec_scaled = vec
-            contributions = []
-            for i, name in enumerate(FEATURE_NAMES):
-                if i < len(coefs) and i < len(vec_scaled):
-                    contrib = float(coefs[i] * vec_scaled[i])
-                    contributions.append({
-                        "feature": name,
-                        "contribution": round(contrib, 6),
-                        "direction": "positive" if contrib > 0 else "negative",
-                        "description": _FEATURE_DESCRIPTIONS.get(name, name),
-                    })
-            contributions.sort(key=lambda x: abs(x["contribution"]), reverse=True)
-            return contributions
-        except Exception as exc:
-            logger.debug("Coefficient proxy failed: %s", exc)
-
-    contributions = []
-    for name in FEATURE_NAMES:
-        val = features.get(name, _FEATURE_BASELINES.get(name, 0.0))
-        baseline = _FEATURE_BASELINES.get(name, 0.0)
-        direction_sign = _FEATURE_DIRECTION.get(name, 1)
-        delta = (val - baseline)
-        norm = max(abs(baseline) + 1.0, 1.0)
-        contrib = direction_sign * delta / norm * 0.1
-        contributions.append({
-            "feature": name,
-            "contribution": round(contrib, 6),
-            "direction": "positive" if contrib > 0 else "negative",
-            "description": _FEATURE_DESCRIPTIONS.get(name, name),
-        })
-    contributions.sort(key=lambda x: abs(x["contribution"]), reverse=True)
-    return contributions
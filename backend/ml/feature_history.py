@@ -0,0 +1,140 @@
+"""Materialised feature history and point-in-time training sets.
+
+A scheduler job snapshots the 15 ``FEATURE_NAMES`` with the consensus price
+into ``ml_features``; ``training_set`` joins each row to the forward return
+observed ``horizon_seconds`` later, counting only outcomes realised inside the
+requested window.
+"""
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import numpy as np
+
+from backend.core.state_store import StateStore
+from backend.data.repositories.feature_repo import FeatureRepository
+from backend.data.repositories.regime_repo import HORIZON_SECONDS
+from backend.ml.feature_store import FEATURE_NAMES, build_features
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOL = "SOL_USD"
+DEFAULT_HORIZON_S = HORIZON_SECONDS["return_4h"]
+DEFAULT_WINDOW_DAYS = 30
+
+
+def collect_state(store: StateStore) -> dict[str, Any]:
+    state: dict[str, Any] = {}
+
+    idx = store.get_snapshot("desk:index:latest") or store.get_snapshot("index:latest")
+    if idx:
+        state["tariff_index"] = idx.get("value", 30.0)
+        state["tariff_delta"] = idx.get("rate_of_change", 0.0)
+
+    shock = store.get_snapshot("desk:shock:latest") or store.get_snapshot("shock:latest")
+    if shock:
+        state["shock_score"] = shock.get("shock_score", 0.0)
+
+    pred = store.get_snapshot("predict:latest")
+    if pred:
+        state["predictor_confidence"] = pred.get("confidence", 0.5)
+
+    arb = store.get_snapshot("funding_arb:latest")
+    if arb:
+        state["funding_skew"] = arb.get("hl_rate", 0.0)
+
+    basis = store.get_snapshot("basis:latest")
+    if basis:
+        state["basis_spread"] = basis.get("basis_bps", 0.0) / 10000.0
+
+    vr = store.get_snapshot("desk:vol_regime:latest") or store.get_snapshot("vol_regime:latest")
+    if vr:
+        state["vol_regime"] = vr.get("regime", "normal")
+
+    stable = store.get_snapshot("stablecoin:health:latest")
+    if stable:
+        assets = stable.get("assets", {})
+        if assets:
+            state["stable_health"] = sum(
+                1.0 - min(abs(a.get("depeg_bps", 0)) / 100.0, 1.0)
+                for a in assets.values()
+            ) / len(assets)
+
+    sf = store.get_snapshot("stable_flow:latest")
+    if sf:
+        state["stable_flow"] = sf.get("momentum", 0.0)
+
+    eqi = store.get_snapshot("execution:metrics:latest")
+    if eqi:
+        state["exec_quality"] = eqi.get("eqi_score", 0.8)
+
+    ms = store.get_snapshot("microstructure:latest")
+    if ms:
+        state["orderbook_imbalance"] = ms.get("imbalance", 0.0)
+
+    return state
+
+
+def _matrix(rows: list[dict[str, Any]]) -> np.ndarray:
+    return np.array([[row[name] for name in FEATURE_NAMES] for row in rows], dtype=np.float32).reshape(len(rows), len(FEATURE_NAMES))
+
+
+class FeatureHistory:
+
+    def __init__(self, repository: FeatureRepository | None = None, state_store: StateStore | None = None):
+        self._repo = repository or FeatureRepository()
+        self._store = state_store or StateStore()
+
+    def materialise(
+        self,
+        price: float,
+        symbol: str = DEFAULT_SYMBOL,
+        state: dict[str, Any] | None = None,
+        ts: datetime | None = None,
+    ) -> dict | None:
+        if not price or price <= 0:
+            return None
+        features = build_features(collect_state(self._store) if state is None else state)["features"]
+        return self._repo.save_row(symbol, price, features, ts)
+
+    def window(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        symbol: str = DEFAULT_SYMBOL,
+    ) -> tuple[np.ndarray, list[datetime]]:
+        """Materialised feature rows in ``[start, end)`` as a float32 matrix plus timestamps."""
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=1)
+        rows = self._repo.get_window(start, end, symbol=symbol)
+        return _matrix(rows), [row["ts"] for row in rows]
+
+    def training_set(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        horizon_seconds: int = DEFAULT_HORIZON_S,
+        threshold: float = 0.0,
+        symbol: str = DEFAULT_SYMBOL,
+    ) -> tuple[np.ndarray, np.ndarray, list[datetime]]:
+        """Return ``(X, y, ts)`` for rows in ``[start, end)``.
+
+        ``X`` is a float32 matrix in ``FEATURE_NAMES`` order and ``y`` is 1
+        where the forward return over ``horizon_seconds`` beat ``threshold``.
+        """
+        end = end or datetime.now(timezone.utc)
+        start = start or end - timedelta(days=DEFAULT_WINDOW_DAYS)
+        rows = self._repo.get_training_rows(start, end, horizon_seconds, symbol=symbol)
+        X = _matrix(rows)
+        y = np.array([int(row["forward_return"] > threshold) for row in rows], dtype=np.int8)
+        return X, y, [row["ts"] for row in rows]
+
+
+_history: FeatureHistory | None = None
+
+
+def get_feature_history() -> FeatureHistory:
+    global _history
+    if _history is None:
+        _history = FeatureHistory()
+    return _history
@@ -2,7 +2,9 @@ import logging
 from datetime import datetime, timezone
 from typing import Any
 
-from backend.ml.feature_store import features_to_vector, FEATURE_NAMES
+import numpy as np
+
+from backend.ml.feature_store import FEATURE_DEFAULTS, FEATURE_NAMES, features_to_matrix
 from backend.ml.training import get_trained_model
 
 logger = logging.getLogger(__name__)
@@ -10,62 +12,75 @@ logger = logging.getLogger(__name__)
 _CACHED_PREDICTION: dict[str, Any] | None = None
 
 
-def _heuristic_predict(features: dict[str, float]) -> dict[str, Any]:
-    tariff_idx = features.get("tariff_index", 30.0)
-    shock = features.get("shock_score", 0.0)
-    vol_enc = features.get("vol_regime_encoded", 0.25)
-    stable_health = features.get("stable_health", 1.0)
-    predictor_conf = features.get("predictor_conf", 0.5)
-    exec_quality = features.get("exec_quality", 0.8)
+_COL = {name: i for i, name in enumerate(FEATURE_NAMES)}
 
+
+def _heuristic_predict_batch(X: np.ndarray) -> dict[str, Any]:
+    X = np.asarray(X, dtype=np.float64)
     score = 0.5
-    score -= (tariff_idx - 30.0) / 200.0
-    score -= shock * 0.05
-    score -= vol_enc * 0.10
-    score += (stable_health - 0.5) * 0.10
-    score += (predictor_conf - 0.5) * 0.15
-    score += (exec_quality - 0.5) * 0.05
+    score = score - (X[:, _COL["tariff_index"]] - 30.0) / 200.0
+    score = score - X[:, _COL["shock_score"]] * 0.05
+    score = score - X[:, _COL["vol_regime_encoded"]] * 0.10
+    score = score + (X[:, _COL["stable_health"]] - 0.5) * 0.10
+    score = score + (X[:, _COL["predictor_conf"]] - 0.5) * 0.15
+    score = score + (X[:, _COL["exec_quality"]] - 0.5) * 0.05
 
-    prob = max(0.05, min(0.95, score))
-    confidence = 0.3 + predictor_conf * 0.3 + stable_health * 0.2
+    prob = np.clip(score, 0.05, 0.95)
+    confidence = 0.3 + X[:, _COL["predictor_conf"]] * 0.3 + X[:, _COL["stable_health"]] * 0.2
 
     return {
-        "probability": round(prob, 4),
-        "prediction": 1 if prob > 0.5 else 0,
-        "confidence": round(min(confidence, 0.75), 3),
+        "probability": prob,
+        "prediction": (prob > 0.5).astype(np.int8),
+        "confidence": np.minimum(confidence, 0.75),
         "model_type": "heuristic_fallback",
     }
 
 
-def predict(features: dict[str, float]) -> dict[str, Any]:
-    global _CACHED_PREDICTION
+def _row(batch: dict[str, Any], i: int = 0) -> dict[str, Any]:
+    return {
+        "probability": round(float(batch["probability"][i]), 4),
+        "prediction": int(batch["prediction"][i]),
+        "confidence": round(float(batch["confidence"][i]), 3),
+        "model_type": batch["model_type"],
+    }
+
 
+def _heuristic_predict(features: dict[str, float]) -> dict[str, Any]:
+    return _row(_heuristic_predict_batch(features_to_matrix([features], FEATURE_DEFAULTS)))
+
+
+def predict_batch(X: np.ndarray) -> dict[str, Any]:
+    """Score a feature matrix (rows in ``FEATURE_NAMES`` order) in one pass.
+
+    The scaler and ``predict_proba`` run once over all rows and the class is
+    taken from the probability, so no second model call is needed.  Returns
+    arrays ``probability``, ``prediction`` and ``confidence`` plus
+    ``model_type``; falls back to the heuristic if no model is trained or
+    inference fails.
+    """
+    X = np.asarray(X, dtype=np.float32).reshape(-1, len(FEATURE_NAMES))
     model_data = get_trained_model()
+    if model_data is None or len(X) == 0:
+        return _heuristic_predict_batch(X)
+    try:
+        scaler = model_data.get("scaler")
+        Xs = scaler.transform(X) if scaler is not None else X
+        prob = np.asarray(model_data["model"].predict_proba(Xs), dtype=np.float64)[:, 1]
+        return {
+            "probability": prob,
+            "prediction": (prob > 0.5).astype(np.int8),
+            "confidence": np.full(len(prob), min(0.85, model_data.get("train_accuracy", 0.5))),
+            "model_type": model_data.get("type", "unknown"),
+        }
+    except Exception as exc:
+        logger.warning("ML inference failed, using heuristic: %s", exc)
+        return _heuristic_predict_batch(X)
 
-    if model_data is None:
-        pred = _heuristic_predict(features)
-    else:
-        try:
-            model = model_data["model"]
-            scaler = model_data.get("scaler")
-            vec = [features_to_vector(features)]
-
-            if scaler is not None:
-                vec = scaler.transform(vec)
-
-            prob = float(model.predict_proba(vec)[0][1])
-            pred_class = int(model.predict(vec)[0])
-
-            pred = {
-                "probability": round(prob, 4),
-                "prediction": pred_class,
-                "confidence": round(min(0.85, model_data.get("train_accuracy", 0.5)), 3),
-                "model_type": model_data.get("type", "unknown"),
-            }
-        except Exception as exc:
-            logger.warning("ML inference failed, using heuristic: %s", exc)
-            pred = _heuristic_predict(features)
 
+def predict(features: dict[str, float]) -> dict[str, Any]:
+    global _CACHED_PREDICTION
+
+    pred = _row(predict_batch(features_to_matrix([features], FEATURE_DEFAULTS)))
     pred["ts"] = datetime.now(timezone.utc).isoformat()
     _CACHED_PREDICTION = pred
     return pred
@@ -0,0 +1,191 @@
+"""On-disk registry of fitted models with an atomically swapped active version.
+
+Each version lives in its own directory (``model.joblib`` + ``meta.json``) and
+is published with a directory rename; the ``ACTIVE`` pointer file is replaced
+with ``os.replace``.  Workers warm-load the active version at startup with
+arrays memory-mapped read-only, then pick up promotions made by any other
+worker from a scheduler job that polls the pointer every
+``MODEL_REGISTRY_POLL_S`` — the request path only reads the swapped reference.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.config import MODEL_REGISTRY_DIR
+from backend.ml.feature_store import FEATURE_NAMES
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_POINTER = "ACTIVE"
+ARTEFACT_FILE = "model.joblib"
+META_FILE = "meta.json"
+
+
+def feature_hash(names: list[str] | None = None) -> str:
+    return hashlib.sha256(",".join(names or FEATURE_NAMES).encode()).hexdigest()[:16]
+
+
+def _try_import_joblib():
+    try:
+        import joblib
+        return joblib
+    except ImportError:
+        return None
+
+
+class ModelRegistry:
+
+    def __init__(self, root: str | None = None):
+        self.root = root or MODEL_REGISTRY_DIR
+        self._lock = threading.Lock()
+        self._current: tuple[str | None, dict[str, Any] | None] = (None, None)
+        self._watching = False
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def active_version(self) -> str | None:
+        try:
+            with open(self._path(ACTIVE_POINTER)) as fh:
+                return fh.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def list_versions(self) -> list[dict[str, Any]]:
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        metas = []
+        for name in names:
+            try:
+                with open(self._path(name, META_FILE)) as fh:
+                    metas.append(json.load(fh))
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                continue
+        return sorted(metas, key=lambda m: m.get("created_at", ""))
+
+    def register(
+        self,
+        model_data: dict[str, Any],
+        metrics: dict[str, Any] | None = None,
+        window: dict[str, Any] | None = None,
+        promote: bool = True,
+    ) -> dict[str, Any]:
+        """Serialise a fitted model and its scaler as a new version.
+
+        The version directory is written under a temporary name and renamed
+        into place, so readers never observe a partial artefact.
+        """
+        created = datetime.now(timezone.utc)
+        version = f"{created.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        feature_names = list(model_data.get("feature_names") or FEATURE_NAMES)
+        meta = {
+            "version": version,
+            "type": model_data.get("type", "unknown"),
+            "feature_names": feature_names,
+            "feature_hash": feature_hash(feature_names),
+            "n_samples": model_data.get("n_samples"),
+            "train_accuracy": model_data.get("train_accuracy"),
+            "metrics": metrics or {},
+            "window": window,
+            "created_at": created.isoformat(),
+        }
+        os.makedirs(self.root, exist_ok=True)
+        staging = self._path(f".{version}.tmp")
+        os.makedirs(staging)
+        artefact = {"model": model_data["model"], "scaler": model_data.get("scaler")}
+        joblib = _try_import_joblib()
+        if joblib is not None:
+            joblib.dump(artefact, os.path.join(staging, ARTEFACT_FILE))
+        else:
+            with open(os.path.join(staging, ARTEFACT_FILE), "wb") as fh:
+                pickle.dump(artefact, fh)
+        with open(os.path.join(staging, META_FILE), "w") as fh:
+            json.dump(meta, fh, default=str)
+        os.rename(staging, self._path(version))
+        logger.info("Registered model %s (%s, %s samples)", version, meta["type"], meta["n_samples"])
+
+        if promote:
+            self.promote(version, loaded=model_data)
+        return meta
+
+    def promote(self, version: str, loaded: dict[str, Any] | None = None) -> dict[str, Any]:
+        model_data = loaded if loaded is not None else self.load(version)
+        pointer = self._path(f".{ACTIVE_POINTER}.{uuid.uuid4().hex[:6]}.tmp")
+        with open(pointer, "w") as fh:
+            fh.write(version)
+        os.replace(pointer, self._path(ACTIVE_POINTER))
+        with self._lock:
+            self._current = (version, {**model_data, "version": version})
+        logger.info("Promoted model %s", version)
+        return self._current[1]
+
+    def load(self, version: str) -> dict[str, Any]:
+        with open(self._path(version, META_FILE)) as fh:
+            meta = json.load(fh)
+        if meta.get("feature_hash") != feature_hash():
+            raise ValueError(f"Model {version} was trained on a different feature set")
+        path = self._path(version, ARTEFACT_FILE)
+        joblib = _try_import_joblib()
+        if joblib is not None:
+            artefact = joblib.load(path, mmap_mode="r")
+        else:
+            with open(path, "rb") as fh:
+                artefact = pickle.load(fh)
+        return {
+            "type": meta.get("type", "unknown"),
+            "model": artefact["model"],
+            "scaler": artefact.get("scaler"),
+            "feature_names": meta.get("feature_names", FEATURE_NAMES),
+            "n_samples": meta.get("n_samples"),
+            "train_accuracy": meta.get("train_accuracy", 0.5),
+            "version": version,
+        }
+
+    def _swap_to(self, version: str | None) -> dict[str, Any] | None:
+        if version is None:
+            return None
+        try:
+            model_data = self.load(version)
+        except Exception:
+            logger.error("Failed to load model %s; keeping %s", version, self._current[0], exc_info=True)
+            return None
+        with self._lock:
+            self._current = (version, model_data)
+        logger.info("Loaded model %s", version)
+        return model_data
+
+    def warm_load(self) -> dict[str, Any] | None:
+        """Load the active version and start following promotions from other workers."""
+        self._watching = True
+        return self._swap_to(self.active_version())
+
+    def poll(self) -> dict[str, Any] | None:
+        """Return a newly promoted model if the pointer moved since the last check, else None."""
+        if not self._watching:
+            return None
+        version = self.active_version()
+        if version is None or version == self._current[0]:
+            return None
+        return self._swap_to(version)
+
+    @property
+    def current_version(self) -> str | None:
+        return self._current[0]
+
+
+_registry: ModelRegistry | None = None
+
+
+def get_model_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        _registry = ModelRegistry()
+    return _registry
@@ -1,8 +1,13 @@
 import logging
+from collections.abc import Callable
 from datetime import datetime, timezone
 from typing import Any
 
-from backend.ml.feature_store import FEATURE_NAMES, features_to_vector
+import numpy as np
+
+from backend.ml.feature_history import DEFAULT_HORIZON_S, FeatureHistory, get_feature_history
+from backend.ml.feature_store import FEATURE_DEFAULTS, FEATURE_NAMES, features_to_matrix
+from backend.ml.model_registry import get_model_registry
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +16,17 @@ _TRAINING_HISTORY: list[dict[str, Any]] = []
 
 MIN_SAMPLES = 20
 
+ProgressCallback = Callable[[str, float], None]
+
+
+class TrainingCancelled(Exception):
+    """Raised from a progress callback to stop a fit between stages."""
+
+
+def _report(progress: ProgressCallback | None, stage: str, fraction: float) -> None:
+    if progress is not None:
+        progress(stage, round(fraction, 4))
+
 
 def _try_import_sklearn():
     try:
@@ -30,13 +46,8 @@ def _try_import_lgbm():
         return None
 
 
-def train_offline(
-    samples: list[dict[str, Any]],
-    labels: list[int],
-    method: str = "logistic",
-) -> dict[str, Any]:
-    global _TRAINED_MODEL, _TRAINING_HISTORY
-
+def validate_samples(samples: list[dict[str, Any]], labels: list[int]) -> dict[str, Any] | None:
+    """Return a failure result if ``samples``/``labels`` cannot be trained on, else None."""
     if len(samples) < MIN_SAMPLES:
         return {
             "success": False,
@@ -52,14 +63,84 @@ def train_offline(
             "reason": "samples and labels length mismatch",
             "ts": datetime.now(timezone.utc).isoformat(),
         }
+    return None
+
+
+def train_offline(
+    samples: list[dict[str, Any]],
+    labels: list[int],
+    method: str = "logistic",
+    promote: bool = True,
+    progress: ProgressCallback | None = None,
+) -> dict[str, Any]:
+    invalid = validate_samples(samples, labels)
+    if invalid is not None:
+        return invalid
 
-    X = [features_to_vector(s.get("features", s)) for s in samples]
+    X = features_to_matrix([s.get("features", s) for s in samples], FEATURE_DEFAULTS)
     y = [int(bool(lbl)) for lbl in labels]
+    return train_matrix(X, y, method=method, promote=promote, progress=progress)
 
+
+def train_from_history(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    horizon_seconds: int = DEFAULT_HORIZON_S,
+    threshold: float = 0.0,
+    method: str = "logistic",
+    history: FeatureHistory | None = None,
+    promote: bool = True,
+    progress: ProgressCallback | None = None,
+) -> dict[str, Any]:
+    """Train on the materialised feature history with point-in-time forward-return labels."""
+    _report(progress, "loading", 0.0)
+    X, y, ts = (history or get_feature_history()).training_set(start, end, horizon_seconds, threshold)
+    _report(progress, "loaded", 0.2)
+    window = {
+        "start": ts[0].isoformat() if ts else None,
+        "end": ts[-1].isoformat() if ts else None,
+        "horizon_seconds": horizon_seconds,
+        "threshold": threshold,
+        "positive_rate": round(float(np.mean(y)), 4) if len(y) else None,
+    }
+    if len(X) < MIN_SAMPLES:
+        return {
+            "success": False,
+            "reason": f"Insufficient training data: {len(X)} labelled feature rows, minimum {MIN_SAMPLES} required",
+            "samples_provided": len(X),
+            "samples_needed": MIN_SAMPLES,
+            "window": window,
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+    if len(set(y.tolist())) < 2:
+        return {
+            "success": False,
+            "reason": "Labels in the window are all one class",
+            "samples_provided": len(X),
+            "window": window,
+            "ts": datetime.now(timezone.utc).isoformat(),
+        }
+    return train_matrix(X, y.tolist(), method=method, window=window, promote=promote, progress=progress)
+
+
+def train_matrix(
+    X,
+    y: list[int],
+    method: str = "logistic",
+    window: dict[str, Any] | None = None,
+    promote: bool = True,
+    progress: ProgressCallback | None = None,
+) -> dict[str, Any]:
+    """Fit and register a model.
+
+    ``progress(stage, fraction)`` is called after each fitting stage, each
+    cross-validation fold and each boosting round; raising
+    ``TrainingCancelled`` from it abandons the fit before anything is registered.
+    """
     if method == "lgbm":
         lgb = _try_import_lgbm()
         if lgb is not None:
-            return _train_lgbm(lgb, X, y)
+            return _train_lgbm(lgb, X, y, window, promote, progress)
         logger.warning("LightGBM not available, falling back to logistic regression")
         method = "logistic"
 
@@ -71,33 +152,33 @@ def train_offline(
             "ts": datetime.now(timezone.utc).isoformat(),
         }
 
-    return _train_sklearn(LogisticRegression, StandardScaler, cross_val_score, X, y)
+    return _train_sklearn(LogisticRegression, StandardScaler, cross_val_score, X, y, window, promote, progress)
 
 
-def _train_sklearn(LR, Scaler, cv_score, X, y) -> dict[str, Any]:
+def _train_sklearn(LR, Scaler, cv_score, X, y, window=None, promote=True, progress=None) -> dict[str, Any]:
     global _TRAINED_MODEL, _TRAINING_HISTORY
     try:
+        _report(progress, "fitting", 0.25)
         scaler = Scaler()
         X_scaled = scaler.fit_transform(X)
         model = LR(max_iter=500, C=1.0, random_state=42)
         model.fit(X_scaled, y)
+        _report(progress, "fitted", 0.4)
 
         cv_scores = []
         try:
-            cv_scores = cv_score(model, X_scaled, y, cv=min(5, len(y) // 4 + 1), scoring="accuracy").tolist()
+            from sklearn.model_selection import check_cv
+            folds = list(check_cv(min(5, len(y) // 4 + 1), y, classifier=True).split(X_scaled, y))
+            for i, fold in enumerate(folds):
+                cv_scores.append(float(cv_score(model, X_scaled, y, cv=[fold], scoring="accuracy")[0]))
+                _report(progress, f"cv fold {i + 1}/{len(folds)}", 0.4 + 0.5 * (i + 1) / len(folds))
+        except TrainingCancelled:
+            raise
         except Exception:
-            pass
+            cv_scores = []
 
         acc = model.score(X_scaled, y)
-
-        _TRAINED_MODEL = {
-            "type": "sklearn_logistic",
-            "model": model,
-            "scaler": scaler,
-            "feature_names": FEATURE_NAMES,
-            "n_samples": len(X),
-            "train_accuracy": round(acc, 4),
-        }
+        _report(progress, "registering", 0.95)
 
         result = {
             "success": True,
@@ -108,9 +189,21 @@ def _train_sklearn(LR, Scaler, cv_score, X, y) -> dict[str, Any]:
             "cv_mean": round(sum(cv_scores) / len(cv_scores), 4) if cv_scores else None,
             "ts": datetime.now(timezone.utc).isoformat(),
         }
+        if window is not None:
+            result["window"] = window
+        _publish({
+            "type": "sklearn_logistic",
+            "model": model,
+            "scaler": scaler,
+            "feature_names": FEATURE_NAMES,
+            "n_samples": len(X),
+            "train_accuracy": round(acc, 4),
+        }, result, promote)
         _TRAINING_HISTORY.append(result)
         _TRAINING_HISTORY = _TRAINING_HISTORY[-10:]
         return result
+    except TrainingCancelled:
+        raise
     except Exception as exc:
         logger.warning("sklearn training failed: %s", exc, exc_info=True)
         return {
@@ -120,7 +213,7 @@ def _train_sklearn(LR, Scaler, cv_score, X, y) -> dict[str, Any]:
         }
 
 
-def _train_lgbm(lgb, X, y) -> dict[str, Any]:
+def _train_lgbm(lgb, X, y, window=None, promote=True, progress=None) -> dict[str, Any]:
     global _TRAINED_MODEL, _TRAINING_HISTORY
     try:
         params = {
@@ -131,18 +224,14 @@ def _train_lgbm(lgb, X, y) -> dict[str, Any]:
             "random_state": 42,
             "verbosity": -1,
         }
+        def on_round(env) -> None:
+            _report(progress, f"boosting round {env.iteration + 1}/{env.end_iteration}", 0.25 + 0.65 * (env.iteration + 1) / env.end_iteration)
+
+        _report(progress, "fitting", 0.25)
         model = lgb.LGBMClassifier(**params)
-        model.fit(X, y)
+        model.fit(X, y, callbacks=[on_round])
         acc = model.score(X, y)
-
-        _TRAINED_MODEL = {
-            "type": "lgbm",
-            "model": model,
-            "scaler": None,
-            "feature_names": FEATURE_NAMES,
-            "n_samples": len(X),
-            "train_accuracy": round(acc, 4),
-        }
+        _report(progress, "registering", 0.95)
 
         result = {
             "success": True,
@@ -151,9 +240,21 @@ def _train_lgbm(lgb, X, y) -> dict[str, Any]:
             "train_accuracy": round(acc, 4),
             "ts": datetime.now(timezone.utc).isoformat(),
         }
+        if window is not None:
+            result["window"] = window
+        _publish({
+            "type": "lgbm",
+            "model": model,
+            "scaler": None,
+            "feature_names": FEATURE_NAMES,
+            "n_samples": len(X),
+            "train_accuracy": round(acc, 4),
+        }, result, promote)
         _TRAINING_HISTORY.append(result)
         _TRAINING_HISTORY = _TRAINING_HISTORY[-10:]
         return result
+    except TrainingCancelled:
+        raise
     except Exception as exc:
         logger.warning("LightGBM training failed: %s", exc, exc_info=True)
         return {
@@ -163,6 +264,57 @@ def _train_lgbm(lgb, X, y) -> dict[str, Any]:
         }
 
 
+def _publish(model_data: dict[str, Any], result: dict[str, Any], promote: bool = True) -> None:
+    """Persist a freshly fitted model as a registry version; with ``promote`` also make it active here."""
+    global _TRAINED_MODEL
+    if promote:
+        _TRAINED_MODEL = model_data
+    try:
+        meta = get_model_registry().register(
+            model_data,
+            metrics={k: result.get(k) for k in ("train_accuracy", "cv_scores", "cv_mean")},
+            window=result.get("window"),
+            promote=promote,
+        )
+        if promote:
+            _TRAINED_MODEL = {**model_data, "version": meta["version"]}
+        result["version"] = meta["version"]
+    except Exception:
+        logger.error("Failed to persist trained model to the registry", exc_info=True)
+
+
+def warm_load_model() -> str | None:
+    """Load the registry's active version at startup; returns its version."""
+    global _TRAINED_MODEL
+    model_data = get_model_registry().warm_load()
+    if model_data is not None:
+        _TRAINED_MODEL = model_data
+        return model_data["version"]
+    return None
+
+
+def promote_model_version(version: str) -> None:
+    """Make a registered version active for every worker and swap to it here immediately."""
+    global _TRAINED_MODEL
+    _TRAINED_MODEL = get_model_registry().promote(version)
+
+
+def refresh_model() -> str | None:
+    """Hot-swap to a version promoted elsewhere; returns the new version if one was loaded."""
+    global _TRAINED_MODEL
+    model_data = get_model_registry().poll()
+    if model_data is not None:
+        _TRAINED_MODEL = model_data
+        return model_data["version"]
+    return None
+
+
+def record_training_result(result: dict[str, Any]) -> None:
+    global _TRAINING_HISTORY
+    _TRAINING_HISTORY.append(result)
+    _TRAINING_HISTORY = _TRAINING_HISTORY[-10:]
+
+
 def get_trained_model() -> dict[str, Any] | None:
     return _TRAINED_MODEL
 
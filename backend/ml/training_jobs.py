@@ -0,0 +1,328 @@
+"""Training jobs run in a separate process pool.
+
+API calls enqueue a job and return its id immediately; fitting (and, for
+history jobs, loading the feature window) happens in a worker process so it
+never holds an API thread or the API process's GIL.  ``ML_TRAINING_WORKERS``
+bounds concurrent fits and ``ML_TRAINING_MAX_PENDING`` bounds queued plus
+running jobs.  Workers report each stage, cross-validation fold and boosting
+round through a managed queue that a pump thread folds into the job record,
+and check a managed cancel flag at the same points: cancelling a running job
+stops it at the next stage without registering a model.  Workers register
+the fitted model without promoting it; the API process promotes it.  In
+multi-worker mode job records are mirrored to the ``ml:training_jobs`` Redis
+hash so any worker can report or cancel a job; the submitting worker still
+runs and promotes it, and the other workers hot-swap via the registry.
+"""
+import json
+import logging
+import multiprocessing
+import threading
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+
+from backend.config import ML_TRAINING_MAX_PENDING, ML_TRAINING_WORKERS
+from backend.core import cluster
+from backend.core.event_bus import EventBus, EventType
+from backend.core.state_store import StateStore
+from backend.ml.model_registry import get_model_registry
+
+logger = logging.getLogger(__name__)
+
+MAX_FINISHED_JOBS = 50
+JOBS_KEY = "ml:training_jobs"
+_TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class TrainingQueueFull(Exception):
+    pass
+
+
+def _run_job(job_id: str, kind: str, params: dict[str, Any], registry_root: str, updates, cancels) -> dict[str, Any]:
+    """Worker-process entry point: fit and register, but leave promotion to the API process."""
+    from backend.ml import model_registry, training
+
+    def progress(stage: str, fraction: float) -> None:
+        if cancels.get(job_id):
+            raise training.TrainingCancelled(f"training job {job_id} cancelled during {stage}")
+        updates.put((job_id, stage, fraction))
+
+    model_registry._registry = model_registry.ModelRegistry(registry_root)
+    progress("started", 0.0)
+    if kind == "history":
+        return training.train_from_history(promote=False, progress=progress, **params)
+    return training.train_offline(params["samples"], params["labels"], method=params.get("method", "logistic"), promote=False, progress=progress)
+
+
+class TrainingJobQueue:
+
+    def __init__(
+        self,
+        max_workers: int = ML_TRAINING_WORKERS,
+        max_pending: int = ML_TRAINING_MAX_PENDING,
+        event_bus: EventBus | None = None,
+        state_store: StateStore | None = None,
+        shared: bool | None = None,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(1, max_pending)
+        self._bus = event_bus or EventBus()
+        self._shared = cluster.is_multi_worker() if shared is None else shared
+        self._store = state_store or (StateStore() if self._shared else None)
+        self._pool: ProcessPoolExecutor | None = None
+        self._manager = None
+        self._updates = None
+        self._cancels = None
+        self._pump: threading.Thread | None = None
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._futures: dict[str, Future] = {}
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def add_completion_listener(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        """Call ``listener(job)`` after a job's model has been promoted."""
+        self._listeners.append(listener)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            ctx = multiprocessing.get_context("spawn")
+            self._manager = ctx.Manager()
+            self._updates = self._manager.Queue()
+            self._cancels = self._manager.dict()
+            self._pump = threading.Thread(target=self._pump_progress, args=(self._updates,), name="training-progress", daemon=True)
+            self._pump.start()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._pool
+
+    def _pump_progress(self, updates) -> None:
+        """Fold ``(job_id, stage, fraction)`` updates from workers into the job records."""
+        while True:
+            try:
+                item = updates.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, stage, fraction = item
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] in _TERMINAL:
+                    continue
+                job.update(status="running", stage=stage, progress=fraction)
+                snapshot = dict(job)
+            if self._shared:
+                self._share(snapshot)
+                if any(remote.get("cancel_requested") for remote in self._shared_jobs(job_id)):
+                    self._request_cancel(job_id)
+
+    def _request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] not in _TERMINAL:
+                job["cancel_requested"] = True
+        if self._cancels is not None:
+            try:
+                self._cancels[job_id] = True
+            except (EOFError, OSError):
+                logger.warning("Failed to flag training job %s for cancellation", job_id, exc_info=True)
+
+    def _share(self, job: dict[str, Any]) -> None:
+        r = self._store.get_redis() if self._shared else None
+        if r is None:
+            return
+        try:
+            r.hset(JOBS_KEY, job["job_id"], json.dumps(job, default=str))
+        except Exception:
+            logger.warning("Failed to share training job %s", job["job_id"], exc_info=True)
+
+    def _shared_jobs(self, *job_ids: str) -> list[dict[str, Any]]:
+        r = self._store.get_redis() if self._shared else None
+        if r is None:
+            return []
+        try:
+            raw = r.hmget(JOBS_KEY, list(job_ids)) if job_ids else list(r.hgetall(JOBS_KEY).values())
+        except Exception:
+            logger.warning("Failed to read shared training jobs", exc_info=True)
+            return []
+        return [json.loads(item) for item in raw if item]
+
+    def _active(self) -> int:
+        return sum(1 for job in self._jobs.values() if job["status"] not in _TERMINAL)
+
+    def submit(self, kind: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Queue a ``"history"`` or ``"samples"`` training job; raises TrainingQueueFull at capacity."""
+        now = datetime.now(timezone.utc).isoformat()
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            if self._active() >= self.max_pending:
+                raise TrainingQueueFull(f"{self.max_pending} training jobs already queued or running")
+            job = {
+                "job_id": job_id,
+                "kind": kind,
+                "method": params.get("method", "logistic"),
+                "status": "queued",
+                "stage": "queued",
+                "progress": 0.0,
+                "cancel_requested": False,
+                "submitted_at": now,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._jobs[job_id] = job
+            pool = self._executor()
+            future = pool.submit(_run_job, job_id, kind, params, get_model_registry().root, self._updates, self._cancels)
+            self._futures[job_id] = future
+        self._share(job)
+        future.add_done_callback(lambda f, jid=job_id: self._finish(jid, f))
+        logger.info("Training job %s queued (%s, %s)", job_id, kind, job["method"])
+        return self.get(job_id)
+
+    def _finish(self, job_id: str, future: Future) -> None:
+        with self._lock:
+            job = self._jobs[job_id]
+            self._futures.pop(job_id, None)
+        if self._cancels is not None:
+            try:
+                self._cancels.pop(job_id, None)
+            except (EOFError, OSError):
+                pass
+        if any(remote.get("cancel_requested") for remote in self._shared_jobs(job_id)):
+            job["cancel_requested"] = True
+        try:
+            self._complete(job_id, job, future)
+        finally:
+            self._share(job)
+
+    def _complete(self, job_id: str, job: dict[str, Any], future: Future) -> None:
+        finished = datetime.now(timezone.utc).isoformat()
+        if future.cancelled():
+            job.update(status="cancelled", stage="cancelled", finished_at=finished)
+            return
+
+        from backend.ml import training
+        error = future.exception()
+        if isinstance(error, training.TrainingCancelled):
+            job.update(status="cancelled", stage="cancelled", finished_at=finished)
+            logger.info("Training job %s stopped after cancellation", job_id)
+            return
+        result = None if error is not None else future.result()
+        if error is not None or not result.get("success"):
+            job.update(status="failed", stage="failed", finished_at=finished, result=result,
+                       error=str(error) if error is not None else result.get("reason"))
+            logger.warning("Training job %s failed: %s", job_id, job["error"])
+            return
+        if job["cancel_requested"]:
+            job.update(status="cancelled", stage="cancelled", finished_at=finished, result=result)
+            logger.info("Training job %s finished after cancellation; version %s left unpromoted", job_id, result.get("version"))
+            return
+
+        try:
+            if result.get("version"):
+                training.promote_model_version(result["version"])
+        except Exception as exc:
+            logger.error("Failed to promote model from training job %s", job_id, exc_info=True)
+            job.update(status="failed", stage="failed", finished_at=finished, result=result, error=f"promotion failed: {exc}")
+            return
+        training.record_training_result(result)
+        job.update(status="succeeded", stage="done", progress=1.0, finished_at=finished, result=result)
+        self._bus.emit(
+            EventType.ML_MODEL_TRAINED,
+            source="training_jobs",
+            payload={
+                "job_id": job_id,
+                "method": result.get("method"),
+                "version": result.get("version"),
+                "n_samples": result.get("n_samples"),
+                "train_accuracy": result.get("train_accuracy"),
+                "window": result.get("window"),
+            },
+        )
+        for listener in self._listeners:
+            try:
+                listener(dict(job))
+            except Exception:
+                logger.error("Training job listener failed for %s", job_id, exc_info=True)
+        self._prune()
+
+    def _prune(self) -> None:
+        with self._lock:
+            finished = [jid for jid, job in self._jobs.items() if job["status"] in _TERMINAL]
+            pruned = finished[:-MAX_FINISHED_JOBS]
+            for jid in pruned:
+                del self._jobs[jid]
+        r = self._store.get_redis() if self._shared and pruned else None
+        if r is not None:
+            try:
+                r.hdel(JOBS_KEY, *pruned)
+            except Exception:
+                logger.warning("Failed to prune shared training jobs", exc_info=True)
+
+    def get(self, job_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                future = self._futures.get(job_id)
+                started = job["status"] == "queued" and future is not None and future.running()
+                if started:
+                    job.update(status="running", stage="started")
+                snapshot = {k: v for k, v in job.items()}
+        if job is None:
+            return next(iter(self._shared_jobs(job_id)), None)
+        if started:
+            self._share(snapshot)
+        return snapshot
+
+    def list(self) -> list[dict[str, Any]]:
+        with self._lock:
+            ids = list(self._jobs)
+        jobs = [job for job in (self.get(jid) for jid in ids) if job is not None]
+        local = set(ids)
+        remote = [job for job in self._shared_jobs() if job["job_id"] not in local]
+        return sorted(remote, key=lambda job: job["submitted_at"]) + jobs if remote else jobs
+
+    def cancel(self, job_id: str) -> dict[str, Any] | None:
+        """Cancel a queued job outright; a running job stops at its next stage and registers nothing."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            future = self._futures.get(job_id)
+        if job is None:
+            return self._cancel_shared(job_id)
+        self._request_cancel(job_id)
+        if future is not None:
+            future.cancel()
+        return self.get(job_id)
+
+    def _cancel_shared(self, job_id: str) -> dict[str, Any] | None:
+        """Flag a job owned by another worker; its owner picks the flag up at the job's next stage."""
+        job = next(iter(self._shared_jobs(job_id)), None)
+        if job is not None and job["status"] not in _TERMINAL:
+            job["cancel_requested"] = True
+            self._share(job)
+        return job
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            try:
+                self._updates.put(None)
+            except (EOFError, OSError):
+                pass
+            if self._pump is not None:
+                self._pump.join(timeout=1.0)
+            self._manager.shutdown()
+            self._manager = self._updates = self._cancels = self._pump = None
+
+
+_queue: TrainingJobQueue | None = None
+
+
+def get_training_queue() -> TrainingJobQueue:
+    global _queue
+    if _queue is None:
+        _queue = TrainingJobQueue()
+    return _queue
@@ -1,19 +1,50 @@
-import subprocess
 import os
 import shutil
+import socket
+import subprocess
 import time
+from urllib.parse import urlparse
+
 
-if shutil.which("redis-server"):
+def _redis_address() -> tuple[str, int] | None:
+    url = urlparse(os.environ.get("REDIS_URL", "redis://localhost:6379"))
+    host = url.hostname or "localhost"
+    if host not in ("localhost", "127.0.0.1", "::1"):
+        return None
+    return host, url.port or 6379
+
+
+def _redis_listening(address: tuple[str, int]) -> bool:
+    try:
+        with socket.create_connection(address, timeout=0.05):
+            return True
+    except OSError:
+        return False
+
+
+def _start_local_redis(wait_s: float = 2.0) -> None:
+    """Spawn a local redis-server only when one is needed and nothing is listening,
+    then poll until it accepts connections instead of sleeping a fixed interval."""
+    if os.environ.get("START_LOCAL_REDIS", "1") not in ("1", "true", "yes"):
+        return
+    address = _redis_address()
+    if address is None or not shutil.which("redis-server") or _redis_listening(address):
+        return
     try:
         subprocess.run(
-            ["redis-server", "--daemonize", "yes", "--loglevel", "warning"],
+            ["redis-server", "--port", str(address[1]), "--daemonize", "yes", "--loglevel", "warning"],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
             timeout=5,
         )
-        time.sleep(0.5)
     except Exception:
-        pass
+        return
+    deadline = time.monotonic() + wait_s
+    while time.monotonic() < deadline and not _redis_listening(address):
+        time.sleep(0.02)
+
+
+_start_local_redis()
 
 from backend.logging_config import setup_logging, get_logger
 
@@ -22,6 +53,7 @@ logger = get_logger(__name__)
 
 
 def create_app():
+    import asyncio
     from pathlib import Path
     from contextlib import asynccontextmanager
     from fastapi import FastAPI
@@ -37,20 +69,77 @@ def create_app():
         except Exception as exc:
             logger.warning("Database migration failed (non-fatal): %s", exc)
 
+        from backend.compute.regime_memory import get_regime_memory
+        get_regime_memory().warm_in_background()
+
+        from backend.ml.training import warm_load_model
+        try:
+            version = warm_load_model()
+            logger.info("ML model warm-loaded: %s", version or "none registered")
+        except Exception as exc:
+            logger.warning("ML model warm load failed (non-fatal): %s", exc)
+
+        from backend.core import cluster
         from backend.ingest.scheduler import IngestScheduler
+        from backend.execution.smart_scheduler import get_smart_scheduler
         scheduler = IngestScheduler()
+        smart_scheduler = get_smart_scheduler()
+
+        async def set_leader(leader: bool) -> None:
+            scheduler.set_leader(leader)
+            if not leader:
+                await smart_scheduler.stop()
+                return
+            from backend.compute.regime_memory import get_regime_memory
+            from backend.execution.trigger_engine import get_trigger_engine
+            get_trigger_engine().reset()
+            get_regime_memory().invalidate()
+            await smart_scheduler.start()
+
+        multi_worker = cluster.is_multi_worker()
         try:
-            scheduler.schedule_all()
+            scheduler.schedule_all(leader=not multi_worker)
             logger.info("Ingest scheduler started")
         except Exception as exc:
             logger.warning("Scheduler start failed (non-fatal): %s", exc)
 
+        leadership = None
+        if multi_worker:
+            leadership = asyncio.create_task(cluster.maintain_leadership(set_leader), name="leader-lease")
+            logger.info("Multi-worker mode: worker %s contending for the scheduler lease", cluster.WORKER_ID)
+        else:
+            try:
+                await smart_scheduler.start()
+            except Exception as exc:
+                logger.warning("Smart execution scheduler start failed (non-fatal): %s", exc)
+
         yield
 
+        if leadership is not None:
+            leadership.cancel()
+            try:
+                await leadership
+            except asyncio.CancelledError:
+                pass
+            cluster.get_leader_lease().release()
+        try:
+            await smart_scheduler.stop()
+        except Exception:
+            pass
         try:
             scheduler.stop()
         except Exception:
             pass
+        try:
+            from backend.ml.training_jobs import get_training_queue
+            get_training_queue().shutdown()
+        except Exception:
+            pass
+        try:
+            from backend.agents.runtime import get_agent_runtime
+            get_agent_runtime().shutdown()
+        except Exception:
+            pass
 
     app = FastAPI(title="Tariff Risk Desk", version="0.1.0", lifespan=lifespan)
 
@@ -80,3 +80,111 @@ def test_allocation_execution_preview_structure():
     assert "allowed_size" in result
     assert "suggested_size" in result
     assert "warnings" in result
+
+
+def _bars(start_day: int, n: int, base: float = 100.0):
+    return [{"ts": f"2026-01-{start_day + i:02d}T21:00:00+00:00", "open": base + i, "high": base + i, "low": base + i, "close": base + i, "volume": 1000} for i in range(n)]
+
+
+def test_equity_loader_batches_and_caches_on_disk(tmp_path, monkeypatch):
+    import backend.ingest.equity_universe as eu
+
+    calls = {"batch": [], "single": []}
+
+    def fake_batch(tickers, period="3mo"):
+        calls["batch"].append((tuple(tickers), period))
+        return {t: {"ticker": t, "history": _bars(1, 20), "provider_status": {"name": "yfinance", "status": "ok"}, "degraded": False} for t in tickers if t != "ZZZ"}
+
+    def fake_cascade(ticker, period="3mo", batch_tried=False):
+        assert batch_tried
+        calls["single"].append(ticker)
+        return {"ticker": ticker, "history": _bars(1, 5), "provider_status": {"name": "Stooq", "status": "degraded"}, "degraded": True}
+
+    monkeypatch.setattr(eu.yfinance_ingest, "fetch_history_batch", fake_batch)
+    monkeypatch.setattr(eu, "fetch_with_cascade", fake_cascade)
+
+    loader = eu.EquityUniverseLoader(cache_dir=str(tmp_path))
+    result = loader.load(["SPY", "AAPL", "ZZZ"])
+    assert calls["batch"] == [(("SPY", "AAPL", "ZZZ"), "3mo")]
+    assert calls["single"] == ["ZZZ"]
+    assert result["ZZZ"]["degraded"] is True
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["AAPL.json", "SPY.json"]
+
+    fresh = eu.EquityUniverseLoader(cache_dir=str(tmp_path))
+    again = fresh.load(["SPY", "AAPL"])
+    assert len(calls["batch"]) == 1
+    assert len(again["SPY"]["history"]) == 20
+
+
+def test_equity_loader_incremental_refresh_merges_bars(tmp_path, monkeypatch):
+    import json
+    from datetime import date, timedelta
+    import backend.ingest.equity_universe as eu
+
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    (tmp_path / "SPY.json").write_text(json.dumps({"ticker": "SPY", "history": _bars(1, 20), "degraded": False, "as_of": yesterday, "fetched_at": 0.0}))
+    periods = []
+
+    def fake_batch(tickers, period="3mo"):
+        periods.append(period)
+        return {"SPY": {"ticker": "SPY", "history": _bars(20, 3, base=500.0), "provider_status": {"name": "yfinance", "status": "ok"}, "degraded": False}}
+
+    monkeypatch.setattr(eu.yfinance_ingest, "fetch_history_batch", fake_batch)
+    entry = eu.EquityUniverseLoader(cache_dir=str(tmp_path)).get("SPY")
+    assert periods == ["5d"]
+    assert len(entry["history"]) == 22
+    assert entry["history"][19]["close"] == 500.0
+    assert entry["as_of"] == date.today().isoformat()
+
+
+def test_equity_loader_skips_yfinance_retry_and_keeps_3mo_window(tmp_path, monkeypatch):
+    import backend.ingest.equity_universe as eu
+
+    year = [{"ts": f"2025-{m:02d}-{d:02d}T21:00:00+00:00", "close": 100.0 + m, "volume": 1} for m in range(1, 13) for d in (5, 20)]
+    singles = []
+    monkeypatch.setattr(eu.yfinance_ingest, "fetch_history_batch", lambda tickers, period="3mo": {})
+    monkeypatch.setattr(eu.yfinance_ingest, "fetch_history", lambda ticker, period="3mo": singles.append(ticker))
+    monkeypatch.setattr(eu.stooq_ingest, "fetch_history", lambda ticker: {"ticker": ticker, "history": list(year), "provider_status": {"name": "Stooq", "status": "ok"}, "degraded": False})
+
+    entry = eu.EquityUniverseLoader(cache_dir=str(tmp_path)).get("SPY")
+    assert singles == []
+    assert entry["provider_chain"] == ["yfinance", "Stooq"]
+    assert [r["ts"][:10] for r in entry["history"]] == ["2025-09-20", "2025-10-05", "2025-10-20", "2025-11-05", "2025-11-20", "2025-12-05", "2025-12-20"]
+
+
+def test_equity_panel_matches_scalar_helpers():
+    import numpy as np
+    from backend.compute.equity_analytics import analyze_panel, beta_proxy, max_drawdown, moving_average, pct_change, realized_volatility, rsi
+    spy = [400 + i + (i % 3) for i in range(70)]
+    long = [100 + (i % 7) - i * 0.2 for i in range(70)]
+    long_vol = [1000 + i for i in range(70)]
+    short = [50 + i for i in range(8)]
+    closes = np.full((70, 2), np.nan)
+    volumes = np.zeros((70, 2))
+    closes[:, 0] = long
+    closes[30, 0] = 0.0
+    volumes[:, 0] = long_vol
+    closes[62:, 1] = short
+    volumes[62:, 1] = 500
+    rows = analyze_panel(["LONG", "SHORT"], closes, volumes, spy)
+
+    spy_1m = pct_change(spy, 21)
+    for row, series, vols in ((rows[0], long[:30] + long[31:], long_vol[:30] + long_vol[31:]), (rows[1], short, [500] * 8)):
+        one_m = pct_change(series, min(21, len(series) - 1))
+        expected = {
+            "daily_return": pct_change(series, 1),
+            "return_5d": pct_change(series, min(5, len(series) - 1)),
+            "return_1m": one_m,
+            "realized_volatility": realized_volatility(series),
+            "max_drawdown": max_drawdown(series),
+            "ma_20": moving_average(series, 20),
+            "ma_50": moving_average(series, 50),
+            "rsi": rsi(series),
+            "beta_proxy": beta_proxy(series, spy),
+            "relative_strength_vs_spy": one_m - spy_1m,
+            "avg_volume_20d": int(sum(vols[-20:]) / len(vols[-20:])),
+        }
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, abs=1e-4), (row["ticker"], key)
+    assert rows[1]["rsi"] == 50.0 and rows[1]["return_5d"] == pytest.approx(57 / 52 - 1, abs=1e-6)
+    assert rows[0]["beta_proxy"] != 1.0
@@ -178,6 +178,60 @@ def test_liquidation_heatmap_probabilities_bounded():
             assert 0.0 <= prob <= 1.0
 
 
+def test_liquidation_heatmap_custom_grid():
+    from backend.compute.liquidation_heatmap import compute_heatmap
+    levs = [1 + 0.5 * i for i in range(99)]
+    drops = [0.5 * (i + 1) for i in range(100)]
+    result = compute_heatmap(100.0, [], 0.5, 0.3, levs, drops)
+    assert "error" not in result
+    assert len(result["leverage_levels"]) == 99
+    assert len(result["price_drops_pct"]) == 100
+    assert result["leverage_levels"][:3] == [1, 1.5, 2]
+    grid = result["grid"]
+    for lev in result["leverage_levels"][::10]:
+        row = [grid[str(lev)][str(d)] for d in result["price_drops_pct"]]
+        assert row == sorted(row)
+
+
+def test_liquidation_heatmap_rejects_oversized_grid():
+    from backend.compute.liquidation_heatmap import compute_heatmap, MAX_GRID_CELLS, LEVERAGE_LEVELS
+    levs = list(range(1, 1001))
+    drops = [0.01 * i for i in range(MAX_GRID_CELLS // 1000 + 1)]
+    result = compute_heatmap(100.0, [], 0.5, 0.3, levs, drops)
+    assert "error" in result
+    assert result["leverage_levels"] == LEVERAGE_LEVELS
+
+
+def test_liquidation_heatmap_per_position_distance():
+    from backend.compute.liquidation_heatmap import compute_heatmap
+    positions = [
+        {"venue": "paper", "market": "SOL-PERP", "size": 1.0, "entry_price": 100.0, "liq_price": 90.0},
+        {"venue": "paper", "market": "BTC-PERP", "size": -2.0, "entry_price": 60000.0, "margin": 30000.0},
+        {"venue": "paper", "market": "JUP-PERP", "size": 5.0, "entry_price": 1.0},
+    ]
+    result = compute_heatmap(100.0, positions, 0.5, 0.3, marks={"SOL-PERP": 100.0, "BTC-PERP": 60000.0})
+    long_pos, short_pos = result["positions"]
+    assert long_pos["liquidation_distance_pct"] == 10.0
+    assert long_pos["liq_price_source"] == "reported"
+    assert short_pos["market"] == "BTC-PERP" and short_pos["side"] == "short"
+    assert short_pos["leverage"] == 4.0
+    assert short_pos["liq_price"] > 60000.0
+    assert 0.0 < short_pos["liquidation_distance_pct"] < 100.0
+    assert result["nearest_liquidation_pct"] == 10.0
+    assert 0.0 <= long_pos["liquidation_probability"] <= 1.0
+
+
+def test_liquidation_route_rejects_oversized_axis_before_building_it():
+    from fastapi.testclient import TestClient
+    from fastapi import FastAPI
+    from backend.api import liquidation_routes
+    app = FastAPI()
+    app.include_router(liquidation_routes.router)
+    response = TestClient(app).get("/api/liquidation/heatmap", params={"max_drop_pct": 100, "drop_step_pct": 1e-9})
+    assert response.status_code == 400
+    assert "exceeds" in response.json()["detail"]
+
+
 def test_execution_metrics_eqi():
     from backend.compute.execution_metrics import ExecutionMetrics
     em = ExecutionMetrics()
@@ -212,3 +212,22 @@ class TestPositionSideField:
         assert "entry_price" in pos
         assert "side" in pos
         assert "pnl" in pos
+
+    def test_positions_read_during_a_fill_is_not_cached_stale(self, executor):
+        import threading
+        from backend.execution import paper_exec
+        real_apply = paper_exec.apply_fill
+        seen = {}
+
+        def slow_apply(*args):
+            reader = threading.Thread(target=lambda: seen.setdefault("during", executor.get_positions()))
+            reader.start()
+            reader.join(timeout=0.1)
+            real_apply(*args)
+            seen["reader"] = reader
+
+        with patch.object(paper_exec, "apply_fill", slow_apply):
+            executor.place_order(venue="paper", market="SOL-PERP", side="buy", size=1.0, price=150.0)
+        seen["reader"].join(timeout=1.0)
+        assert [p["size"] for p in seen["during"]] == [1.0]
+        assert [p["size"] for p in executor.get_positions()] == [1.0]
@@ -0,0 +1,1314 @@
+import pytest
+import time
+
+
+class TestSandboxLeaderboard:
+    def setup_method(self):
+        from backend.compute.strategy_sandbox import run_leaderboard
+        self.run = run_leaderboard
+
+    def test_ranks_all_configs(self):
+        configs = [{"name": f"c{i}", "vol_scale_factor": 0.5 + 0.1 * i} for i in range(25)]
+        result = self.run(configs, {"volatility": 0.6}, seed=7)
+        board = result["leaderboard"]
+        assert result["n_configs"] == 25
+        assert [row["rank"] for row in board] == list(range(1, 26))
+        scores = [row["risk_adjusted"] for row in board]
+        assert scores == sorted(scores, reverse=True)
+        assert result["leader"] == board[0]["config_name"]
+        assert result["ranked_by"] == "risk_adjusted"
+
+    def test_seeded_runs_are_reproducible(self):
+        configs = [{"vol_scale_factor": 1.0}, {"vol_scale_factor": 2.0}]
+        a = self.run(configs, {"volatility": 0.5}, seed=11)
+        b = self.run(configs, {"volatility": 0.5}, seed=11)
+        assert [r["expected_pnl"] for r in a["leaderboard"]] == [r["expected_pnl"] for r in b["leaderboard"]]
+
+    def test_config_thresholds_change_exposure(self):
+        configs = [{"name": "loose", "stable_rotation_trigger": 5.0}, {"name": "tight", "stable_rotation_trigger": 0.3}]
+        result = self.run(configs, {"shock_score": 1.0}, seed=3)
+        rows = {r["config_name"]: r for r in result["leaderboard"]}
+        assert rows["tight"]["triggered_rules"] == ["stable_rotation"]
+        assert rows["loose"]["triggered_rules"] == []
+        assert rows["tight"]["exposure"] < rows["loose"]["exposure"]
+
+    def test_triggers_follow_rules_engine(self):
+        result = self.run(
+            [{"name": "default"}, {"name": "strict", "tariff_roc_threshold": 20.0, "divergence_threshold_bps": 100.0}],
+            {"shock_score": 2.5, "tariff_rate_of_change": 6.0, "vol_regime": "high",
+             "divergence_bps": 40.0, "funding_rate": -0.02},
+            seed=3,
+        )
+        rows = {r["config_name"]: r for r in result["leaderboard"]}
+        assert rows["default"]["triggered_rules"] == [
+            "tariff_vol_reduce", "shock_throttle", "divergence_hedge", "stable_rotation",
+        ]
+        assert rows["strict"]["triggered_rules"] == ["shock_throttle", "stable_rotation"]
+
+    def test_ranks_on_risk_adjusted_pnl(self):
+        configs = [
+            {"name": "levered", "vol_scale_factor": 8.0, "stable_rotation_trigger": 0.5},
+            {"name": "plain", "vol_scale_factor": 1.0},
+        ]
+        result = self.run(configs, {"shock_score": 1.0, "volatility": 0.5, "drift": 2.0})
+        rows = {r["config_name"]: r for r in result["leaderboard"]}
+        assert rows["levered"]["expected_pnl"] > rows["plain"]["expected_pnl"]
+        assert result["leader"] == "plain"
+        assert result["seed"] == self.run(configs, {"shock_score": 1.0})["seed"]
+
+    def test_leader_has_neutral_paired_difference(self):
+        result = self.run([{"vol_scale_factor": 1.0}, {"vol_scale_factor": 3.0}], {"volatility": 0.8}, seed=5)
+        leader = result["leaderboard"][0]
+        assert leader["diff_vs_leader"] == 0
+        assert leader["p_value"] == 1.0
+        assert all(0.0 <= r["p_value"] <= 1.0 for r in result["leaderboard"])
+
+    def test_rejects_too_many_configs(self):
+        from backend.compute.strategy_sandbox import MAX_CONFIGS
+        with pytest.raises(ValueError):
+            self.run([{}] * (MAX_CONFIGS + 1))
+
+
+class TestDislocationScanner:
+    def setup_method(self):
+        from unittest.mock import MagicMock
+        from backend.compute.dislocation_scanner import DislocationScanner
+        self.bus = MagicMock()
+        self.store = MagicMock()
+        self.scanner = DislocationScanner(threshold_bps=30.0, cooldown_seconds=60, state_store=self.store, event_bus=self.bus)
+
+    def test_spread_uses_extreme_venues(self):
+        self.scanner.update("SOL/USD", "pyth", 100.0)
+        self.scanner.update("SOL_USD", "kraken", 100.5)
+        self.scanner.update("SOL-USD", "hyperliquid", 99.9)
+        rows = {r["symbol"]: r for r in self.scanner.compute_spreads()}
+        sol = rows["SOL_USD"]
+        assert sol["venue_count"] == 3
+        assert sol["high_venue"] == "kraken"
+        assert sol["low_venue"] == "hyperliquid"
+        assert sol["dislocated"] is True
+        assert rows["ETH_USD"]["dislocated"] is False
+
+    def test_per_symbol_cooldown(self):
+        import time
+        now = time.time()
+        self.scanner.update("SOL_USD", "pyth", 100.0, ts=now)
+        self.scanner.update("SOL_USD", "drift", 101.0, ts=now)
+        assert [a["symbol"] for a in self.scanner.scan(now=now)["alerts"]] == ["SOL_USD"]
+        self.scanner.update("BTC_USD", "pyth", 100.0, ts=now + 30)
+        self.scanner.update("BTC_USD", "drift", 101.0, ts=now + 30)
+        assert [a["symbol"] for a in self.scanner.scan(now=now + 30)["alerts"]] == ["BTC_USD"]
+        assert [a["symbol"] for a in self.scanner.scan(now=now + 61)["alerts"]] == ["SOL_USD"]
+        assert self.bus.emit.call_count == 3
+
+    def test_stale_prices_ignored(self):
+        import time
+        now = time.time()
+        self.scanner.update("SOL_USD", "pyth", 100.0, ts=now)
+        self.scanner.update("SOL_USD", "kraken", 110.0, ts=now - 3600)
+        row = self.scanner.compute_spreads(now)[0]
+        assert row["venue_count"] == 1
+        assert row["dislocated"] is False
+
+    def test_refresh_reads_all_cells_in_one_call(self):
+        import json
+        from unittest.mock import MagicMock
+        redis_client = MagicMock()
+
+        def mget(keys):
+            prices = {"price:pyth:SOL/USD": 100.0, "price:kraken:SOLUSD": 100.2, "price:coingecko:BITCOIN/USD": 60000.0}
+            return [json.dumps({"price": prices[k]}) if k in prices else None for k in keys]
+
+        redis_client.mget.side_effect = mget
+        self.store.get_redis.return_value = redis_client
+        assert self.scanner.refresh_from_store() == 3
+        assert redis_client.mget.call_count == 1
+        rows = {r["symbol"]: r for r in self.scanner.compute_spreads()}
+        assert rows["SOL_USD"]["venue_count"] == 2
+        assert rows["BTC_USD"]["venue_count"] == 1
+
+    def test_ingest_symbol_formats_share_a_row(self):
+        from backend.compute.dislocation_scanner import normalise_symbol
+        for raw in ("SOLUSD", "SOL/USD", "SOLANA/USD", "SOL-PERP", "SOL_USDC", "sol-usd"):
+            assert normalise_symbol(raw) == "SOL_USD"
+        assert normalise_symbol("XBTUSD") == "BTC_USD"
+        self.scanner.update("SOLUSD", "kraken", 100.0)
+        self.scanner.update("SOLANA/USD", "coingecko", 100.1)
+        self.scanner.update("SOL-PERP", "drift", 100.2)
+        assert self.scanner.symbols == ["SOL_USD", "BTC_USD", "ETH_USD"]
+        assert self.scanner.compute_spreads()[0]["venue_count"] == 3
+
+    def test_refresh_keeps_newer_pushed_tick(self):
+        import json
+        import time
+        from unittest.mock import MagicMock
+        now = time.time()
+        redis_client = MagicMock()
+        redis_client.mget.side_effect = lambda keys: [
+            json.dumps({"price": 90.0, "ts": now - 10}) if k == "price:pyth:SOL/USD" else None for k in keys
+        ]
+        self.store.get_redis.return_value = redis_client
+        self.scanner.update("SOL/USD", "pyth", 100.0, ts=now)
+        self.scanner.refresh_from_store()
+        assert self.scanner.consensus_prices(now)["SOL_USD"] == 100.0
+
+
+class TestSlippageCalibration:
+    def setup_method(self):
+        from unittest.mock import MagicMock
+        from backend.compute.slippage_model import SlippageCalibrator
+        self.store = MagicMock()
+        self.store.get_snapshot.return_value = None
+        self.calibrator = SlippageCalibrator(state_store=self.store)
+
+    def _metrics_with_fills(self, intercept, coef, depth=100000.0, n=40):
+        import math
+        import time
+        from backend.compute.execution_metrics import ExecutionMetrics
+        em = ExecutionMetrics()
+        now = time.time()
+        for i in range(n):
+            size = 1000.0 * (i + 1)
+            slip = intercept + coef * math.sqrt(size / depth)
+            em.record_fill(now, now + i * 0.001, 100.0, 100.0 * (1 + slip / 10000.0), "hyperliquid", "SOL-PERP",
+                           size_usd=size, depth_usd=depth)
+        return em
+
+    def test_recovers_square_root_coefficients(self):
+        models = self.calibrator.fit_from_metrics(self._metrics_with_fills(2.0, 40.0))
+        model = models["hyperliquid"]
+        assert model["n_fills"] == 40
+        assert abs(model["intercept_bps"] - 2.0) < 0.05
+        assert abs(model["impact_coef"] - 40.0) < 0.1
+        self.store.set_snapshot.assert_called()
+
+    def test_fit_is_incremental(self):
+        em = self._metrics_with_fills(2.0, 40.0)
+        self.calibrator.fit_from_metrics(em)
+        models = self.calibrator.fit_from_metrics(em)
+        assert models["hyperliquid"]["n_fills"] == 40
+
+    def test_safe_size_inverts_fitted_curve(self):
+        from backend.compute.slippage_model import compute_max_safe_sizes, _fitted_slippage_bps
+        model = self.calibrator.fit_from_metrics(self._metrics_with_fills(2.0, 40.0))["hyperliquid"]
+        result = compute_max_safe_sizes(ob_depth=100000.0, venue="hyperliquid", model=model)
+        assert result["model_type"] == "fitted_sqrt"
+        size_25 = result["max_safe_sizes"]["25bps"]
+        assert abs(_fitted_slippage_bps(model, size_25, 100000.0) - 25.0) < 0.05
+
+    def test_heuristic_safe_size_is_exact_inverse(self):
+        from backend.compute.slippage_model import compute_max_safe_sizes
+        result = compute_max_safe_sizes(ob_depth=20000.0, spread_bps=4.0, volatility=0.03)
+        assert result["model_type"] == "heuristic_linear"
+        size_10 = result["max_safe_sizes"]["10bps"]
+        expected = (10.0 - 2.0) / (50.0 * 1.3 / 20000.0)
+        assert abs(size_10 - expected) < 0.01
+
+    def test_sparse_model_falls_back_to_heuristic(self):
+        from backend.compute.slippage_model import estimate_slippage_curve
+        model = self.calibrator.fit_from_metrics(self._metrics_with_fills(2.0, 40.0, n=5))["hyperliquid"]
+        assert estimate_slippage_curve(venue="hyperliquid", model=model)["model_type"] == "heuristic_linear"
+
+
+class TestStreamingHedgeEngine:
+    def setup_method(self):
+        import random
+        rng = random.Random(5)
+        self.assets = ["SOL", "BTC", "ETH"]
+        sol = [rng.gauss(0, 0.02) for _ in range(80)]
+        self.returns = {
+            "SOL": sol,
+            "BTC": [0.6 * s + rng.gauss(0, 0.01) for s in sol],
+            "ETH": [rng.gauss(0, 0.03) for _ in range(80)],
+        }
+
+    def _engine(self, **kwargs):
+        from backend.compute.hedge_ratio import StreamingHedgeEngine
+        engine = StreamingHedgeEngine(self.assets, **kwargs)
+        for i in range(80):
+            engine.update({a: self.returns[a][i] for a in self.assets})
+        return engine
+
+    def test_window_matches_batch_functions(self):
+        from backend.compute.hedge_ratio import compute_hedge_ratios, compute_rolling_correlations
+        engine = self._engine(window=30)
+        batch = compute_rolling_correlations(self.returns, window=30)["correlations"]
+        corr = engine.snapshot()["correlation"]
+        assert corr["SOL"]["BTC"] == batch["SOL_vs_BTC"]["correlation"]
+        assert corr["BTC"]["ETH"] == batch["BTC_vs_ETH"]["correlation"]
+        streamed = engine.hedge_ratio("SOL", "BTC")
+        expected = compute_hedge_ratios(self.returns["SOL"], self.returns["BTC"], window=30)
+        assert streamed["hedge_ratio"] == expected["hedge_ratio"]
+        assert streamed["r_squared"] == expected["r_squared"]
+
+    def test_analysis_served_from_engine_matches_batch(self):
+        from backend.compute.hedge_ratio import compute_full_hedge_analysis, hedge_analysis_from_matrix
+        streamed = hedge_analysis_from_matrix(self._engine(window=30).snapshot())
+        batch = compute_full_hedge_analysis(self.returns, window=30)
+        assert streamed["correlations"] == batch["correlations"]
+        assert streamed["best_hedge"] == batch["best_hedge"] == "SOL_hedged_by_BTC"
+        for name, expected in batch["hedge_ratios"].items():
+            got = streamed["hedge_ratios"][name]
+            assert {k: got[k] for k in ("hedge_ratio", "r_squared", "sample_size", "window")} == {
+                k: expected[k] for k in ("hedge_ratio", "r_squared", "sample_size", "window")
+            }
+
+    def test_ewma_tracks_recent_dependence(self):
+        engine = self._engine(half_life=10)
+        corr = engine.correlation_matrix()
+        assert engine.mode == "ewma"
+        assert corr[0, 1] > 0.6
+        assert abs(corr[0, 2]) < 0.5
+
+    def test_price_updates_feed_log_returns(self):
+        from backend.compute.hedge_ratio import StreamingHedgeEngine
+        engine = StreamingHedgeEngine(self.assets, window=10)
+        assert engine.update_prices({"SOL": 100.0, "BTC": 50000.0, "ETH": 3000.0}) is False
+        assert engine.update_prices({"SOL": 101.0, "BTC": 50500.0, "ETH": 0.0}) is False
+        assert engine.update_prices({"SOL": 102.0, "BTC": 51000.0, "ETH": 3030.0}) is True
+        assert engine.sample_size == 1
+
+    def test_missing_asset_rejected(self):
+        from backend.compute.hedge_ratio import StreamingHedgeEngine
+        engine = StreamingHedgeEngine(self.assets)
+        with pytest.raises(ValueError):
+            engine.update({"SOL": 0.01, "BTC": 0.02})
+
+
+class _FakeRegimeRepo:
+    def __init__(self, rows=None):
+        self.rows = list(rows or [])
+        self.updates = []
+
+    def get_recent(self, limit=200_000):
+        return self.rows[-limit:]
+
+    def save_snapshot(self, shock_state, funding_regime, vol_regime, tariff_index, price, ts=None):
+        row = {"id": len(self.rows) + 1, "shock_state": shock_state, "funding_regime": funding_regime, "vol_regime": vol_regime, "tariff_index": tariff_index, "price": price, "return_4h": None, "return_24h": None, "return_3d": None, "ts": ts}
+        self.rows.append(row)
+        return row
+
+    def update_returns(self, snapshot_id, return_4h, return_24h, return_3d):
+        self.updates.append((snapshot_id, return_4h, return_24h, return_3d))
+
+
+class TestRegimeMemoryIndex:
+    def _memory(self, rows=None):
+        from backend.compute.regime_memory import RegimeMemory
+        return RegimeMemory(repository=_FakeRegimeRepo(rows))
+
+    def test_loads_history_from_repository(self):
+        rows = [
+            {"id": 1, "shock_state": "high", "funding_regime": "neutral", "vol_regime": "high", "tariff_index": 60.0, "price": 100.0, "return_4h": 0.02, "return_24h": -0.01, "return_3d": None, "ts": "2024-01-01T00:00:00+00:00"},
+            {"id": 2, "shock_state": "normal", "funding_regime": "neutral", "vol_regime": "high", "tariff_index": 30.0, "price": 110.0, "return_4h": -0.01, "return_24h": None, "return_3d": None, "ts": "2024-01-02T00:00:00+00:00"},
+        ]
+        memory = self._memory(rows)
+        dist = memory.get_outcome_distribution("high", "neutral", "high")
+        assert dist["count"] == 2
+        assert dist["avg_return_4h"] == pytest.approx(0.005)
+        assert dist["win_rate_4h"] == 0.5
+        assert dist["best_analog"]["id"] == 1
+        assert [a["id"] for a in memory.find_analogues("high", "neutral", "high")] == [1, 2]
+
+    def test_analogues_ranked_by_score_then_age(self):
+        memory = self._memory()
+        ids = [
+            memory.record("high", "positive", "low", 50.0, 100.0),
+            memory.record("high", "neutral", "high", 50.0, 100.0),
+            memory.record("normal", "neutral", "high", 50.0, 100.0),
+            memory.record("high", "neutral", "low", 50.0, 100.0),
+        ]
+        for i, snapshot_id in enumerate(ids):
+            memory.update_returns(snapshot_id, return_4h=0.01 * (i + 1))
+        scores = [(a["match_score"], a["return_4h"]) for a in memory.find_analogues("high", "neutral", "high")]
+        assert scores == [(6, 0.02), (5, 0.04), (3, 0.01), (3, 0.03)]
+
+    def test_update_returns_keeps_aggregates_and_writes_through(self):
+        memory = self._memory()
+        snapshot_id = memory.record("high", "neutral", "high", 50.0, 100.0)
+        memory.update_returns(snapshot_id, return_4h=0.03)
+        memory.update_returns(snapshot_id, return_4h=-0.01, return_24h=0.05)
+        dist = memory.get_outcome_distribution("high", "neutral", "high")
+        assert dist["avg_return_4h"] == pytest.approx(-0.01)
+        assert dist["win_rate_4h"] == 0.0
+        assert dist["avg_return_24h"] == pytest.approx(0.05)
+        assert memory.get_summary()["records_with_returns"] == 1
+        assert memory._repo.updates[-1] == (1, -0.01, 0.05, None)
+
+    def test_nearest_neighbours_include_unindexed_tail(self):
+        memory = self._memory()
+        for i in range(200):
+            memory.update_returns(memory.record("normal", "neutral", "normal", float(i), 100.0 + i), return_4h=0.0)
+        assert memory.find_nearest(120.0, 220.0, k=1)[0]["tariff_index"] == 120.0
+        memory.update_returns(memory.record("normal", "neutral", "normal", 500.0, 900.0), return_4h=0.01)
+        nearest = memory.find_nearest(500.0, 900.0, k=2)
+        assert nearest[0]["tariff_index"] == 500.0
+        assert nearest[0]["distance"] == 0.0
+
+    def test_kd_tree_matches_brute_force(self):
+        import numpy as np
+        from backend.compute.regime_memory import _KDTree
+        rng = np.random.default_rng(3)
+        points = rng.normal(size=(5000, 2))
+        tree = _KDTree(points)
+        for query in rng.normal(size=(20, 2)):
+            dist, idx = tree.query(query, k=7)
+            brute = np.linalg.norm(points - query, axis=1)
+            assert idx.tolist() == np.argsort(brute, kind="stable")[:7].tolist()
+            assert np.allclose(dist, np.sort(brute)[:7])
+
+    def test_update_returns_survives_trim(self):
+        from backend.compute.regime_memory import RegimeMemory
+        memory = RegimeMemory(repository=_FakeRegimeRepo(), max_entries=10)
+        ids = [memory.record("normal", "neutral", "normal", float(i), 100.0 + i) for i in range(15)]
+        assert len(memory.get_history(100)) < 15
+        memory.update_returns(ids[-1], return_4h=0.07)
+        memory.update_returns(ids[0], return_4h=0.5)
+        labelled = memory.find_analogues("normal", "neutral", "normal")
+        assert [(a["id"], a["return_4h"]) for a in labelled] == [(ids[-1], 0.07)]
+        assert memory._repo.updates == [(ids[-1], 0.07, None, None)]
+
+    def test_follower_reload_runs_in_background(self):
+        import threading
+        from backend.compute.regime_memory import RegimeMemory
+        repo = _FakeRegimeRepo([
+            {"id": 1, "shock_state": "high", "funding_regime": "neutral", "vol_regime": "high", "tariff_index": 60.0, "price": 100.0, "return_4h": 0.02, "return_24h": None, "return_3d": None, "ts": "2024-01-01T00:00:00+00:00"},
+        ])
+        memory = RegimeMemory(repository=repo, shared=False)
+        memory.warm()
+        release = threading.Event()
+        rows = repo.rows + [{**repo.rows[0], "id": 2, "return_4h": 0.04}]
+
+        def slow_get_recent(limit=200_000):
+            release.wait(5)
+            return rows
+
+        repo.get_recent = slow_get_recent
+        memory.invalidate()
+        assert memory.get_outcome_distribution("high", "neutral", "high")["count"] == 1
+        release.set()
+        for _ in range(100):
+            if memory.get_outcome_distribution("high", "neutral", "high")["count"] == 2:
+                break
+            time.sleep(0.01)
+        assert memory.get_outcome_distribution("high", "neutral", "high")["count"] == 2
+
+    def test_label_outcomes_applies_bulk_labels(self):
+        memory = self._memory()
+        memory.record("high", "neutral", "high", 50.0, 100.0)
+        memory.record("high", "neutral", "high", 55.0, 101.0)
+        memory._repo.label_forward_returns = lambda: [
+            {"id": 2, "return_4h": 0.01, "return_24h": None, "return_3d": None},
+            {"id": 99, "return_4h": 0.5, "return_24h": None, "return_3d": None},
+        ]
+        assert memory.label_outcomes() == 2
+        assert [a["id"] for a in memory.find_analogues("high", "neutral", "high")] == [2]
+        assert memory.get_outcome_distribution("high", "neutral", "high")["avg_return_4h"] == pytest.approx(0.01)
+        assert memory._repo.updates == []
+
+    def test_label_forward_returns_binds_parameters_outside_literals(self):
+        import re
+        from unittest.mock import patch
+        from psycopg2.extensions import adapt
+        from backend.data.repositories import regime_repo
+        seen = {}
+
+        def capture(sql, params):
+            seen["raw"], seen["sql"] = sql, sql % {k: adapt(v).getquoted().decode() for k, v in params.items()}
+            return []
+
+        with patch.object(regime_repo, "execute_query", capture):
+            assert regime_repo.RegimeRepository().label_forward_returns(["SOL"], batch_size=10, lookback_seconds=86400) == []
+        assert "NOW() - 86400 * INTERVAL '1 second'" in seen["sql"]
+        assert "LIMIT 10" in seen["sql"] and "ANY(ARRAY['SOL'])" in seen["sql"]
+        assert not re.search(r"'[^'\n]*%\(", seen["raw"])
+
+
+class TestExecutionSketches:
+    def test_sketch_quantiles_within_relative_error(self):
+        import random
+        import numpy as np
+        from backend.compute.quantile_sketch import DDSketch
+        rng = random.Random(2)
+        values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+        a, b = DDSketch(), DDSketch()
+        for i, v in enumerate(values):
+            (a if i % 2 else b).add(v)
+        merged = DDSketch.from_dict(a.to_dict()).merge(b)
+        assert merged.count == len(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = float(np.quantile(values, q, method="lower"))
+            assert merged.quantile(q) == pytest.approx(exact, rel=0.03)
+
+    def test_eqi_covers_recent_window_and_lifetime_separately(self):
+        from unittest.mock import MagicMock
+        from backend.compute.execution_metrics import ExecutionMetrics
+        em = ExecutionMetrics(rolling_window=10, state_store=MagicMock())
+        for i in range(500):
+            em.record_fill(0.0, 0.001 * (i + 1), 100.0, 100.0 + 0.001 * i, "drift", "SOL-PERP")
+        eqi = em.get_eqi()
+        assert len(em.iter_fills()) == 100
+        assert 90 <= eqi["fill_count"] <= 100
+        assert eqi["latency_p50_ms"] == pytest.approx(455.0, rel=0.02)
+        assert 9 <= eqi["venue_breakdown"]["drift"]["fill_count"] <= 10
+
+        lifetime = em.get_lifetime_eqi()
+        assert lifetime["fill_count"] == 500
+        assert lifetime["latency_p50_ms"] == pytest.approx(250.0, rel=0.02)
+        assert lifetime["venue_breakdown"]["drift"]["fill_count"] == 500
+
+    def test_window_query_merges_persisted_buckets(self):
+        from unittest.mock import MagicMock
+        from backend.compute.execution_metrics import ExecutionMetrics
+        store = _FakeStore(_ClusterRedis())
+
+        em = ExecutionMetrics(state_store=store)
+        day = 86400 * 20000
+        em.record_fill(day, day + 0.010, 100.0, 100.0, "drift", "SOL-PERP")
+        em.record_fill(day + 7200, day + 7200.050, 100.0, 100.1, "kraken", "SOL-USD")
+        assert em.flush(now=day + 100 * 86400) == 3
+        assert em._buckets == {"hourly": {}, "daily": {}}
+        assert ExecutionMetrics(state_store=MagicMock(get_redis=MagicMock(return_value=None))).flush() == 0
+
+        fresh = ExecutionMetrics(state_store=store)
+        window = fresh.get_eqi_window(day, day + 3 * 3600)
+        assert window["fill_count"] == 2
+        assert window["granularity"] == "hourly"
+        drift_only = fresh.get_eqi_window(day - 30 * 86400, day + 86400, venue="drift")
+        assert drift_only["granularity"] == "daily"
+        assert drift_only["fill_count"] == 1
+        assert drift_only["latency_p50_ms"] == pytest.approx(10.0, rel=0.02)
+
+    def test_workers_flush_the_same_bucket_without_overwriting(self, monkeypatch):
+        from backend.compute import execution_metrics
+        from backend.compute.execution_metrics import ExecutionMetrics
+        store = _FakeStore(_ClusterRedis())
+        day = 86400 * 20000
+        workers = {}
+        for worker in ("w1", "w2"):
+            monkeypatch.setattr(execution_metrics, "WORKER_ID", worker)
+            workers[worker] = ExecutionMetrics(state_store=store)
+            workers[worker].record_fill(day, day + 0.010, 100.0, 100.0, "drift", "SOL-PERP")
+            workers[worker].flush(now=day)
+        workers["w2"].record_fill(day + 60, day + 60.010, 100.0, 100.0, "drift", "SOL-PERP")
+        assert workers["w2"].get_eqi_window(day, day + 3600)["fill_count"] == 3
+        workers["w2"].flush(now=day)
+        monkeypatch.setattr(execution_metrics, "WORKER_ID", "w3")
+        assert ExecutionMetrics(state_store=store).get_eqi_window(day, day + 3600)["fill_count"] == 3
+
+
+class _FakeSmartRepo:
+    def __init__(self, active=None):
+        self.saved = {}
+        self.active = active or []
+
+    def save_plan(self, plan):
+        self.saved[plan["exec_id"]] = dict(plan)
+        return True
+
+    def get_active(self):
+        return self.active
+
+
+class _FakeSmartRouter:
+    def __init__(self, price=100.0, depth=0.0, fill_price=None, status="filled", delay=0.0):
+        self.delay = delay
+        self.price = price
+        self.depth = depth
+        self.fill_price = fill_price or price
+        self.status = status
+        self.orders = []
+
+    def get_live_price(self, market):
+        return {"price": self.price, "found": True, "fresh": True}
+
+    def get_market_state(self, market=None):
+        return {"liquidity_depth": self.depth}
+
+    def route_order(self, venue, market, side, size, price=None):
+        if self.delay:
+            time.sleep(self.delay)
+        self.orders.append(size)
+        if self.status == "blocked":
+            return {"status": "blocked", "reasons": ["risk"]}
+        return {"status": self.status, "fill_price": self.fill_price}
+
+
+class TestSmartExecutionScheduler:
+    def _scheduler(self, router, repo=None):
+        from backend.execution.smart_scheduler import SmartExecutionScheduler
+        return SmartExecutionScheduler(router=router, repository=repo or _FakeSmartRepo())
+
+    def _plan(self, **kwargs):
+        from backend.compute.smart_execution import create_smart_order
+        args = {"venue": "paper", "market": "SOL-PERP", "side": "buy", "total_size": 10.0, "n_slices": 4, "interval_seconds": 5, "mode": "TWAP"}
+        args.update(kwargs)
+        return create_smart_order(**args)
+
+    def test_fires_all_slices_and_persists(self):
+        router, repo = _FakeSmartRouter(), _FakeSmartRepo()
+        sched = self._scheduler(router, repo)
+        plan = sched.submit(self._plan())
+        for _ in range(4):
+            sched.fire_slice(plan["exec_id"])
+        assert plan["status"] == "completed"
+        assert router.orders == [2.5, 2.5, 2.5, 2.5]
+        assert repo.saved[plan["exec_id"]]["status"] == "completed"
+        assert all(s["status"] == "filled" for s in plan["schedule"])
+        assert sched.pending == 0
+
+    def test_depth_cap_extends_schedule(self):
+        router = _FakeSmartRouter(price=100.0, depth=15000.0)
+        sched = self._scheduler(router)
+        plan = sched.submit(self._plan(n_slices=2))
+        while plan["status"] == "active":
+            sched.fire_slice(plan["exec_id"])
+        assert max(router.orders) <= 15.0
+        assert plan["n_slices"] == 2
+        assert plan["executed_size"] == pytest.approx(10.0)
+
+        thin = _FakeSmartRouter(price=100.0, depth=2000.0)
+        sched = self._scheduler(thin)
+        plan = sched.submit(self._plan(n_slices=2))
+        while plan["status"] == "active":
+            sched.fire_slice(plan["exec_id"])
+        assert max(thin.orders) <= 2.0 + 1e-9
+        assert plan["n_slices"] > 2
+        assert plan["status"] == "completed"
+
+    def test_slippage_shrinks_slices_and_failures_abort(self):
+        from backend.execution.smart_scheduler import plan_slice_size
+        plan = self._plan(max_slippage_bps=10.0)
+        plan["slices"] = [{"slippage_bps": 40.0}]
+        plan["actual_slippage_bps"] = 40.0
+        assert plan_slice_size(plan, 100.0, 0.0) == pytest.approx(2.5 * 0.25)
+
+        router = _FakeSmartRouter(status="blocked")
+        sched = self._scheduler(router)
+        plan = sched.submit(self._plan())
+        for _ in range(3):
+            sched.fire_slice(plan["exec_id"])
+        assert plan["status"] == "aborted"
+        assert len(plan["slice_errors"]) == 3
+
+    def test_resume_and_timer_loop(self):
+        import asyncio
+        router = _FakeSmartRouter()
+        stored = self._plan(n_slices=2)
+        stored["executed_size"] = 5.0
+        stored["completed_slices"] = 1
+        repo = _FakeSmartRepo(active=[stored])
+        sched = self._scheduler(router, repo)
+
+        async def drive():
+            await sched.start()
+            for _ in range(50):
+                if stored["status"] != "active":
+                    break
+                await asyncio.sleep(0.02)
+            await sched.stop()
+
+        asyncio.run(drive())
+        assert stored["status"] == "completed"
+        assert router.orders == [5.0]
+        assert repo.saved[stored["exec_id"]]["executed_size"] == pytest.approx(10.0)
+
+
+    def test_stop_drains_in_flight_slices_and_abort_waits_for_them(self):
+        import asyncio
+        import threading
+        router = _FakeSmartRouter(delay=0.2)
+        sched = self._scheduler(router)
+        plans = [sched.submit(self._plan(n_slices=2, interval_seconds=60)) for _ in range(2)]
+
+        async def drive():
+            await sched.start()
+            while len(sched._inflight) < 2:
+                await asyncio.sleep(0.01)
+            aborting = threading.Thread(target=sched.abort, args=(plans[0]["exec_id"],))
+            aborting.start()
+            await sched.stop()
+            aborting.join()
+            assert not sched._inflight
+
+        asyncio.run(drive())
+        assert router.orders == [5.0, 5.0]
+        assert plans[0]["status"] == "aborted" and plans[0]["executed_size"] == pytest.approx(5.0)
+        assert plans[1]["status"] == "active" and plans[1]["executed_size"] == pytest.approx(5.0)
+
+
+class _FakeOrderRepo:
+    def __init__(self, active=None):
+        self.saved = {}
+        self.active = active or []
+
+    def save_orders(self, orders):
+        for order in orders:
+            self.saved[order["id"]] = dict(order)
+        return len(orders)
+
+    def get_active(self):
+        return self.active
+
+
+class TestConditionalTriggerEngine:
+    def _engine(self, repo=None):
+        from backend.execution.trigger_engine import ConditionalTriggerEngine
+        return ConditionalTriggerEngine(router=_FakeSmartRouter(), repository=repo or _FakeOrderRepo())
+
+    def _order(self, oid, order_type, side="sell", market="SOL-PERP", **kwargs):
+        return {"id": oid, "venue": "paper", "market": market, "side": side, "size": 1.0, "order_type": order_type, "status": "active", **kwargs}
+
+    def test_only_crossed_levels_fire(self):
+        engine = self._engine()
+        for i, level in enumerate([90.0, 95.0, 99.0]):
+            engine.add(self._order(f"s{i}", "stop_loss", trigger_price=level))
+        engine.add(self._order("tp", "take_profit", trigger_price=110.0))
+        engine.add(self._order("btc", "stop_loss", market="BTC-PERP", trigger_price=1e9))
+
+        assert engine.on_price("SOL-PERP", 100.0) == []
+        fired = engine.on_price("SOL_USD", 94.0)
+        assert sorted(o["id"] for o in fired) == ["s1", "s2"]
+        assert all(o["status"] == "triggered" for o in fired)
+        assert [o["id"] for o in engine.on_price("SOL-PERP", 111.0)] == ["tp"]
+        assert engine.on_price("SOL-PERP", 94.0) == []
+        assert sorted(engine.active_by_market()) == ["BTC-PERP", "SOL-PERP"]
+
+    def test_trailing_stops_ratchet(self):
+        repo = _FakeOrderRepo()
+        engine = self._engine(repo)
+        engine.add(self._order("trail_sell", "trailing_stop", trailing_amount=5.0))
+        engine.add(self._order("trail_buy", "trailing_stop", side="buy", market="ETH-PERP", trailing_amount=5.0))
+        for price in (100.0, 104.0, 110.0, 107.0):
+            assert engine.on_price("SOL-PERP", price) == []
+            assert engine.on_price("ETH-PERP", 200.0 - price) == []
+        sell = engine.get_orders()[0]
+        assert sell["peak_price"] == 110.0
+        assert sell["current_trigger_level"] == 105.0
+        assert repo.saved["trail_sell"]["peak_price"] == 110.0
+        assert [o["id"] for o in engine.on_price("SOL-PERP", 105.0)] == ["trail_sell"]
+        assert [o["id"] for o in engine.on_price("ETH-PERP", 95.0)] == ["trail_buy"]
+
+    def test_cancel_restore_and_compaction(self):
+        restored = self._order("r1", "stop_loss", trigger_price=50.0)
+        engine = self._engine(_FakeOrderRepo(active=[restored]))
+        engine.add(self._order("c1", "stop_loss", trigger_price=80.0))
+        engine.cancel("c1")
+        assert engine.on_price("SOL-PERP", 70.0) == []
+        assert [o["id"] for o in engine.on_price("SOL-PERP", 49.0)] == ["r1"]
+
+        engine.add(self._order("t", "trailing_stop", trailing_amount=1.0))
+        for i in range(500):
+            engine.on_price("SOL-PERP", 100.0 + i)
+        book = engine._books["SOL_USD"]
+        assert book.heap_size < 100
+        assert engine.get_orders()[-1]["current_trigger_level"] == 598.0
+
+    def test_stablecoin_quoted_markets_fire_from_consensus_prices(self):
+        engine = self._engine()
+        engine.add(self._order("jup", "stop_loss", market="SOL/USDC", trigger_price=95.0))
+        engine.add(self._order("usdt", "take_profit", market="SOL_USDT", trigger_price=105.0))
+        assert sorted(o["id"] for o in engine.on_prices({"SOL_USD": 94.0})) == ["jup"]
+        assert [o["id"] for o in engine.on_prices({"SOL_USD": 106.0})] == ["usdt"]
+
+    def test_follower_order_list_reads_the_newest_orders(self):
+        from unittest.mock import patch
+        from backend.data.repositories import conditional_orders_repo
+        seen = {}
+
+        def fake_query(sql, params):
+            seen["sql"], seen["params"] = sql, params
+            return [{"payload": {"id": "new"}}, {"payload": '{"id": "old"}'}]
+
+        with patch.object(conditional_orders_repo, "execute_query", fake_query):
+            orders = conditional_orders_repo.ConditionalOrderRepository().get_recent(limit=2)
+        assert "ORDER BY created_at DESC LIMIT %s" in seen["sql"] and seen["params"] == (2,)
+        assert [o["id"] for o in orders] == ["old", "new"]
+
+    def test_blocked_route_marks_order_rejected(self):
+        from backend.execution.trigger_engine import ConditionalTriggerEngine
+        repo = _FakeOrderRepo()
+        engine = ConditionalTriggerEngine(router=_FakeSmartRouter(status="blocked"), repository=repo)
+        engine.add(self._order("s", "stop_loss", trigger_price=95.0))
+        fired = engine.on_price("SOL-PERP", 94.0)
+        assert [(o["id"], o["status"], o["error"]) for o in fired] == [("s", "rejected", "risk")]
+        assert repo.saved["s"]["status"] == "rejected"
+        assert engine.on_price("SOL-PERP", 90.0) == []
+
+
+class _FakeRedis:
+    def __init__(self, values):
+        self.values = values
+        self.mget_calls = 0
+
+    def mget(self, keys):
+        self.mget_calls += 1
+        return [self.values.get(k) for k in keys]
+
+
+class _FakeStore:
+    def __init__(self, redis):
+        self.redis = redis
+
+    def get_redis(self):
+        return self.redis
+
+
+class TestPreTradeFastPath:
+    def _values(self, price=150.0):
+        import json
+        from datetime import datetime, timezone
+        now = datetime.now(timezone.utc).isoformat()
+        return {
+            "price:kraken:SOL_USD": json.dumps({"price": price, "ts": now}),
+            "price:integrity": json.dumps({"status": "OK"}),
+            "microstructure:latest": json.dumps({"spread_bps": 3, "liquidity_depth": 50000}),
+        }
+
+    def test_context_is_one_read_and_cached(self):
+        from backend.execution.pretrade import PreTradeContextCache
+        redis = _FakeRedis(self._values())
+        cache = PreTradeContextCache(state_store=_FakeStore(redis), ttl_ms=10_000)
+        ctx = cache.get("SOL_USD")
+        assert ctx.price.found and ctx.price.source == "kraken" and ctx.price.price == 150.0
+        assert ctx.snapshot("microstructure:latest")["liquidity_depth"] == 50000
+        assert cache.get("SOL_USD") is ctx
+        assert redis.mget_calls == 1
+        cache.invalidate("SOL_USD")
+        cache.get("SOL_USD")
+        assert redis.mget_calls == 2
+
+    def test_route_order_burst_shares_context_and_records_stages(self):
+        from unittest.mock import MagicMock
+        from backend.core.event_bus import EventBus
+        from backend.execution.pretrade import PreTradeContextCache
+        from backend.compute.risk_engine import RiskEngine
+        from backend.execution.router import ExecutionRouter
+
+        router = ExecutionRouter(event_bus=MagicMock(spec=EventBus), risk_engine=RiskEngine())
+        redis = _FakeRedis(self._values())
+        router._pretrade = PreTradeContextCache(state_store=_FakeStore(redis), ttl_ms=10_000)
+        router.risk_engine.check_constraints = MagicMock(return_value=(True, []))
+        for _ in range(5):
+            result = router.route_order("paper", "SOL-PERP", "buy", 0.1)
+            assert result["status"] == "paper_filled"
+            assert result["fill_price"] == 150.0
+        assert redis.mget_calls == 1
+        stages = router.latency.summary()
+        assert {"context", "risk", "execute", "total"} <= set(stages)
+        assert stages["total"]["count"] == 5
+        assert stages["total"]["p99_ms"] >= stages["total"]["p50_ms"] >= 0
+
+    def test_background_event_bus_defers_delivery(self):
+        from backend.core.event_bus import EventBus
+        delivered = []
+        bus = EventBus(redis_url="redis://127.0.0.1:1", background=True)
+        bus._deliver = lambda events: delivered.extend(events)
+        event_id = bus.emit("ORDER_SENT", source="test", payload={"x": 1})
+        EventBus.flush()
+        assert [e["id"] for e in delivered] == [event_id]
+
+
+class TestBatchRouting:
+    def _router(self, values):
+        from unittest.mock import MagicMock
+        from backend.core.event_bus import EventBus
+        from backend.execution.pretrade import PreTradeContextCache
+        from backend.compute.risk_engine import RiskEngine
+        from backend.execution.router import ExecutionRouter
+
+        router = ExecutionRouter(event_bus=MagicMock(spec=EventBus), risk_engine=RiskEngine())
+        redis = _FakeRedis(values)
+        router._pretrade = PreTradeContextCache(state_store=_FakeStore(redis), ttl_ms=10_000)
+        return router, redis
+
+    def test_batch_fills_with_one_read_per_symbol_and_one_event(self):
+        from backend.core.event_bus import EventType
+        router, redis = self._router(TestPreTradeFastPath()._values())
+        router.risk_engine.check_batch = lambda positions, legs, execution_mode="paper": (True, [])
+        legs = [
+            {"venue": "paper", "market": "SOL-PERP", "side": "buy", "size": 1.0},
+            {"venue": "paper", "market": "SOL/USD", "side": "buy", "size": 2.0},
+            {"venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 0.5, "price": 151.0},
+        ]
+        result = router.route_orders(legs)
+        assert result["status"] == "filled"
+        assert [o["fill_price"] for o in result["orders"]] == [150.0, 150.0, 151.0]
+        assert redis.mget_calls == 1
+        events = [c[0][0] for c in router.event_bus.emit.call_args_list]
+        assert events == [EventType.ORDER_BATCH_ROUTED]
+        assert sum(p["size"] for p in router.paper.get_positions()) == pytest.approx(2.5)
+        assert router.latency.summary()["batch_total"]["count"] == 1
+
+    def test_batch_blocked_atomically(self):
+        router, _ = self._router(TestPreTradeFastPath()._values())
+        router.risk_engine.check_batch = lambda positions, legs, execution_mode="paper": (False, ["Leverage limit exceeded"])
+        result = router.route_orders([{"venue": "paper", "market": "SOL-PERP", "side": "buy", "size": 1.0}] * 3)
+        assert result["status"] == "blocked"
+        assert router.paper.get_positions() == []
+
+        result = router.route_orders([{"venue": "paper", "market": "DOGE-PERP", "side": "buy", "size": 1.0}])
+        assert result["status"] == "blocked"
+        assert "No price data available for DOGE-PERP" in result["reasons"]
+
+
+    def test_live_batch_checks_each_leg_against_its_own_context(self):
+        from unittest.mock import MagicMock
+        router, _ = self._router(TestPreTradeFastPath()._values())
+        router.mode = "live"
+        router.risk_engine.check_batch = lambda positions, legs, execution_mode="live": (True, [])
+        router._get_market_state = lambda ctx=None: {"symbol": ctx.symbol}
+        seen = []
+        router._exec_agent.pre_trade_check = lambda leg, state: seen.append((leg["market"], state["symbol"])) or {"allowed": True}
+        executor = MagicMock()
+        executor.place_order.side_effect = lambda market, side, size, price: {"status": "ok", "fill_price": price}
+        router._get_live_executor = lambda venue: executor
+        legs = [
+            {"venue": "drift", "market": "SOL-PERP", "side": "buy", "size": 1.0, "price": 150.0},
+            {"venue": "drift", "market": "BTC-PERP", "side": "sell", "size": 0.1, "price": 60000.0},
+        ]
+        assert router.route_orders(legs)["status"] == "filled"
+        assert seen == [("SOL-PERP", "SOL_USD"), ("BTC-PERP", "BTC_USD")]
+
+    def test_concurrent_paper_fills_are_serialised(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from backend.core.event_bus import EventBus
+        from backend.execution.paper_exec import PaperExecutor
+        executor = PaperExecutor(event_bus=EventBus(), shared=False)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: executor.place_order("paper", "SOL-PERP", "buy", 0.5, price=100.0, emit_events=False), range(400)))
+        assert executor.get_positions()[0]["size"] == pytest.approx(200.0)
+
+
+class TestAgentRuntime:
+    def _runtime(self, values, **kwargs):
+        from backend.agents.runtime import AgentRuntime
+        redis = _FakeRedis(values)
+        return AgentRuntime(state_store=_FakeStore(redis), tick_ms=0, **kwargs), redis
+
+    def test_one_read_per_tick_and_signals_cached_until_inputs_change(self):
+        import json
+        from backend.agents.runtime import register_default_agents
+        values = {"index:latest": json.dumps({"tariff_index": 40, "shock_score": 10, "ts": "t0"})}
+        runtime, redis = self._runtime(values)
+        register_default_agents(runtime)
+        calls = []
+        runtime.register("counter", lambda snap: calls.append(snap.state["tariff_index"]) or [])
+        published = []
+        runtime.add_tick_listener(published.append)
+
+        first = runtime.tick()
+        assert redis.mget_calls == 1
+        assert first.complete and len(first.agents) == 13
+        assert runtime.tick() is first
+        assert redis.mget_calls == 2 and calls == [40] and published == [first]
+
+        values["index:latest"] = json.dumps({"tariff_index": 90, "shock_score": 85, "ts": "t1"})
+        second = runtime.tick()
+        assert second is not first and calls == [40, 90] and len(published) == 2
+        assert runtime.snapshot().state["tariff_index"] == 90
+        with pytest.raises(TypeError):
+            runtime.snapshot().state["tariff_index"] = 0
+
+    def test_slow_and_failing_agents_do_not_block_the_tick(self):
+        import threading
+        runtime, _ = self._runtime({}, budget_ms=50)
+        release = threading.Event()
+        runtime.register("fast", lambda snap: [{"agent": "fast", "signal": "OK"}])
+        runtime.register("slow", lambda snap: [{"agent": "slow", "signal": "LATE"}] if release.wait(2) else [])
+        runtime.register("broken", lambda snap: 1 / 0)
+
+        started = time.perf_counter()
+        tick = runtime.tick()
+        assert time.perf_counter() - started < 1.0
+        assert [s["agent"] for s in tick.signals] == ["fast"]
+        assert {k: v["status"] for k, v in tick.agents.items()} == {"fast": "ok", "slow": "timeout", "broken": "error"}
+        assert tick.agents["slow"]["stale"] and not tick.agents["fast"]["stale"]
+        assert not tick.complete
+
+        assert runtime.tick() is tick
+        release.set()
+        for _ in range(200):
+            if runtime.status()["agents"]["slow"]["runs"]:
+                break
+            time.sleep(0.01)
+        later = runtime.tick()
+        assert later is not tick and later.tick_id > tick.tick_id
+        assert later.agents["slow"]["status"] == "ok" and not later.agents["slow"]["stale"]
+        assert [s["agent"] for s in later.signals] == ["fast", "slow"]
+        assert [s["agent"] for s in later.new_signals] == ["slow"]
+        status = runtime.status()["agents"]
+        assert status["fast"]["runs"] == 1 and status["slow"]["timeouts"] == 1 and status["broken"]["errors"] == 1
+        runtime.shutdown()
+
+    def test_history_records_each_agent_result_once(self):
+        from unittest.mock import patch
+        from backend.api import agents_routes
+        runtime, _ = self._runtime({})
+        runtime.register("fast", lambda snap: [{"agent": "fast", "signal": "OK"}])
+        with patch.object(agents_routes, "_signal_history", []), patch.object(agents_routes, "_last_published_tick", 0):
+            runtime.add_tick_listener(agents_routes._publish_tick)
+            first = runtime.tick()
+            agents_routes._publish_tick(first)
+            runtime.tick()
+            assert [s["agent"] for s in agents_routes._signal_history] == ["fast"]
+        runtime.shutdown()
+
+
+class TestSignalPipeline:
+    def _pipeline(self, values):
+        from unittest.mock import MagicMock
+        from backend.core.event_bus import EventBus
+        from backend.compute.signal_pipeline import SignalPipeline
+
+        class _PublishingStore(_FakeStore):
+            published = {}
+
+            def set_snapshot(self, key, data, ttl=None):
+                self.published[key] = data
+                return True
+
+        redis = _FakeRedis(values)
+        store = _PublishingStore(redis)
+        return SignalPipeline(state_store=store, event_bus=MagicMock(spec=EventBus), interval_s=3600), redis, store
+
+    def test_nodes_recompute_only_downstream_of_changed_inputs(self):
+        import json
+        values = {"index:latest": json.dumps({"value": 40}), "carry:latest": json.dumps({"score": 1})}
+        pipeline, redis, store = self._pipeline(values)
+        calls = []
+
+        def node(name, fn):
+            def compute(snaps, upstream):
+                calls.append(name)
+                return fn(snaps, upstream)
+            return compute
+
+        pipeline.register("index", node("index", lambda s, u: {"level": s["index:latest"]["value"]}), keys=("index:latest",))
+        pipeline.register("regime", node("regime", lambda s, u: {"risk_off": u["index"]["level"] > 60}), deps=("index",))
+        pipeline.register("carry", node("carry", lambda s, u: dict(s["carry:latest"])), keys=("carry:latest",), publish_as=("carry:published",))
+
+        assert pipeline.run() == ["index", "regime", "carry"]
+        assert pipeline.run() == [] and calls == ["index", "regime", "carry"]
+        assert redis.mget_calls == 2
+
+        values["index:latest"] = json.dumps({"value": 75})
+        assert pipeline.run() == ["index", "regime"]
+        regime = pipeline.get("regime")
+        assert regime["risk_off"] is True and regime["version"] == 2 and regime["as_of"]
+        assert pipeline.get("carry")["version"] == 1
+        assert store.published["pipeline:regime"]["version"] == 2
+        assert store.published["carry:published"]["score"] == 1
+
+    def test_unknown_dependency_and_failed_node(self):
+        pipeline, _, _ = self._pipeline({})
+        with pytest.raises(ValueError):
+            pipeline.register("allocation", lambda s, u: {}, deps=("prediction",))
+        pipeline.register("broken", lambda s, u: 1 / 0)
+        assert pipeline.run() == []
+        assert "division by zero" in pipeline.status()["broken"]["error"]
+        served = pipeline.get("broken")
+        assert served["stale"] is True and "division by zero" in served["error"] and served["version"] == 0
+
+    def test_failed_node_serves_last_good_value(self):
+        import json
+        values = {"index:latest": json.dumps({"value": 40})}
+        pipeline, _, _ = self._pipeline(values)
+        pipeline.register("index", lambda s, u: {"level": 100 / s["index:latest"]["value"]}, keys=("index:latest",))
+        pipeline.run()
+        values["index:latest"] = json.dumps({"value": 0})
+        pipeline.run()
+        served = pipeline.get("index")
+        assert served["level"] == 2.5 and served["version"] == 1
+        assert served["stale"] is True and "division by zero" in served["error"]
+
+    def test_publish_hooks_fire_once_per_published_version(self):
+        import json
+        values = {"index:latest": json.dumps({"value": 40})}
+        pipeline, _, _ = self._pipeline(values)
+        fired = []
+        pipeline.register(
+            "index", lambda s, u: {"level": s["index:latest"]["value"]}, keys=("index:latest",), max_age_s=0,
+            on_publish=lambda previous, current: fired.append(((previous or {}).get("level"), current["level"])),
+        )
+        pipeline.run()
+        pipeline.run()
+        pipeline.run(publish=False)
+        assert fired == [(None, 40)]
+        values["index:latest"] = json.dumps({"value": 75})
+        pipeline.run(publish=False)
+        values["index:latest"] = json.dumps({"value": 80})
+        pipeline.run()
+        assert fired == [(None, 40), (75, 80)]
+
+
+class TestImportAudit:
+    def test_parse_importtime(self):
+        from backend.core.import_audit import parse_importtime
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   backend.config\n"
+            "import time:      2500 |       2620 | main\n"
+            "unrelated warning\n"
+        )
+        assert parse_importtime(stderr) == [("backend.config", 120, 120), ("main", 2500, 2620)]
+
+    def test_app_startup_skips_heavy_analytics_imports(self):
+        from backend.core.import_audit import measure_startup
+        report = measure_startup("main", top=5)
+        assert report["heavy_loaded"] == []
+        assert report["total_ms"] > 0 and len(report["slowest"]) == 5
+
+    def test_app_import_builds_no_router_singletons(self):
+        import os
+        import subprocess
+        import sys
+        from backend.core.import_audit import _ROOT
+        probe = (
+            "import main; from backend.agents import runtime; from backend.execution import router; "
+            "from backend.api import execution_routes; "
+            "assert runtime._runtime is None and router._router is None; "
+            "assert not execution_routes._positions_repo.built"
+        )
+        proc = subprocess.run([sys.executable, "-c", probe], cwd=str(_ROOT), env={**os.environ, "START_LOCAL_REDIS": "0"}, capture_output=True, text=True, timeout=120)
+        assert proc.returncode == 0, proc.stderr
+
+    def test_lazy_builds_once_and_default_tick_listeners_attach(self):
+        from unittest.mock import patch
+        from backend.core.lazy import Lazy
+        from backend.agents import runtime as runtime_mod
+        calls = []
+        lazy = Lazy(lambda: calls.append(1) or object())
+        assert not lazy.built
+        assert lazy() is lazy() and calls == [1] and lazy.built
+
+        seen = []
+        with patch.object(runtime_mod, "_runtime", None), patch.object(runtime_mod, "_default_listeners", []):
+            runtime_mod.add_default_tick_listener(seen.append)
+            rt = runtime_mod.get_agent_runtime()
+            assert seen.append in rt._listeners
+
+
+class _ClusterRedis:
+    """Just enough of redis-py for the lease, command queues and shared paper book."""
+
+    def __init__(self):
+        self.kv = {}
+        self.lists = {}
+        self.hashes = {}
+
+    def get(self, key):
+        return self.kv.get(key)
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.kv:
+            return None
+        self.kv[key] = value
+        return True
+
+    def eval(self, script, numkeys, key, owner, *args):
+        if self.kv.get(key) != owner:
+            return 0
+        if "del" in script:
+            del self.kv[key]
+        return 1
+
+    def incr(self, key):
+        self.kv[key] = str(int(self.kv.get(key) or 0) + 1)
+        return int(self.kv[key])
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lrange(key, start, end)
+
+    def hget(self, key, field):
+        return self.hashes.get(key, {}).get(field)
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field] = value
+
+    def hdel(self, key, *fields):
+        for field in fields:
+            self.hashes.get(key, {}).pop(field, None)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def expire(self, key, seconds):
+        return True
+
+    def transaction(self, func, *watches):
+        pipe = _ClusterPipeline(self, buffered=False)
+        func(pipe)
+        return pipe.execute()
+
+    def pipeline(self):
+        return _ClusterPipeline(self)
+
+
+class _ClusterPipeline:
+    def __init__(self, redis, buffered=True):
+        self.redis = redis
+        self.buffered = buffered
+        self.calls = []
+
+    def multi(self):
+        self.buffered = True
+
+    def __getattr__(self, name):
+        if not self.buffered:
+            return getattr(self.redis, name)
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class TestMultiWorker:
+    def test_leader_lease_is_exclusive(self):
+        from backend.core.cluster import CommandQueue, LeaderLease
+        store = _FakeStore(_ClusterRedis())
+        a = LeaderLease(store, worker_id="a")
+        b = LeaderLease(store, worker_id="b")
+        assert a.refresh() is True and b.refresh() is False
+        assert a.refresh() is True and a.holder() == "a"
+        a.release()
+        assert a.is_leader is False and b.refresh() is True
+
+        queue = CommandQueue("orders", store)
+        for i in range(3):
+            queue.push("add", {"id": i})
+        assert [c["payload"]["id"] for c in queue.drain(limit=2)] == [0, 1]
+        assert [c["op"] for c in queue.drain()] == ["add"] and queue.drain() == []
+
+    def test_paper_book_is_shared_across_workers(self):
+        from backend.core.event_bus import EventBus
+        from backend.execution.paper_exec import PaperExecutor
+        store = _FakeStore(_ClusterRedis())
+        bus = EventBus()
+        a = PaperExecutor(event_bus=bus, state_store=store, shared=True)
+        b = PaperExecutor(event_bus=bus, state_store=store, shared=True)
+        seen = []
+        a.add_position_listener(lambda venue, market, pos: seen.append((market, pos and pos["size"])))
+
+        a.place_order("paper", "SOL-PERP", "buy", 2.0, price=100.0, emit_events=False)
+        b.place_order("paper", "SOL-PERP", "buy", 2.0, price=110.0, emit_events=False)
+        assert b.get_positions()[0]["size"] == 4.0 and b.get_positions()[0]["entry_price"] == pytest.approx(105.0)
+        assert a.sync() == 1 and a.sync() == 0
+        assert [(p["size"], p["entry_price"]) for p in a.get_positions()] == [(4.0, pytest.approx(105.0))]
+        assert seen == [("SOL-PERP", 2.0), ("SOL-PERP", 4.0)]
+
+    def test_failed_shared_fill_is_queued_and_replayed(self):
+        from backend.core.event_bus import EventBus
+        from backend.execution.paper_exec import PAPER_BOOK_KEY, PaperExecutor
+        redis = _ClusterRedis()
+        store = _FakeStore(redis)
+        executor = PaperExecutor(event_bus=EventBus(), state_store=store, shared=True)
+        executor.place_order("paper", "SOL-PERP", "buy", 1.0, price=100.0, emit_events=False)
+        executor.sync()
+
+        store.get_redis = lambda: None
+        executor.place_order("paper", "SOL-PERP", "buy", 1.0, price=120.0, emit_events=False)
+        assert executor.get_positions()[0]["size"] == 2.0
+        assert "2.0" not in redis.hget(PAPER_BOOK_KEY, "paper:SOL-PERP")
+
+        store.get_redis = lambda: redis
+        reads = []
+        redis.hgetall = lambda key: reads.append(key) or _ClusterRedis.hgetall(redis, key)
+        executor.place_order("paper", "SOL-PERP", "sell", 0.5, price=130.0, emit_events=False)
+        assert reads == []
+        shared = PaperExecutor(event_bus=EventBus(), state_store=_FakeStore(redis), shared=True)
+        shared.sync()
+        book = [(p["size"], p["entry_price"]) for p in shared.get_positions()]
+        assert book[0][0] == 1.5
+        assert [(p["size"], p["entry_price"]) for p in executor.get_positions()] == book
+        assert executor.sync() == 0
+
+    def test_followers_forward_conditional_orders_to_leader(self, monkeypatch):
+        from backend.core import cluster
+        from backend.execution.trigger_engine import ConditionalTriggerEngine
+        queue = cluster.CommandQueue("conditional_orders", _FakeStore(_ClusterRedis()))
+        follower = ConditionalTriggerEngine(router=_FakeSmartRouter(), repository=_FakeOrderRepo(), persist=False, shared=True, commands=queue)
+        leader = ConditionalTriggerEngine(router=_FakeSmartRouter(), repository=_FakeOrderRepo(), persist=False, shared=True, commands=queue)
+        order = {"id": "s1", "venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 1.0, "order_type": "stop_loss", "status": "active", "trigger_price": 95.0}
+
+        monkeypatch.setattr(cluster, "is_leader", lambda: False)
+        follower.add(order)
+        assert follower.on_price("SOL-PERP", 90.0) == [] and leader.on_price("SOL-PERP", 90.0) == []
+
+        monkeypatch.setattr(cluster, "is_leader", lambda: True)
+        assert [o["id"] for o in leader.on_price("SOL-PERP", 94.0)] == ["s1"]
+        assert leader.get_orders()[0]["status"] == "triggered"
+
+
+class TestStructuredLogging:
+    def _record(self, name="backend.execution.paper_exec", level=20, created=1_700_000_000.25, msg="fill %s"):
+        import logging
+        record = logging.LogRecord(name, level, __file__, 1, msg, ("x",), None)
+        record.created = created
+        return record
+
+    def test_formatter_uses_record_created(self):
+        import json
+        from datetime import datetime, timezone
+        from backend.logging_config import StructuredFormatter
+        record = self._record()
+        entry = json.loads(StructuredFormatter().format(record))
+        assert entry["ts"] == datetime.fromtimestamp(record.created, timezone.utc).isoformat()
+        assert entry["message"] == "fill x" and entry["logger"] == "backend.execution.paper_exec"
+
+    def test_rate_limit_counts_and_reports_suppressed(self):
+        from backend.logging_config import RateLimitFilter
+        limiter = RateLimitFilter({"backend.execution": 2})
+        kept = [limiter.filter(self._record(created=100.0)) for _ in range(5)]
+        assert kept == [True, True, False, False, False]
+        assert limiter.filter(self._record(level=40, created=100.0)) is True
+        assert limiter.filter(self._record(name="backend.api.risk_routes", created=100.0)) is True
+        later = self._record(created=101.0)
+        assert limiter.filter(later) is True and later.suppressed == 3
+        assert limiter.dropped == {"backend.execution": 3}
+
+    def test_queue_handler_never_blocks(self):
+        import queue
+        from backend.logging_config import NonBlockingQueueHandler
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(self._record())
+        handler.handle(self._record())
+        queued = handler.queue.get_nowait()
+        assert queued.msg == "fill x" and queued.args is None
+        assert handler.dropped == 1
+
+    def test_full_queue_keeps_warnings_and_leaves_the_record_intact(self):
+        import logging
+        import queue
+        import sys
+        from backend.logging_config import NonBlockingQueueHandler
+
+        class _Collect(logging.Handler):
+            def __init__(self):
+                super().__init__()
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        overflow = _Collect()
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1), overflow=overflow)
+        handler.handle(self._record())
+        handler.handle(self._record(level=10))
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            failure = self._record(level=40)
+            failure.exc_info = sys.exc_info()
+        handler.handle(failure)
+        assert handler.dropped == 1 and handler.overflowed == 1
+        written = overflow.records[0]
+        assert written.levelno == 40 and written.msg == "fill x" and "ValueError: boom" in written.exc_text
+        assert failure.exc_info[0] is ValueError and failure.args == ("x",) and failure.msg == "fill %s"
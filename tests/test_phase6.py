@@ -2,6 +2,12 @@ import pytest
 import math
 
 
+@pytest.fixture(autouse=True)
+def _isolated_model_registry(tmp_path, monkeypatch):
+    from backend.ml import model_registry
+    monkeypatch.setattr(model_registry, "_registry", model_registry.ModelRegistry(str(tmp_path / "models")))
+
+
 class TestCapitalAllocator:
     def setup_method(self):
         from backend.compute.capital_allocator import allocate, VENUES
@@ -212,6 +218,22 @@ class TestMLFeatureStore:
         high_result = self.build({"vol_regime": "extreme"})
         assert low_result["features"]["vol_regime_encoded"] < high_result["features"]["vol_regime_encoded"]
 
+    def test_feature_matrix_matches_per_state_builder(self):
+        import numpy as np
+        import pandas as pd
+        from backend.ml.feature_store import build_feature_matrix
+        states = [
+            {},
+            {"tariff_index": "150", "shock_score": -7, "vol_regime": "HIGH", "funding_skew": float("nan")},
+            {"basis_spread": 0.1234567, "vol_regime": "unknown", "liquidity_score": float("inf"), "predictor_confidence": None},
+        ]
+        expected = np.array([self.to_vector(self.build(s)["features"]) for s in states], dtype=np.float32)
+        X = build_feature_matrix(states)
+        assert X.dtype == np.float32
+        assert X.shape == (3, len(self.FEATURE_NAMES))
+        assert np.array_equal(X, expected)
+        assert np.array_equal(build_feature_matrix(pd.DataFrame(states)), expected)
+
 
 class TestMLInference:
     def setup_method(self):
@@ -244,6 +266,30 @@ class TestMLInference:
         result = self.predict(features)
         assert "ts" in result
 
+    def test_predict_batch_matches_single_row_predict(self):
+        import numpy as np
+        from backend.ml import training
+        from backend.ml.feature_store import build_feature_matrix, build_features
+        from backend.ml.inference import predict_batch
+        states = [{"tariff_index": 20 + 5 * i, "shock_score": (i % 5) - 2, "predictor_confidence": i / 40} for i in range(40)]
+        labels = [int(s["shock_score"] < 0) for s in states]
+        original = training._TRAINED_MODEL
+        try:
+            for trained in (False, True):
+                training._TRAINED_MODEL = None
+                if trained and not training.train_offline(states, labels)["success"]:
+                    continue
+                batch = predict_batch(build_feature_matrix(states))
+                assert len(batch["probability"]) == len(states)
+                assert np.array_equal(batch["prediction"], (batch["probability"] > 0.5).astype(np.int8))
+                for i in (0, 17, 39):
+                    single = self.predict(build_features(states[i])["features"])
+                    assert single["probability"] == round(float(batch["probability"][i]), 4)
+                    assert single["prediction"] == int(batch["prediction"][i])
+                    assert single["model_type"] == batch["model_type"]
+        finally:
+            training._TRAINED_MODEL = original
+
 
 class TestMLTraining:
     def setup_method(self):
@@ -271,6 +317,311 @@ class TestMLTraining:
         result = self.train(samples=[], labels=[], method="logistic")
         assert "ts" in result
 
+    def test_training_and_inference_fill_missing_features_alike(self):
+        from unittest.mock import patch
+        import numpy as np
+        from backend.ml import inference, training
+        row = {"tariff_index": 55.0, "shock_score": 1.2}
+        seen = {}
+
+        def capture_train(X, y, **kwargs):
+            seen["train"] = X
+            return {"success": True}
+
+        def capture_serve(X):
+            seen["serve"] = X
+            return {"probability": np.array([0.5]), "prediction": np.array([0]), "confidence": np.array([0.5]), "model_type": "stub"}
+
+        with patch.object(training, "train_matrix", capture_train), patch.object(inference, "predict_batch", capture_serve):
+            self.train(samples=[row] * self.MIN_SAMPLES, labels=[0, 1] * (self.MIN_SAMPLES // 2))
+            inference.predict(row)
+        assert np.array_equal(seen["train"][0], seen["serve"][0])
+
+    def test_train_from_materialised_history(self):
+        from datetime import datetime, timedelta, timezone
+        from backend.ml import training
+        from backend.ml.feature_history import FeatureHistory
+        from backend.ml.feature_store import FEATURE_NAMES
+
+        class FakeFeatureRepo:
+            def __init__(self):
+                self.rows = []
+                self.queries = []
+
+            def save_row(self, symbol, price, features, ts=None):
+                self.rows.append({"symbol": symbol, "price": price, "ts": ts, **features})
+                return self.rows[-1]
+
+            def get_training_rows(self, start, end, horizon_seconds, symbol="SOL_USD"):
+                self.queries.append((start, end, horizon_seconds, symbol))
+                return [r for r in self.rows if start <= r["ts"] < end and "forward_return" in r]
+
+        repo = FakeFeatureRepo()
+        history = FeatureHistory(repository=repo, state_store=object())
+        t0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        for i in range(30):
+            shock = (i % 6) - 3
+            history.materialise(100.0 + i, state={"shock_score": shock, "tariff_index": 20 + i}, ts=t0 + timedelta(minutes=5 * i))
+            repo.rows[-1]["forward_return"] = -0.01 * shock
+        assert history.materialise(0.0, state={}) is None
+        assert len(repo.rows) == 30
+
+        end = t0 + timedelta(minutes=5 * 25)
+        X, y, ts = history.training_set(t0, end, horizon_seconds=3600, threshold=0.0)
+        assert repo.queries[-1] == (t0, end, 3600, "SOL_USD")
+        assert X.shape == (25, len(FEATURE_NAMES)) and str(X.dtype) == "float32"
+        assert y.tolist() == [int(-0.01 * ((i % 6) - 3) > 0) for i in range(25)]
+        assert ts[-1] < end
+
+        original = training._TRAINED_MODEL
+        try:
+            result = training.train_from_history(t0, t0 + timedelta(minutes=5 * 10), history=history)
+            assert result["success"] is False and "Insufficient" in result["reason"]
+            result = training.train_from_history(t0, end, horizon_seconds=3600, history=history)
+            if result.get("reason") != "scikit-learn not installed":
+                assert result["success"] is True
+                assert result["n_samples"] == 25
+                assert result["window"]["horizon_seconds"] == 3600
+        finally:
+            training._TRAINED_MODEL = original
+
+
+class TestBatchExplanations:
+    def test_linear_attributions_reconstruct_decision_function(self):
+        import numpy as np
+        from backend.ml import training
+        from backend.ml.explainability import explain, explain_batch
+        from backend.ml.feature_store import build_feature_matrix, build_features
+
+        states = [{"tariff_index": 20 + i, "shock_score": (i % 6) - 3, "stable_flow": (i % 4) / 4} for i in range(60)]
+        labels = [int(s["shock_score"] < 0) for s in states]
+        original = training._TRAINED_MODEL
+        try:
+            if not training.train_offline(states, labels)["success"]:
+                pytest.skip("scikit-learn not installed")
+            X = build_feature_matrix(states)
+            batch = explain_batch(X)
+            assert batch["method"] == "linear_attribution"
+            assert batch["contributions"].shape == X.shape
+            model_data = training.get_trained_model()
+            logits = model_data["model"].decision_function(model_data["scaler"].transform(X))
+            assert np.allclose(batch["contributions"].sum(axis=1) + batch["base_value"], logits, atol=1e-5)
+
+            single = explain(build_features(states[7])["features"])
+            assert single["method"] == "linear_attribution"
+            by_feature = {c["feature"]: c["contribution"] for c in single["contributions"]}
+            assert by_feature["shock_score"] == pytest.approx(batch["contributions"][7][2], abs=1e-5)
+        finally:
+            training._TRAINED_MODEL = original
+
+    def test_tree_and_heuristic_paths(self):
+        import numpy as np
+        from backend.ml import training
+        from backend.ml.explainability import explain_batch
+        from backend.ml.feature_store import FEATURE_NAMES
+
+        class FakeBooster:
+            def predict(self, X, pred_contrib=False):
+                assert pred_contrib
+                return np.hstack([np.asarray(X) * 0.5, np.full((len(X), 1), -0.2)])
+
+        X = np.ones((3, len(FEATURE_NAMES)), dtype=np.float32)
+        original = training._TRAINED_MODEL
+        try:
+            training._TRAINED_MODEL = {"type": "lgbm", "model": FakeBooster(), "scaler": None}
+            batch = explain_batch(X)
+            assert batch["method"] == "tree_shap"
+            assert np.allclose(batch["contributions"], 0.5) and np.allclose(batch["base_value"], -0.2)
+
+            training._TRAINED_MODEL = None
+            batch = explain_batch(X)
+            assert batch["method"] == "heuristic"
+            assert batch["contributions"].shape == (3, len(FEATURE_NAMES))
+        finally:
+            training._TRAINED_MODEL = original
+
+
+class TestModelRegistry:
+    def _fit(self, seed):
+        import numpy as np
+        from backend.ml import training
+        from backend.ml.feature_store import FEATURE_NAMES
+        rng = np.random.default_rng(seed)
+        X = rng.normal(size=(40, len(FEATURE_NAMES))).astype("float32")
+        y = (X[:, 2] > 0).astype(int).tolist()
+        return X, training.train_matrix(X, y)
+
+    def test_versions_persist_and_hot_swap_across_workers(self, tmp_path):
+        import numpy as np
+        from backend.ml import training
+        from backend.ml.model_registry import ModelRegistry, get_model_registry
+
+        original = training._TRAINED_MODEL
+        try:
+            X, first = self._fit(1)
+            if not first["success"]:
+                pytest.skip("scikit-learn not installed")
+            registry = get_model_registry()
+            assert registry.active_version() == first["version"]
+            meta = registry.list_versions()[0]
+            assert meta["feature_hash"] and meta["metrics"]["train_accuracy"] == first["train_accuracy"]
+
+            worker = ModelRegistry(registry.root)
+            loaded = worker.warm_load()
+            assert loaded["version"] == first["version"]
+            expected = training.get_trained_model()["model"].predict_proba(training.get_trained_model()["scaler"].transform(X))
+            assert np.allclose(loaded["model"].predict_proba(loaded["scaler"].transform(X)), expected)
+            assert worker.poll() is None
+
+            _, second = self._fit(2)
+            assert registry.active_version() == second["version"]
+            swapped = worker.poll()
+            assert swapped is not None and swapped["version"] == second["version"]
+            assert worker.current_version == second["version"]
+
+            training.promote_model_version(first["version"])
+            assert training.get_trained_model()["version"] == first["version"]
+            assert worker.poll()["version"] == first["version"]
+        finally:
+            training._TRAINED_MODEL = original
+
+    def test_rejects_model_with_different_feature_set(self):
+        import json
+        import os
+        from backend.ml import training
+        from backend.ml.model_registry import META_FILE, get_model_registry
+
+        original = training._TRAINED_MODEL
+        try:
+            _, result = self._fit(3)
+            if not result["success"]:
+                pytest.skip("scikit-learn not installed")
+            registry = get_model_registry()
+            path = os.path.join(registry.root, result["version"], META_FILE)
+            with open(path) as fh:
+                meta = json.load(fh)
+            meta["feature_hash"] = "stale"
+            with open(path, "w") as fh:
+                json.dump(meta, fh)
+            with pytest.raises(ValueError):
+                registry.load(result["version"])
+            assert registry.warm_load() is None
+        finally:
+            training._TRAINED_MODEL = original
+
+
+class TestTrainingJobQueue:
+    class _Bus:
+        def __init__(self):
+            self.events = []
+
+        def emit(self, event_type, source="", payload=None):
+            self.events.append((event_type, payload))
+
+    def _wait(self, queue, job_id, timeout=60.0):
+        import time
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = queue.get(job_id)
+            if job["status"] in ("succeeded", "failed", "cancelled"):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"training job {job_id} did not finish")
+
+    def test_jobs_train_in_worker_process_and_promote(self):
+        from backend.core.event_bus import EventType
+        from backend.ml import training
+        from backend.ml.model_registry import get_model_registry
+        from backend.ml.training_jobs import TrainingJobQueue, TrainingQueueFull
+
+        samples = [{"tariff_index": 20 + i, "shock_score": (i % 6) - 3} for i in range(30)]
+        labels = [int(s["shock_score"] < 0) for s in samples]
+        bus = self._Bus()
+        queue = TrainingJobQueue(max_workers=1, max_pending=2, event_bus=bus)
+        completed = []
+        queue.add_completion_listener(completed.append)
+        original = training._TRAINED_MODEL
+        try:
+            first = queue.submit("samples", {"samples": samples, "labels": labels})
+            second = queue.submit("samples", {"samples": samples, "labels": labels})
+            assert first["status"] in ("queued", "running")
+            with pytest.raises(TrainingQueueFull):
+                queue.submit("samples", {"samples": samples, "labels": labels})
+            queue.cancel(second["job_id"])
+
+            done = self._wait(queue, first["job_id"])
+            if done["status"] == "failed" and "scikit-learn" in (done["error"] or ""):
+                pytest.skip("scikit-learn not installed")
+            assert done["status"] == "succeeded" and done["progress"] == 1.0
+            version = done["result"]["version"]
+            assert get_model_registry().active_version() == version
+            assert training.get_trained_model()["version"] == version
+            assert [e for e, _ in bus.events] == [EventType.ML_MODEL_TRAINED]
+            assert completed[0]["job_id"] == first["job_id"]
+
+            cancelled = self._wait(queue, second["job_id"])
+            assert cancelled["status"] == "cancelled"
+            assert get_model_registry().active_version() == version
+        finally:
+            queue.shutdown()
+            training._TRAINED_MODEL = original
+
+
+    def test_worker_reports_each_fold_and_stops_when_cancelled(self, tmp_path):
+        import queue as queue_mod
+        from unittest.mock import patch
+        from backend.ml import model_registry, training
+        from backend.ml.training_jobs import _run_job
+
+        samples = [{"tariff_index": 20 + i, "shock_score": (i % 6) - 3} for i in range(40)]
+        params = {"samples": samples, "labels": [int(s["shock_score"] < 0) for s in samples]}
+
+        class _CancelAfter(dict):
+            def __init__(self, updates, after):
+                super().__init__()
+                self.updates, self.after = updates, after
+
+            def get(self, key, default=None):
+                return self.updates.qsize() >= self.after
+
+        with patch.object(model_registry, "_registry", None):
+            updates = queue_mod.Queue()
+            result = _run_job("j1", "samples", params, str(tmp_path), updates, {})
+            if not result.get("success") and "scikit-learn" in result.get("reason", ""):
+                pytest.skip("scikit-learn not installed")
+            reported = [updates.get_nowait() for _ in range(updates.qsize())]
+            stages = [stage for _, stage, _ in reported]
+            fractions = [fraction for _, _, fraction in reported]
+            assert stages[0] == "started" and stages[-1] == "registering"
+            assert [s for s in stages if s.startswith("cv fold")] == [f"cv fold {i}/5" for i in range(1, 6)]
+            assert fractions == sorted(fractions) and len(set(fractions)) == len(fractions)
+            assert len(result["cv_scores"]) == 5
+
+            stopped_root = tmp_path / "stopped"
+            updates = queue_mod.Queue()
+            with pytest.raises(training.TrainingCancelled):
+                _run_job("j2", "samples", params, str(stopped_root), updates, _CancelAfter(updates, 4))
+            assert updates.qsize() == 4
+            assert model_registry.ModelRegistry(str(stopped_root)).list_versions() == []
+
+    def test_progress_updates_and_cancel_flag_reach_job_records(self):
+        import queue as queue_mod
+        from backend.ml.training_jobs import TrainingJobQueue
+
+        jobs = TrainingJobQueue(max_workers=1, event_bus=self._Bus())
+        jobs._jobs["a"] = {"job_id": "a", "status": "queued", "stage": "queued", "progress": 0.0, "cancel_requested": False}
+        jobs._jobs["b"] = {"job_id": "b", "status": "succeeded", "stage": "done", "progress": 1.0, "cancel_requested": False}
+        jobs._cancels = {}
+        updates = queue_mod.Queue()
+        for item in (("a", "fitting", 0.25), ("a", "cv fold 1/5", 0.5), ("b", "fitting", 0.25), None):
+            updates.put(item)
+        jobs._pump_progress(updates)
+        assert jobs.get("a")["status"] == "running" and jobs.get("a")["stage"] == "cv fold 1/5" and jobs.get("a")["progress"] == 0.5
+        assert jobs.get("b")["status"] == "succeeded" and jobs.get("b")["progress"] == 1.0
+
+        jobs.cancel("a")
+        assert jobs._cancels == {"a": True} and jobs.get("a")["cancel_requested"] is True
+
 
 class TestRedisHealthFallback:
     def test_state_store_handles_no_redis(self):
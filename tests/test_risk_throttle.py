@@ -334,3 +334,113 @@ class TestRiskEngine:
             assert allowed is False
         else:
             assert allowed is True
+
+    def test_batch_nets_legs_before_limits(self, engine):
+        """Test that a batch is judged on its netted post-trade exposure."""
+        positions = [
+            {"venue": "paper", "market": "SOL-PERP", "size": 10.0, "entry_price": 100.0, "margin": 1000.0},
+        ]
+        rotation = [
+            {"venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 10.0, "price": 100.0},
+            {"venue": "paper", "market": "ETH-PERP", "side": "buy", "size": 0.5, "price": 2000.0},
+        ]
+        allowed, reasons = engine.check_batch(positions, rotation)
+        assert allowed is True
+        assert reasons == []
+
+        engine.activate_throttle("test")
+        allowed, reasons = engine.check_batch(positions, rotation[:1])
+        assert allowed is True
+
+        allowed, reasons = engine.check_batch(positions, rotation[1:])
+        assert allowed is False
+        assert any("Throttle" in r for r in reasons)
+
+    def test_rotation_batch_is_not_reducing(self):
+        """Test that closing one market does not let a batch open another past the throttle or caps."""
+        engine = RiskEngine(max_leverage=100.0, max_margin_pct=10.0, cooldown_seconds=0, max_asset_notional=500.0)
+        positions = [
+            {"venue": "paper", "market": "SOL-PERP", "size": 10.0, "entry_price": 100.0, "margin": 1000.0},
+        ]
+        rotation = [
+            {"venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 10.0, "price": 100.0},
+            {"venue": "paper", "market": "ETH-PERP", "side": "buy", "size": 0.45, "price": 2000.0},
+        ]
+        allowed, reasons = engine.check_batch(positions, rotation)
+        assert allowed is False
+        assert any("Asset exposure limit" in r and "ETH" in r for r in reasons)
+        assert not any("SOL" in r for r in reasons)
+
+        engine.activate_throttle("test")
+        allowed, reasons = engine.check_batch(positions, rotation)
+        assert allowed is False
+        assert any("Throttle" in r for r in reasons)
+        assert engine.check_batch(positions, rotation[:1]) == (True, [])
+
+    def test_batch_rejected_as_a_whole(self, engine):
+        """Test that legs individually within limits can breach limits together."""
+        positions = [
+            {"venue": "paper", "market": "SOL-PERP", "size": 1.0, "entry_price": 100.0, "margin": 100.0},
+        ]
+        leg = {"venue": "paper", "market": "ETH-PERP", "side": "buy", "size": 0.05, "price": 2000.0, "margin": 0.0}
+        _, reasons = engine.check_batch(positions, [leg])
+        assert not any("Leverage" in r for r in reasons)
+
+        allowed, reasons = engine.check_batch(positions, [leg, {**leg, "market": "BTC-PERP"}, {**leg, "market": "JUP-PERP"}])
+        assert allowed is False
+        assert any("Leverage" in r for r in reasons)
+
+    def test_exposure_index_tracks_fills(self, engine):
+        """Test that the live index replaces per-key contributions and backs check_constraints(None, ...)."""
+        engine.on_position("paper", "SOL-PERP", {"size": 10.0, "entry_price": 100.0, "margin": 1000.0})
+        engine.on_position("paper", "ETH-PERP", {"size": -1.0, "entry_price": 2000.0, "margin": 500.0})
+        assert engine.exposure.total_notional == pytest.approx(3000.0)
+        assert engine.exposure.total_margin == pytest.approx(1500.0)
+
+        engine.on_position("paper", "SOL-PERP", {"size": 5.0, "entry_price": 100.0, "margin": 500.0})
+        engine.on_position("paper", "ETH-PERP", None)
+        assert len(engine.exposure) == 1
+        assert engine.exposure.total_notional == pytest.approx(500.0)
+        assert engine.exposure.asset_notional == {"SOL": pytest.approx(500.0)}
+
+        sell = {"venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 5.0, "price": 100.0}
+        assert engine._is_reducing(None, sell) is True
+        snapshot = [{"venue": "paper", "market": "SOL-PERP", "size": 5.0, "entry_price": 100.0, "margin": 500.0}]
+        assert engine.check_constraints(None, sell) == engine.check_constraints(snapshot, sell)
+
+    def test_venue_and_asset_limits(self):
+        """Test that per-venue and per-asset notional caps block growth but not reductions."""
+        engine = RiskEngine(max_leverage=100.0, max_margin_pct=10.0, cooldown_seconds=0,
+                            max_venue_notional=2000.0, max_asset_notional=1500.0)
+        engine.on_position("paper", "SOL-PERP", {"size": 10.0, "entry_price": 100.0, "margin": 1000.0})
+
+        allowed, reasons = engine.check_constraints(
+            None, {"venue": "paper", "market": "SOL/USD", "side": "buy", "size": 6.0, "price": 100.0},
+        )
+        assert allowed is False
+        assert any("Asset exposure limit" in r and "SOL" in r for r in reasons)
+        assert not any("Venue exposure limit" in r for r in reasons)
+
+        allowed, reasons = engine.check_batch(None, [
+            {"venue": "paper", "market": "ETH-PERP", "side": "buy", "size": 0.6, "price": 2000.0},
+        ])
+        assert allowed is False
+        assert any("Venue exposure limit" in r for r in reasons)
+
+        allowed, reasons = engine.check_constraints(
+            None, {"venue": "paper", "market": "SOL-PERP", "side": "sell", "size": 10.0, "price": 100.0},
+        )
+        assert allowed is True
+
+    def test_router_uses_configured_engine(self):
+        """Test that the execution router checks orders against the configured caps, not the defaults."""
+        from unittest.mock import MagicMock
+        from backend import config
+        from backend.compute.risk_engine import get_risk_engine
+        from backend.core.event_bus import EventBus
+        from backend.execution.router import ExecutionRouter
+
+        router = ExecutionRouter(event_bus=MagicMock(spec=EventBus))
+        assert router.risk_engine is get_risk_engine()
+        assert router.risk_engine.max_leverage == config.MAX_LEVERAGE
+        assert router.risk_engine.max_venue_notional == config.MAX_VENUE_NOTIONAL